@@ -0,0 +1,221 @@
+"""Disponibilidad con reparación (MTTR) para todos los tipos de bloque (sin Qt)
+
+Cada bloque se modela como n unidades idénticas e independientes, cada una
+con su propio equipo de reparación, de las que se requieren k:
+
+    Componente Simple, Sistema con Mantenimiento   n = k = 1
+    Serie                                          k = n
+    Paralelo                                       k = 1
+    Redundancia k-de-n                             k, n
+    Reserva en Espera, Carga Compartida            n = k = 1 con el MTBF del
+                                                   bloque (standby.py)
+
+Parámetros de reparación de cada bloque (horas; 0 = sin reparación):
+    mttr   tiempo medio de reparación
+    mldt   demora logística media (sólo afecta a la disponibilidad operacional)
+
+Todas las fórmulas son formas cerradas vectorizadas: los bloques de un mismo
+tipo se evalúan en una sola pasada de NumPy, igual que block_mtbf_array.
+"""
+
+import numpy as np
+
+from reliability import (DEFAULT_TIMES, block_mtbf_array, normalize_type,
+                         params_columns)
+
+HOURS_PER_YEAR = 8760
+REPAIR_KEYS = ('mttr', 'mldt')
+
+
+def unit_structure(block_type, columns):
+    """n, k y tasa de falla λ de las unidades de cada fila"""
+    block_type = normalize_type(block_type)
+    size = len(next(iter(columns.values())))
+    ones = np.ones(size, dtype=int)
+
+    def rate(mtbf):
+        mtbf = np.asarray(mtbf, dtype=float)
+        return np.where(mtbf > 0, 1 / np.where(mtbf > 0, mtbf, 1), np.inf)
+
+    if block_type == 'Componente Simple':
+        return ones, ones, np.asarray(columns['lambda'], dtype=float)
+    if block_type == 'Serie':
+        n = columns['n'].astype(int)
+        return n, n, rate(columns['mtbf'])
+    if block_type == 'Paralelo':
+        return columns['n'].astype(int), ones, rate(columns['mtbf'])
+    if block_type == 'Redundancia k-de-n':
+        return columns['n'].astype(int), columns['k'].astype(int), rate(columns['mtbf'])
+    return ones, ones, rate(block_mtbf_array(block_type, columns))
+
+
+def k_of_n(a, n, k):
+    """P(al menos k de n unidades operan) con disponibilidad de unidad a
+
+    a puede tener una dimensión extra (tiempos) después de la de filas.
+    """
+    a = np.asarray(a, dtype=float)
+    extra = a.ndim - 1
+    shape = (-1,) + (1,) * extra + (1,)
+    n_max = int(n.max()) if n.size else 0
+    j = np.arange(n_max + 1)
+    nn = n.reshape(shape)
+    kk = k.reshape(shape)
+
+    log_fact = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, n_max + 1)))])
+    jj = np.minimum(j, nn)
+    log_comb = log_fact[nn] - log_fact[jj] - log_fact[nn - jj]
+    terms = np.exp(log_comb) * a[..., None] ** j * (1 - a[..., None]) ** np.maximum(nn - j, 0)
+    mask = (j >= kk) & (j <= nn)
+    return np.where(mask, terms, 0.0).sum(axis=-1)
+
+
+def k_of_n_frequency(a, lam, n, k):
+    """Frecuencia de falla estacionaria de un bloque k-de-n reparable
+
+    El bloque falla cuando hay exactamente k unidades operando y una de
+    ellas falla: f = C(n,k) a^k (1-a)^(n-k) · k·λ.
+    """
+    valid = k <= n
+    kk = np.minimum(k, n)
+    log_fact = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, int(n.max()) + 1)))])
+    comb = np.exp(log_fact[n] - log_fact[kk] - log_fact[n - kk])
+    f = comb * a ** kk * (1 - a) ** (n - kk) * kk * lam
+    return np.where(valid, f, 0.0)
+
+
+def block_availability_array(block_type, columns, times=None):
+    """Disponibilidad de todas las filas de un mismo tipo de bloque
+
+    Devuelve un dict de arrays:
+        repairable    el bloque tiene MTTR > 0
+        inherent      Ai estacionaria (sólo MTTR)
+        operational   Ao estacionaria (MTTR + demora logística)
+        frequency     fallas del bloque por hora en régimen
+        mut, mdt      tiempo medio operando / detenido por falla (horas)
+        downtime      horas detenidas por año (según Ao)
+        point         A(t) para cada tiempo (filas × tiempos), si se pide
+    """
+    n, k, lam = unit_structure(block_type, columns)
+    mttr = np.asarray(columns['mttr'], dtype=float)
+    mldt = np.asarray(columns['mldt'], dtype=float)
+    repairable = (mttr > 0) & np.isfinite(lam)
+    # λ = 0 (MTBF infinito): el bloque nunca falla, se repare o no
+    always_up = np.where(lam == 0, 1.0, 0.0)
+
+    def unit_availability(down):
+        mu = 1 / np.where(repairable, down, 1.0)
+        return np.where(repairable, mu / (lam + mu), 0.0)
+
+    a = unit_availability(mttr)
+    a_op = unit_availability(mttr + mldt)
+    inherent = np.where(repairable, k_of_n(a, n, k), always_up)
+    operational = np.where(repairable, k_of_n(a_op, n, k), always_up)
+    frequency = np.where(repairable, k_of_n_frequency(a, lam, n, k), 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mut = np.where(frequency > 0, inherent / frequency, np.inf)
+        mdt = np.where(frequency > 0, (1 - inherent) / frequency, 0.0)
+
+    result = {
+        'repairable': repairable,
+        'inherent': inherent,
+        'operational': operational,
+        'frequency': frequency,
+        'mut': mut,
+        'mdt': mdt,
+        'downtime': (1 - operational) * HOURS_PER_YEAR,
+    }
+
+    if times is not None:
+        t = np.asarray(times, dtype=float)[None, :]
+        mu = 1 / np.where(repairable, mttr, 1.0)[:, None]
+        lam_c = lam[:, None]
+        a_t = mu / (lam_c + mu) + lam_c / (lam_c + mu) * np.exp(-(lam_c + mu) * t)
+        repaired = k_of_n(a_t, n, k)
+        # Sin reparación la disponibilidad coincide con R(t) = e^(-t/MTBF)
+        mtbf = block_mtbf_array(block_type, columns)[:, None]
+        with np.errstate(divide='ignore'):
+            unrepaired = np.exp(-t / np.where(mtbf > 0, mtbf, 0.0))
+        result['point'] = np.where(repairable[:, None], repaired, unrepaired)
+    return result
+
+
+def design_availability(blocks, times=DEFAULT_TIMES):
+    """Evalúa todos los bloques agrupando por tipo; devuelve arrays en su orden"""
+    size = len(blocks)
+    out = {
+        key: np.zeros(size) for key in
+        ('inherent', 'operational', 'frequency', 'mut', 'mdt', 'downtime')
+    }
+    out['repairable'] = np.zeros(size, dtype=bool)
+    out['point'] = np.zeros((size, len(times)))
+
+    groups = {}
+    for i, block in enumerate(blocks):
+        groups.setdefault(normalize_type(block['type']), []).append(i)
+
+    for block_type, indices in groups.items():
+        columns = params_columns(block_type,
+                                 [blocks[i].get('params', {}) for i in indices],
+                                 REPAIR_KEYS)
+        result = block_availability_array(block_type, columns, times)
+        for key, values in result.items():
+            out[key][indices] = values
+    return out
+
+
+def series_availability(inherent, operational, frequency, point):
+    """Disponibilidad de bloques independientes en serie
+
+    A = Π A_i y f = Σ f_i · Π_{j≠i} A_j (productos excluyentes calculados
+    con prefijos y sufijos para admitir A_i = 0).
+    """
+    inherent = np.asarray(inherent, dtype=float)
+    prefix = np.concatenate([[1.0], np.cumprod(inherent)[:-1]])
+    suffix = np.concatenate([np.cumprod(inherent[::-1])[:-1][::-1], [1.0]])
+    a_sys = float(np.prod(inherent))
+    a_op = float(np.prod(operational))
+    f_sys = float(np.sum(frequency * prefix * suffix))
+    return {
+        'inherent': a_sys,
+        'operational': a_op,
+        'frequency': f_sys,
+        'mut': a_sys / f_sys if f_sys > 0 else float('inf'),
+        'mdt': (1 - a_sys) / f_sys if f_sys > 0 else 0.0,
+        'downtime': (1 - a_op) * HOURS_PER_YEAR,
+        'point': np.prod(point, axis=0).tolist(),
+    }
+
+
+def evaluate_availability(design, times=DEFAULT_TIMES):
+    """Disponibilidad por bloque y, si hay conexiones, del sistema en serie"""
+    blocks = design.get('blocks', [])
+    data = design_availability(blocks, times)
+
+    result = {
+        'times': list(times),
+        'blocks': [
+            {
+                'name': block.get('name', ''),
+                'type': block['type'],
+                'repairable': bool(data['repairable'][i]),
+                'inherent': float(data['inherent'][i]),
+                'operational': float(data['operational'][i]),
+                'frequency': float(data['frequency'][i]),
+                'mut': float(data['mut'][i]),
+                'mdt': float(data['mdt'][i]),
+                'downtime': float(data['downtime'][i]),
+                'point': data['point'][i].tolist(),
+            }
+            for i, block in enumerate(blocks)
+        ],
+    }
+
+    if design.get('connections') and blocks:
+        system = series_availability(data['inherent'], data['operational'],
+                                     data['frequency'], data['point'])
+        # Un bloque que nunca falla no necesita reparación
+        system['repairable'] = bool((data['repairable'] | (data['inherent'] == 1.0)).all())
+        result['system'] = system
+    return result
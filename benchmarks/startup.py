@@ -0,0 +1,164 @@
+"""Benchmark de arranque: tiempo hasta la primera ventana y costo de imports
+
+Cada medición corre en un intérprete nuevo con la plataforma Qt 'offscreen':
+
+- frío: caché de bytecode vacía (PYTHONPYCACHEPREFIX en un directorio nuevo),
+  todos los módulos se compilan y cargan desde cero;
+- tibio: caché de bytecode ya poblada por una corrida previa.
+
+Ejemplo:
+    python benchmarks/startup.py --app mainpremi --runs 5 --json arranque.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = {'main': 'MTBFCalculator', 'mainpremi': 'MTBFApp'}
+
+
+def child(app):
+    """Arranca la aplicación y reporta los tiempos de cada fase"""
+    t0 = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    module = __import__(app)
+    t_import = time.perf_counter()
+
+    from PyQt5.QtCore import QEvent, QObject
+    from PyQt5.QtWidgets import QApplication
+
+    qt_app = QApplication(sys.argv[:1])
+    t_app = time.perf_counter()
+
+    window = getattr(module, APPS[app])()
+    t_window = time.perf_counter()
+
+    painted = {}
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and 'time' not in painted:
+                painted['time'] = time.perf_counter()
+                qt_app.quit()
+            return False
+
+    watcher = FirstPaint()
+    window.installEventFilter(watcher)
+    window.show()
+    qt_app.exec_()
+
+    loaded = sorted(m for m in sys.modules if m in ('numpy', 'reliability', 'design'))
+    print(json.dumps({
+        'import': t_import - t0,
+        'qapplication': t_app - t_import,
+        'window': t_window - t_app,
+        'first_paint': painted.get('time', time.perf_counter()) - t_window,
+        'time_to_first_window': painted.get('time', time.perf_counter()) - t0,
+        'deferred_modules_loaded': loaded,
+    }))
+
+
+def run_child(app, pycache):
+    """Ejecuta una medición en un proceso nuevo; devuelve tiempos en segundos"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', PYTHONPYCACHEPREFIX=pycache)
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, __file__, '--child', '--app', app],
+                         env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result['process_wall'] = wall
+    return result
+
+
+def import_costs(app, top=15):
+    """Costo de import por módulo según `python -X importtime`"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {app}'],
+                         cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    costs = []
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        costs.append({
+            'module': name.strip(),
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+            'top_level': not name.startswith('  '),
+        })
+    costs.sort(key=lambda c: c['cumulative_ms'], reverse=True)
+    return costs[:top]
+
+
+def summarize(runs):
+    """Mediana y mínimo de cada fase"""
+    keys = [k for k in runs[0] if isinstance(runs[0][k], float)]
+    return {
+        k: {
+            'median_ms': statistics.median(r[k] for r in runs) * 1000,
+            'min_ms': min(r[k] for r in runs) * 1000,
+        }
+        for k in keys
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de arranque de la aplicación')
+    parser.add_argument('--app', choices=sorted(APPS), default='mainpremi')
+    parser.add_argument('--runs', type=int, default=5, help='repeticiones por modo')
+    parser.add_argument('--json', help='archivo donde guardar el resultado')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.app)
+        return 0
+
+    cold = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as cache:
+            cold.append(run_child(args.app, cache))
+
+    with tempfile.TemporaryDirectory() as cache:
+        run_child(args.app, cache)  # poblar la caché de bytecode
+        warm = [run_child(args.app, cache) for _ in range(args.runs)]
+
+    report = {
+        'app': args.app,
+        'python': sys.version.split()[0],
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'runs': args.runs,
+        'cold': summarize(cold),
+        'warm': summarize(warm),
+        'deferred_modules_loaded': warm[-1]['deferred_modules_loaded'],
+        'imports': import_costs(args.app),
+    }
+
+    for mode in ('cold', 'warm'):
+        phases = report[mode]
+        print(f'{mode:>5}: primera ventana {phases["time_to_first_window"]["median_ms"]:7.1f} ms '
+              f'(import {phases["import"]["median_ms"]:.1f}, '
+              f'QApplication {phases["qapplication"]["median_ms"]:.1f}, '
+              f'ventana {phases["window"]["median_ms"]:.1f}, '
+              f'pintado {phases["first_paint"]["median_ms"]:.1f}; '
+              f'proceso {phases["process_wall"]["median_ms"]:.1f})')
+    print('Módulos diferidos cargados al arrancar:',
+          ', '.join(report['deferred_modules_loaded']) or 'ninguno')
+    print('Imports más costosos (acumulado):')
+    for cost in report['imports']:
+        print(f'  {cost["cumulative_ms"]:8.2f} ms  {cost["module"]}')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
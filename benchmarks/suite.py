@@ -0,0 +1,507 @@
+"""Suite de benchmarks con cargas sintéticas escalables
+
+Casos:
+    block_eval        get_mtbf bloque por bloque (ruta de la interfaz)
+    block_eval_array  la misma evaluación vectorizada con block_mtbf_array
+                      (antes de medir se compara con block_mtbf, k > n incluido)
+    system_eval       evaluate_system al crecer el número de bloques
+    program_eval      n vectores de parámetros por el programa compilado de
+                      un diseño de 200 bloques
+    ugf_eval          distribución de capacidad multiestado de un diagrama de
+                      n bloques en etapas de tres ramas en paralelo
+    bounds_first      primeras cotas de confiabilidad (sin factorizar) de una
+                      grilla de n bloques con conexiones hacia la derecha y abajo
+    markov_solve      estado estacionario al crecer el número de estados
+    markov_batch      estado estacionario de n variantes de un modelo de 10
+                      estados con np.linalg.solve por lotes
+    chart_decimate    reducción mín/máx de 10 curvas de n muestras a 1200 píxeles
+    results_render    generación del HTML de resultados y setHtml
+    scene_paint       pintado de una escena con miles de bloques y conexiones
+    scene_drag        arrastre de un bloque conectado en una vista visible
+    minimap_update    actualización por zonas del minimapa al mover un bloque
+
+Cada corrida se agrega a un historial JSON Lines. Con --check se compara con
+la mediana de las corridas anteriores y con el exponente de escalamiento
+máximo definido en thresholds.json; el código de salida es 1 si hay
+regresiones.
+
+Ejemplo:
+    python benchmarks/suite.py --quick --check
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+DEFAULT_HISTORY = os.path.join(HERE, 'history.jsonl')
+DEFAULT_THRESHOLDS = os.path.join(HERE, 'thresholds.json')
+
+SIZES = {
+    'block_eval': [1000, 10000, 100000],
+    'block_eval_array': [1000, 10000, 100000],
+    'system_eval': [100, 1000, 10000],
+    'program_eval': [10, 100, 1000],
+    'ugf_eval': [400, 4000, 40000],
+    'bounds_first': [100, 1000, 10000],
+    'markov_solve': [10, 50, 200, 500],
+    'markov_batch': [100, 1000, 10000],
+    'chart_decimate': [100000, 1000000, 4000000],
+    'results_render': [50, 200, 1000],
+    'scene_paint': [500, 2000, 5000],
+    'scene_drag': [500, 2000, 5000],
+    'minimap_update': [500, 2000, 5000],
+}
+
+QUICK_SIZES = {
+    'block_eval': [1000, 10000],
+    'block_eval_array': [1000, 10000],
+    'system_eval': [100, 1000],
+    'program_eval': [10, 100],
+    'ugf_eval': [400, 4000],
+    'bounds_first': [100, 1000],
+    'markov_solve': [10, 50, 200],
+    'markov_batch': [100, 1000],
+    'chart_decimate': [100000, 1000000],
+    'results_render': [50, 200],
+    'scene_paint': [200, 1000],
+    'scene_drag': [200, 1000],
+    'minimap_update': [200, 1000],
+}
+
+QT_CASES = ('results_render', 'scene_paint', 'scene_drag', 'minimap_update')
+
+
+def measure(function, min_time=0.2, repeat=5):
+    """Mejor tiempo por llamada (s), ajustando el número de iteraciones"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def synthetic_blocks(n, seed=0):
+    """Bloques aleatorios de todos los tipos con parámetros válidos"""
+    from reliability import BLOCK_TYPES
+
+    rng = random.Random(seed)
+    types = [t for t in BLOCK_TYPES if t != 'k-de-n']
+    blocks = []
+    for i in range(n):
+        block_type = rng.choice(types)
+        params = {
+            'lambda': rng.uniform(1e-5, 1e-2),
+            'n_components': rng.randint(2, 10),
+            'n_total': rng.randint(3, 10),
+            'k_required': rng.randint(1, 3),
+            'mtbf_component': rng.uniform(100, 100000),
+            'mtbf_base': rng.uniform(100, 100000),
+            'maintenance_interval': rng.uniform(10, 1000),
+        }
+        blocks.append({'type': block_type, 'name': f'B{i}', 'params': params})
+    return blocks
+
+
+def synthetic_generator(n, seed=0):
+    """Generador de Markov denso con filas que suman cero"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    Q = rng.uniform(0, 0.01, (n, n)) * (rng.random((n, n)) < min(1.0, 8 / n))
+    Q[:, 0] += 1e-4  # todos los estados regresan al inicial
+    np.fill_diagonal(Q, 0)
+    np.fill_diagonal(Q, -Q.sum(axis=1))
+    return Q
+
+
+# Casos sin Qt ---------------------------------------------------------------
+
+def bench_block_eval(n):
+    from reliability import block_mtbf
+    blocks = synthetic_blocks(n)
+    return measure(lambda: [block_mtbf(b['type'], b['params']) for b in blocks])
+
+
+def bench_block_eval_array(n):
+    import numpy as np
+    from reliability import block_mtbf, block_mtbf_array, params_columns
+    blocks = synthetic_blocks(n)
+    # Algunos k-de-n con k > n: valen 0, igual que en block_mtbf
+    for b in blocks[::10]:
+        b['params']['k_required'] = b['params']['n_total'] + 3
+    groups = {}
+    for b in blocks:
+        groups.setdefault(b['type'], []).append(b['params'])
+    columns = {t: params_columns(t, p) for t, p in groups.items()}
+    for t, c in columns.items():
+        expected = [block_mtbf(t, p) for p in groups[t]]
+        if not np.allclose(block_mtbf_array(t, c), expected, rtol=1e-9):
+            raise RuntimeError(f'block_mtbf_array no coincide con block_mtbf ({t})')
+    return measure(lambda: [block_mtbf_array(t, c) for t, c in columns.items()])
+
+
+def bench_system_eval(n):
+    from reliability import evaluate_system
+    design = {
+        'blocks': synthetic_blocks(n),
+        'connections': [[i, i + 1] for i in range(n - 1)],
+    }
+    return measure(lambda: evaluate_system(design))
+
+
+def bench_program_eval(n):
+    import numpy as np
+    from program import Program
+    blocks = synthetic_blocks(200)
+    program = Program({'blocks': blocks, 'connections': [[0, 1]]})
+    rng = np.random.default_rng(0)
+    values = program.values * rng.uniform(0.5, 1.5, (n, program.values.size))
+    return measure(lambda: program.evaluate(values))
+
+
+def bench_ugf_eval(n):
+    from ugf import analyze
+    blocks = synthetic_blocks(n)
+    for i, block in enumerate(blocks):
+        if i % 4:
+            block['params']['states'] = [[10, 0.9], [6, 0.07], [0, 0.03]]
+    # Cada etapa: un bloque de unión seguido de tres ramas en paralelo
+    connections = []
+    for start in range(0, n - 4, 4):
+        for branch in range(start + 1, start + 4):
+            connections += [[start, branch], [branch, start + 4]]
+    design = {'blocks': blocks, 'connections': connections}
+    return measure(lambda: analyze(design, 1000.0, 10.0))
+
+
+def bench_bounds_first(n):
+    from bounds import Bounds
+    side = max(int(math.sqrt(n)), 2)
+    connections = []
+    for i in range(side * side):
+        if (i + 1) % side:
+            connections.append([i, i + 1])
+        if i + side < side * side:
+            connections.append([i, i + side])
+    design = {'blocks': synthetic_blocks(side * side), 'connections': connections}
+    return measure(lambda: Bounds(design, 1000.0))
+
+
+def bench_markov_solve(n):
+    from reliability import markov_steady_state
+    Q = synthetic_generator(n)
+    return measure(lambda: markov_steady_state(Q))
+
+
+def bench_markov_batch(n):
+    import numpy as np
+    from markov_batch import sweep
+    Q = synthetic_generator(10)
+    rates = np.geomspace(1e-4, 1e-1, n)[:, None]
+    return measure(lambda: sweep(Q, [(0, 1)], rates))
+
+
+def bench_chart_decimate(n):
+    import numpy as np
+    from decimate import Pyramid
+    x = np.linspace(0, 1e5, n)
+    y = np.exp(-np.outer(np.linspace(1e-5, 1e-4, 10), x)).astype(np.float32)
+    pyramid = Pyramid(y)  # se construye una vez al recibir los datos
+    return measure(lambda: pyramid.minmax(x, n // 10, n - n // 10, 1200))
+
+
+# Casos con Qt (plataforma offscreen) ---------------------------------------
+
+_qt_app = None
+
+
+def qt_app():
+    global _qt_app
+    if _qt_app is None:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt5.QtWidgets import QApplication
+        _qt_app = QApplication.instance() or QApplication(sys.argv[:1])
+    return _qt_app
+
+
+def build_scene(n, scene):
+    """Puebla una escena con n ComponentBlocks encadenados"""
+    from main import ComponentBlock, ConnectionLine
+
+    rng = random.Random(0)
+    columns = max(1, int(math.sqrt(n)))
+    blocks = []
+    for i, data in enumerate(synthetic_blocks(n)):
+        block = ComponentBlock(data['type'], data['name'], data['params'])
+        block.setPos((i % columns) * 150 + rng.uniform(-5, 5), (i // columns) * 110)
+        scene.addItem(block)
+        blocks.append(block)
+
+    connections = []
+    for start, end in zip(blocks, blocks[1:]):
+        conn = ConnectionLine(start, end)
+        scene.addItem(conn)
+        connections.append(conn)
+        start.connections_out.append(end)
+        end.connections_in.append(start)
+    return blocks, connections
+
+
+def bench_results_render(n):
+    qt_app()
+    from main import ComponentBlock, ConnectionLine, MTBFCalculator
+
+    window = MTBFCalculator()
+    for data in synthetic_blocks(n):
+        window.components.append(ComponentBlock(data['type'], data['name'], data['params']))
+    # Una conexión fuerza la tabla de configuración serie
+    window.connections.append(ConnectionLine(window.components[0], window.components[1]))
+    elapsed = measure(window.calculate_system_mtbf, repeat=3)
+    window.close()
+    return elapsed
+
+
+def bench_scene_paint(n):
+    qt_app()
+    from PyQt5.QtGui import QImage, QPainter
+    from PyQt5.QtWidgets import QGraphicsScene
+
+    scene = QGraphicsScene()
+    build_scene(n, scene)
+    rect = scene.itemsBoundingRect()
+    image = QImage(1600, 1200, QImage.Format_ARGB32_Premultiplied)
+
+    def paint():
+        painter = QPainter(image)
+        scene.render(painter, source=rect)
+        painter.end()
+
+    return measure(paint, repeat=3)
+
+
+def bench_scene_drag(n):
+    app = qt_app()
+    from PyQt5.QtWidgets import QGraphicsScene, QGraphicsView
+
+    scene = QGraphicsScene()
+    blocks, _ = build_scene(n, scene)
+    view = QGraphicsView(scene)
+    view.resize(1200, 900)
+    view.show()
+    app.processEvents()
+
+    block = blocks[len(blocks) // 2]
+    view.centerOn(block)
+    origin = block.pos()
+    step = [0]
+
+    def drag():
+        step[0] += 1
+        block.setPos(origin.x() + (step[0] % 40), origin.y() + (step[0] % 40))
+        view.viewport().repaint()
+
+    elapsed = measure(drag, repeat=3)
+    view.close()
+    return elapsed
+
+
+def bench_minimap_update(n):
+    app = qt_app()
+    from PyQt5.QtCore import QLineF
+    from PyQt5.QtWidgets import QGraphicsScene, QGraphicsView
+    from main import ComponentBlock, ConnectionLine
+    from minimap import Minimap
+
+    scene = QGraphicsScene()
+    blocks, connections = build_scene(n, scene)
+    scene.setSceneRect(scene.itemsBoundingRect())
+    view = QGraphicsView(scene)
+    view.resize(1200, 900)
+    minimap = Minimap(
+        view,
+        lambda item: item.colors[item.component_type] if isinstance(item, ComponentBlock) else None,
+        lambda item: (QLineF(item.start_block.pos(), item.end_block.pos())
+                      if isinstance(item, ConnectionLine) else None))
+    view.show()
+    minimap.rebuild()
+
+    block = blocks[len(blocks) // 2]
+    lines = [c for c in connections if block in (c.start_block, c.end_block)]
+    origin = block.pos()
+    step = [0]
+
+    def move():
+        step[0] += 1
+        block.setPos(origin.x() + (step[0] % 40), origin.y())
+        for line in lines:
+            line.prepareGeometryChange()
+        app.processEvents()   # QGraphicsScene.changed con las zonas
+        minimap.flush()
+
+    elapsed = measure(move, repeat=3)
+    view.close()
+    return elapsed
+
+
+CASES = {
+    'block_eval': bench_block_eval,
+    'block_eval_array': bench_block_eval_array,
+    'system_eval': bench_system_eval,
+    'program_eval': bench_program_eval,
+    'ugf_eval': bench_ugf_eval,
+    'bounds_first': bench_bounds_first,
+    'markov_solve': bench_markov_solve,
+    'markov_batch': bench_markov_batch,
+    'chart_decimate': bench_chart_decimate,
+    'results_render': bench_results_render,
+    'scene_paint': bench_scene_paint,
+    'scene_drag': bench_scene_drag,
+    'minimap_update': bench_minimap_update,
+}
+
+
+# Historial y umbrales -------------------------------------------------------
+
+def scaling_exponent(sizes_times):
+    """Pendiente log-log tiempo vs tamaño (1 = lineal, 2 = cuadrático)"""
+    points = [(math.log(int(s)), math.log(t)) for s, t in sizes_times.items() if t > 0]
+    if len(points) < 2:
+        return None
+    mx = statistics.fmean(x for x, _ in points)
+    my = statistics.fmean(y for _, y in points)
+    sxx = sum((x - mx) ** 2 for x, _ in points)
+    return sum((x - mx) * (y - my) for x, y in points) / sxx if sxx else None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_thresholds(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_regressions(record, history, thresholds, window=5):
+    """Compara una corrida con las anteriores y con los exponentes máximos"""
+    default = thresholds.get('default', {})
+    problems = []
+    for case, sizes_times in record['results'].items():
+        limits = dict(default, **thresholds.get(case, {}))
+
+        exponent = scaling_exponent(sizes_times)
+        max_exponent = limits.get('max_exponent')
+        if exponent is not None and max_exponent is not None and exponent > max_exponent:
+            problems.append(f'{case}: escalamiento O(n^{exponent:.2f}) supera '
+                            f'O(n^{max_exponent})')
+
+        max_ratio = limits.get('max_ratio')
+        if max_ratio is None:
+            continue
+        for size, elapsed in sizes_times.items():
+            previous = [h['results'][case][size] for h in history[-window:]
+                        if size in h.get('results', {}).get(case, {})]
+            if not previous:
+                continue
+            baseline = statistics.median(previous)
+            if elapsed > baseline * max_ratio:
+                problems.append(f'{case}[{size}]: {elapsed * 1000:.3f} ms vs '
+                                f'{baseline * 1000:.3f} ms ({elapsed / baseline:.2f}x, '
+                                f'máximo {max_ratio}x)')
+    return problems
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Suite de benchmarks de rendimiento')
+    parser.add_argument('--only', nargs='+', choices=sorted(CASES),
+                        help='ejecutar sólo estos casos')
+    parser.add_argument('--quick', action='store_true', help='tamaños reducidos')
+    parser.add_argument('--no-qt', action='store_true', help='omitir casos con Qt')
+    parser.add_argument('--history', default=DEFAULT_HISTORY,
+                        help='archivo JSON Lines de historial')
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS,
+                        help='umbrales de regresión (JSON)')
+    parser.add_argument('--no-record', action='store_true',
+                        help='no agregar la corrida al historial')
+    parser.add_argument('--check', action='store_true',
+                        help='salir con código 1 si hay regresiones')
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    cases = args.only or list(CASES)
+    if args.no_qt:
+        cases = [c for c in cases if c not in QT_CASES]
+
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'quick': args.quick,
+        'results': {},
+    }
+
+    for case in cases:
+        record['results'][case] = {}
+        for size in sizes[case]:
+            elapsed = CASES[case](size)
+            record['results'][case][str(size)] = elapsed
+            print(f'{case:>18} n={size:<7} {elapsed * 1000:10.3f} ms')
+        exponent = scaling_exponent(record['results'][case])
+        if exponent is not None:
+            print(f'{case:>18} escalamiento ~ O(n^{exponent:.2f})')
+
+    history = [h for h in load_history(args.history) if h.get('quick') == args.quick]
+    problems = check_regressions(record, history, load_thresholds(args.thresholds))
+
+    if not args.no_record:
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+    if problems:
+        print('\nRegresiones detectadas:')
+        for problem in problems:
+            print(f'  - {problem}')
+    else:
+        print('\nSin regresiones')
+
+    return 1 if problems and args.check else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""Cotas de confiabilidad de redes grandes que se estrechan con el tiempo (sin Qt)
+
+El diagrama se interpreta igual que en fault_tree.from_diagram: cada
+subdiagrama conectado funciona si existe un camino de un bloque de entrada
+a uno de salida con todos sus bloques operativos, y los subdiagramas no
+conectados entre sí están en serie. Cada bloque funciona al tiempo de
+misión con probabilidad R_i(t) (curves.block_reliability).
+
+Las cotas de partida son del estilo de Esary–Proschan, con caminos y cortes
+disjuntos para que el producto sea una cota válida sin enumerarlos todos:
+
+    inferior   1 - Π (1 - Π p_i) sobre caminos disjuntos, elegidos de mayor
+               a menor confiabilidad
+    superior   Π (1 - Π q_i) sobre cortes disjuntos: los niveles de
+               distancia desde las entradas (todo camino pasa por cada
+               nivel) y, por separado, desde las salidas; se toma la menor
+
+Después se factoriza (descomposición pivotal): cada hoja del árbol de
+factorización fija bloques como operativos o en falla y tiene peso igual a
+la probabilidad de esa asignación, y las cotas del sistema son las sumas
+ponderadas de las cotas de las hojas. En cada paso se divide la hoja que más
+aporta a la diferencia, pivotando en el bloque menos confiable de su mejor
+camino. Una hoja con un camino enteramente operativo vale 1 y una sin
+camino vale 0, así que con tiempo suficiente las cotas se juntan en el
+valor exacto.
+
+Ejemplo:
+    bounds = Bounds(design, mission_time=1000)
+    result = bounds.run(tolerance=1e-4, budget=10.0)
+"""
+
+import heapq
+import math
+import time
+
+import numpy as np
+
+import profiling
+from graph import (acyclic_successors, adjacency, predecessors, removed_edges,
+                   topological_order, weak_components)
+
+MAX_PATHS = 64             # caminos disjuntos por cota inferior
+PATH_CUTOFF = 1e-9         # un camino que aporta menos que esto no se agrega
+REPORT_INTERVAL = 0.1      # segundos entre avisos de progreso
+DEFAULT_TOLERANCE = 1e-4
+DEFAULT_BUDGET = 10.0      # segundos
+
+
+class _Layers:
+    """Aristas de un grafo acíclico agrupadas por capa del destino
+
+    La capa de un bloque es la longitud del camino más largo que llega a él,
+    así que todas las aristas que entran a una capa salen de capas
+    anteriores: una pasada capa por capa con reduceat calcula máximos o
+    mínimos sobre los predecesores de todos los bloques de la capa a la vez.
+    """
+
+    def __init__(self, order, pred):
+        n = len(pred)
+        depth = [0] * n
+        for v in order:
+            if pred[v]:
+                depth[v] = max(depth[u] for u in pred[v]) + 1
+        self.first = np.array([v for v in range(n) if not pred[v]], dtype=np.int64)
+        dst = np.array([v for v in range(n) for _ in pred[v]], dtype=np.int64)
+        src = np.array([u for v in range(n) for u in pred[v]], dtype=np.int64)
+        depth = np.array(depth, dtype=np.int64)
+        order = np.lexsort((dst, depth[dst])) if dst.size else dst
+        src, dst = src[order], dst[order]
+        self.steps = []
+        layer_starts = np.flatnonzero(np.diff(depth[dst], prepend=-1)) if dst.size else []
+        for a, b in zip(layer_starts, list(layer_starts[1:]) + [dst.size]):
+            s, d = src[a:b], dst[a:b]
+            starts = np.flatnonzero(np.diff(d, prepend=-1))
+            self.steps.append((s, starts, d[starts]))
+
+    def maximum(self, initial, add):
+        """value[v] = máx(value[predecesores]) + add[v]; initial en la primera capa"""
+        value = np.full(add.size, -np.inf)
+        value[self.first] = initial[self.first]
+        for src, starts, dst in self.steps:
+            value[dst] = np.maximum.reduceat(value[src], starts) + add[dst]
+        return value
+
+    def reach(self, alive):
+        """Bloques vivos alcanzables desde la primera capa por bloques vivos"""
+        seen = np.zeros(alive.size, dtype=bool)
+        seen[self.first] = alive[self.first]
+        for src, starts, dst in self.steps:
+            seen[dst] = np.logical_or.reduceat(seen[src], starts) & alive[dst]
+        return seen
+
+    def hops(self, relevant):
+        """Distancia en saltos desde la primera capa sólo por bloques relevantes"""
+        distance = np.full(relevant.size, np.inf)
+        distance[self.first] = np.where(relevant[self.first], 0.0, np.inf)
+        for src, starts, dst in self.steps:
+            step = np.minimum.reduceat(distance[src], starts) + 1.0
+            distance[dst] = np.where(relevant[dst], step, np.inf)
+        return distance
+
+
+class _Network:
+    """Un subdiagrama conectado y las hojas de su árbol de factorización"""
+
+    def __init__(self, nodes, succ, p):
+        self.nodes = nodes
+        self.pred = predecessors(succ)
+        order = topological_order(succ)
+        self.forward = _Layers(order, self.pred)
+        self.backward = _Layers(order[::-1], succ)
+        self.sources = self.forward.first
+        self.sinks = self.backward.first
+        self.p = p
+        self.heap = []
+        self.counter = 0
+        self.lower = 0.0
+        self.upper = 0.0
+        self.leaves = 0
+        self._push((), 1.0)
+
+    @property
+    def gap(self):
+        return self.upper - self.lower
+
+    def _push(self, fixed, weight):
+        pe = self.p.copy()
+        for v, up in fixed:
+            pe[v] = 1.0 if up else 0.0
+        lower, upper, pivot = self.evaluate(pe)
+        self.lower += weight * lower
+        self.upper += weight * upper
+        self.leaves += 1
+        if pivot is not None and upper > lower:
+            self.counter += 1
+            heapq.heappush(self.heap, (-weight * (upper - lower), self.counter,
+                                       fixed, weight, lower, upper, pivot))
+
+    def expand(self):
+        """Divide la hoja que más aporta a la diferencia; False si no quedan"""
+        if not self.heap:
+            return False
+        _, _, fixed, weight, lower, upper, pivot = heapq.heappop(self.heap)
+        self.lower -= weight * lower
+        self.upper -= weight * upper
+        self.leaves -= 1
+        p = self.p[pivot]
+        self._push(fixed + ((pivot, True),), weight * p)
+        self._push(fixed + ((pivot, False),), weight * (1.0 - p))
+        return True
+
+    # Cotas de una hoja ------------------------------------------------------
+
+    def best_path(self, logs):
+        """Camino más confiable (log-probabilidad, nodos) con log p = logs"""
+        score = self.forward.maximum(logs, logs)
+        end = self.sinks[np.argmax(score[self.sinks])]
+        if score[end] == -np.inf:
+            return -np.inf, []
+        path = [int(end)]
+        while self.pred[path[-1]]:
+            preds = self.pred[path[-1]]
+            path.append(preds[int(np.argmax(score[preds]))])
+        return float(score[end]), path
+
+    def level_cuts(self, pe, relevant, layers, targets):
+        """Π P(algún bloque del nivel funciona) por niveles de distancia
+
+        Todo camino por bloques relevantes pasa por cada nivel hasta la menor
+        distancia de un bloque de targets: son cortes disjuntos.
+        """
+        distance = layers.hops(relevant)
+        last = distance[targets].min()
+        inside = distance <= last
+        with np.errstate(divide='ignore'):
+            logs = np.log1p(-pe[inside])
+        failure = np.exp(np.bincount(distance[inside].astype(np.int64), weights=logs))
+        return float(np.prod(1.0 - failure))
+
+    def evaluate(self, pe):
+        """(inferior, superior, pivote) con las probabilidades condicionadas pe"""
+        with np.errstate(divide='ignore'):
+            logs = np.log(pe)
+        score, path = self.best_path(logs)
+        if not path:
+            return 0.0, 0.0, None
+        unknown = [v for v in path if 0.0 < pe[v] < 1.0]
+        if not unknown:
+            return 1.0, 1.0, None
+        pivot = min(unknown, key=lambda v: pe[v])
+
+        # Inferior: caminos disjuntos de mayor a menor confiabilidad, hasta que
+        # uno más ya no cambie la cota
+        failure = -math.expm1(score)
+        for _ in range(MAX_PATHS - 1):
+            logs[path] = -np.inf
+            score, path = self.best_path(logs)
+            if not path or math.exp(score) < PATH_CUTOFF * failure:
+                break
+            failure *= -math.expm1(score)
+        lower = 1.0 - failure
+
+        alive = pe > 0
+        relevant = self.forward.reach(alive) & self.backward.reach(alive)
+        upper = min(self.level_cuts(pe, relevant, self.forward, self.sinks),
+                    self.level_cuts(pe, relevant, self.backward, self.sources))
+        return lower, max(upper, lower), pivot
+
+
+class Bounds:
+    """Cotas [inferior, superior] de la confiabilidad del sistema"""
+
+    def __init__(self, design, mission_time=1000.0):
+        from curves import block_reliability
+        self.mission_time = mission_time
+        blocks = design.get('blocks', [])
+        n = len(blocks)
+        # El redondeo deja algunos R_i apenas por encima de 1
+        self.reliability = (np.clip(block_reliability(design, [float(mission_time)])[:, 0],
+                                    0.0, 1.0) if n else np.zeros(0))
+        connections = design.get('connections', [])
+        succ, _ = adjacency(n, connections)
+        acyclic = acyclic_successors(succ)
+        # Conexiones descartadas al romper ciclos, para avisar al usuario
+        self.removed_edges = [(blocks[a].get('name') or f'Bloque {a + 1}',
+                               blocks[b].get('name') or f'Bloque {b + 1}')
+                              for a, b in removed_edges(succ, acyclic)]
+        succ = acyclic
+
+        self.networks = []
+        for nodes in weak_components(n, connections):
+            local = {v: i for i, v in enumerate(nodes)}
+            self.networks.append(_Network(
+                nodes, [[local[w] for w in succ[v]] for v in nodes],
+                self.reliability[nodes].copy()))
+        self.expansions = 0
+
+    @property
+    def lower(self):
+        return min(max(math.prod(net.lower for net in self.networks), 0.0), 1.0)
+
+    @property
+    def upper(self):
+        return min(max(math.prod(net.upper for net in self.networks), 0.0), 1.0)
+
+    @property
+    def exact(self):
+        return not any(net.heap for net in self.networks)
+
+    def step(self):
+        """Divide una hoja de la red con mayor diferencia; False si ya es exacto"""
+        pending = [net for net in self.networks if net.heap]
+        if not pending:
+            return False
+        max(pending, key=lambda net: net.gap).expand()
+        self.expansions += 1
+        return True
+
+    def result(self, elapsed=0.0):
+        lower, upper = self.lower, self.upper
+        return {
+            'lower': lower,
+            'upper': upper,
+            'gap': upper - lower,
+            'exact': self.exact,
+            'expansions': self.expansions,
+            'leaves': sum(net.leaves for net in self.networks),
+            'elapsed': elapsed,
+            'series': float(np.prod(self.reliability)),
+            'mission_time': self.mission_time,
+            'removed_edges': self.removed_edges,
+        }
+
+    @profiling.timed('cotas')
+    def run(self, tolerance=DEFAULT_TOLERANCE, budget=DEFAULT_BUDGET, progress=None,
+            cancelled=None):
+        """Estrecha las cotas hasta la tolerancia, el presupuesto o la cancelación
+
+        progress(result) recibe las cotas vigentes cada REPORT_INTERVAL
+        segundos y al terminar.
+        """
+        start = time.perf_counter()
+        reported = start
+        if progress:
+            progress(self.result())
+        while self.upper - self.lower > tolerance:
+            now = time.perf_counter()
+            if now - start >= budget or (cancelled is not None and cancelled.is_set()):
+                break
+            if not self.step():
+                break
+            if progress and now - reported >= REPORT_INTERVAL:
+                reported = now
+                progress(self.result(now - start))
+        result = self.result(time.perf_counter() - start)
+        if progress:
+            progress(result)
+        return result
+
+
+def reliability_bounds(design, mission_time=1000.0, tolerance=DEFAULT_TOLERANCE,
+                       budget=DEFAULT_BUDGET, progress=None, cancelled=None):
+    """Atajo de Bounds(...).run(...) para tareas en segundo plano"""
+    return Bounds(design, mission_time).run(tolerance, budget, progress, cancelled)
@@ -0,0 +1,144 @@
+"""Cotas de confiabilidad que se estrechan mientras se calculan
+
+El cálculo corre en un Task y avisa las cotas vigentes cada
+bounds.REPORT_INTERVAL segundos: el intervalo [inferior, superior] y su
+evolución en el tiempo se ven desde el primer aviso y el usuario puede
+detenerlo en cuanto le alcance la precisión.
+"""
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
+                             QPushButton, QLabel, QLineEdit, QDoubleSpinBox)
+
+import numpy as np
+
+from bounds import DEFAULT_BUDGET, DEFAULT_TOLERANCE, reliability_bounds
+from chart_view import ChartView
+from curves import Plot
+
+
+class BoundsDialog(QDialog):
+    """Cotas inferior y superior de R(t) del sistema a tiempo de misión"""
+
+    def __init__(self, design, parent=None):
+        super().__init__(parent)
+        self.design = design
+        self.task = None
+        self.history = []
+        self.last = None
+        self.setWindowTitle('Cotas de Confiabilidad')
+        self.setMinimumSize(700, 550)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        form = QFormLayout()
+        self.time_input = QDoubleSpinBox()
+        self.time_input.setRange(1, 1000000)
+        self.time_input.setValue(1000)
+        self.time_input.setSuffix(' horas')
+        form.addRow('Tiempo de misión:', self.time_input)
+
+        self.tolerance_input = QLineEdit(f'{DEFAULT_TOLERANCE:g}')
+        self.tolerance_input.setToolTip('Se detiene cuando superior - inferior es menor')
+        form.addRow('Tolerancia:', self.tolerance_input)
+
+        self.budget_input = QDoubleSpinBox()
+        self.budget_input.setRange(0.1, 3600)
+        self.budget_input.setValue(DEFAULT_BUDGET)
+        self.budget_input.setSuffix(' s')
+        form.addRow('Tiempo máximo:', self.budget_input)
+        layout.addLayout(form)
+
+        self.status_label = QLabel('Pulse Calcular para empezar')
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+
+        self.chart = ChartView()
+        layout.addWidget(self.chart, 1)
+
+        btn_layout = QHBoxLayout()
+        close_btn = QPushButton('Cerrar')
+        close_btn.clicked.connect(self.close)
+        self.stop_btn = QPushButton('Detener')
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop)
+        self.calc_btn = QPushButton('Calcular')
+        self.calc_btn.clicked.connect(self.calculate)
+        btn_layout.addWidget(close_btn)
+        btn_layout.addWidget(self.stop_btn)
+        btn_layout.addWidget(self.calc_btn)
+        layout.addLayout(btn_layout)
+
+        self.setLayout(layout)
+
+    def calculate(self):
+        try:
+            tolerance = float(self.tolerance_input.text())
+        except ValueError:
+            self.status_label.setText('<span style="color: #F44336;">Tolerancia inválida</span>')
+            return
+        from workers import Task
+        self.history = []
+        self.last = None
+        self.task = Task(reliability_bounds, self.design, self.time_input.value(),
+                         tolerance, self.budget_input.value(),
+                         progress=True, cancellable=True, parent=self)
+        self.task.progress.connect(self.show_progress)
+        self.task.failed.connect(self.show_error)
+        self.task.finished.connect(self.task_finished)
+        self.calc_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.task.start()
+
+    def stop(self):
+        # La tarea avisa las últimas cotas antes de terminar
+        if self.task is not None:
+            self.task.cancel()
+
+    def show_progress(self, result):
+        self.history.append((result['elapsed'], result['lower'], result['upper']))
+        self.last = result
+        self.show_result(result, 'Calculando')
+        if len(self.history) > 1:
+            elapsed, lower, upper = np.array(self.history).T
+            self.chart.set_plot(Plot('Cotas de R(t) durante el cálculo', 'R(t)', elapsed,
+                                     np.vstack([lower, upper]), ['Inferior', 'Superior'],
+                                     y_range=(0.0, 1.0)))
+
+    def show_result(self, result, state):
+        text = (f'{state} · <b>R({result["mission_time"]:g} h) ∈ '
+                f'[{result["lower"]:.6f}, {result["upper"]:.6f}]</b> · '
+                f'diferencia {result["gap"]:.2e}<br>'
+                f'{result["expansions"]} divisiones, {result["leaves"]} hojas, '
+                f'{result["elapsed"]:.1f} s · '
+                f'producto en serie (sin considerar la topología): {result["series"]:.6f}')
+        if result['removed_edges']:
+            text += ('<br><span style="color: #FF9800;">Conexiones descartadas por cerrar '
+                     'ciclos: ' + ', '.join(f'{a} → {b}' for a, b in result['removed_edges'])
+                     + '</span>')
+        self.status_label.setText(text)
+
+    def show_error(self, message):
+        self.status_label.setText(f'<span style="color: #F44336;">{message}</span>')
+
+    def task_finished(self):
+        # El último aviso de la tarea trae las cotas con las que terminó
+        if self.last is not None:
+            if self.last['exact']:
+                state = 'Exacto'
+            elif self.task.cancelled.is_set():
+                state = 'Detenido'
+            else:
+                state = 'Terminado'
+            self.show_result(self.last, state)
+        self.task.deleteLater()
+        self.task = None
+        self.calc_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+
+    def closeEvent(self, event):
+        if self.task is not None:
+            self.task.cancel()
+            self.task.wait()
+        super().closeEvent(event)
@@ -0,0 +1,392 @@
+"""Gráficos de curvas densas dibujados con QPainter
+
+ChartView muestra un curves.Plot (muchas curvas que comparten el eje de
+tiempo, con millones de muestras) sin bibliotecas de gráficos: en cada
+redibujo las curvas visibles se reducen al ancho en píxeles con decimate
+(mín/máx o MinMaxLTTB) y se vuelcan a QPolygonF directamente desde NumPy.
+
+El dibujo se separa en capas:
+
+    ejes      grilla, marcas y títulos, en un pixmap por rango visible
+    curvas    pixmap transparente con las curvas ya reducidas
+    cursor    línea vertical y leyenda con los valores, en cada paintEvent
+
+Al arrastrar o girar la rueda se reutiliza el pixmap de las curvas
+desplazado o escalado, y la reducción se rehace cuando el gesto se detiene
+(REFRESH_MS), de modo que la interacción no depende del tamaño de los datos.
+"""
+
+import math
+
+import numpy as np
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QComboBox,
+                             QPushButton, QLabel)
+from PyQt5.QtCore import Qt, QRect, QRectF, QPointF, QTimer
+from PyQt5.QtGui import QPainter, QPen, QColor, QPixmap, QPolygonF, QFontMetrics
+
+from decimate import minmax_lttb
+
+MARGINS = (70, 30, 20, 40)     # izquierda, arriba, derecha, abajo
+REFRESH_MS = 60                # pausa del gesto antes de recalcular las curvas
+ZOOM_STEP = 0.8                # factor de zoom por paso de la rueda
+MIN_SAMPLES_VISIBLE = 8
+LEGEND_LIMIT = 8               # curvas listadas en la leyenda
+ANTIALIAS_POINTS = 200_000     # con más puntos se dibuja sin suavizado
+COLORS = ['#2196F3', '#FF9800', '#4CAF50', '#E91E63', '#9C27B0',
+          '#00BCD4', '#795548', '#FFC107', '#3F51B5', '#8BC34A']
+EMPHASIS_COLOR = '#212121'
+METHODS = [('Mín/máx', 'minmax'), ('LTTB', 'lttb')]
+
+
+def nice_ticks(low, high, count=6):
+    """Marcas redondas (1, 2, 5 × 10^k) entre low y high"""
+    if not (math.isfinite(low) and math.isfinite(high)) or high <= low:
+        return []
+    raw = (high - low) / max(count, 1)
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw)
+    first = math.ceil(low / step) * step
+    return [first + i * step for i in range(int((high - first) / step) + 1)]
+
+
+def polygon(xs, ys):
+    """QPolygonF llenado en bloque desde dos arrays"""
+    n = xs.size
+    poly = QPolygonF(n)
+    pointer = poly.data()
+    pointer.setsize(n * 16)
+    points = np.frombuffer(pointer, dtype=np.float64).reshape(n, 2)
+    points[:, 0] = xs
+    points[:, 1] = ys
+    return poly
+
+
+class ChartView(QWidget):
+    """Vista de un gráfico con zoom (rueda), desplazamiento (arrastre) y cursor"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.plot = None
+        self.method = 'minmax'
+        self.message = 'Sin datos: calcule el sistema para ver las curvas'
+        self.x_range = (0.0, 1.0)
+        self.y_range = (0.0, 1.0)
+        self.hover = None
+        self.drag = None
+        self._axes = None      # (clave, pixmap)
+        self._curves = None    # (clave, pixmap, x_range)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.setMouseTracking(True)
+        self.setMinimumHeight(220)
+
+    # Datos -----------------------------------------------------------------
+
+    def set_plot(self, plot):
+        self.plot = plot
+        self._curves = None
+        self.reset_zoom()
+
+    def set_method(self, method):
+        self.method = method
+        self.refresh()
+
+    def set_message(self, message):
+        self.message = message
+        self.update()
+
+    def reset_zoom(self):
+        if self.plot is not None and self.plot.x.size:
+            self.x_range = (float(self.plot.x[0]), float(self.plot.x[-1]))
+        self.refresh()
+
+    def visible_samples(self):
+        """Índices [i0, i1) de las muestras dentro del rango visible (con un margen)"""
+        x = self.plot.x
+        i0 = max(int(np.searchsorted(x, self.x_range[0], 'right')) - 1, 0)
+        i1 = min(int(np.searchsorted(x, self.x_range[1], 'left')) + 1, x.size)
+        return i0, i1
+
+    # Geometría ---------------------------------------------------------------
+
+    def plot_rect(self):
+        left, top, right, bottom = MARGINS
+        return QRect(left, top, max(self.width() - left - right, 1),
+                     max(self.height() - top - bottom, 1))
+
+    def to_pixel_x(self, value, rect):
+        x0, x1 = self.x_range
+        return rect.left() + (value - x0) * rect.width() / (x1 - x0)
+
+    def to_value_x(self, pixel, rect):
+        x0, x1 = self.x_range
+        return x0 + (pixel - rect.left()) * (x1 - x0) / rect.width()
+
+    # Capas -------------------------------------------------------------------
+
+    def refresh(self):
+        """Recalcula la escala vertical y la capa de curvas del rango actual"""
+        self.timer.stop()
+        if self.plot is not None:
+            if self.plot.y_range is not None:
+                self.y_range = self.plot.y_range
+            else:
+                extent = self.plot.pyramid.extent(*self.visible_samples())
+                if extent is not None:
+                    low, high = extent
+                    pad = (high - low) * 0.05 or abs(high) * 0.05 or 1.0
+                    self.y_range = (0.0 if low >= 0 else low - pad, high + pad)
+        self.update()
+
+    def _axes_layer(self, rect):
+        key = (self.width(), self.height(), self.x_range, self.y_range,
+               self.plot.title, self.plot.y_label)
+        if self._axes is not None and self._axes[0] == key:
+            return self._axes[1]
+        pixmap = QPixmap(self.size())
+        pixmap.fill(Qt.white)
+        painter = QPainter(pixmap)
+        metrics = QFontMetrics(painter.font())
+        grid = QPen(QColor('#E0E0E0'))
+        text = QColor('#616161')
+        (x0, x1), (y0, y1) = self.x_range, self.y_range
+
+        for value in nice_ticks(x0, x1, max(2, rect.width() // 90)):
+            px = int(round(self.to_pixel_x(value, rect)))
+            painter.setPen(grid)
+            painter.drawLine(px, rect.top(), px, rect.bottom())
+            painter.setPen(text)
+            label = f'{value:g}'
+            painter.drawText(px - metrics.horizontalAdvance(label) // 2,
+                             rect.bottom() + metrics.height() + 2, label)
+        for value in nice_ticks(y0, y1, max(2, rect.height() // 50)):
+            py = int(round(rect.bottom() - (value - y0) * rect.height() / (y1 - y0)))
+            painter.setPen(grid)
+            painter.drawLine(rect.left(), py, rect.right(), py)
+            painter.setPen(text)
+            label = f'{value:.4g}'
+            painter.drawText(rect.left() - metrics.horizontalAdvance(label) - 6,
+                             py + metrics.ascent() // 2, label)
+
+        painter.setPen(QColor('#9E9E9E'))
+        painter.drawRect(rect)
+        painter.setPen(text)
+        painter.drawText(QRect(rect.left(), rect.bottom() + metrics.height() + 4,
+                               rect.width(), metrics.height() + 4),
+                         Qt.AlignHCenter, 'Tiempo (h)')
+        painter.drawText(QRect(rect.left(), 4, rect.width(), rect.top() - 4),
+                         Qt.AlignLeft | Qt.AlignVCenter,
+                         f'{self.plot.title}    ·    {self.plot.y_label}')
+        painter.end()
+        self._axes = (key, pixmap)
+        return pixmap
+
+    def _curves_layer(self, rect):
+        key = (rect.width(), rect.height(), self.x_range, self.y_range, self.method, id(self.plot))
+        if self._curves is not None and self._curves[0] == key:
+            return self._curves[1]
+        plot = self.plot
+        w, h = rect.width(), rect.height()
+        i0, i1 = self.visible_samples()
+        if self.method == 'lttb':
+            xs, ys = minmax_lttb(plot.pyramid, plot.x, i0, i1, w)
+        else:
+            xs, ys = plot.pyramid.minmax(plot.x, i0, i1, w)
+
+        (x0, x1), (y0, y1) = self.x_range, self.y_range
+        px = (xs - x0) * (w / (x1 - x0))
+        # Se acotan las coordenadas para que Qt no reciba valores enormes
+        py = np.clip(h - (np.nan_to_num(ys.astype(float)) - y0) * (h / (y1 - y0)), -h, 2 * h)
+
+        pixmap = QPixmap(w, h)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing, py.size <= ANTIALIAS_POINTS)
+        order = [i for i in range(len(plot.names)) if i not in plot.emphasis]
+        order += sorted(plot.emphasis)  # las destacadas quedan encima
+        for i in order:
+            if i in plot.emphasis:
+                painter.setPen(QPen(QColor(EMPHASIS_COLOR), 2))
+            else:
+                painter.setPen(QPen(QColor(COLORS[i % len(COLORS)]), 1))
+            row_x = px if px.ndim == 1 else px[i]
+            painter.drawPolyline(polygon(row_x, py[i]))
+        painter.end()
+        self._curves = (key, pixmap, self.x_range)
+        return pixmap
+
+    # Pintado -----------------------------------------------------------------
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        rect = self.plot_rect()
+        if self.plot is None or not self.plot.x.size:
+            painter.fillRect(self.rect(), Qt.white)
+            painter.setPen(QColor('#757575'))
+            painter.drawText(self.rect(), Qt.AlignCenter, self.message)
+            return
+
+        painter.drawPixmap(0, 0, self._axes_layer(rect))
+        painter.setClipRect(rect)
+        if self.timer.isActive() and self._curves is not None:
+            # Durante el gesto: la capa anterior desplazada/escalada
+            _, pixmap, (c0, c1) = self._curves
+            left = self.to_pixel_x(c0, rect)
+            right = self.to_pixel_x(c1, rect)
+            painter.drawPixmap(QRectF(left, rect.top(), right - left, rect.height()),
+                               pixmap, QRectF(pixmap.rect()))
+        else:
+            painter.drawPixmap(rect.topLeft(), self._curves_layer(rect))
+        painter.setClipping(False)
+        self._draw_cursor(painter, rect)
+
+    def _draw_cursor(self, painter, rect):
+        plot = self.plot
+        shown = sorted(plot.emphasis) + [i for i in range(len(plot.names))
+                                         if i not in plot.emphasis][:LEGEND_LIMIT]
+        shown = shown[:LEGEND_LIMIT]
+        values = None
+        if self.hover is not None and rect.contains(self.hover):
+            t = self.to_value_x(self.hover.x(), rect)
+            index = min(int(np.searchsorted(plot.x, t)), plot.x.size - 1)
+            values = plot.y[shown, index]
+            painter.setPen(QPen(QColor('#757575'), 1, Qt.DashLine))
+            painter.drawLine(self.hover.x(), rect.top(), self.hover.x(), rect.bottom())
+
+        metrics = QFontMetrics(painter.font())
+        lines = []
+        if values is not None:
+            lines.append((None, f't = {plot.x[index]:.6g} h'))
+        for row, i in enumerate(shown):
+            label = plot.names[i]
+            if values is not None:
+                label += f': {values[row]:.6g}'
+            lines.append((i, label))
+        hidden = len(plot.names) - len(shown)
+        if hidden > 0:
+            lines.append((None, f'… y {hidden} curvas más'))
+
+        line_height = metrics.height()
+        width = max(metrics.horizontalAdvance(text) for _, text in lines) + 34
+        box = QRectF(rect.right() - width - 8, rect.top() + 8, width, line_height * len(lines) + 8)
+        painter.setPen(QColor('#BDBDBD'))
+        painter.setBrush(QColor(255, 255, 255, 220))
+        painter.drawRect(box)
+        for row, (i, text) in enumerate(lines):
+            y = box.top() + 4 + row * line_height
+            if i is not None:
+                color = EMPHASIS_COLOR if i in plot.emphasis else COLORS[i % len(COLORS)]
+                painter.setPen(QPen(QColor(color), 2))
+                middle = y + line_height / 2
+                painter.drawLine(QPointF(box.left() + 6, middle), QPointF(box.left() + 24, middle))
+            painter.setPen(QColor('#212121'))
+            painter.drawText(QRectF(box.left() + 28, y, width - 30, line_height),
+                             Qt.AlignLeft | Qt.AlignVCenter, text)
+
+    # Interacción ---------------------------------------------------------------
+
+    def _set_range(self, x0, x1):
+        """Ajusta el rango a los datos y programa el recálculo de las curvas"""
+        first, last = float(self.plot.x[0]), float(self.plot.x[-1])
+        step = (last - first) / max(self.plot.x.size - 1, 1)
+        span = min(max(x1 - x0, step * MIN_SAMPLES_VISIBLE), last - first)
+        x0 = min(max(x0, first), last - span)
+        self.x_range = (x0, x0 + span)
+        self.timer.start()
+        self.update()
+
+    def wheelEvent(self, event):
+        if self.plot is None:
+            return
+        rect = self.plot_rect()
+        anchor = self.to_value_x(event.pos().x(), rect)
+        factor = ZOOM_STEP ** (event.angleDelta().y() / 120)
+        x0, x1 = self.x_range
+        self._set_range(anchor - (anchor - x0) * factor, anchor + (x1 - anchor) * factor)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self.plot is not None:
+            self.drag = (event.pos().x(), self.x_range)
+
+    def mouseMoveEvent(self, event):
+        self.hover = event.pos()
+        if self.drag is not None:
+            start, (x0, x1) = self.drag
+            shift = (start - event.pos().x()) * (x1 - x0) / self.plot_rect().width()
+            self._set_range(x0 + shift, x1 + shift)
+        else:
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        self.drag = None
+
+    def mouseDoubleClickEvent(self, event):
+        if self.plot is not None:
+            self.reset_zoom()
+
+    def leaveEvent(self, event):
+        self.hover = None
+        self.update()
+
+    def resizeEvent(self, event):
+        self._axes = None
+        self._curves = None
+        super().resizeEvent(event)
+
+
+class ChartPanel(QWidget):
+    """Selector de gráfico y método de reducción sobre un ChartView"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.plots = []
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        bar = QHBoxLayout()
+        self.plot_combo = QComboBox()
+        self.plot_combo.currentIndexChanged.connect(self.show_plot)
+        bar.addWidget(self.plot_combo, 1)
+        self.method_combo = QComboBox()
+        for label, method in METHODS:
+            self.method_combo.addItem(label, method)
+        self.method_combo.currentIndexChanged.connect(
+            lambda index: self.view.set_method(self.method_combo.itemData(index)))
+        bar.addWidget(self.method_combo)
+        reset_btn = QPushButton('Ver todo')
+        reset_btn.clicked.connect(lambda: self.view.reset_zoom())
+        bar.addWidget(reset_btn)
+        self.info = QLabel()
+        bar.addWidget(self.info)
+        layout.addLayout(bar)
+
+        self.view = ChartView()
+        layout.addWidget(self.view, 1)
+
+    def set_plots(self, plots):
+        """Reemplaza los gráficos conservando el seleccionado si sigue existiendo"""
+        current = self.plot_combo.currentText()
+        self.plots = plots
+        self.plot_combo.blockSignals(True)
+        self.plot_combo.clear()
+        self.plot_combo.addItems([plot.title for plot in plots])
+        index = max(self.plot_combo.findText(current), 0)
+        self.plot_combo.setCurrentIndex(index)
+        self.plot_combo.blockSignals(False)
+        if plots:
+            self.show_plot(index)
+        else:
+            self.view.set_plot(None)
+            self.info.clear()
+
+    def set_message(self, message):
+        self.view.set_message(message)
+
+    def show_plot(self, index):
+        if not 0 <= index < len(self.plots):
+            return
+        plot = self.plots[index]
+        self.view.set_plot(plot)
+        self.info.setText(f'{len(plot.names)} curvas · {plot.samples / 1e6:.1f} M muestras')
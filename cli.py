@@ -0,0 +1,245 @@
+"""Evaluación por lotes de diseños desde la línea de comandos (sin Qt)
+
+Ejemplo:
+    python cli.py disenos/ -o resultados --format csv json -j 8
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from availability import evaluate_availability
+from bounds import DEFAULT_BUDGET, DEFAULT_TOLERANCE, reliability_bounds
+from design import find_designs, finite_json, load_design
+from growth import apply_growth
+from hierarchy import flatten
+from reliability import (DEFAULT_TIMES, evaluate_system, markov_steady_state,
+                         monte_carlo)
+from ugf import analyze as analyze_multistate, has_states
+
+ANALYSES = ('growth', 'system', 'markov', 'montecarlo', 'availability', 'multistate',
+            'bounds')
+
+
+def evaluate_design(design, analyses=ANALYSES, samples=10000,
+                    times=DEFAULT_TIMES, seed=None):
+    """Ejecuta los análisis pedidos sobre un diseño ya cargado"""
+    result = {'name': design.get('name', ''), 'n_blocks': len(design['blocks'])}
+
+    # El crecimiento va primero: los demás análisis usan el MTBF proyectado
+    if 'growth' in analyses and design.get('growth'):
+        result['growth'] = apply_growth(design)
+    if 'system' in analyses:
+        result['system'] = evaluate_system(design, times)
+    if 'markov' in analyses and design.get('markov'):
+        markov = design['markov']
+        if 'matrix' in markov:
+            result['markov'] = markov_steady_state(markov['matrix'])
+        else:
+            from markov_import import load_generator
+            result['markov'] = markov_steady_state(load_generator(markov['file']))
+    # Monte Carlo y disponibilidad trabajan sobre el diseño expandido
+    flat = flatten(design)
+    if 'montecarlo' in analyses and flat['blocks']:
+        result['montecarlo'] = monte_carlo(flat, samples, times, seed)
+    if 'availability' in analyses:
+        result['availability'] = evaluate_availability(flat, times)
+    if 'multistate' in analyses and (design.get('multistate') or has_states(flat)):
+        options = design.get('multistate') or {}
+        result['multistate'] = analyze_multistate(flat, options.get('mission_time', 1000.0),
+                                                  options.get('demand'))
+    if 'bounds' in analyses and design.get('bounds'):
+        options = design['bounds']
+        result['bounds'] = reliability_bounds(flat, options.get('mission_time', 1000.0),
+                                              options.get('tolerance', DEFAULT_TOLERANCE),
+                                              options.get('budget', DEFAULT_BUDGET))
+    return result
+
+
+def evaluate_file(job, analyses=ANALYSES, samples=10000, times=DEFAULT_TIMES,
+                  seed=None):
+    """Carga y evalúa un archivo; los errores se devuelven en el resultado"""
+    index, path = job
+    try:
+        design = load_design(path)
+        run_seed = None if seed is None else seed + index
+        result = evaluate_design(design, analyses, samples, times, run_seed)
+        result['error'] = ''
+    except Exception as e:
+        result = {'name': os.path.basename(path), 'error': f'{type(e).__name__}: {e}'}
+    result['file'] = path
+    return result
+
+
+def summary_row(result, times=DEFAULT_TIMES):
+    """Aplana un resultado en una fila para el CSV de resumen"""
+    row = {
+        'file': result['file'],
+        'name': result.get('name', ''),
+        'n_blocks': result.get('n_blocks', ''),
+        'error': result.get('error', ''),
+    }
+
+    system = result.get('system', {})
+    if 'system' in system:
+        row['mtbf_system'] = system['system']['mtbf']
+        row['lambda_system'] = system['system']['lambda']
+        for t, r in zip(times, system['system']['reliability']):
+            row[f'R({t:g})'] = r
+    elif 'statistics' in system:
+        row['mtbf_mean'] = system['statistics']['mean']
+        row['mtbf_min'] = system['statistics']['min']
+        row['mtbf_max'] = system['statistics']['max']
+
+    if 'markov' in result:
+        row['markov_mtbf'] = result['markov']['mtbf']
+        row['markov_availability'] = result['markov']['availability']
+
+    if 'montecarlo' in result:
+        row['mc_mtbf'] = result['montecarlo']['mtbf']
+        row['mc_ci95_low'], row['mc_ci95_high'] = result['montecarlo']['ci95']
+
+    system = result.get('availability', {}).get('system')
+    if system:
+        row['availability_inherent'] = system['inherent']
+        row['availability_operational'] = system['operational']
+        row['downtime_hours_year'] = system['downtime']
+        for t, a in zip(times, system['point']):
+            row[f'A({t:g})'] = a
+
+    if 'multistate' in result:
+        row['ms_expected'] = result['multistate']['expected']
+        row['ms_availability'] = result['multistate']['availability']
+
+    if 'bounds' in result:
+        row['bounds_lower'] = result['bounds']['lower']
+        row['bounds_upper'] = result['bounds']['upper']
+
+    return row
+
+
+def summary_fields(analyses, times=DEFAULT_TIMES):
+    """Columnas del CSV de resumen"""
+    fields = ['file', 'name', 'n_blocks', 'error']
+    if 'system' in analyses:
+        fields += ['mtbf_system', 'lambda_system']
+        fields += [f'R({t:g})' for t in times]
+        fields += ['mtbf_mean', 'mtbf_min', 'mtbf_max']
+    if 'markov' in analyses:
+        fields += ['markov_mtbf', 'markov_availability']
+    if 'montecarlo' in analyses:
+        fields += ['mc_mtbf', 'mc_ci95_low', 'mc_ci95_high']
+    if 'availability' in analyses:
+        fields += ['availability_inherent', 'availability_operational',
+                   'downtime_hours_year']
+        fields += [f'A({t:g})' for t in times]
+    if 'multistate' in analyses:
+        fields += ['ms_expected', 'ms_availability']
+    if 'bounds' in analyses:
+        fields += ['bounds_lower', 'bounds_upper']
+    return fields
+
+
+def run_batch(paths, output_dir, formats=('csv', 'json'), analyses=ANALYSES,
+              samples=10000, times=DEFAULT_TIMES, seed=None, jobs=None,
+              chunksize=None):
+    """Evalúa todos los diseños y escribe los resultados a medida que llegan
+
+    Devuelve (número de diseños, número de errores).
+    """
+    files = find_designs(paths)
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+    if chunksize is None:
+        # Lotes grandes reducen el costo de comunicación entre procesos
+        chunksize = max(1, len(files) // (jobs * 8))
+
+    worker = partial(evaluate_file, analyses=analyses, samples=samples,
+                     times=times, seed=seed)
+
+    csv_file = json_file = writer = None
+    if 'csv' in formats:
+        csv_file = open(os.path.join(output_dir, 'resumen.csv'), 'w',
+                        newline='', encoding='utf-8')
+        writer = csv.DictWriter(csv_file, summary_fields(analyses, times),
+                                extrasaction='ignore')
+        writer.writeheader()
+    if 'json' in formats:
+        json_file = open(os.path.join(output_dir, 'resultados.json'), 'w',
+                         encoding='utf-8')
+        json_file.write('[\n')
+
+    errors = 0
+    try:
+        if jobs == 1:
+            results = map(worker, enumerate(files))
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=jobs)
+            results = executor.map(worker, enumerate(files), chunksize=chunksize)
+
+        for i, result in enumerate(results):
+            if result['error']:
+                errors += 1
+            if writer:
+                writer.writerow(summary_row(result, times))
+            if json_file:
+                if i:
+                    json_file.write(',\n')
+                json.dump(finite_json(result), json_file, ensure_ascii=False, allow_nan=False)
+
+        if executor:
+            executor.shutdown()
+    finally:
+        if csv_file:
+            csv_file.close()
+        if json_file:
+            json_file.write('\n]\n')
+            json_file.close()
+
+    return len(files), errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Evalúa diseños de confiabilidad por lotes sin interfaz gráfica')
+    parser.add_argument('paths', nargs='+',
+                        help='archivos de diseño (.json) o directorios')
+    parser.add_argument('-o', '--output', default='resultados',
+                        help='directorio de salida (por defecto: resultados)')
+    parser.add_argument('--format', nargs='+', choices=('csv', 'json'),
+                        default=['csv', 'json'], help='formatos de salida')
+    parser.add_argument('--analyses', nargs='+', choices=ANALYSES,
+                        default=list(ANALYSES), help='análisis a ejecutar')
+    parser.add_argument('--samples', type=int, default=10000,
+                        help='muestras de Monte Carlo por diseño')
+    parser.add_argument('--times', type=float, nargs='+',
+                        default=list(DEFAULT_TIMES),
+                        help='tiempos (horas) para la tabla de R(t)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='semilla para resultados reproducibles')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='procesos en paralelo (por defecto: núcleos)')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='diseños por lote enviado a cada proceso')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    total, errors = run_batch(args.paths, args.output, args.format,
+                              tuple(args.analyses), args.samples,
+                              tuple(args.times), args.seed, args.jobs,
+                              args.chunksize)
+    elapsed = time.perf_counter() - start
+
+    print(f'{total} diseños evaluados en {elapsed:.2f} s '
+          f'({errors} con errores) -> {args.output}')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Curvas en el tiempo para los gráficos de resultados (sin Qt)
+
+    R(t)    de cada bloque con la distribución de su tipo
+            (reliability.block_reliability_array) y del sistema en serie
+            como producto de los bloques
+    h(t)    tasa de fallo, -d ln R / dt
+    p(t)    probabilidades de estado de la cadena de Markov partiendo del
+            estado 0, con exp(QΔt) aplicada por duplicación sobre la grilla
+
+Las curvas de un gráfico comparten una grilla uniforme de tiempos; la
+cantidad de muestras se reparte entre las curvas dentro de SAMPLE_BUDGET y se
+guardan en float32 junto con su pirámide de decimate.
+"""
+
+import numpy as np
+
+from decimate import Pyramid
+from hierarchy import Hierarchy, is_subsystem
+from reliability import block_reliability_array, normalize_type, params_columns
+
+SAMPLE_BUDGET = 8_000_000    # muestras por gráfico (todas las curvas)
+MIN_SAMPLES = 2_000
+MAX_SAMPLES = 2_000_000
+SPAN_MTBF = 3.0              # el eje de tiempo llega a 3 veces el mayor MTBF
+MARKOV_CHART_LIMIT = 500     # estados máximos para las curvas de Markov
+HAZARD_FLOOR = 1e-200        # por debajo de este R(t) no se deriva ln R
+SYSTEM_NAME = 'Sistema'
+
+
+class Plot:
+    """Un gráfico: eje x compartido, curvas (filas de y) y su pirámide"""
+
+    def __init__(self, title, y_label, x, y, names, y_range=None, emphasis=()):
+        self.title = title
+        self.y_label = y_label
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.ascontiguousarray(y, dtype=np.float32)
+        self.names = list(names)
+        self.y_range = y_range       # None: se ajusta a lo visible
+        self.emphasis = set(emphasis)  # curvas dibujadas con trazo grueso
+        self.pyramid = Pyramid(self.y)
+
+    @property
+    def samples(self):
+        return self.y.size
+
+
+def time_grid(span, curves):
+    """Grilla uniforme [0, span] con las muestras repartidas entre curvas"""
+    samples = int(np.clip(SAMPLE_BUDGET // max(curves, 1), MIN_SAMPLES, MAX_SAMPLES))
+    return np.linspace(0.0, span, samples)
+
+
+def block_reliability(design, times):
+    """R(t) de cada bloque de nivel superior (bloques × tiempos)"""
+    blocks = design.get('blocks', [])
+    result = np.zeros((len(blocks), len(times)))
+    hierarchy = Hierarchy(design)
+    groups = {}
+    for i, block in enumerate(blocks):
+        groups.setdefault(normalize_type(block['type']), []).append(i)
+    cache = {}
+    for block_type, indices in groups.items():
+        if is_subsystem(blocks[indices[0]]):
+            # Un subsistema es la serie de sus bloques (ya expandidos)
+            for i in indices:
+                name = blocks[i]['params']['subsystem']
+                if name not in cache:
+                    inner = hierarchy.flatten({'blocks': [blocks[i]], 'connections': []})
+                    cache[name] = np.prod(block_reliability(inner, times), axis=0)
+                result[i] = cache[name]
+        else:
+            columns = params_columns(block_type, [blocks[i].get('params', {}) for i in indices])
+            result[indices] = block_reliability_array(block_type, columns, times)
+    return result
+
+
+def hazard_rate(times, reliability):
+    """h(t) = -d ln R / dt por diferencias centradas
+
+    Donde R(t) ya no es representable (cola de la curva) ln R deja de tener
+    sentido; allí se mantiene el último valor calculado.
+    """
+    with np.errstate(divide='ignore'):
+        log_r = np.log(np.clip(reliability, 1e-300, None))
+    hazard = -np.gradient(log_r, times, axis=-1)
+    valid = reliability > HAZARD_FLOOR
+    valid[:, :-1] &= valid[:, 1:]  # la diferencia centrada usa el punto siguiente
+    if not valid.all():
+        last = np.where(valid, np.arange(valid.shape[1]), 0)
+        np.maximum.accumulate(last, axis=1, out=last)
+        hazard = np.take_along_axis(hazard, last, axis=1)
+    return hazard
+
+
+def expm(A):
+    """exp(A) por escalamiento y cuadrados con serie de Taylor"""
+    norm = np.abs(A).sum(axis=1).max()
+    squarings = max(0, int(np.ceil(np.log2(norm / 0.5)))) if norm > 0.5 else 0
+    A = A / 2 ** squarings
+    result = np.eye(A.shape[0])
+    term = np.eye(A.shape[0])
+    for k in range(1, 19):
+        term = term @ A / k
+        result += term
+    for _ in range(squarings):
+        result = result @ result
+    return result
+
+
+def markov_transient(Q, times):
+    """Probabilidades de estado p(t) (estados × tiempos) desde el estado 0
+
+    times debe ser uniforme: con P = exp(QΔt), los bloques de filas
+    p[2^j : 2^(j+1)] = p[0 : 2^j] · P^(2^j) se obtienen con un producto de
+    matrices por cada duplicación.
+    """
+    Q = Q.to_dense() if hasattr(Q, 'to_dense') else np.asarray(Q, dtype=float)
+    n = Q.shape[0]
+    count = len(times)
+    p = np.zeros((count, n))
+    p[0, 0] = 1.0
+    if count > 1:
+        step = expm(Q * (times[1] - times[0]))
+        filled = 1
+        while filled < count:
+            take = min(filled, count - filled)
+            p[filled:filled + take] = p[:take] @ step
+            filled += take
+            step = step @ step
+    return np.clip(p, 0.0, 1.0).T
+
+
+def results_plots(design, markov=None):
+    """Gráficos de R(t), h(t) y, si hay modelo de Markov, p(t)"""
+    plots = []
+    blocks = design.get('blocks', [])
+    if blocks:
+        mtbfs = Hierarchy(design).block_mtbfs(blocks)
+        finite = mtbfs[np.isfinite(mtbfs) & (mtbfs > 0)]
+        span = SPAN_MTBF * (finite.max() if finite.size else 1000.0)
+        names = [b.get('name', '') or f'Bloque {i + 1}' for i, b in enumerate(blocks)]
+        system = bool(design.get('connections'))
+        times = time_grid(span, len(blocks) + system)
+        reliability = block_reliability(design, times)
+        emphasis = ()
+        if system:
+            reliability = np.vstack([np.prod(reliability, axis=0), reliability])
+            names = [SYSTEM_NAME] + names
+            emphasis = (0,)
+        # h(t) se calcula antes de pasar a float32: cerca de R = 1 se perdería
+        hazard = hazard_rate(times, reliability)
+        plots.append(Plot('Confiabilidad R(t)', 'R(t)', times, reliability, names,
+                          y_range=(0.0, 1.0), emphasis=emphasis))
+        del reliability
+        plots.append(Plot('Tasa de fallo h(t)', 'h(t) (fallos/h)', times, hazard, names,
+                          emphasis=emphasis))
+    if markov is not None:
+        n = markov.n if hasattr(markov, 'n') else len(markov)
+        if n <= MARKOV_CHART_LIMIT:
+            Q = markov.to_dense() if hasattr(markov, 'to_dense') else np.asarray(markov, dtype=float)
+            rates = -np.diag(Q)
+            rates = rates[rates > 0]
+            span = 5.0 / rates.min() if rates.size else 1000.0
+            times = time_grid(span, n)
+            labels = getattr(markov, 'labels', None) or [f'Estado {i}' for i in range(n)]
+            plots.append(Plot('Probabilidad de estado (Markov)', 'p(t)', times,
+                              markov_transient(Q, times), labels, y_range=(0.0, 1.0)))
+    return plots
@@ -0,0 +1,173 @@
+"""Reducción de curvas densas al ancho de la pantalla (sin Qt)
+
+Las curvas comparten el eje x (n muestras crecientes) y se guardan como una
+matriz y (curvas × n). Dos métodos:
+
+    mín/máx     por cada columna de píxeles, el primer valor, el mínimo, el
+                máximo y el último (M4): el trazo resultante es idéntico al de
+                todas las muestras. Una pirámide de mínimos y máximos por
+                bloques de FACTOR**k muestras hace que el costo dependa del
+                ancho en píxeles y no de la cantidad de muestras visibles; los
+                bloques parciales en los bordes de cada columna se resuelven
+                con los niveles más finos.
+    LTTB        Largest-Triangle-Three-Buckets: conserva la forma con menos
+                puntos. Primero se preseleccionan candidatos con mín/máx
+                (MinMaxLTTB) y luego se elige un punto por cubeta, para todas
+                las curvas a la vez.
+"""
+
+import numpy as np
+
+FACTOR = 4          # muestras por bloque entre niveles de la pirámide
+MIN_LEVEL = 256     # la pirámide se detiene al llegar a este tamaño
+LTTB_RATIO = 4      # candidatos mín/máx por punto de salida en MinMaxLTTB
+
+
+class Pyramid:
+    """Mínimos y máximos precalculados de una matriz de curvas"""
+
+    def __init__(self, y):
+        self.y = y
+        self.levels = [(y, y)]
+        lo = hi = y
+        while lo.shape[1] > MIN_LEVEL * FACTOR:
+            starts = np.arange(0, lo.shape[1], FACTOR)
+            lo = np.minimum.reduceat(lo, starts, axis=1)
+            hi = np.maximum.reduceat(hi, starts, axis=1)
+            self.levels.append((lo, hi))
+
+    @property
+    def nbytes(self):
+        return sum(lo.nbytes + hi.nbytes for lo, hi in self.levels[1:]) + self.y.nbytes
+
+    def extent(self, i0=0, i1=None):
+        """(mínimo, máximo) de todas las curvas entre las muestras i0 e i1"""
+        i1 = self.y.shape[1] if i1 is None else i1
+        k = 0
+        while k + 1 < len(self.levels) and FACTOR ** (k + 1) * 4 <= i1 - i0:
+            k += 1
+        b = FACTOR ** k
+        lo, hi = self.levels[k]
+        lo, hi = lo[:, i0 // b:-(-i1 // b)], hi[:, i0 // b:-(-i1 // b)]
+        finite_lo = lo[np.isfinite(lo)]
+        finite_hi = hi[np.isfinite(hi)]
+        if not finite_lo.size:
+            return None
+        return float(finite_lo.min()), float(finite_hi.max())
+
+    def minmax(self, x, i0, i1, buckets):
+        """Puntos M4 de las muestras [i0, i1) repartidas en `buckets` columnas
+
+        Devuelve (xs, ys): xs compartido (4·cubetas,) e ys (curvas × 4·cubetas).
+        Si hay pocas muestras se devuelven tal cual.
+        """
+        if i1 - i0 <= 2 * buckets:
+            return x[i0:i1], self.y[:, i0:i1]
+        edges = np.unique(np.linspace(i0, i1, buckets + 1).astype(np.int64))
+        starts, ends = edges[:-1], edges[1:]
+        per = (i1 - i0) / buckets
+
+        # Nivel más grueso cuyos bloques caben al menos cuatro veces en una cubeta
+        k = 0
+        while k + 1 < len(self.levels) and FACTOR ** (k + 1) * 4 <= per:
+            k += 1
+
+        # Los extremos de cada cubeta casi nunca caen en el borde de un bloque:
+        # en cada nivel fino se toman los elementos sueltos del principio y del
+        # final (menos de FACTOR por lado) y se sube al nivel siguiente. Los
+        # índices se recortan a [s, e), que sigue dentro de la cubeta.
+        reach = np.arange(FACTOR - 1)
+        s, e = starts, ends
+        low = high = None
+        for j in range(k):
+            lo, hi = self.levels[j]
+            index = np.concatenate([s[:, None] + reach, e[:, None] - 1 - reach], axis=1)
+            index = np.clip(index, s[:, None], e[:, None] - 1)
+            part_low = lo[:, index].min(axis=2)
+            part_high = hi[:, index].max(axis=2)
+            low = part_low if low is None else np.minimum(low, part_low)
+            high = part_high if high is None else np.maximum(high, part_high)
+            s, e = -(-s // FACTOR), e // FACTOR
+
+        # Bloques completos del nivel k: cada cubeta contiene al menos uno; los
+        # tramos entre cubetas (índices impares) se descartan
+        lo, hi = self.levels[k]
+        bounds = np.empty(2 * s.size, dtype=np.int64)
+        bounds[0::2] = s
+        bounds[1::2] = e
+        inner_low = np.minimum.reduceat(lo[:, :e[-1]], bounds[:-1], axis=1)[:, 0::2]
+        inner_high = np.maximum.reduceat(hi[:, :e[-1]], bounds[:-1], axis=1)[:, 0::2]
+        low = inner_low if low is None else np.minimum(low, inner_low)
+        high = inner_high if high is None else np.maximum(high, inner_high)
+
+        first = self.y[:, starts]
+        last = self.y[:, ends - 1]
+        # El mínimo y el máximo se ordenan según la tendencia de la cubeta
+        rising = last >= first
+        ys = np.empty((self.y.shape[0], starts.size, 4), dtype=self.y.dtype)
+        ys[:, :, 0] = first
+        ys[:, :, 1] = np.where(rising, low, high)
+        ys[:, :, 2] = np.where(rising, high, low)
+        ys[:, :, 3] = last
+        # Posiciones repartidas dentro de la cubeta (las exactas no se guardan)
+        left, right = x[starts], x[ends - 1]
+        xs = np.column_stack([left, (2 * left + right) / 3, (left + 2 * right) / 3, right])
+        return xs.ravel(), ys.reshape(self.y.shape[0], -1)
+
+
+def lttb(x, y, points):
+    """Largest-Triangle-Three-Buckets sobre todas las filas de y a la vez
+
+    x es compartido (n,) o por curva (curvas × n). Devuelve (xs, ys), ambos
+    de forma (curvas × points).
+    """
+    m, n = y.shape
+    shared = x.ndim == 1
+    if n <= points or points < 3:
+        xs = np.broadcast_to(x, y.shape) if shared else x
+        return xs, y
+    xf = x.astype(float)
+    yf = y.astype(float)
+    # Cubetas del interior; el primer y el último punto se conservan
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    cum_y = np.concatenate([np.zeros((m, 1)), np.cumsum(yf, axis=1)], axis=1)
+    cum_x = np.concatenate([np.zeros(xf.shape[:-1] + (1,)), np.cumsum(xf, axis=-1)], axis=-1)
+    # La cubeta siguiente de la última es el punto final
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], n)
+    count = np.maximum(next_end - next_start, 1)
+    avg_y = (cum_y[:, next_end] - cum_y[:, next_start]) / count
+    avg_x = (cum_x[..., next_end] - cum_x[..., next_start]) / count
+
+    rows = np.arange(m)
+    chosen = np.empty((m, points), dtype=np.int64)
+    chosen[:, 0] = 0
+    chosen[:, -1] = n - 1
+    ax = xf[0] if shared else xf[:, 0]
+    ax = np.broadcast_to(ax, (m,))
+    ay = yf[:, 0]
+    for b in range(points - 2):
+        s, e = edges[b], edges[b + 1]
+        if e <= s:
+            e = s + 1
+        bx = avg_x[b] if shared else avg_x[:, b]
+        by = avg_y[:, b]
+        cx = xf[s:e] if shared else xf[:, s:e]
+        cy = yf[:, s:e]
+        # Doble del área del triángulo (a, candidato, promedio siguiente)
+        area = np.abs((ax - bx)[:, None] * (cy - ay[:, None])
+                      - (ax[:, None] - cx) * (by - ay)[:, None])
+        best = np.argmax(area, axis=1)
+        chosen[:, b + 1] = s + best
+        ax = xf[s + best] if shared else xf[rows, s + best]
+        ay = cy[rows, best]
+
+    ys = np.take_along_axis(y, chosen, axis=1)
+    xs = x[chosen] if shared else np.take_along_axis(x, chosen, axis=1)
+    return xs, ys
+
+
+def minmax_lttb(pyramid, x, i0, i1, points):
+    """MinMaxLTTB: candidatos mín/máx y LTTB sobre ellos"""
+    xs, ys = pyramid.minmax(x, i0, i1, max(points * LTTB_RATIO // 4, 1))
+    return lttb(xs, ys, points)
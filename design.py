@@ -0,0 +1,118 @@
+"""Lectura y escritura de diseños en formato JSON (sin Qt)
+
+Un diseño es un dict con la forma:
+
+    {
+        "version": 1,
+        "name": "Planta A",
+        "blocks": [{"type": "Serie", "name": "Bombas", "params": {...},
+                    "pos": [x, y]}, ...],
+        "connections": [[0, 1], ...],          # índices de bloques
+        "markov": {"states": [...], "matrix": [[...], ...]},  # opcional
+        "growth": [{"block": "Bombas", "stages": [             # opcional
+            {"name": "TRL 5", "hours": 500, "failures": [...]}, ...]}],
+        "multistate": {"mission_time": 1000, "demand": 50},   # opcional
+        "bounds": {"mission_time": 1000, "tolerance": 1e-4,   # opcional
+                   "budget": 10}
+    }
+
+Los parámetros de un bloque pueden incluir "capacity" y "states"
+([[capacidad, probabilidad], ...]) para el análisis multiestado (ugf.py).
+
+En lugar de "matrix", la sección markov puede indicar "file" con la ruta
+(relativa al diseño) de un modelo .csv/.npy/.npz para markov_import. Del
+mismo modo, una entrada de growth puede traer "file" con las pruebas por etapa
+en .csv (ver growth.py).
+"""
+
+import json
+import math
+import os
+
+FORMAT_VERSION = 1
+DESIGN_EXTENSION = '.json'
+
+
+def validate_design(design):
+    """Verifica la estructura básica de un diseño y lo devuelve"""
+    if not isinstance(design, dict):
+        raise ValueError('El diseño debe ser un objeto JSON')
+
+    blocks = design.setdefault('blocks', [])
+    for i, block in enumerate(blocks):
+        if 'type' not in block:
+            raise ValueError(f'El bloque {i} no tiene tipo')
+        block.setdefault('name', f'{block["type"]} {i + 1}')
+        block.setdefault('params', {})
+        states = block['params'].get('states')
+        if states and not all(len(state) == 2 for state in states):
+            raise ValueError(f'El bloque {i} tiene estados inválidos')
+
+    connections = design.setdefault('connections', [])
+    for conn in connections:
+        if len(conn) != 2 or not all(0 <= c < len(blocks) for c in conn):
+            raise ValueError(f'Conexión inválida: {conn}')
+
+    markov = design.get('markov')
+    if markov is not None and 'matrix' not in markov and 'file' not in markov:
+        raise ValueError('La sección markov requiere una matriz o un archivo')
+
+    for entry in design.get('growth') or []:
+        if 'block' not in entry or ('stages' not in entry and 'file' not in entry):
+            raise ValueError('Cada entrada de growth requiere un bloque y etapas o un archivo')
+
+    for name, definition in (design.get('subsystems') or {}).items():
+        validate_design(definition)
+    for i, block in enumerate(blocks):
+        if block['type'] == 'Subsistema' and \
+                block['params'].get('subsystem') not in (design.get('subsystems') or {}):
+            raise ValueError(f'El bloque {i} usa un subsistema no definido')
+
+    return design
+
+
+def load_design(path):
+    """Carga y valida un diseño desde un archivo JSON"""
+    with open(path, encoding='utf-8') as f:
+        design = json.load(f)
+    design = validate_design(design)
+    design.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    markov = design.get('markov')
+    if markov and 'file' in markov:
+        markov['file'] = os.path.join(os.path.dirname(os.path.abspath(path)), markov['file'])
+    for entry in design.get('growth') or []:
+        if 'file' in entry:
+            entry['file'] = os.path.join(os.path.dirname(os.path.abspath(path)), entry['file'])
+    return design
+
+
+def save_design(design, path):
+    """Guarda un diseño en un archivo JSON"""
+    data = dict(design)
+    data['version'] = FORMAT_VERSION
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def finite_json(value):
+    """Copia de value apta para JSON estricto: inf y nan pasan a None (null)"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: finite_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [finite_json(item) for item in value]
+    return value
+
+
+def find_designs(paths):
+    """Lista los archivos de diseño indicados (archivos o directorios)"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                found.extend(os.path.join(root, f) for f in files
+                             if f.endswith(DESIGN_EXTENSION))
+        else:
+            found.append(path)
+    return sorted(found)
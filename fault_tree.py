@@ -0,0 +1,356 @@
+"""Árbol de fallas y conjuntos mínimos de corte (sin Qt)
+
+Los conjuntos de corte se guardan como enteros usados como bitsets: el bit i
+corresponde al evento básico i, de modo que la prueba de inclusión
+(subsunción) es `m & c == m`. Los conjuntos se generan de abajo hacia arriba
+por compuertas (expansión tipo MOCUS) con truncamiento por orden y por
+probabilidad durante la expansión, lo que mantiene acotado el trabajo en
+árboles con miles de eventos básicos.
+"""
+
+import math
+
+import profiling
+from graph import (acyclic_successors, adjacency, predecessors, removed_edges,
+                   topological_order, weak_components)
+from reliability import block_mtbf
+
+AND = 'AND'
+OR = 'OR'
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(x):
+        return bin(x).count('1')
+
+
+class FaultTree:
+    """Árbol (o grafo acíclico) de compuertas AND/OR sobre eventos básicos
+
+    Las referencias a nodos son tuplas ('E', i) para eventos básicos y
+    ('G', j) para compuertas. Los hijos de una compuerta deben existir antes
+    que la compuerta, por lo que el índice de compuerta es un orden
+    topológico.
+    """
+
+    def __init__(self):
+        self.event_names = []
+        self.probabilities = []
+        self.gates = []  # (tipo, [hijos], nombre)
+        self.top = None
+        self.removed_edges = []  # (origen, destino) descartadas al romper ciclos
+
+    def add_event(self, name, probability):
+        self.event_names.append(name)
+        self.probabilities.append(min(max(float(probability), 0.0), 1.0))
+        return ('E', len(self.event_names) - 1)
+
+    def add_gate(self, kind, children, name=''):
+        if kind not in (AND, OR):
+            raise ValueError(f'Compuerta desconocida: {kind}')
+        if not children:
+            raise ValueError('Una compuerta necesita al menos un hijo')
+        if len(children) == 1:
+            return children[0]
+        self.gates.append((kind, list(children), name))
+        return ('G', len(self.gates) - 1)
+
+    def describe(self, ref):
+        """Nombre legible de un nodo"""
+        kind, index = ref
+        if kind == 'E':
+            return self.event_names[index]
+        gate_kind, _, name = self.gates[index]
+        return name or f'{gate_kind} {index}'
+
+
+def event_probability(mtbf, mission_time):
+    """Probabilidad de falla antes de mission_time con tasa constante 1/MTBF"""
+    if mtbf == float('inf'):
+        return 0.0
+    if mtbf <= 0:
+        return 1.0
+    return -math.expm1(-mission_time / mtbf)
+
+
+def from_diagram(design, mission_time=1000.0):
+    """Construye el árbol de fallas equivalente al diagrama de bloques
+
+    El sistema funciona si en cada subdiagrama conectado existe un camino de
+    un bloque de entrada a uno de salida con todos sus bloques operativos;
+    los subdiagramas no conectados entre sí se consideran en serie (igual que
+    un diseño sin conexiones). Para cada bloque v:
+
+        Falla(v) = E_v  OR  AND(Falla(w) para cada sucesor w)
+
+    Cada bloque es un evento básico con probabilidad 1 - exp(-t/MTBF). Las
+    conexiones descartadas para romper ciclos quedan en tree.removed_edges.
+    """
+    blocks = design.get('blocks', [])
+    n = len(blocks)
+    tree = FaultTree()
+    events = [
+        tree.add_event(b.get('name') or f'Bloque {i + 1}',
+                       event_probability(block_mtbf(b['type'], b.get('params', {})),
+                                         mission_time))
+        for i, b in enumerate(blocks)
+    ]
+    if not n:
+        return tree
+
+    connections = design.get('connections', [])
+    succ, _ = adjacency(n, connections)
+    acyclic = acyclic_successors(succ)
+    tree.removed_edges = [(tree.event_names[a], tree.event_names[b])
+                          for a, b in removed_edges(succ, acyclic)]
+    succ = acyclic
+    pred = predecessors(succ)
+
+    fail = [None] * n
+    for v in reversed(topological_order(succ)):
+        if not succ[v]:
+            fail[v] = events[v]
+            continue
+        downstream = tree.add_gate(AND, [fail[w] for w in succ[v]],
+                                   f'Sin camino después de {tree.event_names[v]}')
+        fail[v] = tree.add_gate(OR, [events[v], downstream],
+                                f'Falla desde {tree.event_names[v]}')
+
+    subsystems = []
+    for component in weak_components(n, connections):
+        sources = [v for v in component if not pred[v]]
+        subsystems.append(tree.add_gate(AND, [fail[s] for s in sources],
+                                        'Sin camino de entrada a salida'))
+    tree.top = tree.add_gate(OR, subsystems, 'Falla del sistema')
+    return tree
+
+
+class _Limits:
+    """Criterios de truncamiento de conjuntos de corte"""
+
+    def __init__(self, log_q, max_order=None, cutoff=0.0, max_cutsets=None):
+        self.log_q = log_q
+        self.max_order = max_order
+        self.log_cutoff = math.log(cutoff) if cutoff > 0 else -math.inf
+        self.max_cutsets = max_cutsets
+
+    def log_probability(self, bits):
+        total = 0.0
+        log_q = self.log_q
+        while bits:
+            low = bits & -bits
+            total += log_q[low.bit_length() - 1]
+            bits ^= low
+        return total
+
+    def accept(self, bits, log_p):
+        if self.max_order is not None and _popcount(bits) > self.max_order:
+            return False
+        return log_p >= self.log_cutoff
+
+
+def minimize(cutsets):
+    """Elimina los conjuntos que contienen a otro (subsunción por bitsets)
+
+    cutsets es una lista de pares (bits, log_p). Los candidatos se recorren
+    por orden creciente; cada conjunto mínimo se indexa por su bit más bajo,
+    así cada candidato sólo se compara con los conjuntos cuyo bit más bajo
+    está contenido en él.
+    """
+    unique = dict(cutsets)
+    ordered = sorted(unique.items(), key=lambda item: _popcount(item[0]))
+    kept = []
+    by_low_bit = {}
+    for bits, log_p in ordered:
+        x = bits
+        subsumed = False
+        while x and not subsumed:
+            low = x & -x
+            for m in by_low_bit.get(low, ()):
+                if m & bits == m:
+                    subsumed = True
+                    break
+            x ^= low
+        if not subsumed:
+            kept.append((bits, log_p))
+            by_low_bit.setdefault(bits & -bits, []).append(bits)
+    return kept
+
+
+def merge(base, extra):
+    """Une dos listas ya mínimas conservando sólo los conjuntos mínimos
+
+    Sólo compara conjuntos de listas distintas, lo que evita reordenar y
+    revisar de nuevo la lista más grande.
+    """
+    if len(extra) > len(base):
+        base, extra = extra, base
+    if not extra:
+        return list(base)
+    base_bits = [bits for bits, _ in base]
+    present = set(base_bits)
+    extra = [(e, p) for e, p in extra if e not in present]
+    extra = [(e, p) for e, p in extra
+             if not any(b & e == b for b in base_bits)]
+    if not extra:
+        return list(base)
+    if len(extra) == 1:
+        e = extra[0][0]
+        kept = [item for item in base if item[0] & e != e]
+    else:
+        extra_bits = [e for e, _ in extra]
+        kept = [item for item in base
+                if not any(item[0] & e == e for e in extra_bits)]
+    return kept + extra
+
+
+def _and(left, right, limits):
+    # Los conjuntos presentes en ambos operandos pasan directo al resultado y
+    # subsumen cualquier producto que los contenga: (X + A)(X + B) = X + AB
+    right_bits = dict(right)
+    common = [(bits, log_p) for bits, log_p in left if bits in right_bits]
+    if common:
+        shared = {bits for bits, _ in common}
+        left = [item for item in left if item[0] not in shared]
+        right = [item for item in right if item[0] not in shared]
+
+    products = []
+    for a, pa in left:
+        for b, pb in right:
+            common_bits = a & b
+            bits = a | b
+            log_p = pa + pb - (limits.log_probability(common_bits) if common_bits else 0.0)
+            if limits.accept(bits, log_p):
+                products.append((bits, log_p))
+    return merge(common, minimize(products))
+
+
+def _truncate(cutsets, limits):
+    if limits.max_cutsets is not None and len(cutsets) > limits.max_cutsets:
+        cutsets.sort(key=lambda item: item[1], reverse=True)
+        del cutsets[limits.max_cutsets:]
+    return cutsets
+
+
+@profiling.timed('arbol_fallas.cortes')
+def minimal_cut_sets(tree, max_order=None, cutoff=0.0, max_cutsets=None):
+    """Conjuntos mínimos de corte del evento tope como lista de (bits, probabilidad)
+
+    max_order descarta conjuntos con más eventos; cutoff descarta conjuntos
+    con probabilidad menor; max_cutsets conserva en cada compuerta sólo los
+    más probables. Los tres truncamientos se aplican durante la expansión.
+    """
+    if tree.top is None:
+        return []
+
+    log_q = [math.log(q) if q > 0 else -math.inf for q in tree.probabilities]
+    limits = _Limits(log_q, max_order, cutoff, max_cutsets)
+
+    def leaf(index):
+        # Un evento imposible no forma conjuntos de corte con probabilidad
+        if log_q[index] == -math.inf:
+            return []
+        bits = 1 << index
+        return [(bits, log_q[index])] if limits.accept(bits, log_q[index]) else []
+
+    # Cuántas compuertas usan cada compuerta, para liberar resultados
+    uses = [0] * len(tree.gates)
+    for _, children, _ in tree.gates:
+        for kind, index in children:
+            if kind == 'G':
+                uses[index] += 1
+
+    results = {}
+
+    def take(ref):
+        kind, index = ref
+        if kind == 'E':
+            return leaf(index)
+        cutsets = results[index]
+        uses[index] -= 1
+        if uses[index] <= 0 and ref != tree.top:
+            del results[index]
+        return cutsets
+
+    top_kind, top_index = tree.top
+    if top_kind == 'E':
+        cutsets = leaf(top_index)
+    else:
+        for index in range(top_index + 1):
+            if index != top_index and uses[index] == 0:
+                continue  # compuerta que no cuelga del tope
+            kind, children, _ = tree.gates[index]
+            if kind == OR:
+                cutsets = []
+                for child in children:
+                    cutsets = merge(cutsets, take(child))
+            else:
+                ordered = sorted(children, key=lambda c: c[0] == 'G')
+                cutsets = take(ordered[0])
+                for child in ordered[1:]:
+                    if not cutsets:
+                        break
+                    cutsets = _and(cutsets, take(child), limits)
+            results[index] = _truncate(cutsets, limits)
+        cutsets = results[top_index]
+
+    return sorted(((bits, math.exp(log_p)) for bits, log_p in cutsets),
+                  key=lambda item: item[1], reverse=True)
+
+
+def cut_set_events(bits):
+    """Índices de los eventos básicos de un conjunto de corte"""
+    events = []
+    while bits:
+        low = bits & -bits
+        events.append(low.bit_length() - 1)
+        bits ^= low
+    return events
+
+
+def analyze(tree, max_order=None, cutoff=0.0, max_cutsets=None, top=20):
+    """Conjuntos mínimos de corte, indisponibilidad del sistema e importancias
+
+    - rare_event: Σ P(C), aproximación de eventos raros;
+    - mcub: 1 - Π(1 - P(C)), cota superior por conjuntos mínimos de corte;
+    - importance: Fussell-Vesely de cada evento sobre los conjuntos hallados.
+    """
+    cutsets = minimal_cut_sets(tree, max_order, cutoff, max_cutsets)
+    probabilities = [p for _, p in cutsets]
+    rare_event = math.fsum(probabilities)
+    mcub = -math.expm1(math.fsum(math.log1p(-p) if p < 1 else -math.inf
+                                 for p in probabilities))
+
+    contribution = {}
+    for bits, p in cutsets:
+        for i in cut_set_events(bits):
+            contribution[i] = contribution.get(i, 0.0) + p
+    importance = sorted(
+        ((tree.event_names[i], c / rare_event if rare_event else 0.0)
+         for i, c in contribution.items()),
+        key=lambda item: item[1], reverse=True)
+
+    orders = {}
+    for bits, _ in cutsets:
+        order = _popcount(bits)
+        orders[order] = orders.get(order, 0) + 1
+
+    return {
+        'n_events': len(tree.event_names),
+        'n_gates': len(tree.gates),
+        'n_cutsets': len(cutsets),
+        'orders': dict(sorted(orders.items())),
+        'rare_event': min(rare_event, 1.0),
+        'mcub': mcub,
+        'top': [
+            {
+                'events': [tree.event_names[i] for i in cut_set_events(bits)],
+                'order': _popcount(bits),
+                'probability': p,
+            }
+            for bits, p in cutsets[:top]
+        ],
+        'importance': importance[:top],
+        'removed_edges': list(tree.removed_edges),
+    }
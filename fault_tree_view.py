@@ -0,0 +1,137 @@
+"""Vista del árbol de fallas derivado del diagrama y sus conjuntos mínimos de corte"""
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
+                             QPushButton, QLineEdit, QSpinBox,
+                             QDoubleSpinBox, QTreeWidget, QTreeWidgetItem,
+                             QTextEdit, QSplitter, QMessageBox)
+from PyQt5.QtCore import Qt
+
+import fault_tree
+
+
+class FaultTreeDialog(QDialog):
+    """Árbol de fallas, conjuntos mínimos de corte e indisponibilidad"""
+
+    def __init__(self, design, parent=None):
+        super().__init__(parent)
+        self.design = design
+        self.tree = None
+        self.setWindowTitle('Árbol de Fallas')
+        self.setMinimumSize(900, 600)
+        self.init_ui()
+        self.build_tree()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        form = QFormLayout()
+        self.time_input = QDoubleSpinBox()
+        self.time_input.setRange(1, 1000000)
+        self.time_input.setValue(1000)
+        self.time_input.setSuffix(' horas')
+        self.time_input.valueChanged.connect(self.build_tree)
+        form.addRow('Tiempo de misión:', self.time_input)
+
+        self.order_input = QSpinBox()
+        self.order_input.setRange(0, 50)
+        self.order_input.setValue(4)
+        self.order_input.setSpecialValueText('Sin límite')
+        form.addRow('Orden máximo:', self.order_input)
+
+        self.cutoff_input = QLineEdit('1e-12')
+        form.addRow('Probabilidad mínima:', self.cutoff_input)
+
+        self.top_input = QSpinBox()
+        self.top_input.setRange(1, 1000)
+        self.top_input.setValue(20)
+        form.addRow('Conjuntos a mostrar:', self.top_input)
+        layout.addLayout(form)
+
+        splitter = QSplitter(Qt.Horizontal)
+        self.tree_view = QTreeWidget()
+        self.tree_view.setHeaderLabels(['Nodo', 'Tipo', 'Probabilidad'])
+        self.tree_view.itemExpanded.connect(self.expand_item)
+        splitter.addWidget(self.tree_view)
+
+        self.results = QTextEdit()
+        self.results.setReadOnly(True)
+        splitter.addWidget(self.results)
+        splitter.setSizes([400, 500])
+        layout.addWidget(splitter)
+
+        btn_layout = QHBoxLayout()
+        close_btn = QPushButton('Cerrar')
+        close_btn.clicked.connect(self.close)
+        calc_btn = QPushButton('Calcular Cortes Mínimos')
+        calc_btn.clicked.connect(self.calculate)
+        btn_layout.addWidget(close_btn)
+        btn_layout.addWidget(calc_btn)
+        layout.addLayout(btn_layout)
+
+        self.setLayout(layout)
+
+    def build_tree(self):
+        """Reconstruye el árbol; los hijos se cargan al expandir cada nodo"""
+        self.tree = fault_tree.from_diagram(self.design, self.time_input.value())
+        self.tree_view.clear()
+        if self.tree.top is not None:
+            self.tree_view.addTopLevelItem(self.make_item(self.tree.top))
+
+    def make_item(self, ref):
+        kind, index = ref
+        if kind == 'E':
+            item = QTreeWidgetItem([self.tree.describe(ref), 'Evento básico',
+                                    f'{self.tree.probabilities[index]:.3e}'])
+        else:
+            gate_kind = self.tree.gates[index][0]
+            item = QTreeWidgetItem([self.tree.describe(ref), gate_kind, ''])
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+        item.setData(0, Qt.UserRole, ref)
+        return item
+
+    def expand_item(self, item):
+        if item.childCount():
+            return
+        kind, index = item.data(0, Qt.UserRole)
+        if kind == 'G':
+            for child in self.tree.gates[index][1]:
+                item.addChild(self.make_item(tuple(child)))
+
+    def calculate(self):
+        try:
+            cutoff = float(self.cutoff_input.text() or 0)
+        except ValueError:
+            QMessageBox.warning(self, 'Error', 'Probabilidad mínima inválida')
+            return
+
+        max_order = self.order_input.value() or None
+        result = fault_tree.analyze(self.tree, max_order, cutoff,
+                                    top=self.top_input.value())
+
+        html = '<h3>Conjuntos Mínimos de Corte</h3>'
+        html += (f'<p>{result["n_events"]} eventos básicos, {result["n_gates"]} compuertas, '
+                 f'<b>{result["n_cutsets"]}</b> conjuntos mínimos '
+                 f'(orden ≤ {max_order or "∞"}, P ≥ {cutoff:g})</p>')
+        html += '<p>Por orden: ' + ', '.join(
+            f'{order}: {count}' for order, count in result['orders'].items()) + '</p>'
+        html += (f'<p><b>Indisponibilidad (eventos raros): {result["rare_event"]:.4e}</b><br>'
+                 f'<b>Indisponibilidad (MCUB): {result["mcub"]:.4e}</b></p>')
+        if result['removed_edges']:
+            html += ('<p style="color: #FF9800;">Se descartaron conexiones que cierran ciclos; '
+                     'los caminos que pasaban por ellas no se consideran: ' + ', '.join(
+                         f'{a} → {b}' for a, b in result['removed_edges']) + '</p>')
+
+        html += '<table border="1" cellpadding="4" cellspacing="0" width="100%">'
+        html += '<tr style="background-color: #2196F3; color: white;">'
+        html += '<th>#</th><th>Eventos</th><th>Orden</th><th>Probabilidad</th></tr>'
+        for i, cut in enumerate(result['top'], 1):
+            html += (f'<tr><td>{i}</td><td>{", ".join(cut["events"])}</td>'
+                     f'<td>{cut["order"]}</td><td>{cut["probability"]:.3e}</td></tr>')
+        html += '</table>'
+
+        html += '<h4>Importancia Fussell-Vesely</h4><table border="1" cellpadding="4" cellspacing="0">'
+        for name, value in result['importance']:
+            html += f'<tr><td>{name}</td><td>{value:.4f}</td></tr>'
+        html += '</table>'
+
+        self.results.setHtml(html)
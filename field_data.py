@@ -0,0 +1,311 @@
+"""Actualización bayesiana de λ con datos de campo (sin Qt)
+
+Cada 'Componente Simple' del diseño lleva una distribución gamma(α, β) para
+su tasa de fallo. La previa tiene por media el λ del diseño y un peso de
+prior_failures fallas equivalentes: α₀ = prior_failures, β₀ = α₀ / λ₀. Un
+evento con f fallas en h horas de operación deja α = α₀ + Σf y β = β₀ + Σh
+(conjugada gamma–Poisson), así que cada evento cuesta O(1): dos sumas sobre
+arreglos. La media posterior α / β reemplaza al λ del bloque en la
+evaluación incremental de whatif.WhatIf, que sólo recalcula los bloques que
+recibieron eventos.
+
+El registro tiene una línea por evento, en CSV o JSON:
+
+    bloque,fallas,horas
+    {"block": "Bomba 1", "failures": 1, "hours": 12.5}
+
+Las fuentes leen sólo lo agregado desde la lectura anterior: LogTail sigue
+un archivo que crece por el final (si se trunca o se reemplaza vuelve a
+empezar) y UdpSource recibe datagramas en localhost ('udp:PUERTO'). Las
+líneas de bloques que no están en el diseño o que no se entienden se
+cuentan y se descartan.
+
+Ejemplo:
+    python field_data.py diseño.json campo.log --follow
+"""
+
+import argparse
+import json
+import math
+import os
+import socket
+import sys
+import time
+
+import numpy as np
+
+from whatif import WhatIf
+
+TRACKED_TYPE = 'Componente Simple'
+PRIOR_FAILURES = 1.0      # peso de la previa en fallas equivalentes
+READ_LIMIT = 4 * 2**20    # bytes leídos del archivo por llamada
+DATAGRAM_LIMIT = 10000    # datagramas leídos por llamada
+Z_95 = 1.6448536269514722
+
+
+def parse_event(line):
+    """(bloque, fallas, horas) de una línea; None si es vacía o encabezado
+
+    Lanza ValueError si la línea no se entiende.
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if line.startswith('{'):
+        try:
+            data = json.loads(line)
+            name = str(data['block'])
+            failures = float(data.get('failures', 0))
+            hours = float(data.get('hours', 0))
+        except (KeyError, TypeError, json.JSONDecodeError) as e:
+            raise ValueError(f'Evento inválido: {line}') from e
+    else:
+        parts = line.rsplit(',', 2)
+        if len(parts) != 3:
+            raise ValueError(f'Evento inválido: {line}')
+        try:
+            failures = float(parts[1])
+            hours = float(parts[2])
+        except ValueError:
+            if parts[1].strip().lower() in ('fallas', 'failures'):
+                return None
+            raise ValueError(f'Evento inválido: {line}') from None
+        name = parts[0].strip()
+    if failures < 0 or hours < 0 or not (math.isfinite(failures) and math.isfinite(hours)):
+        raise ValueError(f'Evento inválido: {line}')
+    return name, failures, hours
+
+
+class Posteriors:
+    """Previa y posterior gamma de λ para cada bloque seguido"""
+
+    def __init__(self, names, rates, prior_failures=PRIOR_FAILURES):
+        self.names = list(names)
+        self.index = {}
+        for i, name in enumerate(self.names):
+            self.index.setdefault(name, []).append(i)
+        self.prior = np.asarray(rates, dtype=float)
+        self.prior_failures = prior_failures
+        self.failures = np.zeros(len(self.names))
+        self.hours = np.zeros(len(self.names))
+        self.dirty = set()
+        self.events = 0
+        self.rejected = 0
+
+    @property
+    def alpha(self):
+        return self.prior_failures + self.failures
+
+    @property
+    def beta(self):
+        # λ₀ = 0 deja una previa vaga (β₀ = 0): manda sólo el dato de campo
+        prior = np.where(self.prior > 0, self.prior, 1.0)
+        return np.where(self.prior > 0, self.prior_failures / prior, 0.0) + self.hours
+
+    def add(self, name, failures, hours):
+        """Incorpora un evento; False si el bloque no se sigue"""
+        rows = self.index.get(name)
+        if rows is None:
+            self.rejected += 1
+            return False
+        for i in rows:
+            self.failures[i] += failures
+            self.hours[i] += hours
+            self.dirty.add(i)
+        self.events += 1
+        return True
+
+    def add_lines(self, lines):
+        """Incorpora las líneas de una lectura; devuelve cuántos eventos aceptó"""
+        accepted = 0
+        for line in lines:
+            try:
+                event = parse_event(line)
+            except ValueError:
+                self.rejected += 1
+                continue
+            if event is not None and self.add(*event):
+                accepted += 1
+        return accepted
+
+    def mean(self):
+        """Media posterior de λ; sin previa ni horas queda en 0"""
+        beta = self.beta
+        return np.where(beta > 0, self.alpha / np.where(beta > 0, beta, 1.0), 0.0)
+
+    def upper(self):
+        """Cota superior de λ al 95 % (aproximación de Wilson–Hilferty)"""
+        alpha = self.alpha
+        beta = self.beta
+        c = 1.0 / (9.0 * np.maximum(alpha, 1e-12))
+        quantile = alpha * np.maximum(1.0 - c + Z_95 * np.sqrt(c), 0.0) ** 3
+        return np.where(beta > 0, quantile / np.where(beta > 0, beta, 1.0), np.inf)
+
+    def take_dirty(self):
+        rows = sorted(self.dirty)
+        self.dirty.clear()
+        return rows
+
+
+class LogTail:
+    """Lee las líneas completas agregadas a un archivo desde la última lectura"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.identity = None
+        self.offset = 0
+        self.partial = b''
+
+    def _open(self):
+        self.close()
+        try:
+            self.file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return False
+        stat = os.fstat(self.file.fileno())
+        self.identity = (stat.st_dev, stat.st_ino)
+        self.offset = 0
+        self.partial = b''
+        return True
+
+    def read(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        # Rotado (otro archivo con el mismo nombre) o truncado: desde el inicio
+        if (self.file is None or (stat.st_dev, stat.st_ino) != self.identity
+                or stat.st_size < self.offset):
+            if not self._open():
+                return []
+        if stat.st_size == self.offset:
+            return []
+        self.file.seek(self.offset)
+        data = self.file.read(READ_LIMIT)
+        self.offset += len(data)
+        data = self.partial + data
+        end = data.rfind(b'\n') + 1
+        self.partial = data[end:]
+        return data[:end].decode('utf-8', errors='replace').splitlines()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class UdpSource:
+    """Datagramas UDP en localhost; cada uno trae una o más líneas"""
+
+    def __init__(self, port, host='127.0.0.1'):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.setblocking(False)
+
+    def read(self):
+        lines = []
+        for _ in range(DATAGRAM_LIMIT):
+            try:
+                data = self.socket.recv(65536)
+            except BlockingIOError:
+                break
+            lines.extend(data.decode('utf-8', errors='replace').splitlines())
+        return lines
+
+    def close(self):
+        self.socket.close()
+
+
+def open_source(spec):
+    """'udp:PUERTO' abre un UdpSource; cualquier otra cosa es un archivo"""
+    if spec.startswith('udp:'):
+        try:
+            port = int(spec[4:])
+        except ValueError:
+            raise ValueError(f'Puerto inválido: {spec}') from None
+        return UdpSource(port)
+    return LogTail(spec)
+
+
+class FieldTracker:
+    """Posteriores de los bloques seguidos sobre la evaluación incremental"""
+
+    def __init__(self, design, prior_failures=PRIOR_FAILURES, mission_time=1000.0):
+        self.model = WhatIf(design, mission_time)
+        self.rows = [i for i, block in enumerate(design['blocks'])
+                     if block['type'] == TRACKED_TYPE]
+        names = [design['blocks'][i]['name'] for i in self.rows]
+        rates = [self.model.value(i, 'lambda') for i in self.rows]
+        self.posteriors = Posteriors(names, rates, prior_failures)
+
+    def poll(self, source):
+        """Lee la fuente, actualiza las posteriores y el sistema
+
+        Devuelve las filas de posteriors que cambiaron.
+        """
+        self.posteriors.add_lines(source.read())
+        changed = self.posteriors.take_dirty()
+        if changed:
+            means = self.posteriors.mean()
+            for row in changed:
+                self.model.set(self.rows[row], 'lambda', float(means[row]))
+            self.model.update()
+        return changed
+
+    def changes(self):
+        """[(índice del bloque, λ posterior)] de los bloques con eventos"""
+        means = self.posteriors.mean()
+        seen = (self.posteriors.failures > 0) | (self.posteriors.hours > 0)
+        return [(self.rows[row], float(means[row])) for row in np.flatnonzero(seen)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Actualiza los λ de un diseño con un registro de fallas y horas')
+    parser.add_argument('design', help='archivo de diseño (.json)')
+    parser.add_argument('source', help="registro de eventos o 'udp:PUERTO'")
+    parser.add_argument('--prior-failures', type=float, default=PRIOR_FAILURES,
+                        help='peso de la previa en fallas equivalentes')
+    parser.add_argument('--follow', action='store_true',
+                        help='seguir leyendo hasta Ctrl+C')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='segundos entre lecturas con --follow')
+    args = parser.parse_args(argv)
+
+    from design import load_design
+    tracker = FieldTracker(load_design(args.design), args.prior_failures)
+    source = open_source(args.source)
+
+    def report():
+        posteriors = tracker.posteriors
+        summary = tracker.model.summary()
+        system = (f'MTBF del sistema: {summary["mtbf"]:.2f} h' if summary['series']
+                  else 'sin conexiones')
+        print(f'{posteriors.events} eventos ({posteriors.rejected} descartados) · {system}',
+              flush=True)
+
+    try:
+        tracker.poll(source)
+        while args.follow:
+            report()
+            time.sleep(args.interval)
+            tracker.poll(source)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+
+    posteriors = tracker.posteriors
+    mean, upper = posteriors.mean(), posteriors.upper()
+    print(f'{"bloque":<24} {"fallas":>8} {"horas":>12} {"λ diseño":>12} '
+          f'{"λ posterior":>12} {"λ 95 %":>12}')
+    for i, name in enumerate(posteriors.names):
+        print(f'{name:<24} {posteriors.failures[i]:8g} {posteriors.hours[i]:12g} '
+              f'{posteriors.prior[i]:12.4g} {mean[i]:12.4g} {upper[i]:12.4g}')
+    report()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Panel acoplable de datos de campo: λ bayesiano desde un registro en vivo
+
+Un temporizador (POLL_MS) lee lo que llegó a la fuente desde la lectura
+anterior, actualiza las posteriores y la evaluación incremental del sistema
+y redibuja sólo las filas de los bloques que recibieron eventos: miles de
+eventos por segundo cuestan una actualización de la interfaz por intervalo.
+El diagrama se toma al iniciar; los cambios posteriores se ven al reiniciar.
+"""
+
+import time
+
+from PyQt5.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QHBoxLayout,
+                             QFormLayout, QPushButton, QLabel, QLineEdit,
+                             QDoubleSpinBox, QFileDialog, QMessageBox,
+                             QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt5.QtCore import QTimer
+
+import profiling
+from field_data import PRIOR_FAILURES, FieldTracker, open_source
+
+POLL_MS = 100
+COLUMNS = ['Bloque', 'Fallas', 'Horas', 'λ diseño', 'λ posterior', 'λ 95 %']
+
+
+class FieldDataDock(QDockWidget):
+    """Sigue un registro de fallas y horas y actualiza los 'Componente Simple'"""
+
+    def __init__(self, app, parent=None):
+        super().__init__('Datos de Campo', parent)
+        self.setObjectName('fieldDataDock')
+        self.app = app
+        self.tracker = None
+        self.source = None
+        self.last_events = 0
+        self.last_time = 0.0
+        self.rate = 0.0
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+
+        form = QFormLayout()
+        source_row = QHBoxLayout()
+        self.source_input = QLineEdit()
+        self.source_input.setPlaceholderText('archivo de registro o udp:PUERTO')
+        browse_btn = QPushButton('Examinar...')
+        browse_btn.clicked.connect(self.browse)
+        source_row.addWidget(self.source_input, 1)
+        source_row.addWidget(browse_btn)
+        form.addRow('Fuente:', source_row)
+
+        self.prior_input = QDoubleSpinBox()
+        self.prior_input.setRange(0, 1e6)
+        self.prior_input.setDecimals(2)
+        self.prior_input.setValue(PRIOR_FAILURES)
+        self.prior_input.setSuffix(' fallas')
+        self.prior_input.setToolTip('Peso del λ del diseño en fallas equivalentes')
+        form.addRow('Peso de la previa:', self.prior_input)
+        layout.addLayout(form)
+
+        self.start_btn = QPushButton('Iniciar')
+        self.start_btn.setCheckable(True)
+        self.start_btn.toggled.connect(self.toggle)
+        layout.addWidget(self.start_btn)
+
+        self.status_label = QLabel('Detenido')
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table, 1)
+
+        apply_btn = QPushButton('Aplicar al diseño')
+        apply_btn.clicked.connect(self.apply)
+        layout.addWidget(apply_btn)
+
+        self.setWidget(widget)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(POLL_MS)
+        self.timer.timeout.connect(self.poll)
+
+    def browse(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, 'Registro de eventos', '', 'Registros (*.log *.csv *.jsonl *.txt);;Todos (*)')
+        if path:
+            self.source_input.setText(path)
+
+    # Seguimiento -------------------------------------------------------------
+
+    def toggle(self, checked):
+        if checked:
+            self.start()
+        else:
+            self.stop()
+
+    def start(self):
+        design = self.app.to_design()
+        if not any(block['type'] == 'Componente Simple' for block in design['blocks']):
+            QMessageBox.warning(self, 'Advertencia',
+                                'El diseño no tiene bloques "Componente Simple".')
+            self.start_btn.setChecked(False)
+            return
+        try:
+            self.source = open_source(self.source_input.text().strip())
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, 'Advertencia', f'No se pudo abrir la fuente: {e}')
+            self.start_btn.setChecked(False)
+            return
+        self.tracker = FieldTracker(design, self.prior_input.value())
+        self.fill_table()
+        self.last_events = 0
+        self.last_time = time.perf_counter()
+        self.rate = 0.0
+        self.source_input.setEnabled(False)
+        self.prior_input.setEnabled(False)
+        self.start_btn.setText('Detener')
+        self.poll()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+        self.source_input.setEnabled(True)
+        self.prior_input.setEnabled(True)
+        self.start_btn.setText('Iniciar')
+        if self.start_btn.isChecked():
+            self.start_btn.setChecked(False)
+        self.refresh_status()
+
+    def poll(self):
+        """Absorbe todo lo recibido desde la lectura anterior"""
+        with profiling.span('campo.lectura'):
+            changed = self.tracker.poll(self.source)
+            if changed:
+                self.update_rows(changed)
+        now = time.perf_counter()
+        events = self.tracker.posteriors.events
+        if now > self.last_time:
+            # Media móvil de eventos por segundo
+            self.rate = 0.7 * self.rate + 0.3 * (events - self.last_events) / (now - self.last_time)
+        self.last_events = events
+        self.last_time = now
+        self.refresh_status()
+
+    # Resultados ------------------------------------------------------------
+
+    def fill_table(self):
+        posteriors = self.tracker.posteriors
+        self.table.setRowCount(len(posteriors.names))
+        for row, name in enumerate(posteriors.names):
+            for col in range(len(COLUMNS)):
+                self.table.setItem(row, col, QTableWidgetItem())
+            self.table.item(row, 0).setText(name)
+            self.table.item(row, 3).setText(f'{posteriors.prior[row]:.4g}')
+        self.update_rows(range(len(posteriors.names)))
+
+    def update_rows(self, rows):
+        posteriors = self.tracker.posteriors
+        mean = posteriors.mean()
+        upper = posteriors.upper()
+        for row in rows:
+            self.table.item(row, 1).setText(f'{posteriors.failures[row]:g}')
+            self.table.item(row, 2).setText(f'{posteriors.hours[row]:.1f}')
+            self.table.item(row, 4).setText(f'{mean[row]:.4g}')
+            self.table.item(row, 5).setText(f'{upper[row]:.4g}')
+
+    def refresh_status(self):
+        if self.tracker is None:
+            return
+        posteriors = self.tracker.posteriors
+        state = 'Siguiendo' if self.timer.isActive() else 'Detenido'
+        text = (f'{state} · {posteriors.events} eventos ({posteriors.rejected} descartados)'
+                f' · {self.rate:.0f} eventos/s')
+        summary = self.tracker.model.summary()
+        if summary['series']:
+            text += (f'<br><b>MTBF del sistema: {summary["mtbf"]:.2f} h</b> · '
+                     f'λ = {summary["lambda"]:.6g} fallos/h')
+        self.status_label.setText(text)
+
+    def apply(self):
+        """Escribe los λ posteriores en los bloques (se puede deshacer)"""
+        if self.tracker is None:
+            return
+        changes = self.tracker.changes()
+        if not changes:
+            return
+        # La previa pasaría a incluir los datos: el seguimiento se detiene
+        self.stop()
+        names = [block['name'] for block in self.tracker.model.design['blocks']]
+        history = {}
+        for index, value in changes:
+            # El diagrama pudo cambiar después de iniciar: sólo los mismos bloques
+            if index >= len(self.app.components) or self.app.components[index].name != names[index]:
+                continue
+            block = self.app.components[index]
+            old = {'lambda': block.params.get('lambda')}
+            new = {'lambda': value}
+            self.app.set_fields(block, new)
+            history[block.uid] = (old, new)
+        if history:
+            self.app.history.push('params', history)
+        self.status_label.setText(f'{len(history)} bloques actualizados con los datos de campo')
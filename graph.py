@@ -0,0 +1,112 @@
+"""Utilidades sobre el grafo de conexiones de un diseño (sin Qt)
+
+Los bloques se identifican por su índice en design['blocks'] y las
+conexiones son pares [origen, destino].
+"""
+
+
+def adjacency(n, connections):
+    """Listas de sucesores y predecesores sin aristas repetidas ni lazos"""
+    succ = [[] for _ in range(n)]
+    pred = [[] for _ in range(n)]
+    seen = set()
+    for start, end in connections:
+        if start == end or (start, end) in seen:
+            continue
+        seen.add((start, end))
+        succ[start].append(end)
+        pred[end].append(start)
+    return succ, pred
+
+
+def predecessors(succ):
+    """Listas de predecesores a partir de las de sucesores"""
+    pred = [[] for _ in succ]
+    for start, targets in enumerate(succ):
+        for end in targets:
+            pred[end].append(start)
+    return pred
+
+
+def weak_components(n, connections):
+    """Componentes débilmente conexas, cada una como lista ordenada de índices"""
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for start, end in connections:
+        a, b = find(start), find(end)
+        if a != b:
+            parent[a] = b
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return sorted(groups.values(), key=lambda g: g[0])
+
+
+def acyclic_successors(succ):
+    """Elimina las aristas de retorno encontradas por DFS iterativa
+
+    El resultado es acíclico, pero no conserva todos los caminos simples
+    cuando a un ciclo se entra por más de un bloque: con S→X, X→Y, Y→X,
+    Y→T, S2→Y y X→T2 se descarta Y→X y se pierde el camino S2→Y→X→T2.
+    removed_edges() informa qué aristas se descartaron para avisar al usuario.
+    """
+    n = len(succ)
+    state = [0] * n  # 0 = sin visitar, 1 = en la pila, 2 = terminado
+    result = [list(s) for s in succ]
+    for root in range(n):
+        if state[root]:
+            continue
+        stack = [(root, 0)]
+        state[root] = 1
+        while stack:
+            node, i = stack[-1]
+            if i < len(succ[node]):
+                stack[-1] = (node, i + 1)
+                nxt = succ[node][i]
+                if state[nxt] == 1:
+                    result[node].remove(nxt)
+                elif state[nxt] == 0:
+                    state[nxt] = 1
+                    stack.append((nxt, 0))
+            else:
+                state[node] = 2
+                stack.pop()
+    return result
+
+
+def removed_edges(succ, acyclic):
+    """Aristas (origen, destino) de succ que acyclic_successors descartó"""
+    return [(node, t) for node, (before, after) in enumerate(zip(succ, acyclic))
+            for t in before if t not in after]
+
+
+def topological_order(succ):
+    """Orden topológico (Kahn) de un grafo acíclico"""
+    n = len(succ)
+    indegree = [0] * n
+    for targets in succ:
+        for t in targets:
+            indegree[t] += 1
+    order = [i for i in range(n) if indegree[i] == 0]
+    for node in order:
+        for t in succ[node]:
+            indegree[t] -= 1
+            if indegree[t] == 0:
+                order.append(t)
+    if len(order) != n:
+        raise ValueError('El diagrama contiene ciclos')
+    return order
+
+
+def sources_and_sinks(nodes, succ, pred):
+    """Bloques de entrada (sin predecesores) y de salida (sin sucesores)"""
+    sources = [v for v in nodes if not pred[v]]
+    sinks = [v for v in nodes if not succ[v]]
+    return sources, sinks
@@ -0,0 +1,305 @@
+"""Crecimiento de confiabilidad entre etapas TRL (Crow-AMSAA / Duane, sin Qt)
+
+Los datos de prueba se agrupan por etapa TRL: horas de prueba de la etapa e
+instantes de falla medidos desde su inicio. El reloj de prueba se acumula de
+una etapa a la siguiente, de modo que el modelo ve un único proceso.
+
+    Crow-AMSAA  proceso de Poisson no homogéneo con E[N(T)] = λ·T^β; el MLE
+                tiene forma cerrada, β = n / (n·ln T - Σ ln t_i), λ = n / T^β,
+                y el MTBF instantáneo es 1 / (λ·β·T^(β-1))
+    Duane       recta ln(MTBF acumulado) = a + α·ln t ajustada en cada falla;
+                α es la tasa de crecimiento y MTBF_inst = MTBF_acum / (1 - α)
+
+Ambos ajustes dependen sólo de sumas (n, Σ ln t_i y las de mínimos cuadrados
+de Duane): GrowthTracker las actualiza en O(1) con cada falla u hora de prueba
+nueva, sin volver a recorrer los datos. crow_amsaa() opera sobre arrays, así
+que los ajustes de todas las etapas (o de todos los prefijos, fit_history) se
+obtienen de una vez.
+
+Archivo .csv: filas `etapa,tiempo[,evento]` con evento `falla` (por defecto)
+o `fin` (horas totales de prueba de la etapa); encabezado opcional. Una etapa
+sin fila `fin` termina en su última falla.
+"""
+
+import csv
+
+import numpy as np
+
+from reliability import PARAM_ALIASES, block_mtbf, get_param, normalize_type
+
+FAILURE = 'falla'
+END = 'fin'
+
+
+def crow_amsaa(n, log_sum, T, unbiased=False, failure_terminated=False):
+    """MLE (β, λ) de Crow-AMSAA a partir de n, Σ ln t_i y el tiempo total T
+
+    Acepta escalares o arrays de igual forma. Con unbiased se aplica la
+    corrección (n-1)/n (prueba terminada por tiempo) o (n-2)/n (terminada en
+    una falla). Donde el ajuste no está definido se devuelve nan.
+    """
+    n = np.asarray(n, dtype=float)
+    T = np.asarray(T, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominator = n * np.log(T) - log_sum
+        beta = np.where((n > 0) & (denominator > 0), n / denominator, np.nan)
+        if unbiased:
+            beta = beta * (n - (2 if failure_terminated else 1)) / n
+            beta = np.where(beta > 0, beta, np.nan)
+        lam = n / T ** beta
+    return beta, lam
+
+
+def instantaneous_mtbf(beta, lam, T):
+    """MTBF instantáneo 1 / (λ·β·T^(β-1)) del modelo Crow-AMSAA"""
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        return 1.0 / (lam * beta * np.asarray(T, dtype=float) ** (beta - 1))
+
+
+def duane(n, sx, sy, sxx, sxy):
+    """(a, α) de la recta de Duane a partir de sus sumas de mínimos cuadrados"""
+    n = np.asarray(n, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread = n * sxx - sx * sx
+        alpha = np.where(n > 1, (n * sxy - sx * sy) / spread, np.nan)
+        a = (sy - alpha * sx) / n
+    return a, alpha
+
+
+def duane_mtbf(a, alpha, t):
+    """MTBF instantáneo de Duane, e^a·t^α / (1 - α); nan si α ≥ 1 (sin crecimiento)"""
+    alpha = np.asarray(alpha, dtype=float)
+    with np.errstate(over='ignore', invalid='ignore'):
+        mtbf = np.exp(a) * np.power(t, alpha) / (1 - np.where(alpha < 1, alpha, 0.0))
+    return np.where(alpha < 1, mtbf, np.nan)
+
+
+def fit_history(times):
+    """Ajustes tras cada falla (terminados en ella) de tiempos acumulados
+
+    Devuelve un dict de arrays de largo n: time, beta, lambda, mtbf
+    (instantáneo de Crow-AMSAA) y alpha (Duane).
+    """
+    t = np.asarray(times, dtype=float)
+    if np.any(np.diff(t) < 0) or np.any(t <= 0):
+        raise ValueError('Los tiempos de falla deben ser positivos y crecientes')
+    k = np.arange(1, t.size + 1, dtype=float)
+    x = np.log(t)
+    y = x - np.log(k)  # ln del MTBF acumulado t_k / k
+    beta, lam = crow_amsaa(k, np.cumsum(x), t)
+    _, alpha = duane(k, np.cumsum(x), np.cumsum(y), np.cumsum(x * x), np.cumsum(x * y))
+    return {'time': t, 'beta': beta, 'lambda': lam,
+            'mtbf': instantaneous_mtbf(beta, lam, t), 'alpha': alpha}
+
+
+class GrowthTracker:
+    """Sumas suficientes de una campaña de prueba, actualizadas en O(1)"""
+
+    def __init__(self):
+        self.total = 0.0        # horas de prueba acumuladas
+        self.n = 0
+        self.log_sum = 0.0
+        self.last_failure = 0.0
+        # Sumas de la recta de Duane: x = ln t_i, y = ln(t_i / i)
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+        self.stages = []        # etapas cerradas (dicts de stage_record)
+        self.stage = None
+        self.stage_start = 0.0
+        self.stage_n = 0
+        self.stage_log_sum = 0.0
+
+    def start_stage(self, name):
+        """Cierra la etapa en curso y comienza otra en el tiempo acumulado"""
+        self.close_stage()
+        self.stage = str(name)
+        self.stage_start = self.total
+        self.stage_n = 0
+        self.stage_log_sum = 0.0
+
+    def close_stage(self, hours=None):
+        """Cierra la etapa en curso; hours fija sus horas totales de prueba"""
+        if self.stage is None:
+            return
+        if hours is not None:
+            self.add_time(self.stage_start + hours - self.total)
+        self.stages.append(self.stage_record())
+        self.stage = None
+
+    def add_time(self, hours):
+        """Suma horas de prueba sin fallas"""
+        if hours < 0:
+            raise ValueError('Las horas de prueba no pueden disminuir')
+        self.total += hours
+
+    def add_failure(self, time=None):
+        """Registra una falla en el tiempo dado desde el inicio de la etapa
+
+        Sin tiempo, la falla se ubica al final de lo probado hasta ahora.
+        """
+        t = self.total if time is None else self.stage_start + time
+        if t <= 0 or t < self.last_failure:
+            raise ValueError(f'Tiempo de falla fuera de orden: {t:g} h')
+        self.total = max(self.total, t)
+        self.last_failure = t
+        self.n += 1
+        x = np.log(t)
+        y = x - np.log(self.n)
+        self.log_sum += x
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+        if self.stage is not None and t > self.stage_start:
+            self.stage_n += 1
+            self.stage_log_sum += np.log(t - self.stage_start)
+
+    def fit(self, unbiased=False):
+        """Ajuste acumulado con todos los datos registrados hasta ahora"""
+        failure_terminated = self.n > 0 and self.total == self.last_failure
+        beta, lam = crow_amsaa(self.n, self.log_sum, self.total, unbiased,
+                               failure_terminated)
+        a, alpha = duane(self.n, self.sx, self.sy, self.sxx, self.sxy)
+        return {
+            'hours': self.total,
+            'failures': self.n,
+            'beta': float(beta),
+            'lambda': float(lam),
+            'mtbf': float(instantaneous_mtbf(beta, lam, self.total)),
+            'mtbf_cumulative': self.total / self.n if self.n else float('inf'),
+            'alpha': float(alpha),
+            'duane_mtbf': float(duane_mtbf(a, alpha, self.total)),
+        }
+
+    def stage_record(self):
+        record = self.fit()
+        record.update(stage=self.stage, stage_hours=self.total - self.stage_start,
+                      stage_failures=self.stage_n, stage_log_sum=self.stage_log_sum)
+        return record
+
+    def project(self, hours, fit=None):
+        """MTBF instantáneo esperado tras `hours` horas más de prueba"""
+        fit = fit or self.fit()
+        return float(instantaneous_mtbf(fit['beta'], fit['lambda'], self.total + hours))
+
+    def summary(self):
+        """Etapas cerradas (y la actual) con el ajuste propio de cada una
+
+        El ajuste de etapa usa sólo sus fallas, con el reloj desde su inicio;
+        todas las etapas se ajustan en una sola llamada vectorizada.
+        """
+        records = list(self.stages)
+        if self.stage is not None:
+            records.append(self.stage_record())
+        if records:
+            n = np.array([r['stage_failures'] for r in records], dtype=float)
+            log_sum = np.array([r['stage_log_sum'] for r in records])
+            hours = np.array([r['stage_hours'] for r in records])
+            beta, lam = crow_amsaa(n, log_sum, hours)
+            mtbf = instantaneous_mtbf(beta, lam, hours)
+            for i, record in enumerate(records):
+                record['stage_beta'] = float(beta[i])
+                record['stage_mtbf'] = float(mtbf[i])
+        return records
+
+
+def tracker_from_stages(stages):
+    """GrowthTracker con una lista [{'name', 'hours', 'failures': [...]}]"""
+    tracker = GrowthTracker()
+    for i, stage in enumerate(stages):
+        tracker.start_stage(stage.get('name', f'Etapa {i + 1}'))
+        for t in sorted(stage.get('failures', [])):
+            tracker.add_failure(float(t))
+        tracker.close_stage(stage.get('hours'))
+    return tracker
+
+
+def track_file(path):
+    """GrowthTracker con los datos de un .csv de pruebas por etapa"""
+    return tracker_from_stages(load_growth_data(path))
+
+
+def load_growth_data(path):
+    """Lee un .csv de pruebas por etapa y devuelve la lista de etapas"""
+    stages = {}
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        delimiter = ';' if sample.count(';') > sample.count(',') else ','
+        for line, row in enumerate(csv.reader(f, delimiter=delimiter), 1):
+            if not row or not ''.join(row).strip():
+                continue
+            name = row[0].strip()
+            try:
+                time = float(row[1].replace(',', '.')) if len(row) > 1 else None
+            except ValueError:
+                if line == 1:
+                    continue  # encabezado
+                raise ValueError(f'Línea {line}: tiempo inválido {row[1]!r}')
+            if time is None:
+                raise ValueError(f'Línea {line}: falta el tiempo')
+            event = row[2].strip().lower() if len(row) > 2 and row[2].strip() else FAILURE
+            stage = stages.setdefault(name, {'name': name, 'failures': []})
+            if event == END:
+                stage['hours'] = time
+            elif event == FAILURE:
+                stage['failures'].append(time)
+            else:
+                raise ValueError(f'Línea {line}: evento desconocido {row[2]!r}')
+    if not stages:
+        raise ValueError('El archivo no contiene datos de prueba')
+    return list(stages.values())
+
+
+def projected_params(block_type, params, mtbf):
+    """Parámetros del bloque con el MTBF llevado al valor proyectado
+
+    El MTBF de todos los tipos es proporcional a su parámetro base (λ es su
+    inversa), así que basta con escalarlo; n y k no se tocan.
+    """
+    block_type = normalize_type(block_type)
+    if not (np.isfinite(mtbf) and mtbf > 0):
+        raise ValueError('El MTBF proyectado no es válido (faltan fallas para el ajuste)')
+    params = dict(params)
+    if block_type == 'Componente Simple':
+        params['lambda'] = 1.0 / mtbf
+        return params
+    current = block_mtbf(block_type, params)
+    if not current > 0:
+        raise ValueError('El bloque no tiene un MTBF que se pueda escalar')
+    key = 'mtbf_base' if block_type == 'Sistema con Mantenimiento' else 'mtbf'
+    aliases = PARAM_ALIASES.get(key, (key,))
+    base = get_param(block_type, params, key)
+    key = next((alias for alias in aliases if alias in params), aliases[-1])
+    params[key] = base * mtbf / current
+    if block_type == 'Reserva en Espera' and params.get('mtbf_standby'):
+        # En reserva tibia el MTBF es proporcional a ambos MTBF de unidad
+        params['mtbf_standby'] *= mtbf / current
+    return params
+
+
+def apply_growth(design, unbiased=False):
+    """Proyecta los datos de la sección 'growth' del diseño en sus bloques
+
+    Cada entrada indica el bloque (por nombre o índice) y sus etapas o un
+    archivo .csv; con 'hours' se proyecta tras esas horas de prueba más.
+    Modifica el diseño y devuelve el informe de cada bloque.
+    """
+    blocks = design.get('blocks', [])
+    by_name = {block.get('name'): i for i, block in enumerate(blocks)}
+    report = []
+    for entry in design.get('growth', []):
+        target = entry['block']
+        index = target if isinstance(target, int) else by_name.get(target)
+        if index is None or not 0 <= index < len(blocks):
+            raise ValueError(f'Bloque de crecimiento desconocido: {target!r}')
+        stages = entry.get('stages')
+        if stages is None:
+            stages = load_growth_data(entry['file'])
+        tracker = tracker_from_stages(stages)
+        fit = tracker.fit(unbiased)
+        mtbf = tracker.project(entry.get('hours', 0.0), fit)
+        block = blocks[index]
+        block['params'] = projected_params(block['type'], block['params'], mtbf)
+        report.append({'block': block.get('name', index), 'mtbf': mtbf,
+                       'fit': fit, 'stages': tracker.summary()})
+    return report
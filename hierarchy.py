@@ -0,0 +1,210 @@
+"""Subsistemas jerárquicos reutilizables (sin Qt)
+
+Un diseño puede declarar definiciones de subsistema:
+
+    "subsystems": {
+        "Skid de bombeo": {"blocks": [...], "connections": [...]},
+        ...
+    }
+
+y usarlas tantas veces como quiera con bloques de tipo 'Subsistema' y
+params {"subsystem": "Skid de bombeo"}. Las definiciones pueden a su vez
+contener subsistemas (sin ciclos).
+
+Cada definición se identifica por un hash canónico de su estructura (tipos,
+parámetros y conexiones; no nombres ni posiciones), de modo que subsistemas
+estructuralmente idénticos, aunque tengan nombres distintos, se evalúan una
+sola vez. Igual que en la interfaz, un subsistema se evalúa como la serie de
+sus bloques.
+"""
+
+import hashlib
+import json
+
+import numpy as np
+
+from graph import adjacency
+from reliability import (PARAM_ALIASES, block_mtbf_array, normalize_type,
+                         params_columns)
+
+SUBSYSTEM_TYPE = 'Subsistema'
+
+# Rondas de refinamiento de etiquetas (Weisfeiler-Lehman) del hash canónico
+WL_ROUNDS = 3
+
+_CANONICAL_KEY = {alias: key for key, aliases in PARAM_ALIASES.items() for alias in aliases}
+
+
+def is_subsystem(block):
+    return block.get('type') == SUBSYSTEM_TYPE
+
+
+def _digest(value):
+    text = json.dumps(value, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _canonical_params(params):
+    canonical = {}
+    for key, value in params.items():
+        if key in ('name', 'subsystem'):
+            continue
+        if isinstance(value, (int, float)):
+            value = float(value)
+        canonical[_CANONICAL_KEY.get(key, key)] = value
+    return canonical
+
+
+class Hierarchy:
+    """Definiciones de un diseño con hashes y evaluaciones memorizadas"""
+
+    def __init__(self, design):
+        self.definitions = design.get('subsystems', {}) or {}
+        self._hashes = {}
+        self._mtbf_by_hash = {}
+        self.evaluations = 0  # definiciones realmente evaluadas
+
+    def definition(self, name):
+        try:
+            return self.definitions[name]
+        except KeyError:
+            raise ValueError(f'Subsistema no definido: {name}')
+
+    # Hash canónico ---------------------------------------------------------
+
+    def block_label(self, block, stack=()):
+        if is_subsystem(block):
+            return 'S:' + self.canonical_hash(block['params']['subsystem'], stack)
+        return _digest([normalize_type(block['type']),
+                        _canonical_params(block.get('params', {}))])
+
+    def canonical_hash(self, name, stack=()):
+        """Hash de la estructura de una definición, independiente del orden
+
+        Las etiquetas de bloque se refinan con las de sus vecinos (WL) y el
+        hash final combina la multiconjunto de etiquetas y de aristas.
+        """
+        cached = self._hashes.get(name)
+        if cached is not None:
+            return cached
+        if name in stack:
+            raise ValueError(f'Subsistema recursivo: {name}')
+        definition = self.definition(name)
+        blocks = definition.get('blocks', [])
+        connections = definition.get('connections', [])
+        labels = [self.block_label(b, stack + (name,)) for b in blocks]
+
+        succ, pred = adjacency(len(blocks), connections)
+        for _ in range(WL_ROUNDS if connections else 0):
+            labels = [
+                _digest([labels[v],
+                         sorted(labels[w] for w in succ[v]),
+                         sorted(labels[w] for w in pred[v])])
+                for v in range(len(blocks))
+            ]
+        edges = sorted([labels[a], labels[b]] for a, b in connections if a != b)
+        result = _digest([sorted(labels), edges, bool(connections)])
+        self._hashes[name] = result
+        return result
+
+    # Evaluación ------------------------------------------------------------
+
+    def mtbf(self, name, stack=()):
+        """MTBF de una definición (serie de sus bloques), una vez por estructura"""
+        key = self.canonical_hash(name, stack)
+        cached = self._mtbf_by_hash.get(key)
+        if cached is not None:
+            return cached
+        mtbfs = self.block_mtbfs(self.definition(name).get('blocks', []), stack + (name,))
+        rates = np.where(mtbfs > 0, 1 / np.where(mtbfs > 0, mtbfs, 1), 0.0)
+        total = float(rates.sum())
+        value = 1 / total if total > 0 else 0.0
+        self._mtbf_by_hash[key] = value
+        self.evaluations += 1
+        return value
+
+    def block_mtbfs(self, blocks, stack=()):
+        """MTBF de una lista de bloques, vectorizado por tipo"""
+        mtbfs = np.zeros(len(blocks))
+        groups = {}
+        for i, block in enumerate(blocks):
+            groups.setdefault(normalize_type(block['type']), []).append(i)
+        for block_type, indices in groups.items():
+            if block_type == SUBSYSTEM_TYPE:
+                mtbfs[indices] = [self.mtbf(blocks[i]['params']['subsystem'], stack)
+                                  for i in indices]
+            else:
+                columns = params_columns(block_type,
+                                         [blocks[i].get('params', {}) for i in indices])
+                mtbfs[indices] = block_mtbf_array(block_type, columns)
+        return mtbfs
+
+    # Expansión -------------------------------------------------------------
+
+    def flatten(self, design):
+        """Diseño plano equivalente, con los subsistemas expandidos
+
+        Las conexiones que llegan a una instancia se dirigen a sus bloques de
+        entrada y las que salen parten de sus bloques de salida. Los nombres
+        se prefijan con el de la instancia ('Skid 3/Bomba A').
+        """
+        blocks = []
+        connections = []
+        # Para cada bloque original: (índices de entrada, índices de salida)
+        ports = []
+        for block in design.get('blocks', []):
+            ports.append(self._expand(block, '', blocks, connections, ()))
+
+        for a, b in design.get('connections', []):
+            for start in ports[a][1]:
+                for end in ports[b][0]:
+                    connections.append([start, end])
+
+        flat = {key: value for key, value in design.items() if key != 'subsystems'}
+        flat['blocks'] = blocks
+        flat['connections'] = connections
+        return flat
+
+    def _expand(self, block, prefix, blocks, connections, stack):
+        name = prefix + block.get('name', '')
+        if not is_subsystem(block):
+            blocks.append(dict(block, name=name))
+            index = len(blocks) - 1
+            return [index], [index]
+
+        sub = block['params']['subsystem']
+        if sub in stack:
+            raise ValueError(f'Subsistema recursivo: {sub}')
+        definition = self.definition(sub)
+        inner = [self._expand(b, name + '/', blocks, connections, stack + (sub,))
+                 for b in definition.get('blocks', [])]
+        inner_connections = definition.get('connections', [])
+        if not inner_connections and inner:
+            # Sin conexiones internas el subsistema es una serie: se encadena
+            inner_connections = [[i, i + 1] for i in range(len(inner) - 1)]
+        for a, b in inner_connections:
+            for start in inner[a][1]:
+                for end in inner[b][0]:
+                    connections.append([start, end])
+
+        succ, pred = adjacency(len(inner), inner_connections)
+        entries = [i for v in range(len(inner)) if not pred[v] for i in inner[v][0]]
+        exits = [i for v in range(len(inner)) if not succ[v] for i in inner[v][1]]
+        return entries, exits
+
+
+def subsystem_mtbfs(design):
+    """MTBF de cada bloque de nivel superior que sea un subsistema"""
+    hierarchy = Hierarchy(design)
+    return {
+        i: hierarchy.mtbf(block['params']['subsystem'])
+        for i, block in enumerate(design.get('blocks', []))
+        if is_subsystem(block)
+    }
+
+
+def flatten(design):
+    """Atajo de Hierarchy.flatten; devuelve el mismo diseño si no hay subsistemas"""
+    if not design.get('subsystems'):
+        return design
+    return Hierarchy(design).flatten(design)
@@ -0,0 +1,172 @@
+"""Historial de deshacer/rehacer basado en diferencias (sin Qt)
+
+Cada comando guarda sólo lo que cambió, nunca una copia del diseño:
+
+    ('add', fragmento)        bloques y conexiones agregados
+    ('remove', fragmento)     bloques y conexiones eliminados
+    ('move', {uid: ((x0, y0), (x1, y1))})
+    ('params', {uid: (antes, después)})   sólo los campos modificados
+    ('subsystems', {nombre: (antes, después)})
+    ('group', [(tipo, datos), ...])       varios cambios como uno solo
+
+Un fragmento es {'blocks': [(uid, índice, tipo, nombre, params, x, y)],
+'lines': [(índice, uid_origen, uid_destino)]}, con los índices que ocupan
+los elementos en las listas del diagrama. El historial no conoce la interfaz:
+aplica los comandos a través de la función `apply(tipo, datos, undo)` que
+recibe al construirse, de modo que deshacer o rehacer cuesta lo mismo que el
+cambio y no depende del tamaño del diseño.
+
+Los comandos se guardan serializados (pickle), lo que los hace compactos e
+inmutables: el diario de autoguardado puede escribirlos desde otro hilo sin
+tocar los objetos de la interfaz. La memoria total es la suma de esos tamaños
+y se acota a `budget` bytes descartando los comandos más antiguos; el último
+comando siempre se conserva aunque supere el presupuesto por sí solo.
+"""
+
+import pickle
+import time
+from collections import deque
+from operator import itemgetter
+
+HISTORY_BUDGET = 8 * 2**20   # bytes
+COALESCE_SECONDS = 1.5       # arrastres seguidos de los mismos bloques se unen
+SMALL_CHANGE = 32            # hasta aquí se inserta/elimina elemento a elemento
+
+
+class Command:
+    """Cambio reversible, guardado serializado"""
+
+    __slots__ = ('kind', 'blob', 'time')
+
+    def __init__(self, kind, data):
+        self.kind = kind
+        self.blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        self.time = time.monotonic()
+
+    @property
+    def data(self):
+        return pickle.loads(self.blob)
+
+    @property
+    def size(self):
+        return len(self.blob)
+
+
+class History:
+    """Pilas de deshacer/rehacer con presupuesto de memoria"""
+
+    def __init__(self, apply, budget=HISTORY_BUDGET):
+        self.apply = apply
+        self.budget = budget
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.memory = 0
+        self.listeners = []  # funciones llamadas tras cada cambio del historial
+        self.observers = []  # funciones (comando, undo) por cada cambio aplicado
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def push(self, kind, data, coalesce=False):
+        """Registra un cambio ya aplicado al diagrama"""
+        if not data:
+            return
+        self._clear_redo()
+        last = self.undo_stack[-1] if self.undo_stack else None
+        merged = data
+        if (coalesce and last is not None and last.kind == kind
+                and time.monotonic() - last.time < COALESCE_SECONDS):
+            previous = last.data
+            if previous.keys() == data.keys():
+                # Se conserva el estado inicial del primero y el final del último
+                self.undo_stack.pop()
+                self.memory -= last.size
+                merged = {key: (previous[key][0], value[1]) for key, value in data.items()}
+        command = Command(kind, merged)
+        self.undo_stack.append(command)
+        self.memory += command.size
+        self._trim()
+        self._observe(command, False)
+        self._notify()
+
+    def undo(self):
+        if not self.undo_stack:
+            return False
+        command = self.undo_stack.pop()
+        self.apply(command.kind, command.data, True)
+        self.redo_stack.append(command)
+        self._observe(command, True)
+        self._notify()
+        return True
+
+    def redo(self):
+        if not self.redo_stack:
+            return False
+        command = self.redo_stack.pop()
+        self.apply(command.kind, command.data, False)
+        command.time = 0.0  # un comando rehecho no se une con el siguiente
+        self.undo_stack.append(command)
+        self._observe(command, False)
+        self._notify()
+        return True
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.memory = 0
+        self._notify()
+
+    def _clear_redo(self):
+        self.memory -= sum(c.size for c in self.redo_stack)
+        self.redo_stack.clear()
+
+    def _trim(self):
+        # Sólo se llama al registrar un cambio, cuando no hay nada que rehacer
+        while self.memory > self.budget and len(self.undo_stack) > 1:
+            self.memory -= self.undo_stack.popleft().size
+
+    def _observe(self, command, undo):
+        for observer in self.observers:
+            observer(command, undo)
+
+    def _notify(self):
+        for listener in self.listeners:
+            listener()
+
+
+def insert_at(items, entries):
+    """Inserta pares (índice, elemento), donde índice es la posición final"""
+    entries = sorted(entries, key=itemgetter(0))
+    if len(entries) <= SMALL_CHANGE:
+        for index, item in entries:
+            items.insert(index, item)
+        return
+    merged = []
+    rest = iter(items)
+    for index, item in entries:
+        while len(merged) < index:
+            merged.append(next(rest))
+        merged.append(item)
+    merged.extend(rest)
+    items[:] = merged
+
+
+def remove_all(items, removed):
+    """Quita de la lista los elementos indicados"""
+    if len(removed) <= SMALL_CHANGE:
+        for item in removed:
+            items.remove(item)
+        return
+    removed = set(removed)
+    items[:] = [item for item in items if item not in removed]
+
+
+def indices_of(items, targets):
+    """Posición de cada elemento de targets en items"""
+    if len(targets) <= SMALL_CHANGE:
+        return [items.index(item) for item in targets]
+    index = {item: i for i, item in enumerate(items)}
+    return [index[item] for item in targets]
@@ -0,0 +1,278 @@
+"""Autoguardado a prueba de cierres inesperados con un diario de operaciones (sin Qt)
+
+La interfaz no escribe el diseño completo: cada cambio del historial
+(history.Command, ya serializado) se encola y un hilo en segundo plano lo
+agrega como una línea JSON a `journal.jsonl`:
+
+    [seq, tipo, undo, datos]
+
+El mismo hilo mantiene una copia del diseño (Document) aplicando esas
+operaciones y, cuando el diario crece, la escribe como `snapshot.json` y
+vacía el diario. Así el costo en la interfaz es proporcional a las ediciones
+y nunca depende del tamaño del diseño.
+
+Al arrancar, recover() lee la instantánea y reaplica las operaciones con
+número de secuencia posterior; una última línea incompleta (cierre a mitad
+de escritura) se ignora.
+"""
+
+import json
+import os
+import pickle
+import queue
+import threading
+import time
+from collections import Counter
+
+from history import insert_at, remove_all
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.mtbfsoft', 'autosave')
+JOURNAL_NAME = 'journal.jsonl'
+SNAPSHOT_NAME = 'snapshot.json'
+COMPACT_BYTES = 4 * 2**20   # tamaño del diario que dispara una instantánea
+SYNC_SECONDS = 2.0          # intervalo máximo entre fsync del diario
+
+
+class Document:
+    """Diseño mantenido por identificador de bloque, igual que la interfaz"""
+
+    def __init__(self):
+        self.order = []    # uid de los bloques en el orden de la interfaz
+        self.blocks = {}   # uid -> [tipo, nombre, params, x, y]
+        self.lines = []    # (uid_origen, uid_destino)
+        self.subsystems = {}
+
+    @classmethod
+    def from_design(cls, design, uids=None):
+        doc = cls()
+        blocks = design.get('blocks', [])
+        doc.order = list(uids) if uids is not None else list(range(len(blocks)))
+        for uid, block in zip(doc.order, blocks):
+            x, y = block.get('pos', (0, 0))
+            doc.blocks[uid] = [block['type'], block.get('name', ''),
+                               dict(block.get('params', {})), x, y]
+        doc.lines = [(doc.order[a], doc.order[b]) for a, b in design.get('connections', [])]
+        doc.subsystems = dict(design.get('subsystems') or {})
+        return doc
+
+    def to_design(self):
+        index = {uid: i for i, uid in enumerate(self.order)}
+        design = {
+            'blocks': [
+                {
+                    'type': block_type,
+                    'name': name,
+                    'params': params,
+                    'pos': [x, y],
+                }
+                for block_type, name, params, x, y in (self.blocks[uid] for uid in self.order)
+            ],
+            'connections': [[index[a], index[b]] for a, b in self.lines],
+        }
+        if self.subsystems:
+            design['subsystems'] = self.subsystems
+        return design
+
+    def apply(self, kind, data, undo):
+        """Mismo contrato que MTBFCalculator.apply_change
+
+        Acepta los datos tal como salen de pickle (tuplas, claves enteras) o
+        de JSON (listas, claves de texto).
+        """
+        if kind == 'group':
+            for item_kind, item_data in (reversed(data) if undo else data):
+                self.apply(item_kind, item_data, undo)
+        elif kind in ('add', 'remove'):
+            if (kind == 'add') == undo:
+                self._remove(data)
+            else:
+                self._insert(data)
+        elif kind == 'move':
+            for uid, (old, new) in data.items():
+                self.blocks[int(uid)][3:5] = old if undo else new
+        elif kind == 'params':
+            for uid, (old, new) in data.items():
+                block = self.blocks[int(uid)]
+                for key, value in (old if undo else new).items():
+                    if key == 'name':
+                        block[1] = value
+                    elif value is None:
+                        block[2].pop(key, None)
+                    else:
+                        block[2][key] = value
+        elif kind == 'subsystems':
+            for name, (old, new) in data.items():
+                definition = old if undo else new
+                if definition is None:
+                    self.subsystems.pop(name, None)
+                else:
+                    self.subsystems[name] = definition
+
+    def _insert(self, fragment):
+        entries = []
+        for uid, i, block_type, name, params, x, y in fragment['blocks']:
+            self.blocks[uid] = [block_type, name, dict(params), x, y]
+            entries.append((i, uid))
+        insert_at(self.order, entries)
+        insert_at(self.lines, [(i, (start, end)) for i, start, end in fragment['lines']])
+
+    def _remove(self, fragment):
+        # Las conexiones repetidas se quitan tantas veces como aparezcan
+        pending = Counter((start, end) for _, start, end in fragment['lines'])
+        if pending:
+            kept = []
+            for line in self.lines:
+                if pending[line]:
+                    pending[line] -= 1
+                else:
+                    kept.append(line)
+            self.lines = kept
+        uids = [block[0] for block in fragment['blocks']]
+        for uid in uids:
+            del self.blocks[uid]
+        remove_all(self.order, uids)
+
+
+def _json_default(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f'No serializable: {type(value).__name__}')
+
+
+class Journal:
+    """Escritor del diario en un hilo propio"""
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, compact_bytes=COMPACT_BYTES):
+        self.directory = directory
+        self.compact_bytes = compact_bytes
+        self.journal_path = os.path.join(directory, JOURNAL_NAME)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_NAME)
+        self.queue = queue.Queue()
+        self.thread = None
+        self.error = None  # última excepción del hilo (el autoguardado no detiene la interfaz)
+
+    # Interfaz (hilo de la interfaz) ----------------------------------------
+
+    def has_recovery(self):
+        return any(os.path.exists(p) and os.path.getsize(p) > 0
+                   for p in (self.journal_path, self.snapshot_path))
+
+    def recover(self):
+        """Diseño reconstruido desde la instantánea y el diario, o None"""
+        return recover(self.directory)
+
+    def start(self, design=None):
+        """Arranca el hilo escritor con el diseño inicial (vacío por defecto)"""
+        os.makedirs(self.directory, exist_ok=True)
+        self.thread = threading.Thread(target=self._run, name='autoguardado', daemon=True)
+        self.thread.start()
+        self.reset(design or {'blocks': [], 'connections': []})
+
+    def record(self, command, undo):
+        """Observador de history.History: encola el comando serializado"""
+        self.queue.put(('op', command.kind, command.blob, undo))
+
+    def reset(self, design):
+        """El diseño se reemplazó por completo (nuevo o abierto desde archivo)"""
+        self.queue.put(('reset', design))
+
+    def close(self, discard=True):
+        """Vacía la cola y detiene el hilo; con discard borra el autoguardado"""
+        if self.thread is None:
+            return
+        self.queue.put(('close', discard))
+        self.thread.join()
+        self.thread = None
+
+    # Hilo escritor ---------------------------------------------------------
+
+    def _run(self):
+        self.doc = Document()
+        self.seq = 0
+        self.file = None
+        self.last_sync = time.monotonic()
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                for item in batch:
+                    if item[0] == 'op':
+                        self._write_op(*item[1:])
+                    elif item[0] == 'reset':
+                        self.doc = Document.from_design(item[1])
+                        self._compact()
+                    elif item[0] == 'close':
+                        running = False
+                        self._finish(item[1])
+                if running and self.file is not None:
+                    self.file.flush()
+                    if time.monotonic() - self.last_sync > SYNC_SECONDS:
+                        os.fsync(self.file.fileno())
+                        self.last_sync = time.monotonic()
+                    if self.file.tell() > self.compact_bytes:
+                        self._compact()
+            except Exception as e:  # noqa: BLE001 - se informa y se sigue
+                self.error = e
+
+    def _write_op(self, kind, blob, undo):
+        data = pickle.loads(blob)
+        self.doc.apply(kind, data, undo)
+        self.seq += 1
+        self.file.write(json.dumps([self.seq, kind, undo, data],
+                                   default=_json_default, separators=(',', ':')) + '\n')
+
+    def _compact(self):
+        """Escribe la copia del diseño como instantánea y vacía el diario"""
+        snapshot = {'seq': self.seq, 'uids': self.doc.order, 'design': self.doc.to_design()}
+        tmp = self.snapshot_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, default=_json_default, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        # Si se corta aquí, las operaciones del diario ya están en la
+        # instantánea y recover() las salta por su número de secuencia
+        if self.file is not None:
+            self.file.close()
+        self.file = open(self.journal_path, 'w', encoding='utf-8')
+        self.last_sync = time.monotonic()
+
+    def _finish(self, discard):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if discard:
+            for path in (self.journal_path, self.snapshot_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def recover(directory=DEFAULT_DIRECTORY):
+    """Reconstruye el último diseño autoguardado en directory, o None"""
+    snapshot_path = os.path.join(directory, SNAPSHOT_NAME)
+    journal_path = os.path.join(directory, JOURNAL_NAME)
+    doc = Document()
+    seq = 0
+    found = False
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+        doc = Document.from_design(snapshot['design'], snapshot.get('uids'))
+        seq = snapshot.get('seq', 0)
+        found = True
+    if os.path.exists(journal_path):
+        with open(journal_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    number, kind, undo, data = json.loads(line)
+                except ValueError:
+                    break  # última línea a medio escribir
+                if number > seq:
+                    doc.apply(kind, data, undo)
+                    found = True
+    return doc.to_design() if found else None
@@ -0,0 +1,214 @@
+"""Organización automática de diagramas grandes (sin Qt)
+
+auto_layout() elige el método según el grafo de conexiones:
+
+    sin conexiones   grilla
+    acíclico         por capas (Sugiyama): capa = camino más largo desde las
+                     entradas y orden dentro de cada capa por baricentro,
+                     con barridos vectorizados sobre todas las capas a la vez
+    con ciclos       dirigido por fuerzas (Fruchterman-Reingold) con la
+                     repulsión aproximada por una grilla de centros de masa
+
+Las posiciones son los centros de los bloques, como pos() en la escena.
+"""
+
+import math
+
+import numpy as np
+
+from graph import acyclic_successors, adjacency
+
+BLOCK_WIDTH = 120
+BLOCK_HEIGHT = 80
+LAYER_SPACING = 200     # distancia horizontal entre capas
+ROW_SPACING = 110       # distancia vertical dentro de una capa
+MARGIN = 100
+LAYERS_PER_BAND = 40    # las cadenas largas se pliegan en franjas
+SWEEPS = 8              # barridos de baricentro (alternando sentido)
+FORCE_ITERATIONS = 60
+FORCE_GRID = 12         # celdas por lado para la repulsión aproximada
+
+
+def grid_layout(n, columns=None):
+    """Grilla casi cuadrada en el orden de los bloques"""
+    columns = columns or max(1, math.ceil(math.sqrt(n)))
+    i = np.arange(n)
+    return np.column_stack([MARGIN + (i % columns) * (BLOCK_WIDTH + 40),
+                            MARGIN + (i // columns) * ROW_SPACING]).astype(float)
+
+
+def longest_path_layers(succ):
+    """Capa de cada bloque: longitud del camino más largo desde una entrada"""
+    n = len(succ)
+    indegree = [0] * n
+    for targets in succ:
+        for v in targets:
+            indegree[v] += 1
+    layer = [0] * n
+    queue = [v for v in range(n) if indegree[v] == 0]
+    for u in queue:  # la lista crece mientras se recorre (orden topológico)
+        for v in succ[u]:
+            if layer[u] + 1 > layer[v]:
+                layer[v] = layer[u] + 1
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                queue.append(v)
+    return np.array(layer, dtype=np.int64)
+
+
+def _ranks(layer, key):
+    """Posición de cada bloque dentro de su capa ordenando por key"""
+    order = np.lexsort((key, layer))
+    sizes = np.bincount(layer)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.empty(layer.size, dtype=np.int64)
+    rank[order] = np.arange(layer.size) - starts[layer[order]]
+    return rank, sizes
+
+
+def layered_layout(n, connections, sweeps=SWEEPS):
+    """Posiciones por capas para un grafo acíclico (los ciclos se rompen)"""
+    succ, _ = adjacency(n, connections)
+    succ = acyclic_successors(succ)
+    src = np.array([u for u, targets in enumerate(succ) for _ in targets], dtype=np.int64)
+    dst = np.array([v for targets in succ for v in targets], dtype=np.int64)
+
+    isolated = np.ones(n, dtype=bool)
+    isolated[src] = False
+    isolated[dst] = False
+    layer = longest_path_layers(succ)
+    layer[isolated] = 0
+
+    connected = np.flatnonzero(~isolated)
+    positions = np.zeros((n, 2))
+    if connected.size:
+        # Sólo los bloques conectados participan en las capas
+        local = np.full(n, -1, dtype=np.int64)
+        local[connected] = np.arange(connected.size)
+        lay = layer[connected]
+        s, d = local[src], local[dst]
+        rank, sizes = _ranks(lay, np.arange(connected.size))
+        in_count = np.bincount(d, minlength=connected.size)
+        out_count = np.bincount(s, minlength=connected.size)
+        for sweep in range(sweeps):
+            norm = rank / np.maximum(sizes[lay] - 1, 1)
+            if sweep % 2 == 0:  # hacia abajo: baricentro de los predecesores
+                total = np.bincount(d, weights=norm[s], minlength=connected.size)
+                count = in_count
+            else:               # hacia arriba: baricentro de los sucesores
+                total = np.bincount(s, weights=norm[d], minlength=connected.size)
+                count = out_count
+            bary = np.where(count > 0, total / np.maximum(count, 1), norm)
+            # Desempate por el orden anterior para que los barridos converjan
+            rank, _ = _ranks(lay, bary + rank * 1e-9)
+
+        band = lay // LAYERS_PER_BAND
+        column = lay % LAYERS_PER_BAND
+        tallest = int(sizes.max())
+        band_height = tallest * ROW_SPACING + ROW_SPACING
+        offset = (tallest - sizes[lay]) * ROW_SPACING / 2  # capas centradas
+        positions[connected, 0] = MARGIN + column * LAYER_SPACING
+        positions[connected, 1] = MARGIN + band * band_height + offset + rank * ROW_SPACING
+        bottom = positions[connected, 1].max() + ROW_SPACING
+    else:
+        bottom = MARGIN - ROW_SPACING
+
+    lonely = np.flatnonzero(isolated)
+    if lonely.size:
+        grid = grid_layout(lonely.size, max(LAYERS_PER_BAND, math.ceil(math.sqrt(lonely.size))))
+        grid[:, 1] += bottom + ROW_SPACING - MARGIN
+        positions[lonely] = grid
+    return positions
+
+
+def force_layout(n, connections, iterations=FORCE_ITERATIONS, seed=0):
+    """Fruchterman-Reingold vectorizado con repulsión por celdas de una grilla"""
+    if n == 0:
+        return np.zeros((0, 2))
+    edges = np.array([(a, b) for a, b in connections if a != b], dtype=np.int64).reshape(-1, 2)
+    src, dst = edges[:, 0], edges[:, 1]
+    k = ROW_SPACING * 1.5  # distancia ideal entre bloques vecinos
+    side = k * math.sqrt(n)
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(0, side, size=(n, 2))
+    temperature = side / 10
+    cooling = (1.0 / 200) ** (1.0 / max(iterations, 1))
+    cells = FORCE_GRID * FORCE_GRID
+
+    for _ in range(iterations):
+        low = pos.min(axis=0)
+        span = np.maximum(pos.max(axis=0) - low, 1e-9)
+        cell_xy = np.minimum(((pos - low) / span * FORCE_GRID).astype(np.int64), FORCE_GRID - 1)
+        cell = cell_xy[:, 0] * FORCE_GRID + cell_xy[:, 1]
+        counts = np.bincount(cell, minlength=cells)
+        used = np.flatnonzero(counts)
+        mass = counts[used].astype(float)
+        center = np.column_stack([
+            np.bincount(cell, weights=pos[:, 0], minlength=cells)[used],
+            np.bincount(cell, weights=pos[:, 1], minlength=cells)[used],
+        ]) / mass[:, None]
+
+        # Repulsión k²/d de cada celda, ponderada por la cantidad de bloques
+        dx = pos[:, 0, None] - center[None, :, 0]
+        dy = pos[:, 1, None] - center[None, :, 1]
+        weight = mass / (dx * dx + dy * dy + 1.0)
+        disp = k * k * np.column_stack([(weight * dx).sum(axis=1),
+                                        (weight * dy).sum(axis=1)])
+
+        # Atracción d²/k a lo largo de cada conexión
+        if src.size:
+            d = pos[dst] - pos[src]
+            length = np.sqrt(np.einsum('ij,ij->i', d, d)) + 1e-9
+            pull = d * (length / k)[:, None]
+            for axis in (0, 1):
+                disp[:, axis] += np.bincount(src, weights=pull[:, axis], minlength=n)
+                disp[:, axis] -= np.bincount(dst, weights=pull[:, axis], minlength=n)
+
+        norm = np.sqrt(np.einsum('ij,ij->i', disp, disp)) + 1e-9
+        pos += disp * (np.minimum(norm, temperature) / norm)[:, None]
+        temperature *= cooling
+
+    return snap_to_grid(pos)
+
+
+def snap_to_grid(pos):
+    """Lleva cada bloque a la celda libre más cercana de una grilla sin solapes"""
+    step = np.array([BLOCK_WIDTH + 30.0, BLOCK_HEIGHT + 30.0])
+    cells = np.round((pos - pos.min(axis=0)) / step).astype(np.int64)
+    taken = set()
+    result = np.empty_like(pos)
+    for i, (cx, cy) in enumerate(cells.tolist()):
+        # Se avanza en la fila hasta encontrar una celda libre
+        while (cx, cy) in taken:
+            cx += 1
+        taken.add((cx, cy))
+        result[i] = (cx, cy)
+    return MARGIN + result * step
+
+
+def auto_layout(n, connections, method='auto'):
+    """Posiciones (n × 2) para todos los bloques del diagrama"""
+    connections = [(int(a), int(b)) for a, b in connections]
+    if method == 'auto':
+        if not connections:
+            method = 'grid'
+        else:
+            succ, _ = adjacency(n, connections)
+            acyclic = acyclic_successors(succ)
+            cyclic = sum(map(len, succ)) != sum(map(len, acyclic))
+            method = 'force' if cyclic else 'layered'
+    if method == 'grid':
+        return grid_layout(n)
+    if method == 'force':
+        return force_layout(n, connections)
+    return layered_layout(n, connections)
+
+
+def bounds(positions):
+    """Rectángulo (x0, y0, x1, y1) que cubre los bloques en esas posiciones"""
+    if not len(positions):
+        return None
+    low = positions.min(axis=0)
+    high = positions.max(axis=0)
+    return (low[0] - BLOCK_WIDTH / 2, low[1] - BLOCK_HEIGHT / 2,
+            high[0] + BLOCK_WIDTH / 2, high[1] + BLOCK_HEIGHT / 2)
@@ -5,9 +5,21 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QComboBox, QGraphicsView, QGraphicsScene, 
                              QGraphicsItem, QGraphicsTextItem, QMessageBox,
                              QDialog, QFormLayout, QDoubleSpinBox, QTextEdit,
-                             QTabWidget, QScrollArea, QGroupBox)
+                             QTabWidget, QScrollArea, QGroupBox, QFileDialog,
+                             QInputDialog, QShortcut, QProgressDialog, QSplitter)
 from PyQt5.QtCore import Qt, QRectF, QPointF, QLineF
-from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont, QPainterPath
+from PyQt5.QtGui import (QPainter, QPen, QBrush, QColor, QFont, QPainterPath,
+                         QKeySequence)
+
+import profiling
+from history import History, indices_of, insert_at, remove_all
+from minimap import Minimap, grow_scene
+
+# Margen que se agrega alrededor de los bloques al ampliar la escena
+SCENE_MARGIN = 200
+
+# El motor de cálculo (reliability, con NumPy) y el módulo de diseños se
+# importan en el primer uso para no retrasar la apertura de la ventana
 
 # Estilos CSS
 STYLE_SHEET = """
@@ -152,15 +164,21 @@ class ComponentBlock(QGraphicsItem):
             'Serie': QColor(129, 199, 132),
             'Paralelo': QColor(255, 183, 77),
             'Redundancia k-de-n': QColor(255, 138, 101),
-            'Sistema con Mantenimiento': QColor(186, 104, 200)
+            'Sistema con Mantenimiento': QColor(186, 104, 200),
+            'Reserva en Espera': QColor(77, 182, 172),
+            'Carga Compartida': QColor(240, 98, 146),
+            'Subsistema': QColor(144, 164, 174)
         }
         
         self.connections_out = []
         self.connections_in = []
+        self.lines = []  # ConnectionLine que llegan o salen del bloque
+        self.uid = None  # identificador estable para el historial
         
     def boundingRect(self):
         return QRectF(-self.width/2, -self.height/2, self.width, self.height)
     
+    @profiling.timed('paint.bloque')
     def paint(self, painter, option, widget):
         # Configurar antialiasing
         painter.setRenderHint(QPainter.Antialiasing)
@@ -194,58 +212,8 @@ class ComponentBlock(QGraphicsItem):
     
     def get_mtbf(self):
         """Calcula el MTBF del componente según su tipo y parámetros"""
-        if self.component_type == 'Componente Simple':
-            # MTBF = 1/λ para tasa de fallo constante
-            lambda_val = self.params.get('lambda', 0.001)
-            if lambda_val > 0:
-                return 1 / lambda_val
-            return float('inf')
-            
-        elif self.component_type == 'Serie':
-            # Para sistema en serie: 1/MTBF_sys = Σ(1/MTBF_i)
-            n = self.params.get('n_components', 2)
-            mtbf_comp = self.params.get('mtbf_component', 1000)
-            if mtbf_comp > 0:
-                return mtbf_comp / n
-            return 0
-            
-        elif self.component_type == 'Paralelo':
-            # Redundancia paralela: MTBF aumenta significativamente
-            n = self.params.get('n_components', 2)
-            mtbf_comp = self.params.get('mtbf_component', 1000)
-            # Aproximación: MTBF_sys ≈ MTBF_comp * (1 + 1/2 + 1/3 + ... + 1/n)
-            harmonic_sum = sum(1/i for i in range(1, n+1))
-            return mtbf_comp * harmonic_sum
-            
-        elif self.component_type == 'Redundancia k-de-n':
-            # Sistema k-de-n: requiere al menos k de n componentes
-            n = self.params.get('n_total', 3)
-            k = self.params.get('k_required', 2)
-            mtbf_comp = self.params.get('mtbf_component', 1000)
-            # Aproximación simplificada
-            if k <= n:
-                factor = sum(1/i for i in range(k, n+1))
-                return mtbf_comp * factor
-            return 0
-            
-        elif self.component_type == 'Sistema con Mantenimiento':
-            # Con mantenimiento preventivo: MTBF_PM = ∫R(t)dt / (1-R(Y))
-            mtbf_base = self.params.get('mtbf_base', 1000)
-            interval = self.params.get('maintenance_interval', 100)
-            lambda_val = 1 / mtbf_base if mtbf_base > 0 else 0.001
-            
-            # Calcular R(Y) - confiabilidad en el intervalo de mantenimiento
-            r_y = math.exp(-lambda_val * interval)
-            
-            # Calcular integral de R(t) de 0 a Y
-            integral_r = mtbf_base * (1 - math.exp(-lambda_val * interval))
-            
-            if r_y < 1:
-                mtbf_pm = integral_r / (1 - r_y)
-                return mtbf_pm
-            return mtbf_base
-        
-        return 0
+        from reliability import block_mtbf
+        return block_mtbf(self.component_type, self.params)
 
 
 class ConnectionLine(QGraphicsItem):
@@ -262,6 +230,7 @@ class ConnectionLine(QGraphicsItem):
         end = self.end_block.pos()
         return QRectF(start, end).normalized().adjusted(-10, -10, 10, 10)
     
+    @profiling.timed('paint.conexion')
     def paint(self, painter, option, widget):
         painter.setRenderHint(QPainter.Antialiasing)
         
@@ -384,6 +353,84 @@ class ComponentDialog(QDialog):
             self.interval_input.setValue(100)
             self.interval_input.setSuffix(' horas')
             form_layout.addRow('Intervalo mantenimiento (Y):', self.interval_input)
+            
+        elif self.component_type == 'Reserva en Espera':
+            self.n_input = QDoubleSpinBox()
+            self.n_input.setDecimals(0)
+            self.n_input.setRange(2, 20)
+            self.n_input.setValue(2)
+            form_layout.addRow('Unidades (1 activa + reserva):', self.n_input)
+            
+            self.mtbf_input = QDoubleSpinBox()
+            self.mtbf_input.setRange(1, 1000000)
+            self.mtbf_input.setValue(1000)
+            self.mtbf_input.setSuffix(' horas')
+            form_layout.addRow('MTBF de la unidad activa:', self.mtbf_input)
+            
+            self.standby_input = QDoubleSpinBox()
+            self.standby_input.setRange(0, 100000000)
+            self.standby_input.setValue(0)
+            self.standby_input.setSuffix(' horas')
+            self.standby_input.setSpecialValueText('Reserva fría')
+            form_layout.addRow('MTBF en espera:', self.standby_input)
+            
+            self.switch_input = QDoubleSpinBox()
+            self.switch_input.setDecimals(4)
+            self.switch_input.setRange(0, 1)
+            self.switch_input.setSingleStep(0.01)
+            self.switch_input.setValue(1.0)
+            form_layout.addRow('Confiabilidad de conmutación:', self.switch_input)
+            
+        elif self.component_type == 'Carga Compartida':
+            self.n_input = QDoubleSpinBox()
+            self.n_input.setDecimals(0)
+            self.n_input.setRange(2, 20)
+            self.n_input.setValue(3)
+            form_layout.addRow('Total de unidades (n):', self.n_input)
+            
+            self.k_input = QDoubleSpinBox()
+            self.k_input.setDecimals(0)
+            self.k_input.setRange(1, 20)
+            self.k_input.setValue(2)
+            form_layout.addRow('Requeridas (k):', self.k_input)
+            
+            self.mtbf_input = QDoubleSpinBox()
+            self.mtbf_input.setRange(1, 1000000)
+            self.mtbf_input.setValue(1000)
+            self.mtbf_input.setSuffix(' horas')
+            form_layout.addRow('MTBF por unidad (carga nominal):', self.mtbf_input)
+            
+            self.load_input = QDoubleSpinBox()
+            self.load_input.setDecimals(2)
+            self.load_input.setRange(0, 10)
+            self.load_input.setSingleStep(0.1)
+            self.load_input.setValue(1.0)
+            form_layout.addRow('Exponente de carga (γ):', self.load_input)
+        
+        # Reparación (común a todos los tipos)
+        self.mttr_input = QDoubleSpinBox()
+        self.mttr_input.setRange(0, 100000)
+        self.mttr_input.setValue(0)
+        self.mttr_input.setSuffix(' horas')
+        self.mttr_input.setSpecialValueText('Sin reparación')
+        form_layout.addRow('Tiempo de reparación (MTTR):', self.mttr_input)
+        
+        self.mldt_input = QDoubleSpinBox()
+        self.mldt_input.setRange(0, 100000)
+        self.mldt_input.setValue(0)
+        self.mldt_input.setSuffix(' horas')
+        form_layout.addRow('Demora logística (MLDT):', self.mldt_input)
+        
+        # Capacidad para el análisis multiestado (común a todos los tipos)
+        self.capacity_input = QDoubleSpinBox()
+        self.capacity_input.setDecimals(3)
+        self.capacity_input.setRange(0, 1e9)
+        self.capacity_input.setValue(1)
+        form_layout.addRow('Capacidad nominal:', self.capacity_input)
+        
+        self.states_input = QLineEdit()
+        self.states_input.setPlaceholderText('capacidad:probabilidad, ... (vacío = binario)')
+        form_layout.addRow('Estados de capacidad:', self.states_input)
         
         layout.addLayout(form_layout)
         
@@ -408,6 +455,32 @@ class ComponentDialog(QDialog):
         
         self.setLayout(layout)
     
+    def set_params(self, name, params):
+        """Carga los valores de un bloque existente para editarlo"""
+        self.name_input.setText(name)
+        fields = {
+            'lambda': 'lambda_input',
+            'n_components': 'n_input',
+            'n_total': 'n_input',
+            'k_required': 'k_input',
+            'mtbf_component': 'mtbf_input',
+            'mtbf_base': 'mtbf_base_input',
+            'maintenance_interval': 'interval_input',
+            'mtbf_standby': 'standby_input',
+            'switch_reliability': 'switch_input',
+            'load_exponent': 'load_input',
+            'mttr': 'mttr_input',
+            'mldt': 'mldt_input',
+            'capacity': 'capacity_input',
+        }
+        if params.get('states'):
+            from ugf import format_states
+            self.states_input.setText(format_states(params['states']))
+        for key, value in params.items():
+            widget = getattr(self, fields.get(key, ''), None)
+            if widget is not None:
+                widget.setValue(value)
+    
     def get_theory_info(self):
         """Retorna información teórica sobre el tipo de componente"""
         info = {
@@ -436,6 +509,17 @@ class ComponentDialog(QDialog):
                 <b>Con Mantenimiento Preventivo:</b><br>
                 MTBF<sub>PM</sub> = ∫R(t)dt / (1-R(Y))<br>
                 <i>Mantenimiento cada Y horas mejora confiabilidad</i>
+            ''',
+            'Reserva en Espera': '''
+                <b>Reserva en Espera:</b><br>
+                Una unidad activa y n-1 en reserva fría o tibia<br>
+                Con reserva fría e idénticas: R(t) = e<sup>-λt</sup> Σ (pλt)<sup>j</sup>/j!<br>
+                <i>p = probabilidad de que la conmutación funcione</i>
+            ''',
+            'Carga Compartida': '''
+                <b>Carga Compartida:</b><br>
+                Con m de n unidades operando cada una falla con λ(n/m)<sup>γ</sup><br>
+                <i>Se requieren k unidades; γ = 0 equivale a k-de-n</i>
             '''
         }
         return info.get(self.component_type, '')
@@ -463,8 +547,36 @@ class ComponentDialog(QDialog):
         elif self.component_type == 'Sistema con Mantenimiento':
             params['mtbf_base'] = self.mtbf_base_input.value()
             params['maintenance_interval'] = self.interval_input.value()
-        
+            
+        elif self.component_type == 'Reserva en Espera':
+            params['n_components'] = int(self.n_input.value())
+            params['mtbf_component'] = self.mtbf_input.value()
+            params['mtbf_standby'] = self.standby_input.value()
+            params['switch_reliability'] = self.switch_input.value()
+            
+        elif self.component_type == 'Carga Compartida':
+            params['n_total'] = int(self.n_input.value())
+            params['k_required'] = int(self.k_input.value())
+            params['mtbf_component'] = self.mtbf_input.value()
+            params['load_exponent'] = self.load_input.value()
+        
+        params['mttr'] = self.mttr_input.value()
+        params['mldt'] = self.mldt_input.value()
+        params['capacity'] = self.capacity_input.value()
+        # None quita los estados de un bloque que los tenía
+        from ugf import parse_states
+        params['states'] = parse_states(self.states_input.text())
         return params
+    
+    def accept(self):
+        """Valida los estados de capacidad antes de cerrar"""
+        from ugf import parse_states
+        try:
+            parse_states(self.states_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, 'Error', f'Estados de capacidad inválidos: {e}')
+            return
+        super().accept()
 
 
 class MTBFCalculator(QMainWindow):
@@ -476,6 +588,21 @@ class MTBFCalculator(QMainWindow):
         self.connections = []
         self.connection_mode = False
         self.connection_start = None
+        self.profiler_dock = None
+        self.field_data_dock = None
+        self.subsystems = {}  # nombre -> {'blocks': [...], 'connections': [...]}
+        self.blocks_by_uid = {}
+        self.next_uid = 0
+        self.drag_start = {}  # bloque -> posición al empezar un arrastre
+        self.history = History(self.apply_change)
+        self.journal = None  # autoguardado; se activa con start_autosave()
+        self.layout_task = None
+        self.export_task = None
+        self.growth_task = None
+        self.programs = None  # programas compilados por estructura (program.py)
+        self.chart_panel = None
+        self.curves_task = None
+        self.pending_curves = None
         self.init_ui()
         
     def init_ui(self):
@@ -507,7 +634,9 @@ class MTBFCalculator(QMainWindow):
             'Serie',
             'Paralelo',
             'Redundancia k-de-n',
-            'Sistema con Mantenimiento'
+            'Sistema con Mantenimiento',
+            'Reserva en Espera',
+            'Carga Compartida'
         ]
         
         for comp_type in component_types:
@@ -522,6 +651,19 @@ class MTBFCalculator(QMainWindow):
         actions_group = QGroupBox('Acciones')
         actions_layout = QVBoxLayout()
         
+        history_layout = QHBoxLayout()
+        self.undo_btn = QPushButton('Deshacer')
+        self.undo_btn.clicked.connect(self.history.undo)
+        history_layout.addWidget(self.undo_btn)
+        self.redo_btn = QPushButton('Rehacer')
+        self.redo_btn.clicked.connect(self.history.redo)
+        history_layout.addWidget(self.redo_btn)
+        actions_layout.addLayout(history_layout)
+        QShortcut(QKeySequence.Undo, self, self.history.undo)
+        QShortcut(QKeySequence.Redo, self, self.history.redo)
+        self.history.listeners.append(self.update_history_buttons)
+        self.update_history_buttons()
+        
         self.connect_btn = QPushButton('Conectar Componentes')
         self.connect_btn.setCheckable(True)
         self.connect_btn.clicked.connect(self.toggle_connection_mode)
@@ -537,6 +679,60 @@ class MTBFCalculator(QMainWindow):
         clear_btn.clicked.connect(self.clear_all)
         actions_layout.addWidget(clear_btn)
         
+        save_btn = QPushButton('Guardar Diseño')
+        save_btn.clicked.connect(self.save_design)
+        actions_layout.addWidget(save_btn)
+        
+        open_btn = QPushButton('Abrir Diseño')
+        open_btn.clicked.connect(self.open_design)
+        actions_layout.addWidget(open_btn)
+        
+        subsystem_btn = QPushButton('Crear Subsistema')
+        subsystem_btn.clicked.connect(self.create_subsystem)
+        actions_layout.addWidget(subsystem_btn)
+        
+        instance_btn = QPushButton('Insertar Subsistema')
+        instance_btn.clicked.connect(self.insert_subsystem)
+        actions_layout.addWidget(instance_btn)
+        
+        self.layout_btn = QPushButton('Organizar Diagrama')
+        self.layout_btn.clicked.connect(self.auto_layout_diagram)
+        actions_layout.addWidget(self.layout_btn)
+        
+        self.export_btn = QPushButton('Exportar Resultados')
+        self.export_btn.clicked.connect(self.export_results)
+        actions_layout.addWidget(self.export_btn)
+        
+        self.growth_btn = QPushButton('Crecimiento TRL')
+        self.growth_btn.clicked.connect(self.growth_analysis)
+        actions_layout.addWidget(self.growth_btn)
+        
+        fault_tree_btn = QPushButton('Árbol de Fallas')
+        fault_tree_btn.clicked.connect(self.show_fault_tree)
+        actions_layout.addWidget(fault_tree_btn)
+        
+        multistate_btn = QPushButton('Análisis Multiestado')
+        multistate_btn.clicked.connect(self.show_multistate)
+        actions_layout.addWidget(multistate_btn)
+        
+        bounds_btn = QPushButton('Cotas de Confiabilidad')
+        bounds_btn.clicked.connect(self.show_bounds)
+        actions_layout.addWidget(bounds_btn)
+        
+        profiler_btn = QPushButton('Perfilado')
+        profiler_btn.clicked.connect(self.toggle_profiler)
+        actions_layout.addWidget(profiler_btn)
+        
+        field_data_btn = QPushButton('Datos de Campo')
+        field_data_btn.clicked.connect(self.toggle_field_data)
+        actions_layout.addWidget(field_data_btn)
+        
+        minimap_btn = QPushButton('Minimapa')
+        minimap_btn.setCheckable(True)
+        minimap_btn.setChecked(True)
+        minimap_btn.toggled.connect(lambda checked: self.minimap.setVisible(checked))
+        actions_layout.addWidget(minimap_btn)
+        
         actions_group.setLayout(actions_layout)
         left_layout.addWidget(actions_group)
         
@@ -580,6 +776,12 @@ class MTBFCalculator(QMainWindow):
         self.view = QGraphicsView(self.scene)
         self.view.setRenderHint(QPainter.Antialiasing)
         self.view.mousePressEvent = self.scene_mouse_press
+        self.view.mouseReleaseEvent = self.scene_mouse_release
+        self.view.mouseDoubleClickEvent = self.scene_double_click
+        
+        # La escena crece mientras se arrastra hacia el borde; el minimapa la resume
+        self.scene.changed.connect(lambda rects: grow_scene(self.scene, rects, SCENE_MARGIN))
+        self.minimap = Minimap(self.view, self.minimap_color, self.minimap_line)
         
         self.tabs.addTab(self.view, 'Diseño del Sistema')
         
@@ -590,7 +792,10 @@ class MTBFCalculator(QMainWindow):
         self.results_text = QTextEdit()
         self.results_text.setReadOnly(True)
         results_layout.addWidget(QLabel('<b>Resultados del Análisis de Confiabilidad:</b>'))
-        results_layout.addWidget(self.results_text)
+        # El gráfico de curvas se agrega debajo del informe en el primer cálculo
+        self.results_splitter = QSplitter(Qt.Vertical)
+        self.results_splitter.addWidget(self.results_text)
+        results_layout.addWidget(self.results_splitter)
         
         self.tabs.addTab(results_widget, 'Resultados')
         
@@ -605,18 +810,41 @@ class MTBFCalculator(QMainWindow):
         dialog = ComponentDialog(component_type, self)
         
         if dialog.exec_() == QDialog.Accepted:
-            params = dialog.get_params()
+            params = {key: value for key, value in dialog.get_params().items()
+                      if value is not None}
             name = params.pop('name')
             
-            block = ComponentBlock(component_type, name, params)
-            
             # Posicionar en el centro de la vista
             x = 400 + len(self.components) * 30
             y = 300 + (len(self.components) % 3) * 100
-            block.setPos(x, y)
-            
-            self.scene.addItem(block)
+            block = self.place_block(component_type, name, params, x, y)
             self.components.append(block)
+            self.fit_scene([(x, y)])
+            self.history.push('add', self.capture_fragment([block]))
+    
+    def edit_component(self, block):
+        """Edita los parámetros de un bloque; sólo se registran los campos cambiados"""
+        dialog = ComponentDialog(block.component_type, self)
+        dialog.set_params(block.name, block.params)
+        
+        if dialog.exec_() == QDialog.Accepted:
+            current = dict(block.params, name=block.name)
+            new = {key: value for key, value in dialog.get_params().items()
+                   if current.get(key) != value}
+            if new:
+                old = {key: current.get(key) for key in new}
+                self.set_fields(block, new)
+                self.history.push('params', {block.uid: (old, new)})
+    
+    def set_fields(self, block, fields):
+        for key, value in fields.items():
+            if key == 'name':
+                block.name = value
+            elif value is None:
+                block.params.pop(key, None)
+            else:
+                block.params[key] = value
+        block.update()
             
     def toggle_connection_mode(self):
         """Activa/desactiva el modo de conexión"""
@@ -633,7 +861,13 @@ class MTBFCalculator(QMainWindow):
         """Maneja clics en la escena para crear conexiones"""
         QGraphicsView.mousePressEvent(self.view, event)
         
-        if self.connection_mode:
+        if not self.connection_mode:
+            self.drag_start = {
+                item: (item.pos().x(), item.pos().y())
+                for item in self.scene.selectedItems()
+                if isinstance(item, ComponentBlock)
+            }
+        else:
             pos = self.view.mapToScene(event.pos())
             item = self.scene.itemAt(pos, self.view.transform())
             
@@ -644,28 +878,324 @@ class MTBFCalculator(QMainWindow):
                 else:
                     if item != self.connection_start:
                         # Crear conexión
-                        connection = ConnectionLine(self.connection_start, item)
-                        self.scene.addItem(connection)
-                        self.connections.append(connection)
-                        
-                        self.connection_start.connections_out.append(item)
-                        item.connections_in.append(self.connection_start)
+                        connection = self.add_connection(self.connection_start, item)
+                        self.history.push('add', self.capture_fragment([], [connection]))
                         
                     self.connection_start.setSelected(False)
                     self.connection_start = None
+    
+    def scene_mouse_release(self, event):
+        """Registra en el historial los bloques arrastrados"""
+        QGraphicsView.mouseReleaseEvent(self.view, event)
+        
+        moved = {}
+        for block, (x, y) in self.drag_start.items():
+            pos = block.pos()
+            if (pos.x(), pos.y()) != (x, y):
+                moved[block.uid] = ((x, y), (pos.x(), pos.y()))
+        self.drag_start = {}
+        if moved:
+            self.fit_scene([new for _, new in moved.values()])
+        # Arrastres seguidos de la misma selección quedan como un solo paso
+        self.history.push('move', moved, coalesce=True)
+    
+    def scene_double_click(self, event):
+        """Doble clic sobre un bloque: editar sus parámetros"""
+        item = self.view.itemAt(event.pos())
+        if isinstance(item, ComponentBlock):
+            self.edit_component(item)
+        else:
+            QGraphicsView.mouseDoubleClickEvent(self.view, event)
+    
+    def place_block(self, component_type, name, params, x, y, uid=None):
+        """Crea un bloque en la escena con un identificador estable"""
+        block = ComponentBlock(component_type, name, params)
+        block.setPos(x, y)
+        if uid is None:
+            uid = self.next_uid
+        self.next_uid = max(self.next_uid, uid + 1)
+        block.uid = uid
+        self.blocks_by_uid[uid] = block
+        self.scene.addItem(block)
+        return block
+    
+    def fit_scene(self, points):
+        """Amplía la escena (nunca la reduce) para incluir bloques centrados en points"""
+        if not points:
+            return
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        rect = QRectF(QPointF(min(xs) - 60, min(ys) - 40), QPointF(max(xs) + 60, max(ys) + 40))
+        rect.adjust(-SCENE_MARGIN, -SCENE_MARGIN, SCENE_MARGIN, SCENE_MARGIN)
+        current = self.scene.sceneRect()
+        if not current.contains(rect):
+            self.scene.setSceneRect(current.united(rect))
+    
+    def auto_layout_diagram(self):
+        """Calcula la organización en un hilo de trabajo y la aplica de una vez"""
+        if not self.components or self.layout_task is not None:
+            return
+        from layout import auto_layout
+        from workers import Task
+        
+        blocks = list(self.components)
+        index = {block: i for i, block in enumerate(blocks)}
+        connections = [(index[c.start_block], index[c.end_block]) for c in self.connections]
+        
+        self.layout_btn.setEnabled(False)
+        self.layout_task = Task(auto_layout, len(blocks), connections, parent=self)
+        self.layout_task.done.connect(lambda positions: self.apply_layout(blocks, positions))
+        self.layout_task.failed.connect(
+            lambda message: QMessageBox.warning(self, 'Error', f'No se pudo organizar:\n{message}'))
+        self.layout_task.finished.connect(self.layout_finished)
+        self.layout_task.start()
+    
+    def layout_finished(self):
+        self.layout_task.deleteLater()
+        self.layout_task = None
+        self.layout_btn.setEnabled(True)
+    
+    def export_results(self):
+        """Exporta el informe a CSV, HTML o PDF sin bloquear la interfaz"""
+        if not self.components:
+            QMessageBox.warning(self, 'Advertencia', 'No hay componentes en el sistema.')
+            return
+        if self.export_task is not None:
+            return
+        path, selected = QFileDialog.getSaveFileName(
+            self, 'Exportar resultados', '', 'CSV (*.csv);;HTML (*.html);;PDF (*.pdf)')
+        if not path:
+            return
+        from report_export import FORMATS, export_report
+        from workers import Task
+        if not path.lower().endswith(FORMATS + ('.htm',)):
+            path += '.' + selected.split()[0].lower()  # extensión del filtro elegido
+        
+        progress = QProgressDialog('Exportando resultados...', 'Cancelar', 0, 100, self)
+        progress.setWindowTitle('Exportar')
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        self.export_btn.setEnabled(False)
+        self.export_task = Task(export_report, self.to_design(), path,
+                                progress=True, cancellable=True, parent=self)
+        self.export_task.progress.connect(lambda fraction: progress.setValue(int(fraction * 100)))
+        progress.canceled.connect(self.export_task.cancel)
+        self.export_task.done.connect(
+            lambda result: QMessageBox.information(self, 'Exportar', f'Resultados exportados a:\n{result}'))
+        self.export_task.failed.connect(
+            lambda message: QMessageBox.warning(self, 'Error', f'No se pudo exportar:\n{message}'))
+        self.export_task.finished.connect(progress.reset)
+        self.export_task.finished.connect(self.export_finished)
+        self.export_task.start()
+    
+    def export_finished(self):
+        self.export_task.deleteLater()
+        self.export_task = None
+        self.export_btn.setEnabled(True)
+    
+    def growth_analysis(self):
+        """Ajusta Crow-AMSAA/Duane a las pruebas por etapa TRL del bloque elegido"""
+        selected = [item for item in self.scene.selectedItems()
+                    if isinstance(item, ComponentBlock) and item.component_type != 'Subsistema']
+        if len(selected) != 1:
+            QMessageBox.warning(self, 'Advertencia',
+                                'Seleccione un bloque para aplicarle los datos de prueba.')
+            return
+        if self.growth_task is not None:
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, 'Datos de prueba por etapa TRL', '', 'CSV (*.csv)')
+        if not path:
+            return
+        from growth import track_file
+        from workers import Task
+        
+        block = selected[0]
+        self.growth_btn.setEnabled(False)
+        self.growth_task = Task(track_file, path, parent=self)
+        self.growth_task.done.connect(lambda tracker: self.show_growth(block, tracker))
+        self.growth_task.failed.connect(
+            lambda message: QMessageBox.warning(self, 'Error', f'No se pudieron leer las pruebas:\n{message}'))
+        self.growth_task.finished.connect(self.growth_finished)
+        self.growth_task.start()
+    
+    def growth_finished(self):
+        self.growth_task.deleteLater()
+        self.growth_task = None
+        self.growth_btn.setEnabled(True)
+    
+    def show_growth(self, block, tracker):
+        """Muestra el ajuste por etapa y ofrece llevar el MTBF proyectado al bloque"""
+        from growth import projected_params
+        fit = tracker.fit()
+        results = f'<h2>Crecimiento de Confiabilidad: {block.name}</h2>'
+        results += '<hr>'
+        results += '<table border="1" cellpadding="5" cellspacing="0" width="100%">'
+        results += '<tr style="background-color: #2196F3; color: white;">'
+        results += '<th>Etapa</th><th>Horas</th><th>Fallas</th><th>β etapa</th>'
+        results += '<th>MTBF etapa (h)</th><th>β acumulado</th><th>MTBF instantáneo (h)</th></tr>'
+        for stage in tracker.summary():
+            results += f'<tr><td>{stage["stage"]}</td><td>{stage["stage_hours"]:.1f}</td>'
+            results += f'<td>{stage["stage_failures"]}</td><td>{stage["stage_beta"]:.3f}</td>'
+            results += f'<td>{stage["stage_mtbf"]:.2f}</td><td>{stage["beta"]:.3f}</td>'
+            results += f'<td><b>{stage["mtbf"]:.2f}</b></td></tr>'
+        results += '</table><br>'
+        results += f'<p>Crow-AMSAA: β = {fit["beta"]:.4f}, λ = {fit["lambda"]:.6g} '
+        results += f'con {fit["failures"]} fallas en {fit["hours"]:.1f} h</p>'
+        if math.isfinite(fit['duane_mtbf']):
+            results += f'<p>Duane: α = {fit["alpha"]:.4f}, MTBF instantáneo = {fit["duane_mtbf"]:.2f} h</p>'
+        else:
+            results += (f'<p>Duane: α = {fit["alpha"]:.4f}, <span style="color: #F44336;">'
+                        'ajuste no válido (α ≥ 1 o pocas fallas)</span></p>')
+        results += f'<p style="font-size: 14pt; color: #4CAF50;"><b>MTBF instantáneo = {fit["mtbf"]:.2f} horas</b></p>'
+        self.results_text.setHtml(results)
+        self.tabs.setCurrentIndex(1)
+        
+        if self.blocks_by_uid.get(block.uid) is not block:
+            return  # eliminado mientras se leían los datos
+        try:
+            params = projected_params(block.component_type, block.params, fit['mtbf'])
+        except ValueError as e:
+            QMessageBox.warning(self, 'Advertencia', str(e))
+            return
+        answer = QMessageBox.question(
+            self, 'Crecimiento TRL',
+            f'¿Aplicar el MTBF instantáneo de {fit["mtbf"]:.2f} h al bloque "{block.name}"?')
+        if answer == QMessageBox.Yes:
+            new = {key: value for key, value in params.items() if block.params.get(key) != value}
+            old = {key: block.params.get(key) for key in new}
+            self.set_fields(block, new)
+            self.history.push('params', {block.uid: (old, new)})
+    
+    def apply_layout(self, blocks, positions):
+        """Mueve los bloques a las posiciones calculadas en una sola actualización"""
+        moved = {}
+        self.view.setUpdatesEnabled(False)
+        for block, (x, y) in zip(blocks, positions.tolist()):
+            if self.blocks_by_uid.get(block.uid) is not block:
+                continue  # eliminado mientras se calculaba
+            old = (block.pos().x(), block.pos().y())
+            if old != (x, y):
+                block.setPos(x, y)
+                moved[block.uid] = (old, (x, y))
+        self.refresh_lines(self.blocks_by_uid[uid] for uid in moved)
+        self.fit_scene([new for _, new in moved.values()])
+        self.view.setUpdatesEnabled(True)
+        self.history.push('move', moved)
+    
+    def refresh_lines(self, blocks):
+        """Actualiza el área de las conexiones de bloques que se movieron por código"""
+        for line in dict.fromkeys(line for block in blocks for line in block.lines):
+            line.prepareGeometryChange()
+    
+    def make_connection(self, start_block, end_block):
+        connection = ConnectionLine(start_block, end_block)
+        self.scene.addItem(connection)
+        start_block.connections_out.append(end_block)
+        end_block.connections_in.append(start_block)
+        start_block.lines.append(connection)
+        end_block.lines.append(connection)
+        return connection
+    
+    def add_connection(self, start_block, end_block):
+        """Crea la línea de conexión entre dos bloques"""
+        connection = self.make_connection(start_block, end_block)
+        self.connections.append(connection)
+        return connection
+    
+    def capture_fragment(self, blocks, lines=()):
+        """Diferencia con los bloques, sus conexiones y sus posiciones en las listas"""
+        lines = list(dict.fromkeys([line for block in blocks for line in block.lines]
+                                   + list(lines)))
+        return {
+            'blocks': [
+                (block.uid, i, block.component_type, block.name, block.params,
+                 block.pos().x(), block.pos().y())
+                for block, i in zip(blocks, indices_of(self.components, blocks))
+            ],
+            'lines': [
+                (i, line.start_block.uid, line.end_block.uid)
+                for line, i in zip(lines, indices_of(self.connections, lines))
+            ],
+        }
+    
+    def insert_fragment(self, fragment):
+        insert_at(self.components, [
+            (i, self.place_block(block_type, name, dict(params), x, y, uid))
+            for uid, i, block_type, name, params, x, y in fragment['blocks']
+        ])
+        insert_at(self.connections, [
+            (i, self.make_connection(self.blocks_by_uid[start], self.blocks_by_uid[end]))
+            for i, start, end in fragment['lines']
+        ])
+        self.fit_scene([block[5:7] for block in fragment['blocks']])
+    
+    def remove_fragment(self, fragment):
+        if len(fragment['blocks']) == len(self.components) and self.components:
+            # Se elimina todo el diagrama
+            self.scene.clear()
+            self.components.clear()
+            self.connections.clear()
+            self.blocks_by_uid.clear()
+            return
+        
+        lines = []
+        for _, start, end in fragment['lines']:
+            start_block = self.blocks_by_uid[start]
+            line = next(line for line in start_block.lines
+                        if line.end_block.uid == end and line not in lines)
+            end_block = line.end_block
+            start_block.connections_out.remove(end_block)
+            end_block.connections_in.remove(start_block)
+            start_block.lines.remove(line)
+            end_block.lines.remove(line)
+            self.scene.removeItem(line)
+            lines.append(line)
+        remove_all(self.connections, lines)
+        
+        blocks = [self.blocks_by_uid.pop(block[0]) for block in fragment['blocks']]
+        for block in blocks:
+            self.scene.removeItem(block)
+        remove_all(self.components, blocks)
+    
+    def apply_change(self, kind, data, undo):
+        """Aplica (o revierte, con undo) un comando del historial"""
+        if kind == 'group':
+            for item_kind, item_data in (reversed(data) if undo else data):
+                self.apply_change(item_kind, item_data, undo)
+        elif kind in ('add', 'remove'):
+            if (kind == 'add') == undo:
+                self.remove_fragment(data)
+            else:
+                self.insert_fragment(data)
+        elif kind == 'move':
+            for uid, (old, new) in data.items():
+                self.blocks_by_uid[uid].setPos(*(old if undo else new))
+            self.refresh_lines(self.blocks_by_uid[uid] for uid in data)
+            self.fit_scene([old if undo else new for old, new in data.values()])
+        elif kind == 'params':
+            for uid, (old, new) in data.items():
+                self.set_fields(self.blocks_by_uid[uid], old if undo else new)
+        elif kind == 'subsystems':
+            for name, (old, new) in data.items():
+                definition = old if undo else new
+                if definition is None:
+                    self.subsystems.pop(name, None)
+                else:
+                    self.subsystems[name] = definition
+    
+    def update_history_buttons(self):
+        self.undo_btn.setEnabled(self.history.can_undo())
+        self.redo_btn.setEnabled(self.history.can_redo())
                     
     def delete_selected(self):
         """Elimina el componente seleccionado"""
-        for item in self.scene.selectedItems():
-            if isinstance(item, ComponentBlock):
-                # Eliminar conexiones asociadas
-                for conn in self.connections[:]:
-                    if conn.start_block == item or conn.end_block == item:
-                        self.scene.removeItem(conn)
-                        self.connections.remove(conn)
-                
-                self.scene.removeItem(item)
-                self.components.remove(item)
+        selected = [item for item in self.scene.selectedItems()
+                    if isinstance(item, ComponentBlock)]
+        if selected:
+            fragment = self.capture_fragment(selected)
+            self.remove_fragment(fragment)
+            self.history.push('remove', fragment)
                 
     def clear_all(self):
         """Limpia todo el diseño"""
@@ -674,11 +1204,264 @@ class MTBFCalculator(QMainWindow):
                                      QMessageBox.Yes | QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            self.scene.clear()
-            self.components.clear()
-            self.connections.clear()
+            # Se puede deshacer: el historial guarda lo eliminado
+            fragment = self.capture_fragment(list(self.components))
+            removed = {name: (definition, None) for name, definition in self.subsystems.items()}
+            self.remove_fragment(fragment)
+            self.subsystems.clear()
             self.results_text.clear()
+            if fragment['blocks'] or removed:
+                self.history.push('group', [('remove', fragment), ('subsystems', removed)])
+    
+    def create_subsystem(self):
+        """Convierte los bloques seleccionados en un subsistema reutilizable"""
+        selected = [item for item in self.scene.selectedItems()
+                    if isinstance(item, ComponentBlock)]
+        if not selected:
+            QMessageBox.warning(self, 'Advertencia',
+                                'Seleccione los bloques que formarán el subsistema.')
+            return
+        
+        name, ok = QInputDialog.getText(self, 'Crear Subsistema', 'Nombre del subsistema:',
+                                        text=f'Subsistema {len(self.subsystems) + 1}')
+        name = name.strip()
+        if not ok or not name:
+            return
+        if name in self.subsystems:
+            QMessageBox.warning(self, 'Advertencia', f'Ya existe el subsistema "{name}".')
+            return
+        
+        inside = {block: i for i, block in enumerate(selected)}
+        lines = list(dict.fromkeys(line for block in selected for line in block.lines))
+        cx = sum(b.pos().x() for b in selected) / len(selected)
+        cy = sum(b.pos().y() for b in selected) / len(selected)
+        definition = {
+            'blocks': [
+                {
+                    'type': b.component_type,
+                    'name': b.name,
+                    'params': dict(b.params),
+                    'pos': [b.pos().x() - cx, b.pos().y() - cy],
+                }
+                for b in selected
+            ],
+            'connections': [
+                [inside[c.start_block], inside[c.end_block]]
+                for c in lines
+                if c.start_block in inside and c.end_block in inside
+            ],
+        }
+        
+        # Las conexiones con el resto del diagrama pasan a la nueva instancia
+        incoming = list(dict.fromkeys(c.start_block for c in lines if c.start_block not in inside))
+        outgoing = list(dict.fromkeys(c.end_block for c in lines if c.end_block not in inside))
+        removed = self.capture_fragment(selected)
+        self.remove_fragment(removed)
+        self.subsystems[name] = definition
+        
+        instance = self.add_instance(name, QPointF(cx, cy))
+        for block in incoming:
+            self.add_connection(block, instance)
+        for block in outgoing:
+            self.add_connection(instance, block)
+        self.history.push('group', [('remove', removed),
+                                    ('subsystems', {name: (None, definition)}),
+                                    ('add', self.capture_fragment([instance]))])
+    
+    def insert_subsystem(self):
+        """Agrega otra instancia de un subsistema ya definido"""
+        if not self.subsystems:
+            QMessageBox.warning(self, 'Advertencia',
+                                'Primero cree un subsistema a partir de una selección.')
+            return
+        name, ok = QInputDialog.getItem(self, 'Insertar Subsistema', 'Subsistema:',
+                                        sorted(self.subsystems), 0, False)
+        if ok:
+            x = 400 + len(self.components) * 30
+            y = 300 + (len(self.components) % 3) * 100
+            block = self.add_instance(name, QPointF(x, y))
+            self.history.push('add', self.capture_fragment([block]))
+    
+    def add_instance(self, name, pos):
+        count = sum(1 for b in self.components
+                    if b.component_type == 'Subsistema' and b.params.get('subsystem') == name)
+        block = self.place_block('Subsistema', f'{name} {count + 1}', {'subsystem': name},
+                                 pos.x(), pos.y())
+        self.components.append(block)
+        self.fit_scene([(pos.x(), pos.y())])
+        return block
+    
+    def component_mtbfs(self, design=None):
+        """MTBF de cada componente con el programa compilado del diagrama
+
+        El programa sólo se recompila si cambió la estructura; editar
+        parámetros reutiliza el mismo y sólo se leen los valores nuevos.
+        """
+        from program import ProgramCache
+        design = design or self.to_design()
+        if self.programs is None:
+            self.programs = ProgramCache()
+        return self.programs.get(design).evaluate(times=())['blocks'][0].tolist()
+            
+    def show_fault_tree(self):
+        """Abre el árbol de fallas derivado de las conexiones"""
+        if not self.components:
+            QMessageBox.warning(self, 'Advertencia', 
+                              'No hay componentes en el sistema.')
+            return
+        from fault_tree_view import FaultTreeDialog
+        from hierarchy import flatten
+        dialog = FaultTreeDialog(flatten(self.to_design()), self)
+        dialog.exec_()
+    
+    def show_multistate(self):
+        """Abre la distribución de capacidad del sistema multiestado"""
+        if not self.components:
+            QMessageBox.warning(self, 'Advertencia', 
+                              'No hay componentes en el sistema.')
+            return
+        from multistate_view import MultiStateDialog
+        dialog = MultiStateDialog(self.to_design(), self)
+        dialog.exec_()
+    
+    def show_bounds(self):
+        """Abre las cotas de confiabilidad según la topología del diagrama"""
+        if not self.components:
+            QMessageBox.warning(self, 'Advertencia', 
+                              'No hay componentes en el sistema.')
+            return
+        from bounds_view import BoundsDialog
+        from hierarchy import flatten
+        dialog = BoundsDialog(flatten(self.to_design()), self)
+        dialog.exec_()
+    
+    def toggle_field_data(self):
+        """Muestra u oculta el panel de datos de campo (se crea en el primer uso)"""
+        if self.field_data_dock is None:
+            from field_data_panel import FieldDataDock
+            self.field_data_dock = FieldDataDock(self, self)
+            self.addDockWidget(Qt.RightDockWidgetArea, self.field_data_dock)
+        else:
+            self.field_data_dock.setVisible(not self.field_data_dock.isVisible())
+    
+    def minimap_color(self, item):
+        """Color de un bloque en el minimapa (None si no es un bloque)"""
+        if isinstance(item, ComponentBlock):
+            return item.colors.get(item.component_type, QColor(200, 200, 200))
+        return None
+    
+    def minimap_line(self, item):
+        """Segmento de una conexión en el minimapa (None si no es una conexión)"""
+        if isinstance(item, ConnectionLine):
+            return QLineF(item.start_block.pos(), item.end_block.pos())
+        return None
+    
+    def toggle_profiler(self):
+        """Muestra u oculta el panel de perfilado (se crea en el primer uso)"""
+        if self.profiler_dock is None:
+            from profiling_panel import ProfilerDock
+            self.profiler_dock = ProfilerDock(self.view, self)
+            self.addDockWidget(Qt.RightDockWidgetArea, self.profiler_dock)
+        else:
+            self.profiler_dock.setVisible(not self.profiler_dock.isVisible())
+    
+    def to_design(self):
+        """Convierte el diagrama actual en un diseño serializable"""
+        index = {block: i for i, block in enumerate(self.components)}
+        design = {
+            'blocks': [
+                {
+                    'type': block.component_type,
+                    'name': block.name,
+                    'params': dict(block.params),
+                    'pos': [block.pos().x(), block.pos().y()],
+                }
+                for block in self.components
+            ],
+            'connections': [
+                [index[conn.start_block], index[conn.end_block]]
+                for conn in self.connections
+            ],
+        }
+        if self.subsystems:
+            design['subsystems'] = self.subsystems
+        return design
+    
+    def load_design(self, design):
+        """Reemplaza el diagrama actual por el diseño indicado"""
+        self.scene.clear()
+        self.components.clear()
+        self.connections.clear()
+        self.results_text.clear()
+        self.subsystems = dict(design.get('subsystems', {}))
+        self.blocks_by_uid.clear()
+        self.next_uid = 0
+        self.history.clear()
+        if self.journal is not None:
+            self.journal.reset(design)
+        
+        for data in design['blocks']:
+            x, y = data.get('pos', (400 + len(self.components) * 30, 300))
+            block = self.place_block(data['type'], data['name'], dict(data['params']), x, y)
+            self.components.append(block)
+        
+        for start, end in design['connections']:
+            self.add_connection(self.components[start], self.components[end])
+        self.fit_scene([(b.pos().x(), b.pos().y()) for b in self.components])
+    
+    def start_autosave(self):
+        """Ofrece recuperar una sesión interrumpida y activa el diario de autoguardado"""
+        from journal import Journal
+        journal = Journal()
+        if journal.has_recovery():
+            try:
+                design = journal.recover()
+            except (OSError, ValueError, KeyError, IndexError):
+                design = None
+            if design and (design['blocks'] or design.get('subsystems')):
+                reply = QMessageBox.question(
+                    self, 'Recuperar diseño',
+                    'La sesión anterior no se cerró correctamente.\n'
+                    '¿Desea recuperar el diseño autoguardado?',
+                    QMessageBox.Yes | QMessageBox.No)
+                if reply == QMessageBox.Yes:
+                    self.load_design(design)
+        
+        self.journal = journal
+        self.history.observers.append(journal.record)
+        journal.start(self.to_design())
+    
+    def closeEvent(self, event):
+        # Destruir un QThread que sigue corriendo aborta el proceso
+        for task in (self.layout_task, self.export_task, self.curves_task, self.growth_task):
+            if task is not None:
+                task.cancel()
+                task.wait()
+        # Un cierre normal no deja nada que recuperar
+        if self.journal is not None:
+            self.journal.close(discard=True)
+        super().closeEvent(event)
+    
+    def save_design(self):
+        """Guarda el diseño en un archivo JSON"""
+        from design import save_design
+        path, _ = QFileDialog.getSaveFileName(self, 'Guardar diseño', '',
+                                              'Diseños (*.json)')
+        if path:
+            save_design(self.to_design(), path)
+    
+    def open_design(self):
+        """Carga un diseño desde un archivo JSON"""
+        from design import load_design
+        path, _ = QFileDialog.getOpenFileName(self, 'Abrir diseño', '',
+                                              'Diseños (*.json)')
+        if path:
+            try:
+                self.load_design(load_design(path))
+            except (OSError, ValueError, KeyError) as e:
+                QMessageBox.critical(self, 'Error', f'No se pudo abrir el diseño:\n{e}')
             
+    @profiling.timed('reporte.calculo')
     def calculate_system_mtbf(self):
         """Calcula el MTBF del sistema completo"""
         if not self.components:
@@ -695,8 +1478,9 @@ class MTBFCalculator(QMainWindow):
         results += '<th>Nombre</th><th>Tipo</th><th>MTBF (horas)</th><th>λ (fallos/hora)</th></tr>'
         
         total_mtbf = 0
-        for comp in self.components:
-            mtbf = comp.get_mtbf()
+        design = self.to_design()
+        mtbfs = self.component_mtbfs(design)
+        for comp, mtbf in zip(self.components, mtbfs):
             lambda_val = 1/mtbf if mtbf > 0 else 0
             
             results += f'<tr>'
@@ -713,13 +1497,21 @@ class MTBFCalculator(QMainWindow):
         # Si no hay conexiones, tomar el promedio
         if self.connections:
             # Sistema en serie (simplificado)
-            lambda_system = sum(1/comp.get_mtbf() for comp in self.components if comp.get_mtbf() > 0)
+            lambda_system = sum(1/mtbf for mtbf in mtbfs if mtbf > 0)
             mtbf_system = 1/lambda_system if lambda_system > 0 else 0
             
             results += '<h3>MTBF del Sistema (Configuración Serie):</h3>'
             results += f'<p style="font-size: 14pt; color: #4CAF50;"><b>MTBF<sub>sistema</sub> = {mtbf_system:.2f} horas</b></p>'
             results += f'<p>λ<sub>sistema</sub> = {lambda_system:.6f} fallos/hora</p>'
             
+            # Con ramificaciones el valor en serie no representa la topología
+            if any(len(comp.connections_out) > 1 or len(comp.connections_in) > 1
+                   for comp in self.components):
+                results += ('<p style="color: #FF9800;"><b>Atención:</b> el diagrama tiene '
+                            'ramas en paralelo y este valor las trata como serie. '
+                            'Use "Cotas de Confiabilidad" para acotar R(t) según las '
+                            'conexiones.</p>')
+            
             # Calcular confiabilidad para diferentes tiempos
             results += '<h3>Confiabilidad R(t) en diferentes tiempos:</h3>'
             results += '<table border="1" cellpadding="5" cellspacing="0" width="100%">'
@@ -735,7 +1527,6 @@ class MTBFCalculator(QMainWindow):
             
         else:
             # Sin conexiones, mostrar estadísticas generales
-            mtbfs = [comp.get_mtbf() for comp in self.components]
             avg_mtbf = sum(mtbfs) / len(mtbfs) if mtbfs else 0
             min_mtbf = min(mtbfs) if mtbfs else 0
             max_mtbf = max(mtbfs) if mtbfs else 0
@@ -745,6 +1536,8 @@ class MTBFCalculator(QMainWindow):
             results += f'<p>MTBF Mínimo: <b>{min_mtbf:.2f} horas</b></p>'
             results += f'<p>MTBF Máximo: <b>{max_mtbf:.2f} horas</b></p>'
         
+        results += self.availability_report()
+        
         results += '<hr>'
         results += '<h3>Fundamentos Teóricos Aplicados:</h3>'
         results += '<ul>'
@@ -752,15 +1545,90 @@ class MTBFCalculator(QMainWindow):
         results += '<li><b>Tasa de fallo:</b> λ = 1 / MTBF</li>'
         results += '<li><b>MTBF:</b> ∫<sub>0</sub><sup>∞</sup> R(t)dt</li>'
         results += '<li><b>Sistema Serie:</b> λ<sub>sys</sub> = Σλ<sub>i</sub></li>'
+        results += '<li><b>Disponibilidad:</b> A = μ/(λ+μ), μ = 1/MTTR</li>'
         results += '</ul>'
         
         results += f'<p><small><i>Basado en el proyecto de investigación:<br>'
         results += f'"Metodología para evaluar el MTBF según etapas TRL"<br>'
         results += f'Universidad Tecnológica de Pereira</i></small></p>'
         
-        self.results_text.setHtml(results)
+        with profiling.span('reporte.render'):
+            self.results_text.setHtml(results)
+        self.update_charts(design)
         self.tabs.setCurrentIndex(1)  # Cambiar a pestaña de resultados
 
+    
+    def update_charts(self, design):
+        """Calcula las curvas R(t) y h(t) en un hilo y las muestra bajo el informe"""
+        if not self.isVisible():
+            return  # sin ventana no hay gráfico que actualizar
+        if self.chart_panel is None:
+            from chart_view import ChartPanel
+            self.chart_panel = ChartPanel()
+            self.results_splitter.addWidget(self.chart_panel)
+            self.results_splitter.setSizes([1, 1])
+        if self.curves_task is not None:
+            # Un cálculo a la vez: se conserva sólo el diseño más reciente
+            self.pending_curves = design
+            return
+        from curves import results_plots
+        from workers import Task
+        
+        self.chart_panel.set_message('Calculando curvas...')
+        self.curves_task = Task(results_plots, design, parent=self)
+        self.curves_task.done.connect(self.chart_panel.set_plots)
+        self.curves_task.failed.connect(
+            lambda message: self.chart_panel.set_message(f'No se pudieron calcular las curvas:\n{message}'))
+        self.curves_task.finished.connect(self.charts_finished)
+        self.curves_task.start()
+    
+    def charts_finished(self):
+        self.curves_task.deleteLater()
+        self.curves_task = None
+        if self.pending_curves is not None:
+            design, self.pending_curves = self.pending_curves, None
+            self.update_charts(design)
+    
+    def availability_report(self):
+        """Sección de disponibilidad para los bloques con MTTR definido"""
+        from availability import evaluate_availability
+        from hierarchy import flatten
+        
+        data = evaluate_availability(flatten(self.to_design()))
+        repairable = [b for b in data['blocks'] if b['repairable']]
+        if not repairable:
+            return ''
+        
+        results = '<h3>Disponibilidad con Reparación:</h3>'
+        results += '<table border="1" cellpadding="5" cellspacing="0" width="100%">'
+        results += '<tr style="background-color: #2196F3; color: white;">'
+        results += ('<th>Nombre</th><th>A<sub>i</sub></th><th>A<sub>o</sub></th>'
+                    '<th>MUT (horas)</th><th>MDT (horas)</th><th>Parada (h/año)</th></tr>')
+        for block in repairable:
+            results += '<tr>'
+            results += f'<td>{block["name"]}</td>'
+            results += f'<td>{block["inherent"]:.6f}</td>'
+            results += f'<td>{block["operational"]:.6f}</td>'
+            results += f'<td>{block["mut"]:.2f}</td>'
+            results += f'<td>{block["mdt"]:.2f}</td>'
+            results += f'<td>{block["downtime"]:.2f}</td>'
+            results += '</tr>'
+        results += '</table>'
+        
+        system = data.get('system')
+        if system:
+            if system['repairable']:
+                results += f'<p><b>A<sub>i</sub> del sistema: {system["inherent"]:.6f}</b> · '
+                results += f'<b>A<sub>o</sub>: {system["operational"]:.6f}</b><br>'
+                results += f'Frecuencia de falla: {system["frequency"]:.6f} fallos/hora · '
+                results += f'Parada esperada: {system["downtime"]:.2f} h/año</p>'
+            else:
+                results += ('<p><i>Hay bloques sin MTTR: la disponibilidad estacionaria '
+                            'del sistema en serie tiende a cero.</i></p>')
+            results += '<p>A(t): ' + ', '.join(
+                f'{t} h = {a:.4f}' for t, a in zip(data['times'], system['point'])) + '</p>'
+        return results
+
 
 def main():
     app = QApplication(sys.argv)
@@ -768,6 +1636,7 @@ def main():
     
     calculator = MTBFCalculator()
     calculator.show()
+    calculator.start_autosave()
     
     sys.exit(app.exec_())
 
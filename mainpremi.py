@@ -1,9 +1,32 @@
 import sys
 import math
-import numpy as np
-from PyQt5.QtWidgets import *
-from PyQt5.QtCore import *
-from PyQt5.QtGui import *
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
+                             QHBoxLayout, QFormLayout, QPushButton, QLabel,
+                             QLineEdit, QSpinBox, QDoubleSpinBox, QDialog,
+                             QGraphicsItem, QGraphicsScene, QGraphicsView,
+                             QTextEdit, QTabWidget, QMessageBox, QFileDialog,
+                             QInputDialog, QProgressDialog, QSplitter, QShortcut)
+from PyQt5.QtCore import Qt, QRectF, QPointF, QLineF
+from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QPolygonF, QKeySequence
+
+import profiling
+from history import History, indices_of, insert_at, remove_all
+from minimap import Minimap, grow_scene
+
+# NumPy, el motor de cálculo (reliability) y el módulo de diseños se importan
+# en el primer uso para no retrasar la apertura de la ventana
+
+# Margen que se agrega alrededor de los bloques al ampliar la escena
+SCENE_MARGIN = 200
+
+# Color de cada tipo de bloque (lienzo y minimapa)
+BLOCK_COLORS = {
+    'Serie': '#2196F3',
+    'Paralelo': '#FF9800',
+    'k-de-n': '#2196F3',
+    'Reserva en Espera': '#009688',
+    'Carga Compartida': '#E91E63'
+}
 
 # Estilos minimalistas - Solo Blanco, Azul y Naranja
 STYLE = """
@@ -64,7 +87,7 @@ QTextEdit {
     padding: 10px;
 }
 
-QTableWidget {
+QTableView {
     border: 2px solid #E0E0E0;
     gridline-color: #E0E0E0;
 }
@@ -96,20 +119,18 @@ class Block(QGraphicsItem):
         self.setCursor(Qt.OpenHandCursor)
         
         self.dragging = False
+        self.lines = []  # Connection que llegan o salen del bloque
+        self.uid = None  # identificador estable para el historial
         
     def boundingRect(self):
         return QRectF(-self.w/2, -self.h/2, self.w, self.h)
     
+    @profiling.timed('paint.bloque')
     def paint(self, painter, option, widget):
         painter.setRenderHint(QPainter.Antialiasing)
         
         # Color según tipo
-        colors = {
-            'Serie': '#2196F3',
-            'Paralelo': '#FF9800',
-            'k-de-n': '#2196F3'
-        }
-        color = QColor(colors.get(self.block_type, '#2196F3'))
+        color = QColor(BLOCK_COLORS.get(self.block_type, '#2196F3'))
         
         rect = QRectF(-self.w/2, -self.h/2, self.w, self.h)
         
@@ -153,23 +174,8 @@ class Block(QGraphicsItem):
     
     def get_mtbf(self):
         """Calcula MTBF según configuración"""
-        if self.block_type == 'Serie':
-            n = self.params.get('n', 2)
-            mtbf_comp = self.params.get('mtbf', 1000)
-            return mtbf_comp / n
-            
-        elif self.block_type == 'Paralelo':
-            n = self.params.get('n', 2)
-            mtbf_comp = self.params.get('mtbf', 1000)
-            return mtbf_comp * sum(1/i for i in range(1, n+1))
-            
-        elif self.block_type == 'k-de-n':
-            n = self.params.get('n', 3)
-            k = self.params.get('k', 2)
-            mtbf_comp = self.params.get('mtbf', 1000)
-            return mtbf_comp * sum(1/i for i in range(k, n+1))
-        
-        return 1000
+        from reliability import block_mtbf
+        return block_mtbf(self.block_type, self.params)
 
 
 class Connection(QGraphicsItem):
@@ -186,6 +192,7 @@ class Connection(QGraphicsItem):
         p2 = self.end.pos()
         return QRectF(p1, p2).normalized().adjusted(-10, -10, 10, 10)
     
+    @profiling.timed('paint.conexion')
     def paint(self, painter, option, widget):
         painter.setRenderHint(QPainter.Antialiasing)
         
@@ -262,6 +269,70 @@ class BlockConfig(QDialog):
             self.mtbf_input.setValue(self.block.params.get('mtbf', 1000))
             self.mtbf_input.setSuffix(' h')
             form.addRow('MTBF por componente:', self.mtbf_input)
+            
+        elif self.block.block_type == 'Reserva en Espera':
+            self.n_input = QSpinBox()
+            self.n_input.setRange(2, 20)
+            self.n_input.setValue(self.block.params.get('n', 2))
+            form.addRow('Unidades (1 activa + reserva):', self.n_input)
+            
+            self.mtbf_input = QDoubleSpinBox()
+            self.mtbf_input.setRange(1, 1000000)
+            self.mtbf_input.setValue(self.block.params.get('mtbf', 1000))
+            self.mtbf_input.setSuffix(' h')
+            form.addRow('MTBF unidad activa:', self.mtbf_input)
+            
+            self.standby_input = QDoubleSpinBox()
+            self.standby_input.setRange(0, 100000000)
+            self.standby_input.setValue(self.block.params.get('mtbf_standby', 0))
+            self.standby_input.setSuffix(' h')
+            self.standby_input.setSpecialValueText('Reserva fría')
+            form.addRow('MTBF en espera:', self.standby_input)
+            
+            self.switch_input = QDoubleSpinBox()
+            self.switch_input.setDecimals(4)
+            self.switch_input.setRange(0, 1)
+            self.switch_input.setSingleStep(0.01)
+            self.switch_input.setValue(self.block.params.get('switch_reliability', 1.0))
+            form.addRow('Confiabilidad conmutación:', self.switch_input)
+            
+        elif self.block.block_type == 'Carga Compartida':
+            self.n_input = QSpinBox()
+            self.n_input.setRange(2, 20)
+            self.n_input.setValue(self.block.params.get('n', 3))
+            form.addRow('Total (n):', self.n_input)
+            
+            self.k_input = QSpinBox()
+            self.k_input.setRange(1, 20)
+            self.k_input.setValue(self.block.params.get('k', 2))
+            form.addRow('Requeridas (k):', self.k_input)
+            
+            self.mtbf_input = QDoubleSpinBox()
+            self.mtbf_input.setRange(1, 1000000)
+            self.mtbf_input.setValue(self.block.params.get('mtbf', 1000))
+            self.mtbf_input.setSuffix(' h')
+            form.addRow('MTBF por unidad:', self.mtbf_input)
+            
+            self.load_input = QDoubleSpinBox()
+            self.load_input.setDecimals(2)
+            self.load_input.setRange(0, 10)
+            self.load_input.setSingleStep(0.1)
+            self.load_input.setValue(self.block.params.get('load_exponent', 1.0))
+            form.addRow('Exponente de carga (γ):', self.load_input)
+        
+        # Reparación
+        self.mttr_input = QDoubleSpinBox()
+        self.mttr_input.setRange(0, 100000)
+        self.mttr_input.setValue(self.block.params.get('mttr', 0))
+        self.mttr_input.setSuffix(' h')
+        self.mttr_input.setSpecialValueText('Sin reparación')
+        form.addRow('MTTR:', self.mttr_input)
+        
+        self.mldt_input = QDoubleSpinBox()
+        self.mldt_input.setRange(0, 100000)
+        self.mldt_input.setValue(self.block.params.get('mldt', 0))
+        self.mldt_input.setSuffix(' h')
+        form.addRow('Demora logística:', self.mldt_input)
         
         layout.addLayout(form)
         
@@ -290,10 +361,26 @@ class BlockConfig(QDialog):
             params['n'] = self.n_input.value()
             params['k'] = self.k_input.value()
             params['mtbf'] = self.mtbf_input.value()
+        elif self.block.block_type == 'Reserva en Espera':
+            params['n'] = self.n_input.value()
+            params['mtbf'] = self.mtbf_input.value()
+            params['mtbf_standby'] = self.standby_input.value()
+            params['switch_reliability'] = self.switch_input.value()
+        elif self.block.block_type == 'Carga Compartida':
+            params['n'] = self.n_input.value()
+            params['k'] = self.k_input.value()
+            params['mtbf'] = self.mtbf_input.value()
+            params['load_exponent'] = self.load_input.value()
         
+        params['mttr'] = self.mttr_input.value()
+        params['mldt'] = self.mldt_input.value()
         return params
 
 
+# Estados listados en el resultado de Markov
+MARKOV_SHOWN = 50
+
+
 class MarkovAnalysis(QDialog):
     """Análisis de Markov simplificado"""
     
@@ -316,40 +403,47 @@ class MarkovAnalysis(QDialog):
         state_layout = QHBoxLayout()
         state_layout.addWidget(QLabel('Estados:'))
         self.states_spin = QSpinBox()
-        self.states_spin.setRange(2, 5)
+        self.states_spin.setRange(2, 100000)
         self.states_spin.setValue(3)
+        self.states_spin.setKeyboardTracking(False)
         self.states_spin.valueChanged.connect(self.update_matrix)
         state_layout.addWidget(self.states_spin)
         state_layout.addStretch()
         layout.addLayout(state_layout)
         
-        # Matriz
-        self.matrix = QTableWidget(3, 3)
-        self.matrix.setHorizontalHeaderLabels(['Operativo', 'Degradado', 'Fallo'])
-        self.matrix.setVerticalHeaderLabels(['Operativo', 'Degradado', 'Fallo'])
+        # Matriz: modelo virtual sobre un generador disperso
+        from markov_editor import MarkovTableModel, MatrixView
+        from markov_matrix import Generator
         
         # Valores por defecto
         defaults = [
-            ['-0.01', '0.008', '0.002'],
-            ['0.05', '-0.08', '0.03'],
-            ['0', '0', '0']
+            [-0.01, 0.008, 0.002],
+            [0.05, -0.08, 0.03],
+            [0, 0, 0]
         ]
-        
-        for i in range(3):
-            for j in range(3):
-                item = QTableWidgetItem(defaults[i][j])
-                item.setTextAlignment(Qt.AlignCenter)
-                self.matrix.setItem(i, j, item)
-        
+        self.model = MarkovTableModel(Generator.from_dense(defaults), self)
+        self.model.validityChanged.connect(self.update_validity)
+        self.matrix = MatrixView()
+        self.matrix.setModel(self.model)
         layout.addWidget(self.matrix)
         
         # Nota
-        note = QLabel('Nota: Filas deben sumar cero. Ultimo estado es absorbente.')
+        note = QLabel('Nota: Filas deben sumar cero. Ultimo estado es absorbente. '
+                      'Ctrl+V pega bloques desde una hoja de cálculo.')
         note.setStyleSheet('color: #757575; font-size: 9pt;')
         layout.addWidget(note)
+        self.validity_label = QLabel()
+        layout.addWidget(self.validity_label)
+        self.update_validity(len(self.model.generator.invalid))
         
         # Botones
         btn_layout = QHBoxLayout()
+        import_btn = QPushButton('Importar...')
+        import_btn.clicked.connect(self.import_model)
+        fill_btn = QPushButton('Rellenar selección')
+        fill_btn.clicked.connect(self.fill_selection)
+        diag_btn = QPushButton('Completar diagonal')
+        diag_btn.clicked.connect(self.model.fill_diagonal)
         calc_btn = QPushButton('Calcular')
         calc_btn.clicked.connect(self.calculate)
         close_btn = QPushButton('Cerrar')
@@ -357,6 +451,9 @@ class MarkovAnalysis(QDialog):
         close_btn.clicked.connect(self.close)
         
         btn_layout.addWidget(close_btn)
+        btn_layout.addWidget(import_btn)
+        btn_layout.addWidget(fill_btn)
+        btn_layout.addWidget(diag_btn)
         btn_layout.addWidget(calc_btn)
         layout.addLayout(btn_layout)
         
@@ -370,55 +467,75 @@ class MarkovAnalysis(QDialog):
         self.setStyleSheet(STYLE)
     
     def update_matrix(self, n):
-        self.matrix.setRowCount(n)
-        self.matrix.setColumnCount(n)
-        
-        labels = ['Operativo', 'Degradado', 'Fallo', 'Estado 3', 'Estado 4'][:n]
-        self.matrix.setHorizontalHeaderLabels(labels)
-        self.matrix.setVerticalHeaderLabels(labels)
-        
-        for i in range(n):
-            for j in range(n):
-                if self.matrix.item(i, j) is None:
-                    val = '-0.01' if i == j else ('0' if i == n-1 else '0.005')
-                    item = QTableWidgetItem(val)
-                    item.setTextAlignment(Qt.AlignCenter)
-                    self.matrix.setItem(i, j, item)
+        # Los estados nuevos empiezan sin transiciones
+        self.model.resize(n)
+    
+    def update_validity(self, invalid):
+        if invalid:
+            self.validity_label.setText(f'{invalid} filas no suman cero')
+            self.validity_label.setStyleSheet('color: #FF9800;')
+        else:
+            self.validity_label.setText('Todas las filas suman cero')
+            self.validity_label.setStyleSheet('color: #2196F3;')
+    
+    def import_model(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, 'Importar modelo de Markov', '',
+            'Modelos (*.csv *.npy *.npz);;Transiciones CSV (*.csv);;NumPy (*.npy *.npz)')
+        if not path:
+            return
+        from markov_import import load_generator
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            generator = load_generator(path)
+        except (OSError, ValueError) as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.warning(self, 'Error', f'No se pudo importar el modelo:\n{e}')
+            return
+        self.states_spin.blockSignals(True)
+        self.states_spin.setValue(generator.n)
+        self.states_spin.blockSignals(False)
+        self.model.set_generator(generator)
+        QApplication.restoreOverrideCursor()
+        self.results.setHtml(f'<b>{generator.n} estados, {generator.nnz} tasas importadas</b>')
+    
+    def fill_selection(self):
+        block = self.matrix.selected_block()
+        if block is None:
+            return
+        value, ok = QInputDialog.getDouble(self, 'Rellenar selección', 'Tasa (por hora):',
+                                           0.0, -1e9, 1e9, 6)
+        if ok:
+            self.model.fill(*block, value)
     
     def calculate(self):
+        from reliability import markov_steady_state
         try:
-            n = self.states_spin.value()
-            Q = np.zeros((n, n))
-            
-            for i in range(n):
-                for j in range(n):
-                    Q[i, j] = float(self.matrix.item(i, j).text())
+            generator = self.model.generator
+            n = generator.n
             
-            # Validar
-            sums = Q.sum(axis=1)
-            if not np.allclose(sums, 0, atol=1e-5):
-                QMessageBox.warning(self, 'Error', 'Las filas deben sumar cero')
+            try:
+                steady = markov_steady_state(generator)
+            except ValueError as e:
+                QMessageBox.warning(self, 'Error', str(e))
                 return
-            
-            # Estado estacionario
-            A = np.vstack([Q.T, np.ones(n)])
-            b = np.zeros(n + 1)
-            b[-1] = 1
-            pi = np.linalg.lstsq(A, b, rcond=None)[0]
-            
-            # MTBF
-            mtbf = (1 - pi[-1]) / abs(Q[0, 0]) if Q[0, 0] < 0 else 0
+            pi = steady['probabilities']
+            mtbf = steady['mtbf']
             
             # Resultados
             result = f'<b>MTBF del Sistema: {mtbf:.2f} horas</b><br>'
             result += f'<b>Disponibilidad: {pi[0]:.4f} ({pi[0]*100:.2f}%)</b><br><br>'
             result += '<b>Probabilidades de Estado:</b><br>'
             
-            names = ['Operativo', 'Degradado', 'Fallo', 'Estado 3', 'Estado 4']
-            for i in range(n):
-                result += f'{names[i]}: {pi[i]:.6f}<br>'
+            # Con muchos estados sólo se listan los más probables
+            shown = sorted(range(n), key=lambda i: pi[i], reverse=True)[:MARKOV_SHOWN]
+            for i in sorted(shown):
+                result += f'{generator.labels[i]}: {pi[i]:.6f}<br>'
+            if n > MARKOV_SHOWN:
+                result += f'<i>({n - MARKOV_SHOWN} estados menos probables omitidos)</i><br>'
             
-            self.results.setHtml(result)
+            with profiling.span('markov.reporte'):
+                self.results.setHtml(result)
             
         except Exception as e:
             QMessageBox.critical(self, 'Error', str(e))
@@ -433,6 +550,20 @@ class MTBFApp(QMainWindow):
         self.connections = []
         self.connecting = False
         self.conn_start = None
+        self._results = None
+        self._markov = None
+        self.profiler_dock = None
+        self.whatif_dock = None
+        self.layout_task = None
+        self.export_task = None
+        self.chart_panel = None
+        self.curves_task = None
+        self.pending_curves = None
+        self.blocks_by_uid = {}
+        self.next_uid = 0
+        self.drag_start = {}  # bloque -> posición al empezar un arrastre
+        self.history = History(self.apply_change)
+        self.journal = None  # autoguardado; se activa con start_autosave()
         self.init_ui()
         
     def init_ui(self):
@@ -471,6 +602,15 @@ class MTBFApp(QMainWindow):
         btn_kn.clicked.connect(lambda: self.add_block('k-de-n'))
         left_layout.addWidget(btn_kn)
         
+        btn_standby = QPushButton('Reserva en Espera')
+        btn_standby.clicked.connect(lambda: self.add_block('Reserva en Espera'))
+        left_layout.addWidget(btn_standby)
+        
+        btn_sharing = QPushButton('Carga Compartida')
+        btn_sharing.setObjectName('orange')
+        btn_sharing.clicked.connect(lambda: self.add_block('Carga Compartida'))
+        left_layout.addWidget(btn_sharing)
+        
         # Markov
         group2 = QLabel('Análisis Avanzado')
         group2.setStyleSheet('font-weight: bold; margin-top: 20px;')
@@ -480,11 +620,46 @@ class MTBFApp(QMainWindow):
         btn_markov.clicked.connect(self.show_markov)
         left_layout.addWidget(btn_markov)
         
+        btn_fault_tree = QPushButton('Árbol de Fallas')
+        btn_fault_tree.clicked.connect(self.show_fault_tree)
+        left_layout.addWidget(btn_fault_tree)
+        
+        btn_bounds = QPushButton('Cotas de Confiabilidad')
+        btn_bounds.clicked.connect(self.show_bounds)
+        left_layout.addWidget(btn_bounds)
+        
+        btn_whatif = QPushButton('Escenarios')
+        btn_whatif.clicked.connect(self.toggle_whatif)
+        left_layout.addWidget(btn_whatif)
+        
+        btn_profiler = QPushButton('Perfilado')
+        btn_profiler.clicked.connect(self.toggle_profiler)
+        left_layout.addWidget(btn_profiler)
+        
+        btn_minimap = QPushButton('Minimapa')
+        btn_minimap.setCheckable(True)
+        btn_minimap.setChecked(True)
+        btn_minimap.toggled.connect(lambda checked: self.minimap.setVisible(checked))
+        left_layout.addWidget(btn_minimap)
+        
         # Acciones
         group3 = QLabel('Acciones')
         group3.setStyleSheet('font-weight: bold; margin-top: 20px;')
         left_layout.addWidget(group3)
         
+        history_layout = QHBoxLayout()
+        self.btn_undo = QPushButton('Deshacer')
+        self.btn_undo.clicked.connect(self.history.undo)
+        history_layout.addWidget(self.btn_undo)
+        self.btn_redo = QPushButton('Rehacer')
+        self.btn_redo.clicked.connect(self.history.redo)
+        history_layout.addWidget(self.btn_redo)
+        left_layout.addLayout(history_layout)
+        QShortcut(QKeySequence.Undo, self, self.history.undo)
+        QShortcut(QKeySequence.Redo, self, self.history.redo)
+        self.history.listeners.append(self.update_history_buttons)
+        self.update_history_buttons()
+        
         self.btn_connect = QPushButton('Conectar Bloques')
         self.btn_connect.setCheckable(True)
         self.btn_connect.clicked.connect(self.toggle_connect)
@@ -495,11 +670,27 @@ class MTBFApp(QMainWindow):
         btn_delete.clicked.connect(self.delete_selected)
         left_layout.addWidget(btn_delete)
         
+        self.btn_layout = QPushButton('Organizar')
+        self.btn_layout.clicked.connect(self.auto_layout)
+        left_layout.addWidget(self.btn_layout)
+        
+        self.btn_export = QPushButton('Exportar')
+        self.btn_export.clicked.connect(self.export_results)
+        left_layout.addWidget(self.btn_export)
+        
         btn_clear = QPushButton('Limpiar Todo')
         btn_clear.setObjectName('orange')
         btn_clear.clicked.connect(self.clear_all)
         left_layout.addWidget(btn_clear)
         
+        btn_save = QPushButton('Guardar')
+        btn_save.clicked.connect(self.save_design)
+        left_layout.addWidget(btn_save)
+        
+        btn_open = QPushButton('Abrir')
+        btn_open.clicked.connect(self.open_design)
+        left_layout.addWidget(btn_open)
+        
         btn_calc = QPushButton('CALCULAR MTBF')
         btn_calc.setStyleSheet('background-color: #4CAF50; font-size: 11pt; padding: 12px;')
         btn_calc.clicked.connect(self.calculate)
@@ -525,26 +716,49 @@ class MTBFApp(QMainWindow):
         self.view = QGraphicsView(self.scene)
         self.view.setRenderHint(QPainter.Antialiasing)
         self.view.mousePressEvent = self.canvas_click
+        self.view.mouseReleaseEvent = self.canvas_release
+        
+        # La escena crece mientras se arrastra hacia el borde; el minimapa la resume
+        self.scene.changed.connect(lambda rects: grow_scene(self.scene, rects, SCENE_MARGIN))
+        self.minimap = Minimap(self.view, self.minimap_color, self.minimap_line)
         
         self.tabs.addTab(self.view, 'Diseño')
         
-        # Tab 2: Resultados
-        self.results = QTextEdit()
-        self.results.setReadOnly(True)
-        self.tabs.addTab(self.results, 'Resultados')
+        # Tab 2: Resultados (la vista se construye al mostrarse por primera vez)
+        self.results_tab = QWidget()
+        QVBoxLayout(self.results_tab).setContentsMargins(0, 0, 0, 0)
+        self.tabs.addTab(self.results_tab, 'Resultados')
+        self.tabs.currentChanged.connect(self.on_tab_changed)
         
         layout.addWidget(self.tabs)
         
         self.setStyleSheet(STYLE)
-        
-        # Mensaje inicial
-        self.results.setHtml(
-            '<div style="padding: 50px; text-align: center;">'
-            '<h2>Bienvenido</h2>'
-            '<p>Arrastra bloques al canvas y conectalos.<br>'
-            'Doble clic para configurar parametros.</p>'
-            '</div>'
-        )
+    
+    @property
+    def results(self):
+        """Vista de resultados, creada en el primer uso"""
+        if self._results is None:
+            self._results = QTextEdit()
+            self._results.setReadOnly(True)
+            # El gráfico de curvas se agrega debajo en el primer cálculo
+            self.results_splitter = QSplitter(Qt.Vertical)
+            self.results_splitter.addWidget(self._results)
+            self.results_tab.layout().addWidget(self.results_splitter)
+            
+            # Mensaje inicial
+            self._results.setHtml(
+                '<div style="padding: 50px; text-align: center;">'
+                '<h2>Bienvenido</h2>'
+                '<p>Arrastra bloques al canvas y conectalos.<br>'
+                'Doble clic para configurar parametros.</p>'
+                '</div>'
+            )
+        return self._results
+    
+    def on_tab_changed(self, index):
+        # Construir la vista de resultados al abrir la pestaña
+        if self.tabs.widget(index) is self.results_tab:
+            self.results.show()
     
     def add_block(self, block_type):
         # Configurar primero
@@ -556,24 +770,37 @@ class MTBFApp(QMainWindow):
             params = dialog.get_params()
             name = params.pop('name')
             
-            block = Block(block_type, name, params)
-            
             # Posición
             x = 300 + (len(self.blocks) % 3) * 160
             y = 200 + (len(self.blocks) // 3) * 100
-            block.setPos(x, y)
-            
-            self.scene.addItem(block)
+            block = self.place_block(block_type, name, params, x, y)
             self.blocks.append(block)
+            self.fit_scene([(x, y)])
+            self.history.push('add', self.capture_fragment([block]))
     
     def edit_block(self, block):
-        """Editar bloque existente"""
+        """Editar bloque existente; sólo se registran los campos cambiados"""
         dialog = BlockConfig(block, self)
         if dialog.exec_() == QDialog.Accepted:
+            current = dict(block.params, name=block.name)
             params = dialog.get_params()
-            block.name = params.pop('name')
-            block.params = params
-            block.update()
+            # Los parámetros que el diálogo ya no devuelve se quitan (None)
+            new = {key: params.get(key) for key in set(current) | set(params)
+                   if current.get(key) != params.get(key)}
+            if new:
+                old = {key: current.get(key) for key in new}
+                self.set_fields(block, new)
+                self.history.push('params', {block.uid: (old, new)})
+    
+    def set_fields(self, block, fields):
+        for key, value in fields.items():
+            if key == 'name':
+                block.name = value
+            elif value is None:
+                block.params.pop(key, None)
+            else:
+                block.params[key] = value
+        block.update()
     
     def toggle_connect(self):
         self.connecting = self.btn_connect.isChecked()
@@ -586,7 +813,13 @@ class MTBFApp(QMainWindow):
     def canvas_click(self, event):
         QGraphicsView.mousePressEvent(self.view, event)
         
-        if self.connecting:
+        if not self.connecting:
+            self.drag_start = {
+                item: (item.pos().x(), item.pos().y())
+                for item in self.scene.selectedItems()
+                if isinstance(item, Block)
+            }
+        else:
             pos = self.view.mapToScene(event.pos())
             item = self.scene.itemAt(pos, self.view.transform())
             
@@ -596,24 +829,31 @@ class MTBFApp(QMainWindow):
                     item.setSelected(True)
                 else:
                     if item != self.conn_start:
-                        conn = Connection(self.conn_start, item)
-                        self.scene.addItem(conn)
-                        self.connections.append(conn)
+                        conn = self.add_connection(self.conn_start, item)
+                        self.history.push('add', self.capture_fragment([], [conn]))
                     
                     self.conn_start.setSelected(False)
                     self.conn_start = None
     
+    def canvas_release(self, event):
+        """Registra en el historial los bloques arrastrados"""
+        QGraphicsView.mouseReleaseEvent(self.view, event)
+        
+        moved = {}
+        for block, (x, y) in self.drag_start.items():
+            pos = block.pos()
+            if (pos.x(), pos.y()) != (x, y):
+                moved[block.uid] = ((x, y), (pos.x(), pos.y()))
+        self.drag_start = {}
+        # Arrastres seguidos de la misma selección quedan como un solo paso
+        self.history.push('move', moved, coalesce=True)
+    
     def delete_selected(self):
-        for item in self.scene.selectedItems():
-            if isinstance(item, Block):
-                # Eliminar conexiones
-                for conn in self.connections[:]:
-                    if conn.start == item or conn.end == item:
-                        self.scene.removeItem(conn)
-                        self.connections.remove(conn)
-                
-                self.scene.removeItem(item)
-                self.blocks.remove(item)
+        selected = [item for item in self.scene.selectedItems() if isinstance(item, Block)]
+        if selected:
+            fragment = self.capture_fragment(selected)
+            self.remove_fragment(fragment)
+            self.history.push('remove', fragment)
     
     def clear_all(self):
         reply = QMessageBox.question(
@@ -623,15 +863,356 @@ class MTBFApp(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
+            # Se puede deshacer: el historial guarda lo eliminado
+            fragment = self.capture_fragment(list(self.blocks))
+            self.remove_fragment(fragment)
+            self.results.clear()
+            if fragment['blocks']:
+                self.history.push('remove', fragment)
+    
+    # Historial -------------------------------------------------------------
+    
+    def place_block(self, block_type, name, params, x, y, uid=None):
+        """Crea un bloque en la escena con un identificador estable"""
+        block = Block(block_type, name, params)
+        block.setPos(x, y)
+        if uid is None:
+            uid = self.next_uid
+        self.next_uid = max(self.next_uid, uid + 1)
+        block.uid = uid
+        self.blocks_by_uid[uid] = block
+        self.scene.addItem(block)
+        return block
+    
+    def make_connection(self, start, end):
+        conn = Connection(start, end)
+        self.scene.addItem(conn)
+        start.lines.append(conn)
+        end.lines.append(conn)
+        return conn
+    
+    def add_connection(self, start, end):
+        conn = self.make_connection(start, end)
+        self.connections.append(conn)
+        return conn
+    
+    def capture_fragment(self, blocks, lines=()):
+        """Diferencia con los bloques, sus conexiones y sus posiciones en las listas"""
+        lines = list(dict.fromkeys([line for block in blocks for line in block.lines]
+                                   + list(lines)))
+        return {
+            'blocks': [
+                (block.uid, i, block.block_type, block.name, block.params,
+                 block.pos().x(), block.pos().y())
+                for block, i in zip(blocks, indices_of(self.blocks, blocks))
+            ],
+            'lines': [
+                (i, line.start.uid, line.end.uid)
+                for line, i in zip(lines, indices_of(self.connections, lines))
+            ],
+        }
+    
+    def insert_fragment(self, fragment):
+        insert_at(self.blocks, [
+            (i, self.place_block(block_type, name, dict(params), x, y, uid))
+            for uid, i, block_type, name, params, x, y in fragment['blocks']
+        ])
+        insert_at(self.connections, [
+            (i, self.make_connection(self.blocks_by_uid[start], self.blocks_by_uid[end]))
+            for i, start, end in fragment['lines']
+        ])
+        self.fit_scene([block[5:7] for block in fragment['blocks']])
+    
+    def remove_fragment(self, fragment):
+        if len(fragment['blocks']) == len(self.blocks) and self.blocks:
+            # Se elimina todo el diagrama
             self.scene.clear()
             self.blocks.clear()
             self.connections.clear()
-            self.results.clear()
+            self.blocks_by_uid.clear()
+            return
+        
+        lines = []
+        for _, start, end in fragment['lines']:
+            start_block = self.blocks_by_uid[start]
+            line = next(line for line in start_block.lines
+                        if line.start is start_block and line.end.uid == end
+                        and line not in lines)
+            start_block.lines.remove(line)
+            line.end.lines.remove(line)
+            self.scene.removeItem(line)
+            lines.append(line)
+        remove_all(self.connections, lines)
+        
+        blocks = [self.blocks_by_uid.pop(block[0]) for block in fragment['blocks']]
+        for block in blocks:
+            self.scene.removeItem(block)
+        remove_all(self.blocks, blocks)
     
-    def show_markov(self):
-        dialog = MarkovAnalysis(self)
+    def apply_change(self, kind, data, undo):
+        """Aplica (o revierte, con undo) un comando del historial"""
+        if kind == 'group':
+            for item_kind, item_data in (reversed(data) if undo else data):
+                self.apply_change(item_kind, item_data, undo)
+        elif kind in ('add', 'remove'):
+            if (kind == 'add') == undo:
+                self.remove_fragment(data)
+            else:
+                self.insert_fragment(data)
+        elif kind == 'move':
+            for uid, (old, new) in data.items():
+                self.blocks_by_uid[uid].setPos(*(old if undo else new))
+            for line in dict.fromkeys(line for uid in data
+                                      for line in self.blocks_by_uid[uid].lines):
+                line.prepareGeometryChange()
+            self.fit_scene([old if undo else new for old, new in data.values()])
+        elif kind == 'params':
+            for uid, (old, new) in data.items():
+                self.set_fields(self.blocks_by_uid[uid], old if undo else new)
+    
+    def update_history_buttons(self):
+        self.btn_undo.setEnabled(self.history.can_undo())
+        self.btn_redo.setEnabled(self.history.can_redo())
+    
+    def to_design(self):
+        """Diseño serializable del diagrama actual"""
+        index = {block: i for i, block in enumerate(self.blocks)}
+        return {
+            'blocks': [
+                {
+                    'type': block.block_type,
+                    'name': block.name,
+                    'params': dict(block.params),
+                    'pos': [block.pos().x(), block.pos().y()],
+                }
+                for block in self.blocks
+            ],
+            'connections': [
+                [index[conn.start], index[conn.end]] for conn in self.connections
+            ],
+        }
+    
+    def load_design(self, design):
+        """Reemplaza el diagrama por el diseño indicado"""
+        self.scene.clear()
+        self.blocks.clear()
+        self.connections.clear()
+        self.results.clear()
+        self.blocks_by_uid.clear()
+        self.next_uid = 0
+        self.history.clear()
+        if self.journal is not None:
+            self.journal.reset(design)
+        
+        for data in design['blocks']:
+            x, y = data.get('pos', (300, 200))
+            block = self.place_block(data['type'], data['name'], dict(data['params']), x, y)
+            self.blocks.append(block)
+        
+        for start, end in design['connections']:
+            self.add_connection(self.blocks[start], self.blocks[end])
+        self.fit_scene([(b.pos().x(), b.pos().y()) for b in self.blocks])
+    
+    def fit_scene(self, points):
+        """Amplía la escena (nunca la reduce) para incluir bloques centrados en points"""
+        if not points:
+            return
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        rect = QRectF(QPointF(min(xs) - 70, min(ys) - 40), QPointF(max(xs) + 70, max(ys) + 40))
+        rect.adjust(-SCENE_MARGIN, -SCENE_MARGIN, SCENE_MARGIN, SCENE_MARGIN)
+        current = self.scene.sceneRect()
+        if not current.contains(rect):
+            self.scene.setSceneRect(current.united(rect))
+    
+    def auto_layout(self):
+        """Organiza el diagrama en un hilo de trabajo"""
+        if not self.blocks or self.layout_task is not None:
+            return
+        from layout import auto_layout
+        from workers import Task
+        
+        blocks = list(self.blocks)
+        index = {block: i for i, block in enumerate(blocks)}
+        connections = [(index[c.start], index[c.end]) for c in self.connections]
+        
+        self.btn_layout.setEnabled(False)
+        self.layout_task = Task(auto_layout, len(blocks), connections, parent=self)
+        self.layout_task.done.connect(lambda positions: self.apply_layout(blocks, positions))
+        self.layout_task.failed.connect(
+            lambda message: QMessageBox.warning(self, 'Error', f'No se pudo organizar:\n{message}'))
+        self.layout_task.finished.connect(self.layout_finished)
+        self.layout_task.start()
+    
+    def layout_finished(self):
+        self.layout_task.deleteLater()
+        self.layout_task = None
+        self.btn_layout.setEnabled(True)
+    
+    def export_results(self):
+        """Exporta el informe (bloques, curvas y Markov) en un hilo de trabajo"""
+        if not self.blocks:
+            QMessageBox.warning(self, 'Error', 'Agrega bloques primero')
+            return
+        if self.export_task is not None:
+            return
+        path, selected = QFileDialog.getSaveFileName(
+            self, 'Exportar resultados', '', 'CSV (*.csv);;HTML (*.html);;PDF (*.pdf)')
+        if not path:
+            return
+        from report_export import FORMATS, export_report
+        from workers import Task
+        if not path.lower().endswith(FORMATS + ('.htm',)):
+            path += '.' + selected.split()[0].lower()
+        
+        # El hilo recibe una copia del generador: la tabla puede seguir editándose
+        markov = self.markov_copy()
+        
+        progress = QProgressDialog('Exportando resultados...', 'Cancelar', 0, 100, self)
+        progress.setWindowTitle('Exportar')
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        self.btn_export.setEnabled(False)
+        self.export_task = Task(export_report, self.to_design(), path, markov=markov,
+                                progress=True, cancellable=True, parent=self)
+        self.export_task.progress.connect(lambda fraction: progress.setValue(int(fraction * 100)))
+        progress.canceled.connect(self.export_task.cancel)
+        self.export_task.done.connect(
+            lambda result: QMessageBox.information(self, 'Exportar', f'Resultados exportados a:\n{result}'))
+        self.export_task.failed.connect(
+            lambda message: QMessageBox.warning(self, 'Error', f'No se pudo exportar:\n{message}'))
+        self.export_task.finished.connect(progress.reset)
+        self.export_task.finished.connect(self.export_finished)
+        self.export_task.start()
+    
+    def export_finished(self):
+        self.export_task.deleteLater()
+        self.export_task = None
+        self.btn_export.setEnabled(True)
+    
+    def apply_layout(self, blocks, positions):
+        # Todas las posiciones en una sola actualización de la vista
+        moved = {}
+        self.view.setUpdatesEnabled(False)
+        for block, (x, y) in zip(blocks, positions.tolist()):
+            if self.blocks_by_uid.get(block.uid) is not block:
+                continue  # eliminado mientras se calculaba
+            old = (block.pos().x(), block.pos().y())
+            if old != (x, y):
+                block.setPos(x, y)
+                moved[block.uid] = (old, (x, y))
+        for conn in self.connections:
+            conn.prepareGeometryChange()
+        self.fit_scene([new for _, new in moved.values()])
+        self.view.setUpdatesEnabled(True)
+        self.history.push('move', moved)
+    
+    def start_autosave(self):
+        """Ofrece recuperar una sesión interrumpida y activa el diario de autoguardado"""
+        import os
+        from journal import DEFAULT_DIRECTORY, Journal
+        # Directorio propio: las dos ventanas pueden estar abiertas a la vez
+        journal = Journal(os.path.join(os.path.dirname(DEFAULT_DIRECTORY), 'autosave-premi'))
+        if journal.has_recovery():
+            try:
+                design = journal.recover()
+            except (OSError, ValueError, KeyError, IndexError):
+                design = None
+            if design and design['blocks']:
+                reply = QMessageBox.question(
+                    self, 'Recuperar diseño',
+                    'La sesión anterior no se cerró correctamente.\n'
+                    '¿Recuperar el diseño autoguardado?',
+                    QMessageBox.Yes | QMessageBox.No)
+                if reply == QMessageBox.Yes:
+                    self.load_design(design)
+        
+        self.journal = journal
+        self.history.observers.append(journal.record)
+        journal.start(self.to_design())
+    
+    def closeEvent(self, event):
+        # Destruir un QThread que sigue corriendo aborta el proceso
+        tasks = [self.layout_task, self.export_task, self.curves_task]
+        if self.whatif_dock is not None:
+            tasks.append(self.whatif_dock.exact_task)
+        for task in tasks:
+            if task is not None:
+                task.cancel()
+                task.wait()
+        # Un cierre normal no deja nada que recuperar
+        if self.journal is not None:
+            self.journal.close(discard=True)
+        super().closeEvent(event)
+    
+    def save_design(self):
+        from design import save_design
+        path, _ = QFileDialog.getSaveFileName(self, 'Guardar diseño', '', 'Diseños (*.json)')
+        if path:
+            save_design(self.to_design(), path)
+    
+    def open_design(self):
+        from design import load_design
+        path, _ = QFileDialog.getOpenFileName(self, 'Abrir diseño', '', 'Diseños (*.json)')
+        if path:
+            try:
+                self.load_design(load_design(path))
+            except (OSError, ValueError, KeyError) as e:
+                QMessageBox.critical(self, 'Error', f'No se pudo abrir el diseño:\n{e}')
+    
+    def show_fault_tree(self):
+        if not self.blocks:
+            QMessageBox.warning(self, 'Error', 'Agrega bloques primero')
+            return
+        from fault_tree_view import FaultTreeDialog
+        dialog = FaultTreeDialog(self.to_design(), self)
         dialog.exec_()
     
+    def show_bounds(self):
+        if not self.blocks:
+            QMessageBox.warning(self, 'Error', 'Agrega bloques primero')
+            return
+        from bounds_view import BoundsDialog
+        dialog = BoundsDialog(self.to_design(), self)
+        dialog.exec_()
+    
+    def minimap_color(self, item):
+        """Color de un bloque en el minimapa (None si no es un bloque)"""
+        if isinstance(item, Block):
+            return QColor(BLOCK_COLORS.get(item.block_type, '#2196F3'))
+        return None
+    
+    def minimap_line(self, item):
+        """Segmento de una conexión en el minimapa (None si no es una conexión)"""
+        if isinstance(item, Connection):
+            return QLineF(item.start.pos(), item.end.pos())
+        return None
+    
+    def toggle_profiler(self):
+        if self.profiler_dock is None:
+            from profiling_panel import ProfilerDock
+            self.profiler_dock = ProfilerDock(self.view, self)
+            self.addDockWidget(Qt.RightDockWidgetArea, self.profiler_dock)
+        else:
+            self.profiler_dock.setVisible(not self.profiler_dock.isVisible())
+    
+    def toggle_whatif(self):
+        """Panel de escenarios con controles deslizantes (se crea en el primer uso)"""
+        if self.whatif_dock is None:
+            from whatif_panel import WhatIfDock
+            self.whatif_dock = WhatIfDock(self, self)
+            self.addDockWidget(Qt.RightDockWidgetArea, self.whatif_dock)
+            self.whatif_dock.select_block()
+        else:
+            self.whatif_dock.setVisible(not self.whatif_dock.isVisible())
+    
+    def show_markov(self):
+        # El diálogo se crea una sola vez y se reutiliza
+        if self._markov is None:
+            self._markov = MarkovAnalysis(self)
+        self._markov.exec_()
+    
+    @profiling.timed('reporte.calculo')
     def calculate(self):
         if not self.blocks:
             QMessageBox.warning(self, 'Error', 'Agrega bloques primero')
@@ -657,12 +1238,20 @@ class MTBFApp(QMainWindow):
         
         result += '</table><br>'
         
+        from availability import evaluate_availability
+        availability = evaluate_availability(self.to_design())
+        
         if self.connections:
             mtbf_sys = 1/total_lambda if total_lambda > 0 else 0
+            system = availability['system']
             
             result += '<div style="background: #E3F2FD; padding: 20px; border-radius: 5px;">'
             result += f'<h3>MTBF del Sistema: {mtbf_sys:.2f} horas</h3>'
             result += f'<p>Tasa de fallo: {total_lambda:.6f} fallos/hora</p>'
+            if system['repairable']:
+                result += (f'<p>Disponibilidad inherente: <b>{system["inherent"]*100:.4f}%</b> · '
+                           f'operacional: <b>{system["operational"]*100:.4f}%</b><br>'
+                           f'Parada esperada: {system["downtime"]:.2f} h/año</p>')
             result += '</div><br>'
             
             result += '<h4>Confiabilidad R(t):</h4>'
@@ -670,24 +1259,82 @@ class MTBFApp(QMainWindow):
             result += '<tr style="background: #2196F3; color: white;">'
             result += '<th>Tiempo (h)</th><th>R(t)</th><th>Disponibilidad</th></tr>'
             
-            for t in [100, 500, 1000, 2000, 5000]:
+            for t, a_t in zip(availability['times'], system['point']):
                 r_t = math.exp(-total_lambda * t)
                 result += f'<tr>'
                 result += f'<td>{t}</td>'
                 result += f'<td><b>{r_t:.4f}</b></td>'
-                result += f'<td>{r_t*100:.2f}%</td>'
+                result += f'<td>{a_t*100:.2f}%</td>'
                 result += '</tr>'
             
             result += '</table>'
         
-        self.results.setHtml(result)
+        repairable = [b for b in availability['blocks'] if b['repairable']]
+        if repairable:
+            result += '<h4>Disponibilidad por bloque:</h4>'
+            result += '<table border="1" cellpadding="8" style="border-collapse: collapse;">'
+            result += '<tr style="background: #2196F3; color: white;">'
+            result += '<th>Bloque</th><th>Inherente</th><th>Operacional</th><th>MDT (h)</th><th>Parada (h/año)</th></tr>'
+            for block in repairable:
+                result += f'<tr>'
+                result += f'<td>{block["name"]}</td>'
+                result += f'<td>{block["inherent"]*100:.4f}%</td>'
+                result += f'<td>{block["operational"]*100:.4f}%</td>'
+                result += f'<td>{block["mdt"]:.2f}</td>'
+                result += f'<td>{block["downtime"]:.2f}</td>'
+                result += '</tr>'
+            result += '</table>'
+        
+        with profiling.span('reporte.render'):
+            self.results.setHtml(result)
+        self.update_charts(self.to_design())
         self.tabs.setCurrentIndex(1)
+    
+    def markov_copy(self):
+        """Copia del generador de la tabla de Markov, si es válido, para otro hilo"""
+        if self._markov is None or not self._markov.model.generator.is_valid():
+            return None
+        from markov_matrix import Generator
+        g = self._markov.model.generator
+        return Generator.from_coo(g.n, *g.to_coo(), labels=g.labels)
+    
+    def update_charts(self, design):
+        """Calcula R(t), h(t) y p(t) de Markov en un hilo y los muestra bajo el informe"""
+        if not self.isVisible():
+            return  # sin ventana no hay gráfico que actualizar
+        if self.chart_panel is None:
+            from chart_view import ChartPanel
+            self.chart_panel = ChartPanel()
+            self.results_splitter.addWidget(self.chart_panel)
+            self.results_splitter.setSizes([1, 1])
+        if self.curves_task is not None:
+            # Un cálculo a la vez: se conserva sólo el diseño más reciente
+            self.pending_curves = design
+            return
+        from curves import results_plots
+        from workers import Task
+        
+        self.chart_panel.set_message('Calculando curvas...')
+        self.curves_task = Task(results_plots, design, self.markov_copy(), parent=self)
+        self.curves_task.done.connect(self.chart_panel.set_plots)
+        self.curves_task.failed.connect(
+            lambda message: self.chart_panel.set_message(f'No se pudieron calcular las curvas:\n{message}'))
+        self.curves_task.finished.connect(self.charts_finished)
+        self.curves_task.start()
+    
+    def charts_finished(self):
+        self.curves_task.deleteLater()
+        self.curves_task = None
+        if self.pending_curves is not None:
+            design, self.pending_curves = self.pending_curves, None
+            self.update_charts(design)
 
 
 def main():
     app = QApplication(sys.argv)
     window = MTBFApp()
     window.show()
+    window.start_autosave()
     sys.exit(app.exec_())
 
 
@@ -0,0 +1,412 @@
+"""Simulación de eventos discretos de políticas de mantenimiento (sin Qt)
+
+Cada bloque del diseño es una unidad con vida Weibull de media igual a su
+MTBF; el sistema está en serie (igual que el cálculo de la interfaz) y se
+detiene mientras alguna unidad esté fuera de servicio.
+
+Políticas:
+    none    sólo mantenimiento correctivo
+    age     reemplazo preventivo al cumplir `interval` horas de operación
+            desde el último preventivo (o en la falla, lo que ocurra antes)
+    block   reemplazo preventivo de todas las unidades operativas en los
+            instantes k·interval
+
+La reparación correctiva es imperfecta (Kijima tipo II): la edad virtual
+pasa a q·edad, con q = `restoration` (0 = como nueva, 1 = como antes de
+fallar); el preventivo deja la unidad como nueva. Cada trabajo consume un
+repuesto; los repuestos se reponen uno a uno con demora `lead_time`
+(política S-1, S) y los trabajos esperan a una de las `crews` cuadrillas.
+Un correctivo sin repuesto espera la reposición; un preventivo se omite.
+
+El calendario de eventos es un heap binario de pares (tiempo, código) con
+código = unidad·8 + tipo; los eventos obsoletos se descartan al salir del
+heap comparando con el tiempo vigente de la unidad. Los números aleatorios
+se generan por lotes con NumPy.
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import profiling
+from hierarchy import flatten
+from reliability import block_mtbf, get_param
+
+POLICIES = ('none', 'age', 'block')
+
+DEFAULT_POLICY = {
+    'policy': 'age',
+    'interval': 500.0,      # horas entre preventivos
+    'shape': 2.0,           # β de Weibull (1 = exponencial)
+    'restoration': 0.0,     # q de Kijima para el correctivo
+    'mttr': 8.0,            # reparación correctiva si el bloque no define mttr
+    'pm_duration': 2.0,     # duración fija del preventivo
+    'spares': 2,            # repuestos en bodega; None = ilimitados
+    'lead_time': 48.0,      # demora de reposición de cada repuesto
+    'crews': 1,             # cuadrillas de mantenimiento
+    'cost_cm': 1000.0,      # costo por correctivo
+    'cost_pm': 200.0,       # costo por preventivo
+    'cost_downtime': 100.0, # costo por hora de sistema detenido
+}
+
+METRICS = ('availability', 'downtime', 'failures', 'pm_done', 'pm_skipped',
+           'spare_waits', 'cost', 'cost_rate', 'events')
+
+FAIL, DONE, PM, SPARE, BLOCK_PM = range(5)
+UP, WAITING, REPAIR, SERVICE = range(4)
+
+BATCH = 1 << 14
+
+
+def units_from_design(design, policy=None):
+    """Escala y forma de Weibull y MTTR de cada bloque del diseño"""
+    policy = dict(DEFAULT_POLICY, **(policy or {}))
+    units = []
+    for block in flatten(design).get('blocks', []):
+        params = block.get('params', {})
+        mtbf = block_mtbf(block['type'], params)
+        shape = get_param(block['type'], params, 'shape') or policy['shape']
+        mttr = get_param(block['type'], params, 'mttr') or policy['mttr']
+        if not (mtbf > 0 and math.isfinite(mtbf)):
+            continue  # bloque que nunca falla (o inválido): no aporta eventos
+        scale = mtbf / math.gamma(1 + 1 / shape)
+        units.append((scale, shape, mttr))
+    return units
+
+
+def simulate_units(units, policy, horizon, seed=None):
+    """Una réplica sobre [0, horizon]; devuelve las métricas de METRICS"""
+    policy = dict(DEFAULT_POLICY, **(policy or {}))
+    kind = policy['policy']
+    if kind not in POLICIES:
+        raise ValueError(f'Política desconocida: {kind}')
+
+    rng = np.random.default_rng(seed)
+    draws = rng.standard_exponential(BATCH).tolist()
+    di = 0
+
+    n = len(units)
+    scale = [u[0] for u in units]
+    inv_shape = [1 / u[1] for u in units]
+    shape = [u[1] for u in units]
+    mttr = [u[2] for u in units]
+
+    interval = float(policy['interval'])
+    q = float(policy['restoration'])
+    pm_duration = float(policy['pm_duration'])
+    lead_time = float(policy['lead_time'])
+    unlimited = policy['spares'] is None
+    spares = 0 if unlimited else int(policy['spares'])
+    free_crews = int(policy['crews'])
+    age_policy = kind == 'age' and interval > 0
+    inf = math.inf
+
+    status = [UP] * n
+    vage = [0.0] * n        # edad virtual al último arranque
+    op_age = [0.0] * n      # horas operadas desde el último preventivo
+    started = [0.0] * n     # instante del último arranque
+    fail_at = [inf] * n
+    pm_at = [inf] * n
+    job_pm = [False] * n
+
+    heap = []
+    push = heapq.heappush
+    pop = heapq.heappop
+    crew_queue = deque()
+    spare_queue = deque()
+
+    failures = pm_done = pm_skipped = spare_waits = events = 0
+    down = 0
+    down_since = 0.0
+    downtime = 0.0
+
+    # Arranque de todas las unidades nuevas
+    for u in range(n):
+        fail_at[u] = scale[u] * draws[di] ** inv_shape[u]
+        di += 1
+        if di == BATCH:
+            draws = rng.standard_exponential(BATCH).tolist()
+            di = 0
+        push(heap, (fail_at[u], u * 8 + FAIL))
+        if age_policy:
+            pm_at[u] = interval
+            push(heap, (interval, u * 8 + PM))
+    if kind == 'block' and interval > 0 and n:
+        push(heap, (interval, n * 8 + BLOCK_PM))
+
+    while heap:
+        t, code = pop(heap)
+        if t > horizon:
+            break
+        u = code >> 3
+        ev = code & 7
+
+        if ev == FAIL or ev == PM:
+            if status[u] != UP or (fail_at[u] if ev == FAIL else pm_at[u]) != t:
+                continue  # evento obsoleto
+            events += 1
+            has_spare = unlimited or spares > 0
+            if ev == PM and not has_spare:
+                # Sin repuesto: sigue operando y se reintenta en un intervalo
+                pm_skipped += 1
+                op_age[u] = started[u] - t  # cuenta desde 0 a partir de t
+                pm_at[u] = t + interval
+                push(heap, (pm_at[u], u * 8 + PM))
+                continue
+            op_age[u] += t - started[u]
+            vage[u] += t - started[u]
+            fail_at[u] = pm_at[u] = inf
+            job_pm[u] = ev == PM
+            if ev == FAIL:
+                failures += 1
+            if not unlimited:
+                # (S-1, S): cada demanda pide un repuesto, también si queda pendiente
+                push(heap, (t + lead_time, n * 8 + SPARE))
+            if has_spare:
+                if not unlimited:
+                    spares -= 1
+                status[u] = SERVICE if ev == PM else REPAIR
+                crew_queue.append(u)
+            else:
+                spare_waits += 1
+                status[u] = WAITING
+                spare_queue.append(u)
+            if not down:
+                down_since = t
+            down += 1
+
+        elif ev == DONE:
+            events += 1
+            free_crews += 1
+            if job_pm[u]:
+                pm_done += 1
+                vage[u] = 0.0
+                op_age[u] = 0.0
+            else:
+                vage[u] *= q
+            status[u] = UP
+            started[u] = t
+            # Vida residual Weibull dada la edad virtual v, con e ~ Exp(1)
+            v = vage[u]
+            if v > 0:
+                eta = scale[u]
+                fail_at[u] = t + eta * ((v / eta) ** shape[u] + draws[di]) ** inv_shape[u] - v
+            else:
+                fail_at[u] = t + scale[u] * draws[di] ** inv_shape[u]
+            di += 1
+            if di == BATCH:
+                draws = rng.standard_exponential(BATCH).tolist()
+                di = 0
+            push(heap, (fail_at[u], u * 8 + FAIL))
+            if age_policy:
+                pm_at[u] = t + max(interval - op_age[u], 0.0)
+                push(heap, (pm_at[u], u * 8 + PM))
+            down -= 1
+            if not down:
+                downtime += t - down_since
+
+        elif ev == SPARE:
+            events += 1
+            spares += 1
+            if spare_queue:
+                # La demanda pendiente ya hizo su pedido al fallar
+                spares -= 1
+                w = spare_queue.popleft()
+                status[w] = REPAIR
+                crew_queue.append(w)
+
+        else:  # BLOCK_PM
+            events += 1
+            push(heap, (t + interval, code))
+            for w in range(n):
+                if status[w] != UP:
+                    continue
+                if not (unlimited or spares):
+                    pm_skipped += 1
+                    continue
+                if not unlimited:
+                    spares -= 1
+                    push(heap, (t + lead_time, n * 8 + SPARE))
+                vage[w] += t - started[w]
+                fail_at[w] = inf
+                job_pm[w] = True
+                status[w] = SERVICE
+                crew_queue.append(w)
+                if not down:
+                    down_since = t
+                down += 1
+
+        # Asigna cuadrillas libres a los trabajos pendientes (FIFO)
+        while free_crews and crew_queue:
+            w = crew_queue.popleft()
+            free_crews -= 1
+            if job_pm[w]:
+                duration = pm_duration
+            else:
+                duration = mttr[w] * draws[di]
+                di += 1
+                if di == BATCH:
+                    draws = rng.standard_exponential(BATCH).tolist()
+                    di = 0
+            push(heap, (t + duration, w * 8 + DONE))
+
+    if down:
+        downtime += horizon - down_since
+
+    cost = (failures * policy['cost_cm'] + pm_done * policy['cost_pm']
+            + downtime * policy['cost_downtime'])
+    return {
+        'availability': 1 - downtime / horizon if horizon > 0 else 1.0,
+        'downtime': downtime,
+        'failures': failures,
+        'pm_done': pm_done,
+        'pm_skipped': pm_skipped,
+        'spare_waits': spare_waits,
+        'cost': cost,
+        'cost_rate': cost / horizon if horizon > 0 else 0.0,
+        'events': events,
+    }
+
+
+def _run_chunk(job):
+    units, policy, horizon, seeds = job
+    return [simulate_units(units, policy, horizon, seed) for seed in seeds]
+
+
+class RunningStats:
+    """Media y varianza acumuladas (Welford) de cada métrica"""
+
+    def __init__(self, metrics=METRICS):
+        self.count = 0
+        self.mean = dict.fromkeys(metrics, 0.0)
+        self.m2 = dict.fromkeys(metrics, 0.0)
+
+    def add(self, result):
+        self.count += 1
+        for key in self.mean:
+            delta = result[key] - self.mean[key]
+            self.mean[key] += delta / self.count
+            self.m2[key] += delta * (result[key] - self.mean[key])
+
+    def summary(self):
+        """Media, desviación estándar e intervalo de confianza del 95 %"""
+        out = {'replications': self.count}
+        for key, mean in self.mean.items():
+            std = math.sqrt(self.m2[key] / (self.count - 1)) if self.count > 1 else 0.0
+            half = 1.96 * std / math.sqrt(self.count) if self.count else 0.0
+            out[key] = {'mean': mean, 'std': std, 'ci95': [mean - half, mean + half]}
+        return out
+
+
+def replicate(design, policy=None, horizon=87600.0, replications=100, seed=None,
+              jobs=1, chunksize=None):
+    """Genera los resultados de cada réplica a medida que terminan
+
+    Las réplicas usan semillas independientes derivadas de `seed` y se
+    reparten en lotes entre `jobs` procesos.
+    """
+    policy = dict(DEFAULT_POLICY, **(policy or {}))
+    units = units_from_design(design, policy)
+    seeds = np.random.SeedSequence(seed).spawn(replications)
+    jobs = jobs or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, replications // (jobs * 4))
+    chunks = [(units, policy, horizon, seeds[i:i + chunksize])
+              for i in range(0, replications, chunksize)]
+
+    if jobs == 1:
+        for chunk in chunks:
+            yield from _run_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(jobs) as executor:
+        for results in executor.map(_run_chunk, chunks):
+            yield from results
+
+
+@profiling.timed('mantenimiento.simulacion')
+def simulate(design, policy=None, horizon=87600.0, replications=100, seed=None,
+             jobs=1, progress=None):
+    """Ejecuta todas las réplicas y devuelve el resumen estadístico
+
+    progress(stats) se llama después de cada réplica con las estadísticas
+    acumuladas, para mostrar resultados parciales.
+    """
+    stats = RunningStats()
+    for result in replicate(design, policy, horizon, replications, seed, jobs):
+        stats.add(result)
+        if progress:
+            progress(stats)
+    return stats.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Simula políticas de mantenimiento sobre un diseño guardado')
+    parser.add_argument('design', help='archivo de diseño (.json)')
+    parser.add_argument('--policy', choices=POLICIES, default=DEFAULT_POLICY['policy'])
+    parser.add_argument('--interval', type=float, default=DEFAULT_POLICY['interval'],
+                        help='horas entre preventivos')
+    parser.add_argument('--shape', type=float, default=DEFAULT_POLICY['shape'],
+                        help='forma β de Weibull')
+    parser.add_argument('--restoration', type=float,
+                        default=DEFAULT_POLICY['restoration'],
+                        help='factor q de reparación imperfecta (0 = como nueva)')
+    parser.add_argument('--spares', type=int, default=DEFAULT_POLICY['spares'],
+                        help='repuestos iniciales (-1 = ilimitados)')
+    parser.add_argument('--lead-time', type=float, default=DEFAULT_POLICY['lead_time'])
+    parser.add_argument('--crews', type=int, default=DEFAULT_POLICY['crews'])
+    parser.add_argument('--horizon', type=float, default=87600.0,
+                        help='horas simuladas por réplica')
+    parser.add_argument('-n', '--replications', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='procesos en paralelo (0 = núcleos)')
+    parser.add_argument('--json', action='store_true', help='resumen en JSON')
+    args = parser.parse_args(argv)
+
+    from design import load_design
+    design = load_design(args.design)
+    policy = {
+        'policy': args.policy, 'interval': args.interval, 'shape': args.shape,
+        'restoration': args.restoration, 'lead_time': args.lead_time,
+        'spares': None if args.spares < 0 else args.spares, 'crews': args.crews,
+    }
+
+    step = max(1, args.replications // 10)
+
+    def progress(stats):
+        if not args.json and stats.count % step == 0:
+            mean = stats.mean
+            print(f'{stats.count:6d} réplicas  A = {mean["availability"]:.6f}  '
+                  f'costo/h = {mean["cost_rate"]:.3f}', flush=True)
+
+    start = time.perf_counter()
+    summary = simulate(design, policy, args.horizon, args.replications,
+                       args.seed, args.jobs, progress)
+    elapsed = time.perf_counter() - start
+    summary['events_per_second'] = (
+        summary['events']['mean'] * summary['replications'] / elapsed if elapsed else 0.0)
+
+    if args.json:
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    for key in METRICS:
+        low, high = summary[key]['ci95']
+        print(f'{key:>14}: {summary[key]["mean"]:.6g}  (IC95 {low:.6g} – {high:.6g})')
+    print(f'{summary["events_per_second"]:,.0f} eventos/s en {elapsed:.2f} s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""Estado estacionario de familias de modelos de Markov (sin Qt)
+
+Un estudio paramétrico resuelve cientos de variantes del mismo generador con
+distintas tasas de falla y reparación. En lugar de un markov_steady_state por
+variante, las variantes se apilan en un arreglo (m, n, n) y el sistema
+reducido de todas se resuelve con una sola llamada a np.linalg.solve por
+lotes: Qᵀπ = 0 con la última ecuación reemplazada por Σπ = 1, igual que en
+reliability.markov_steady_state. Si algún sistema de un lote es singular
+(varias clases cerradas), las variantes de ese lote se resuelven una a una
+con markov_steady_state, que recurre a mínimos cuadrados.
+
+Las variantes se describen con una plantilla y las celdas que cambian:
+
+    sweep(Q, cells=[(0, 2), (2, 0)], values=valores)    # valores: (m, 2)
+
+La diagonal de cada variante se recalcula para que las filas sumen cero.
+sweep arma y resuelve las variantes por trozos de a lo sumo CHUNK_BYTES; con
+jobs > 1 los trozos se reparten entre procesos, que reciben sólo las tasas.
+
+Ejemplo:
+    python markov_batch.py modelo.csv --cell 0 2 --from 1e-4 --to 1e-2 --steps 500 -j 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import profiling
+from reliability import markov_steady_state
+
+CHUNK_BYTES = 32 * 2**20    # memoria de las matrices de un trozo
+
+
+def _dense(Q):
+    if hasattr(Q, 'to_dense'):
+        return Q.to_dense()
+    Q = np.asarray(Q, dtype=float)
+    if Q.ndim != 2 or Q.shape[0] != Q.shape[1]:
+        raise ValueError('La matriz de transición debe ser cuadrada')
+    return Q
+
+
+def _cells(cells, n):
+    cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+    if cells.size and (cells.min() < 0 or cells.max() >= n):
+        raise ValueError('Índice de estado fuera de rango')
+    if np.any(cells[:, 0] == cells[:, 1]):
+        raise ValueError('Las celdas variables deben estar fuera de la diagonal')
+    return cells
+
+
+def variants(template, cells, values):
+    """Apila las variantes de template con las tasas de values en cells
+
+    values tiene una fila por variante y una columna por celda; el resultado
+    es un arreglo (m, n, n) cuyas filas suman cero.
+    """
+    Q = _dense(template)
+    n = Q.shape[0]
+    cells = _cells(cells, n)
+    values = np.asarray(values, dtype=float).reshape(-1, len(cells))
+    if np.any(values < 0):
+        raise ValueError('Las tasas de transición no pueden ser negativas')
+
+    stack = np.repeat(Q[None], values.shape[0], axis=0)
+    stack[:, cells[:, 0], cells[:, 1]] = values
+    diagonal = np.arange(n)
+    stack[:, diagonal, diagonal] = 0.0
+    stack[:, diagonal, diagonal] = -stack.sum(axis=2)
+    return stack
+
+
+@profiling.timed('markov.lote')
+def steady_state_batch(Q, atol=1e-5):
+    """Probabilidades estacionarias, disponibilidad y MTBF de cada variante
+
+    Q es un arreglo (m, n, n). Devuelve arreglos: 'probabilities' (m, n),
+    'availability' (m,) y 'mtbf' (m,), con las mismas convenciones que
+    markov_steady_state (el último estado es el de fallo).
+    """
+    Q = np.asarray(Q, dtype=float)
+    if Q.ndim != 3 or Q.shape[1] != Q.shape[2]:
+        raise ValueError('Las variantes deben formar un arreglo (m, n, n)')
+    m, n, _ = Q.shape
+
+    bad = np.flatnonzero(np.any(np.abs(Q.sum(axis=2)) > atol, axis=1))
+    if bad.size:
+        raise ValueError(f'Las filas deben sumar cero (variante {bad[0]})')
+
+    A = Q.transpose(0, 2, 1).copy()
+    A[:, -1, :] = 1.0
+    b = np.zeros((m, n, 1))
+    b[:, -1] = 1.0
+    try:
+        pi = np.linalg.solve(A, b)[..., 0]
+    except np.linalg.LinAlgError:
+        pi = np.array([markov_steady_state(q, atol)['probabilities'] for q in Q])
+        profiling.count('markov.lote singular', m)
+
+    q00 = Q[:, 0, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mtbf = np.where(q00 < 0, (1 - pi[:, -1]) / np.abs(q00), 0.0)
+    return {
+        'probabilities': pi,
+        'availability': pi[:, 0].copy(),
+        'mtbf': mtbf,
+    }
+
+
+def _solve_chunk(job):
+    template, cells, values, atol = job
+    return steady_state_batch(variants(template, cells, values), atol)
+
+
+def sweep(template, cells, values, jobs=1, chunksize=None, atol=1e-5):
+    """Resuelve todas las variantes de template por trozos
+
+    Igual que steady_state_batch(variants(...)) pero sin apilar más de
+    CHUNK_BYTES a la vez. jobs = 0 usa todos los núcleos.
+    """
+    Q = _dense(template)
+    n = Q.shape[0]
+    cells = _cells(cells, n)
+    values = np.asarray(values, dtype=float).reshape(-1, len(cells))
+    m = values.shape[0]
+    jobs = jobs or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, CHUNK_BYTES // (8 * n * n))
+        if jobs > 1:
+            chunksize = min(chunksize, max(1, -(-m // (jobs * 4))))
+    chunks = [(Q, cells, values[i:i + chunksize], atol) for i in range(0, m, chunksize)]
+
+    if jobs == 1 or len(chunks) == 1:
+        results = [_solve_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(min(jobs, len(chunks))) as executor:
+            results = list(executor.map(_solve_chunk, chunks))
+
+    if not results:
+        return {'probabilities': np.zeros((0, n)), 'availability': np.zeros(0),
+                'mtbf': np.zeros(0)}
+    return {key: np.concatenate([r[key] for r in results]) for key in results[0]}
+
+
+def _state(text, labels):
+    """Índice de un estado dado por número o por nombre"""
+    if text in labels:
+        return labels.index(text)
+    try:
+        return int(text)
+    except ValueError:
+        raise ValueError(f'Estado desconocido: {text}') from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Barrido de una tasa de un modelo de Markov: disponibilidad y MTBF')
+    parser.add_argument('model', help='modelo de Markov (.csv, .npy o .npz)')
+    parser.add_argument('--cell', nargs=2, required=True, metavar=('ORIGEN', 'DESTINO'),
+                        help='transición que varía (índice o nombre de estado)')
+    parser.add_argument('--from', dest='low', type=float, required=True)
+    parser.add_argument('--to', dest='high', type=float, required=True)
+    parser.add_argument('--steps', type=int, default=100)
+    parser.add_argument('--log', action='store_true', help='tasas en escala logarítmica')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='procesos en paralelo (0 = núcleos)')
+    parser.add_argument('--json', action='store_true', help='resultados en JSON')
+    args = parser.parse_args(argv)
+
+    from markov_import import load_generator
+    generator = load_generator(args.model)
+    cell = [_state(text, generator.labels) for text in args.cell]
+    space = np.geomspace if args.log else np.linspace
+    rates = space(args.low, args.high, args.steps)
+
+    start = time.perf_counter()
+    result = sweep(generator, [cell], rates[:, None], args.jobs)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        json.dump({'rates': rates.tolist(), 'availability': result['availability'].tolist(),
+                   'mtbf': result['mtbf'].tolist()}, sys.stdout, indent=2)
+        print()
+        return 0
+
+    print(f'{"tasa":>14} {"disponibilidad":>16} {"MTBF (h)":>14}')
+    for rate, availability, mtbf in zip(rates, result['availability'], result['mtbf']):
+        print(f'{rate:14.6g} {availability:16.8f} {mtbf:14.6g}')
+    print(f'{rates.size} variantes de {generator.n} estados en {elapsed:.3f} s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Editor virtualizado de la matriz de transición de Markov
+
+La vista sólo pide los valores de las celdas visibles al modelo, que los lee
+del markov_matrix.Generator; no existe un objeto por celda. La última columna
+muestra la suma de cada fila, mantenida de forma incremental por el
+generador.
+"""
+
+import re
+
+import numpy as np
+from PyQt5.QtWidgets import QTableView, QHeaderView, QApplication
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QColor, QKeySequence
+
+from markov_matrix import Generator
+
+INVALID_COLOR = QColor('#FFE0B2')
+VALID_COLOR = QColor('#E3F2FD')
+DIAGONAL_COLOR = QColor('#F5F5F5')
+
+# Celdas máximas que se copian al portapapeles de una vez
+COPY_LIMIT = 1000000
+
+
+class MarkovTableModel(QAbstractTableModel):
+    """Modelo de tabla sobre un Generator, con columna de suma de fila"""
+
+    validityChanged = pyqtSignal(int)  # número de filas que no suman cero
+
+    def __init__(self, generator=None, parent=None):
+        super().__init__(parent)
+        self.generator = generator if generator is not None else Generator(0)
+
+    # Interfaz de QAbstractTableModel ---------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.generator.n
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.generator.n + 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        gen = self.generator
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if col == gen.n:
+                return f'{gen.row_sum(row):.6g}'
+            return f'{gen.get(row, col):g}'
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.BackgroundRole:
+            if col == gen.n:
+                return INVALID_COLOR if row in gen.invalid else VALID_COLOR
+            if col == row:
+                return DIAGONAL_COLOR
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or index.column() >= self.generator.n:
+            return False
+        try:
+            value = float(str(value).replace(',', '.'))
+        except ValueError:
+            return False
+        row = index.row()
+        self.generator.set(row, index.column(), value)
+        self.dataChanged.emit(index, index)
+        sum_index = self.index(row, self.generator.n)
+        self.dataChanged.emit(sum_index, sum_index)
+        self.validityChanged.emit(len(self.generator.invalid))
+        return True
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() < self.generator.n:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        labels = self.generator.labels
+        if orientation == Qt.Horizontal and section == self.generator.n:
+            return 'Σ fila'
+        return labels[section] if section < len(labels) else str(section)
+
+    # Operaciones -----------------------------------------------------------
+
+    def set_generator(self, generator):
+        self.beginResetModel()
+        self.generator = generator
+        self.endResetModel()
+        self.validityChanged.emit(len(generator.invalid))
+
+    def resize(self, n):
+        if n == self.generator.n:
+            return
+        self.beginResetModel()
+        self.generator.resize(n)
+        self.endResetModel()
+        self.validityChanged.emit(len(self.generator.invalid))
+
+    def paste(self, row, col, values):
+        """Copia un bloque 2-D de tasas a partir de (row, col)"""
+        values = np.atleast_2d(values)
+        self.generator.set_block(row, col, values)
+        self._block_changed(row, col, values.shape[0], values.shape[1])
+
+    def fill(self, row, col, height, width, value):
+        self.generator.fill(row, col, height, width, value)
+        self._block_changed(row, col, height, width)
+
+    def fill_diagonal(self):
+        self.generator.fill_diagonal()
+        self._block_changed(0, 0, self.generator.n, self.generator.n)
+
+    def _block_changed(self, row, col, height, width):
+        n = self.generator.n
+        bottom = min(row + height, n) - 1
+        # Las sumas de fila cambian en todas las filas del bloque
+        self.dataChanged.emit(self.index(row, col), self.index(bottom, n))
+        self.validityChanged.emit(len(self.generator.invalid))
+
+
+def _split(line):
+    # Con tabuladores o punto y coma la coma se interpreta como decimal
+    if '\t' in line or ';' in line:
+        return [cell.strip().replace(',', '.') for cell in re.split(r'[\t;]', line)
+                if cell.strip()]
+    return [cell for cell in re.split(r'[, ]+', line) if cell]
+
+
+def parse_block(text):
+    """Convierte texto tabulado (p. ej. desde una hoja de cálculo) en un array"""
+    rows = [[float(cell) for cell in _split(line)]
+            for line in text.strip().splitlines() if line.strip()]
+    if not rows:
+        return None
+    values = np.zeros((len(rows), max(len(r) for r in rows)))
+    for i, r in enumerate(rows):
+        values[i, :len(r)] = r
+    return values
+
+
+class MatrixView(QTableView):
+    """Vista de la matriz con copiar, pegar y borrar por bloques"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Tamaños fijos: la vista no mide cada fila ni columna
+        for header in (self.horizontalHeader(), self.verticalHeader()):
+            header.setSectionResizeMode(QHeaderView.Fixed)
+        self.horizontalHeader().setDefaultSectionSize(80)
+        self.verticalHeader().setDefaultSectionSize(24)
+
+    def selected_block(self):
+        """(fila, columna, alto, ancho) del rectángulo que cubre la selección"""
+        ranges = self.selectionModel().selection()
+        if ranges.isEmpty():
+            current = self.currentIndex()
+            if not current.isValid():
+                return None
+            return current.row(), current.column(), 1, 1
+        top = min(r.top() for r in ranges)
+        left = min(r.left() for r in ranges)
+        bottom = max(r.bottom() for r in ranges)
+        right = max(r.right() for r in ranges)
+        right = min(right, self.model().generator.n - 1)
+        return top, left, bottom - top + 1, right - left + 1
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Paste):
+            self.paste()
+        elif event.matches(QKeySequence.Copy):
+            self.copy()
+        elif event.key() in (Qt.Key_Delete, Qt.Key_Backspace) and self.state() != self.EditingState:
+            block = self.selected_block()
+            if block:
+                self.model().fill(*block, 0.0)
+        else:
+            super().keyPressEvent(event)
+
+    def paste(self):
+        block = self.selected_block()
+        if block is None:
+            return
+        try:
+            values = parse_block(QApplication.clipboard().text())
+        except ValueError:
+            return
+        if values is None:
+            return
+        row, col, height, width = block
+        if values.size == 1 and height * width > 1:
+            # Un solo valor rellena toda la selección
+            self.model().fill(row, col, height, width, values[0, 0])
+        else:
+            self.model().paste(row, col, values)
+
+    def copy(self):
+        block = self.selected_block()
+        if block is None:
+            return
+        row, col, height, width = block
+        if height * width > COPY_LIMIT:
+            return
+        values = self.model().generator.block(row, col, height, width)
+        lines = ['\t'.join(f'{v:g}' for v in line) for line in values]
+        QApplication.clipboard().setText('\n'.join(lines))
@@ -0,0 +1,222 @@
+"""Importación de modelos de Markov desde archivos (sin Qt)
+
+Formatos:
+    .csv    lista de transiciones `origen,destino,tasa` (estados por nombre o
+            por índice; encabezado opcional; con `;` como separador se acepta
+            coma decimal). Se lee por bloques sin construir una matriz densa.
+    .npy    matriz densa n × n, o tabla m × 3 de tripletas (origen, destino,
+            tasa). Los archivos grandes se abren con memoria mapeada y se
+            recorren por bloques de filas.
+    .npz    arrays `rows`, `cols`, `values` (y opcionalmente `n`, `labels`),
+            el formato CSR que guarda scipy.sparse.save_npz (`data`,
+            `indices`, `indptr`, `shape`) o una matriz densa.
+
+Si el archivo no trae ninguna tasa en la diagonal, ésta se completa para que
+las filas sumen cero; en otro caso las sumas se validan tal como vienen.
+"""
+
+import itertools
+import os
+import warnings
+from array import array
+
+import numpy as np
+
+import profiling
+from markov_matrix import Generator
+
+EXTENSIONS = ('.csv', '.npy', '.npz')
+CSV_CHUNK = 8 * 2**20          # caracteres leídos por bloque
+MMAP_THRESHOLD = 64 * 2**20   # bytes
+ROW_BLOCK = 1024              # filas densas leídas por bloque
+
+
+def _is_number(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _parse_numbers(text, delimiter):
+    """Tabla de tripletas numéricas de un bloque de texto, en C vía NumPy"""
+    text = text.strip()
+    if not text:
+        return np.zeros((0, 3))
+    with warnings.catch_warnings():
+        # fromstring sólo avisa (no falla) cuando encuentra texto no numérico
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            if delimiter == ';':
+                text = text.replace(',', '.')  # coma decimal
+            values = np.fromstring(text.replace(delimiter, ' '), sep=' ')
+        except (DeprecationWarning, ValueError):
+            raise ValueError('Cada fila debe tener origen, destino y tasa numéricos')
+    if values.size != 3 * (text.count('\n') + 1):
+        raise ValueError('Cada fila debe tener origen, destino y tasa')
+    return values.reshape(-1, 3)
+
+
+@profiling.timed('markov.importar_csv')
+def load_edge_list(path, delimiter=None):
+    """Generador desde un CSV `origen,destino,tasa`
+
+    Si los estados son enteros se usan como índices y el archivo se
+    convierte por bloques de texto directamente a arrays; si son nombres,
+    cada nombre recibe un índice en orden de primera aparición.
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        first = f.readline()
+        if not first.strip():
+            raise ValueError('El archivo está vacío')
+        if delimiter is None:
+            delimiter = ';' if first.count(';') > first.count(',') else ','
+        fields = [x.strip() for x in first.split(delimiter)]
+        if len(fields) < 3:
+            raise ValueError('Cada fila debe tener origen, destino y tasa')
+        rate = fields[2].replace(',', '.') if delimiter == ';' else fields[2]
+        head = first if _is_number(rate) else ''
+        if not head:
+            first = f.readline()
+            fields = [x.strip() for x in first.split(delimiter)]
+            head = first
+
+        if all(x.lstrip('-').isdigit() for x in fields[:2]):
+            blocks = []
+            while True:
+                chunk = f.read(CSV_CHUNK)
+                text = head + chunk + (f.readline() if chunk else '')
+                head = ''
+                blocks.append(_parse_numbers(text, delimiter))
+                if not chunk:
+                    break
+            table = np.concatenate(blocks)
+            rows = table[:, 0].astype(np.int64)
+            cols = table[:, 1].astype(np.int64)
+            n = int(max(rows.max(), cols.max())) + 1 if rows.size else 0
+            return _finish(n, rows, cols, table[:, 2])
+
+        sources, targets = [], []
+        rates = array('d')
+        for line in itertools.chain([head], f):
+            parts = line.split(delimiter)
+            if len(parts) < 3:
+                if line.strip():
+                    raise ValueError('Cada fila debe tener origen, destino y tasa')
+                continue
+            sources.append(parts[0].strip())
+            targets.append(parts[1].strip())
+            try:
+                rates.append(float(parts[2].replace(',', '.') if delimiter == ';' else parts[2]))
+            except ValueError:
+                raise ValueError(f'Tasa inválida: {parts[2].strip()}')
+
+    if not sources:
+        raise ValueError('El archivo no contiene transiciones')
+
+    # Índices por orden de primera aparición (primero orígenes, luego destinos)
+    names = np.array(sources + targets)
+    unique, first_seen, inverse = np.unique(names, return_index=True, return_inverse=True)
+    order = np.argsort(first_seen, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(order.size)
+    index = rank[inverse]
+    m = len(sources)
+    return _finish(unique.size, index[:m], index[m:],
+                   np.frombuffer(rates, dtype=float), unique[order].tolist())
+
+
+@profiling.timed('markov.importar_npy')
+def load_npy(path):
+    """Generador desde un .npy denso (n × n) o de tripletas (m × 3)"""
+    mmap = 'r' if os.path.getsize(path) > MMAP_THRESHOLD else None
+    data = np.load(path, mmap_mode=mmap)
+    if data.ndim == 2 and data.shape[1] == 3 and data.shape[0] != 3:
+        return _from_triplets(data)
+    return _from_dense_rows(data)
+
+
+@profiling.timed('markov.importar_npz')
+def load_npz(path):
+    """Generador desde un .npz de tripletas, CSR (scipy.sparse) o denso"""
+    with np.load(path, allow_pickle=False) as archive:
+        keys = set(archive.files)
+        labels = [str(x) for x in archive['labels']] if 'labels' in keys else None
+
+        if {'rows', 'cols', 'values'} <= keys:
+            rows = archive['rows']
+            cols = archive['cols']
+            n = int(archive['n']) if 'n' in keys else int(max(rows.max(), cols.max())) + 1
+            return _finish(n, rows, cols, archive['values'], labels)
+
+        if {'data', 'indices', 'indptr', 'shape'} <= keys:
+            fmt = archive['format'].item() if 'format' in keys else b'csr'
+            fmt = fmt.decode() if isinstance(fmt, bytes) else str(fmt)
+            shape = archive['shape']
+            if shape[0] != shape[1]:
+                raise ValueError('La matriz de transición debe ser cuadrada')
+            indptr = archive['indptr'].astype(np.int64)
+            major = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+            minor = archive['indices'].astype(np.int64)
+            rows, cols = (minor, major) if fmt == 'csc' else (major, minor)
+            return _finish(int(shape[0]), rows, cols, archive['data'], labels)
+
+        name = 'matrix' if 'matrix' in keys else archive.files[0]
+        gen = _from_dense_rows(archive[name])
+        if labels is not None:
+            gen.labels = labels
+        return gen
+
+
+def load_generator(path):
+    """Elige el importador según la extensión del archivo"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return load_edge_list(path)
+    if ext == '.npy':
+        return load_npy(path)
+    if ext == '.npz':
+        return load_npz(path)
+    raise ValueError(f'Formato no soportado: {ext}')
+
+
+def _from_triplets(data):
+    rows = np.asarray(data[:, 0]).astype(np.int64)
+    cols = np.asarray(data[:, 1]).astype(np.int64)
+    n = int(max(rows.max(), cols.max())) + 1 if rows.size else 0
+    return _finish(n, rows, cols, np.asarray(data[:, 2], dtype=float))
+
+
+def _from_dense_rows(matrix):
+    """Extrae las tasas no nulas por bloques de filas (sirve con memmap)"""
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError('La matriz de transición debe ser cuadrada')
+    n = matrix.shape[0]
+    rows, cols, values = [], [], []
+    for start in range(0, n, ROW_BLOCK):
+        block = np.asarray(matrix[start:start + ROW_BLOCK], dtype=float)
+        r, c = np.nonzero(block)
+        rows.append(r + start)
+        cols.append(c)
+        values.append(block[r, c])
+    return _finish(n,
+                   np.concatenate(rows) if rows else np.zeros(0, np.int64),
+                   np.concatenate(cols) if cols else np.zeros(0, np.int64),
+                   np.concatenate(values) if values else np.zeros(0))
+
+
+def _finish(n, rows, cols, values, labels=None):
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    values = np.asarray(values, dtype=float)
+    if not np.all(np.isfinite(values)):
+        raise ValueError('El archivo contiene tasas no finitas')
+    off = rows != cols
+    if np.any(values[off] < 0):
+        raise ValueError('Las tasas fuera de la diagonal no pueden ser negativas')
+
+    gen = Generator.from_coo(n, rows, cols, values, labels)
+    if off.all():
+        gen.fill_diagonal()
+    return gen
@@ -0,0 +1,216 @@
+"""Generador de Markov disperso para el editor y los importadores (sin Qt)
+
+Las tasas se guardan en formato CSR (indptr, indices, data) más un diccionario
+de ediciones pendientes que se incorpora al CSR en bloque cuando crece. Las
+sumas de fila se mantienen de forma incremental en cada edición, de modo que
+la validación no recorre la matriz.
+"""
+
+import numpy as np
+
+ROW_TOLERANCE = 1e-5
+COMPACT_LIMIT = 4096
+DEFAULT_LABELS = ['Operativo', 'Degradado', 'Fallo']
+
+
+def default_labels(n):
+    """Nombres de estado: los tres clásicos y luego 'Estado i'"""
+    return [DEFAULT_LABELS[i] if i < len(DEFAULT_LABELS) else f'Estado {i}'
+            for i in range(n)]
+
+
+class Generator:
+    """Matriz generadora Q (n × n) dispersa con sumas de fila incrementales"""
+
+    def __init__(self, n=0, labels=None, tolerance=ROW_TOLERANCE):
+        self.tolerance = tolerance
+        self._set_csr(n, np.zeros(n + 1, dtype=np.int64),
+                      np.zeros(0, dtype=np.int64), np.zeros(0))
+        self.labels = list(labels) if labels is not None else default_labels(n)
+
+    # Construcción ----------------------------------------------------------
+
+    @classmethod
+    def from_dense(cls, Q, labels=None, tolerance=ROW_TOLERANCE):
+        Q = np.asarray(Q, dtype=float)
+        if Q.ndim != 2 or Q.shape[0] != Q.shape[1]:
+            raise ValueError('La matriz de transición debe ser cuadrada')
+        rows, cols = np.nonzero(Q)
+        return cls.from_coo(Q.shape[0], rows, cols, Q[rows, cols], labels, tolerance)
+
+    @classmethod
+    def from_coo(cls, n, rows, cols, values, labels=None, tolerance=ROW_TOLERANCE):
+        """Construye el generador desde tripletas; las repetidas se suman"""
+        gen = cls(0, labels=[], tolerance=tolerance)
+        gen._set_csr(n, *_coo_to_csr(n, rows, cols, values))
+        gen.labels = list(labels) if labels is not None else default_labels(n)
+        return gen
+
+    def _set_csr(self, n, indptr, indices, data):
+        self.n = int(n)
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.pending = {}
+        self._rows = None
+        rows, _, _ = self._coo()
+        self.row_sums = np.bincount(rows, weights=data, minlength=self.n)
+        self._refresh_invalid()
+
+    def _refresh_invalid(self):
+        self.invalid = set(np.flatnonzero(np.abs(self.row_sums) > self.tolerance).tolist())
+
+    # Acceso a celdas -------------------------------------------------------
+
+    @property
+    def nnz(self):
+        self.compact()
+        return int(self.data.size)
+
+    def get(self, i, j):
+        value = self.pending.get((i, j))
+        if value is not None:
+            return value
+        start, end = self.indptr[i], self.indptr[i + 1]
+        k = start + np.searchsorted(self.indices[start:end], j)
+        if k < end and self.indices[k] == j:
+            return float(self.data[k])
+        return 0.0
+
+    def set(self, i, j, value):
+        value = float(value)
+        old = self.get(i, j)
+        if value == old:
+            return
+        self.pending[(i, j)] = value
+        self.row_sums[i] += value - old
+        if abs(self.row_sums[i]) > self.tolerance:
+            self.invalid.add(i)
+        else:
+            self.invalid.discard(i)
+        if len(self.pending) > COMPACT_LIMIT:
+            self.compact()
+
+    def row_sum(self, i):
+        return float(self.row_sums[i])
+
+    def is_valid(self):
+        return not self.invalid
+
+    def compact(self):
+        """Incorpora las ediciones pendientes al CSR (vectorizado)"""
+        if not self.pending:
+            return
+        keys = np.array(list(self.pending), dtype=np.int64).reshape(-1, 2)
+        values = np.fromiter(self.pending.values(), dtype=float, count=len(self.pending))
+        rows, cols, data = self._coo()
+        keep = ~np.isin(rows * self.n + cols, keys[:, 0] * self.n + keys[:, 1])
+        self._set_csr(self.n, *_coo_to_csr(
+            self.n,
+            np.concatenate([rows[keep], keys[:, 0]]),
+            np.concatenate([cols[keep], keys[:, 1]]),
+            np.concatenate([data[keep], values])))
+
+    # Operaciones en bloque -------------------------------------------------
+
+    def set_block(self, row, col, values):
+        """Reemplaza el bloque que empieza en (row, col) por values (2-D)"""
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        h = min(values.shape[0], self.n - row)
+        w = min(values.shape[1], self.n - col)
+        if h <= 0 or w <= 0:
+            return
+        values = values[:h, :w]
+        self.compact()
+        rows, cols, data = self._coo()
+        outside = ~((rows >= row) & (rows < row + h) & (cols >= col) & (cols < col + w))
+        new_r, new_c = np.nonzero(values)
+        self._set_csr(self.n, *_coo_to_csr(
+            self.n,
+            np.concatenate([rows[outside], new_r + row]),
+            np.concatenate([cols[outside], new_c + col]),
+            np.concatenate([data[outside], values[new_r, new_c]])))
+
+    def fill(self, row, col, height, width, value):
+        self.set_block(row, col, np.full((height, width), float(value)))
+
+    def fill_diagonal(self):
+        """Ajusta la diagonal para que todas las filas sumen cero"""
+        self.compact()
+        rows, cols, data = self._coo()
+        off = rows != cols
+        diagonal = -np.bincount(rows[off], weights=data[off], minlength=self.n)
+        idx = np.arange(self.n)
+        self._set_csr(self.n, *_coo_to_csr(
+            self.n,
+            np.concatenate([rows[off], idx]),
+            np.concatenate([cols[off], idx]),
+            np.concatenate([data[off], diagonal])))
+
+    def resize(self, n):
+        """Cambia el número de estados conservando las tasas existentes"""
+        self.compact()
+        rows, cols, data = self._coo()
+        keep = (rows < n) & (cols < n)
+        self._set_csr(n, *_coo_to_csr(n, rows[keep], cols[keep], data[keep]))
+        self.labels = self.labels[:n] + default_labels(n)[len(self.labels):]
+
+    # Conversión ------------------------------------------------------------
+
+    def _coo(self):
+        if self._rows is None:
+            self._rows = np.repeat(np.arange(self.n, dtype=np.int64), np.diff(self.indptr))
+        return self._rows, self.indices, self.data
+
+    def to_coo(self):
+        """Tripletas (filas, columnas, tasas) sin ediciones pendientes"""
+        self.compact()
+        return self._coo()
+
+    def to_dense(self):
+        rows, cols, data = self.to_coo()
+        Q = np.zeros((self.n, self.n))
+        Q[rows, cols] = data
+        return Q
+
+    def block(self, row, col, height, width):
+        """Submatriz densa de tamaño height × width a partir de (row, col)"""
+        self.compact()
+        start, end = self.indptr[row], self.indptr[min(row + height, self.n)]
+        rows = self._coo()[0][start:end]
+        cols = self.indices[start:end]
+        inside = (cols >= col) & (cols < col + width)
+        values = np.zeros((height, width))
+        values[rows[inside] - row, cols[inside] - col] = self.data[start:end][inside]
+        return values
+
+    def left_multiply(self, x):
+        """x·Q en O(nnz)"""
+        rows, cols, data = self.to_coo()
+        return np.bincount(cols, weights=data * x[rows], minlength=self.n)
+
+
+def _coo_to_csr(n, rows, cols, values):
+    """Ordena las tripletas por (fila, columna), suma repetidas y quita ceros"""
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    values = np.asarray(values, dtype=float)
+    if rows.size and (rows.min() < 0 or cols.min() < 0 or rows.max() >= n or cols.max() >= n):
+        raise ValueError('Índice de estado fuera de rango')
+
+    keys = rows * n + cols
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    values = values[order]
+    if keys.size:
+        starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+        values = np.add.reduceat(values, starts)
+        keys = keys[starts]
+    nonzero = values != 0
+    keys = keys[nonzero]
+    values = values[nonzero]
+
+    rows = keys // n if n else keys
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, keys - rows * n, values
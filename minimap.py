@@ -0,0 +1,232 @@
+"""Minimapa del diagrama con una miniatura en caché que se actualiza por zonas
+
+La miniatura no se pinta con QGraphicsScene.render, que dibuja cada bloque
+con su texto: cada bloque es un rectángulo de su color y cada conexión una
+línea, sobre una QImage del tamaño del minimapa que se conserva entre
+pintados. QGraphicsScene.changed entrega, una vez por ciclo de eventos, las
+zonas de la escena que cambiaron (posición vieja y nueva de lo que se movió);
+sólo esos rectángulos se borran y se vuelven a dibujar con los elementos que
+los tocan, que el índice de la escena encuentra sin recorrer el diagrama. La
+imagen completa se rehace sólo cuando cambia la escala o cuando lo cambiado
+cubre gran parte de ella. Mientras la escena crece (un bloque arrastrado
+hacia el borde) se sigue actualizando por zonas con la escala anterior y la
+nueva se aplica RESCALE_MS después del último crecimiento.
+
+paintEvent sólo copia la imagen y dibuja encima el rectángulo de la zona
+visible, así que desplazarse o hacer zoom no vuelve a dibujar bloques. Un
+clic o un arrastre sobre el minimapa centra la vista en ese punto.
+"""
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QEvent, QRect, QRectF, QPointF, QTimer
+from PyQt5.QtGui import QColor, QImage, QPainter, QPen, QTransform
+
+import profiling
+
+WIDTH = 220
+HEIGHT = 160
+CORNER = 12            # separación del minimapa a la esquina de la vista
+FRAME_MS = 16          # las zonas cambiadas se aplican a lo sumo una vez por cuadro
+RESCALE_MS = 250       # la escala nueva se aplica cuando la escena deja de crecer
+FULL_FRACTION = 0.3    # si lo cambiado cubre más que esto se rehace todo
+MIN_BLOCK = 2.0        # lado mínimo de un bloque en la miniatura (píxeles)
+
+BACKGROUND = QColor(250, 250, 250, 235)
+LINE_COLOR = QColor(150, 150, 150)
+VIEWPORT_COLOR = QColor(255, 152, 0)
+
+
+def grow_scene(scene, rects, margin):
+    """Amplía la escena (nunca la reduce) para contener los rectángulos
+
+    Se conecta a QGraphicsScene.changed para que la escena crezca mientras
+    se arrastra un bloque hacia el borde, no sólo al soltarlo.
+    """
+    current = scene.sceneRect()
+    needed = QRectF(current)
+    for rect in rects:
+        if not current.contains(rect):
+            needed = needed.united(rect.adjusted(-margin, -margin, margin, margin))
+    if needed != current:
+        scene.setSceneRect(needed)
+
+
+class Minimap(QWidget):
+    """Vista general superpuesta en la esquina inferior derecha de una vista
+
+    color_of(item) devuelve el color de un bloque o None; line_of(item), el
+    QLineF de una conexión o None. Los demás elementos no se dibujan.
+    """
+
+    def __init__(self, view, color_of, line_of):
+        super().__init__(view)
+        self.view = view
+        self.scene = view.scene()
+        self.color_of = color_of
+        self.line_of = line_of
+        self.image = None          # None: hay que rehacer la miniatura completa
+        self.transform = QTransform()
+        self.dirty = []
+
+        self.setFixedSize(WIDTH, HEIGHT)
+        self.setCursor(Qt.PointingHandCursor)
+        self.setToolTip('Clic o arrastre para desplazar la vista')
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(FRAME_MS)
+        self.timer.timeout.connect(self.flush)
+        self.rescale_timer = QTimer(self)
+        self.rescale_timer.setSingleShot(True)
+        self.rescale_timer.setInterval(RESCALE_MS)
+        self.rescale_timer.timeout.connect(self.invalidate)
+
+        self.scene.changed.connect(self.scene_changed)
+        self.scene.sceneRectChanged.connect(self.rescale_timer.start)
+        for bar in (view.horizontalScrollBar(), view.verticalScrollBar()):
+            bar.valueChanged.connect(self.update)
+            bar.rangeChanged.connect(self.update)
+        # La vista acomoda su área visible después de recibir su propio Resize
+        view.viewport().installEventFilter(self)
+        self.place()
+
+    # Miniatura ---------------------------------------------------------------
+
+    def invalidate(self):
+        self.image = None
+        self.dirty.clear()
+        self.schedule()
+
+    def scene_changed(self, rects):
+        if self.image is None:
+            return
+        self.dirty.extend(rects)
+        self.schedule()
+
+    def schedule(self):
+        if self.isVisible() and not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """Aplica las zonas cambiadas desde el último cuadro"""
+        if self.image is None:
+            self.rebuild()
+        elif self.dirty:
+            rects = [self.transform.mapRect(rect).toAlignedRect().adjusted(-2, -2, 2, 2)
+                     & self.image.rect() for rect in self.dirty]
+            self.dirty.clear()
+            rects = [rect for rect in rects if not rect.isEmpty()]
+            area = sum(rect.width() * rect.height() for rect in rects)
+            if area > FULL_FRACTION * WIDTH * HEIGHT:
+                self.rebuild()
+            else:
+                with profiling.span('minimapa.zonas'):
+                    painter = QPainter(self.image)
+                    inverse = self.transform.inverted()[0]
+                    # Los bloques agrandados a MIN_BLOCK ocupan más que su rectángulo
+                    pad = MIN_BLOCK / self.transform.m11()
+                    for rect in rects:
+                        painter.setClipRect(rect)
+                        region = inverse.mapRect(QRectF(rect)).adjusted(-pad, -pad, pad, pad)
+                        self.draw(painter, rect, self.scene.items(
+                            region, Qt.IntersectsItemBoundingRect, Qt.AscendingOrder))
+                    painter.end()
+        self.update()
+
+    def rebuild(self):
+        """Rehace la miniatura completa con la escala de la escena actual"""
+        with profiling.span('minimapa.completo'):
+            scene_rect = self.scene.sceneRect()
+            scale = min(WIDTH / max(scene_rect.width(), 1.0),
+                        HEIGHT / max(scene_rect.height(), 1.0))
+            dx = (WIDTH - scene_rect.width() * scale) / 2
+            dy = (HEIGHT - scene_rect.height() * scale) / 2
+            self.transform = QTransform(scale, 0, 0, scale,
+                                        dx - scene_rect.x() * scale,
+                                        dy - scene_rect.y() * scale)
+            self.image = QImage(WIDTH, HEIGHT, QImage.Format_ARGB32_Premultiplied)
+            self.dirty.clear()
+            painter = QPainter(self.image)
+            self.draw(painter, self.image.rect(), self.scene.items(Qt.AscendingOrder))
+            painter.end()
+
+    def draw(self, painter, target, items):
+        """Borra target (píxeles) y dibuja encima los elementos indicados"""
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(target, BACKGROUND)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+
+        lines = []
+        blocks = {}
+        for item in items:
+            line = self.line_of(item)
+            if line is not None:
+                lines.append(line)
+                continue
+            color = self.color_of(item)
+            if color is not None:
+                # Rectángulo mínimo para que los bloques no desaparezcan al alejar
+                rect = self.transform.mapRect(item.sceneBoundingRect())
+                grow_x = max(MIN_BLOCK - rect.width(), 0.0) / 2
+                grow_y = max(MIN_BLOCK - rect.height(), 0.0) / 2
+                blocks.setdefault(color.rgba(), []).append(
+                    rect.adjusted(-grow_x, -grow_y, grow_x, grow_y))
+
+        if lines:
+            painter.save()
+            painter.setTransform(self.transform)
+            pen = QPen(LINE_COLOR, 1)
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.drawLines(lines)
+            painter.restore()
+        # Orden fijo de colores: una zona redibujada queda igual que la imagen completa
+        painter.setPen(Qt.NoPen)
+        for rgba, rects in sorted(blocks.items()):
+            painter.setBrush(QColor.fromRgba(rgba))
+            painter.drawRects(rects)
+
+    # Widget ------------------------------------------------------------------
+
+    def place(self):
+        """Ubica el minimapa en la esquina inferior derecha del área visible"""
+        area = self.view.viewport().geometry()
+        self.move(area.right() - WIDTH - CORNER + 1, area.bottom() - HEIGHT - CORNER + 1)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Resize:
+            self.place()
+        return False
+
+    def showEvent(self, event):
+        # Oculto no sigue los cambios: al volver a mostrarse se rehace
+        self.image = None
+        self.schedule()
+
+    def visible_rect(self):
+        """Zona de la escena que muestra la vista, en píxeles del minimapa"""
+        area = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        return self.transform.mapRect(area)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self.image is not None:
+            painter.drawImage(0, 0, self.image)
+            painter.setPen(QPen(VIEWPORT_COLOR, 2))
+            painter.setBrush(QColor(255, 152, 0, 30))
+            painter.drawRect(self.visible_rect() & QRectF(self.rect()).adjusted(1, 1, -1, -1))
+        painter.setPen(QPen(QColor(120, 120, 120), 1))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRect(QRect(0, 0, WIDTH - 1, HEIGHT - 1))
+
+    def navigate(self, point):
+        inverse = self.transform.inverted()[0]
+        self.view.centerOn(inverse.map(QPointF(point)))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self.image is not None:
+            self.navigate(event.pos())
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton and self.image is not None:
+            self.navigate(event.pos())
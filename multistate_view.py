@@ -0,0 +1,83 @@
+"""Vista de la distribución de capacidad del sistema multiestado"""
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
+                             QPushButton, QDoubleSpinBox, QTextEdit)
+
+import ugf
+
+
+class MultiStateDialog(QDialog):
+    """Distribución de capacidad, capacidad esperada y disponibilidad ante la demanda"""
+
+    def __init__(self, design, parent=None):
+        super().__init__(parent)
+        self.design = design
+        self.setWindowTitle('Análisis Multiestado')
+        self.setMinimumSize(600, 500)
+        self.init_ui()
+        self.calculate()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        form = QFormLayout()
+        self.time_input = QDoubleSpinBox()
+        self.time_input.setRange(1, 1000000)
+        self.time_input.setValue(1000)
+        self.time_input.setSuffix(' horas')
+        self.time_input.valueChanged.connect(self.calculate)
+        form.addRow('Tiempo de misión:', self.time_input)
+
+        self.demand_input = QDoubleSpinBox()
+        self.demand_input.setDecimals(3)
+        self.demand_input.setRange(0, 1e9)
+        self.demand_input.setValue(0)
+        self.demand_input.setSpecialValueText('Sin demanda')
+        self.demand_input.valueChanged.connect(self.calculate)
+        form.addRow('Demanda:', self.demand_input)
+        layout.addLayout(form)
+
+        self.results = QTextEdit()
+        self.results.setReadOnly(True)
+        layout.addWidget(self.results)
+
+        btn_layout = QHBoxLayout()
+        close_btn = QPushButton('Cerrar')
+        close_btn.clicked.connect(self.close)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        self.setLayout(layout)
+
+    def calculate(self):
+        """Recalcula; en diagramas grandes tarda milisegundos"""
+        demand = self.demand_input.value() or None
+        try:
+            result = ugf.analyze(self.design, self.time_input.value(), demand)
+        except ValueError as e:
+            self.results.setHtml(f'<p style="color: #F44336;">{e}</p>')
+            return
+
+        html = '<h3>Distribución de Capacidad del Sistema</h3>'
+        html += f'<p><b>Capacidad esperada: {result["expected"]:.4f}</b><br>'
+        if demand is None:
+            html += f'<b>Probabilidad de entregar capacidad: {result["availability"]:.6f}</b></p>'
+        else:
+            html += (f'<b>P(capacidad ≥ {demand:g}): {result["availability"]:.6f}</b><br>'
+                     f'Déficit esperado: {result["deficiency"]:.4f}</p>')
+
+        html += '<table border="1" cellpadding="4" cellspacing="0" width="100%">'
+        html += '<tr style="background-color: #2196F3; color: white;">'
+        html += '<th>Capacidad</th><th>Probabilidad</th><th>P(capacidad ≥ g)</th></tr>'
+        survival = 1.0
+        for value, probability in zip(result['values'], result['probabilities']):
+            html += (f'<tr><td>{value:g}</td><td>{probability:.6e}</td>'
+                     f'<td>{max(survival, 0.0):.6f}</td></tr>')
+            survival -= probability
+        html += '</table>'
+        html += f'<p>{result["terms"]} niveles de capacidad</p>'
+        if result['removed_edges']:
+            html += ('<p style="color: #FF9800;">Se descartaron conexiones que cierran ciclos; '
+                     'los caminos que pasaban por ellas no se consideran: ' + ', '.join(
+                         f'{a} → {b}' for a, b in result['removed_edges']) + '</p>')
+        self.results.setHtml(html)
@@ -0,0 +1,231 @@
+"""Instrumentación de rutas críticas: temporizadores, contadores y trazas
+
+Desactivada por defecto; en ese estado span() devuelve un contexto nulo
+compartido y los decoradores sólo agregan una comprobación de bandera. Se
+activa con enable() o con la variable de entorno MTBF_PROFILE=1.
+
+    with profiling.span('markov.resolver'):
+        ...
+
+    @profiling.timed('paint.bloque')
+    def paint(self, painter, option, widget):
+        ...
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+enabled = os.environ.get('MTBF_PROFILE', '') not in ('', '0')
+
+# Eventos para la traza de Chrome (acotados para no crecer sin límite)
+MAX_TRACE_EVENTS = 200000
+_trace = deque(maxlen=MAX_TRACE_EVENTS)
+_stages = {}
+_counters = {}
+_lock = threading.Lock()
+_origin = time.perf_counter()
+
+# Cubetas del histograma: potencias de 2 en microsegundos (1 µs ... ~18 min)
+HISTOGRAM_BUCKETS = 31
+
+
+class Stage:
+    """Estadísticas acumuladas de una etapa"""
+
+    __slots__ = ('name', 'count', 'total', 'min', 'max', 'last', 'histogram')
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.last = 0.0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.last = duration
+        if duration < self.min:
+            self.min = duration
+        if duration > self.max:
+            self.max = duration
+        bucket = min(int(duration * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)
+        self.histogram[bucket] += 1
+
+    def percentile(self, q):
+        """Percentil aproximado (s) a partir del histograma"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bucket, hits in enumerate(self.histogram):
+            seen += hits
+            if seen >= target:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'min_ms': self.min * 1000 if self.count else 0.0,
+            'max_ms': self.max * 1000,
+            'p50_ms': self.percentile(0.5) * 1000,
+            'p95_ms': self.percentile(0.95) * 1000,
+            'histogram_us_log2': list(self.histogram),
+        }
+
+
+def record(name, start, duration):
+    """Registra una medición ya tomada (start en segundos de perf_counter)"""
+    with _lock:
+        stage = _stages.get(name)
+        if stage is None:
+            stage = _stages[name] = Stage(name)
+        stage.add(duration)
+        _trace.append((name, start, duration, threading.get_ident()))
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Contexto que mide la duración de un bloque de código"""
+    return _Span(name) if enabled else _NULL_SPAN
+
+
+def timed(name):
+    """Decorador que mide cada llamada a la función"""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, start, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    """Incrementa un contador"""
+    if enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def enable(flag=True):
+    global enabled
+    enabled = bool(flag)
+
+
+def reset():
+    """Descarta todas las mediciones"""
+    with _lock:
+        _trace.clear()
+        _stages.clear()
+        _counters.clear()
+
+
+def memory_usage():
+    """Memoria residente actual del proceso en bytes (None si no se puede leer)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss está en KiB en Linux y en bytes en macOS
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+def snapshot():
+    """Estado actual de etapas, contadores y memoria"""
+    with _lock:
+        stages = {name: stage.to_dict() for name, stage in _stages.items()}
+        counters = dict(_counters)
+    return {
+        'enabled': enabled,
+        'stages': stages,
+        'counters': counters,
+        'memory_bytes': memory_usage(),
+        'trace_events': len(_trace),
+    }
+
+
+def export_json(path):
+    """Guarda el resumen de etapas y contadores en JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+def export_chrome_trace(path):
+    """Guarda las mediciones en formato Chrome Trace (chrome://tracing, Perfetto)"""
+    pid = os.getpid()
+    with _lock:
+        events = list(_trace)
+        counters = dict(_counters)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+        for i, (name, start, duration, tid) in enumerate(events):
+            if i:
+                f.write(',\n')
+            json.dump({
+                'name': name,
+                'cat': name.split('.', 1)[0],
+                'ph': 'X',
+                'ts': (start - _origin) * 1e6,
+                'dur': duration * 1e6,
+                'pid': pid,
+                'tid': tid,
+            }, f)
+        if counters:
+            if events:
+                f.write(',\n')
+            json.dump({
+                'name': 'contadores',
+                'ph': 'C',
+                'ts': (time.perf_counter() - _origin) * 1e6,
+                'pid': pid,
+                'args': counters,
+            }, f)
+        f.write('\n]}\n')
@@ -0,0 +1,207 @@
+"""Panel acoplable con las mediciones de profiling.py"""
+
+import time
+
+from PyQt5.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QHBoxLayout,
+                             QPushButton, QLabel, QCheckBox, QTableWidget,
+                             QTableWidgetItem, QFileDialog, QHeaderView)
+from PyQt5.QtCore import Qt, QObject, QEvent, QTimer, QRectF
+from PyQt5.QtGui import QPainter, QColor
+
+import profiling
+
+COLUMNS = ['Etapa', 'Llamadas', 'Media (ms)', 'p50 (ms)', 'p95 (ms)', 'Máx (ms)']
+
+
+class FrameTimer(QObject):
+    """Mide el tiempo de pintado del viewport de una vista
+
+    El filtro recibe el evento Paint antes de que se dibuje; el temporizador
+    de disparo inmediato se ejecuta al volver al bucle de eventos, es decir
+    cuando el cuadro ya terminó.
+    """
+
+    def __init__(self, viewport):
+        super().__init__(viewport)
+        self.start = None
+        viewport.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and profiling.enabled and self.start is None:
+            self.start = time.perf_counter()
+            QTimer.singleShot(0, self.finish)
+        return False
+
+    def finish(self):
+        if self.start is not None:
+            profiling.record('frame', self.start, time.perf_counter() - self.start)
+            self.start = None
+
+
+class HistogramView(QWidget):
+    """Histograma de latencias (cubetas log2 en µs) de una etapa"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.histogram = []
+        self.setMinimumHeight(90)
+
+    def set_histogram(self, histogram):
+        self.histogram = histogram
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.white)
+        used = [i for i, hits in enumerate(self.histogram) if hits]
+        if not used:
+            painter.drawText(self.rect(), Qt.AlignCenter, 'Sin datos')
+            return
+
+        first, last = used[0], used[-1]
+        buckets = self.histogram[first:last + 1]
+        peak = max(buckets)
+        width = self.width() / len(buckets)
+        height = self.height() - 16
+
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor('#2196F3'))
+        for i, hits in enumerate(buckets):
+            h = height * hits / peak
+            painter.drawRect(QRectF(i * width + 1, height - h, width - 2, h))
+
+        painter.setPen(QColor('#757575'))
+        painter.drawText(QRectF(0, height, self.width(), 16), Qt.AlignLeft,
+                         format_us(1 << max(first - 1, 0)))
+        painter.drawText(QRectF(0, height, self.width(), 16), Qt.AlignRight,
+                         format_us(1 << last))
+
+
+def format_us(us):
+    if us >= 1e6:
+        return f'{us / 1e6:.1f} s'
+    if us >= 1e3:
+        return f'{us / 1e3:.1f} ms'
+    return f'{us} µs'
+
+
+class ProfilerDock(QDockWidget):
+    """Tiempo por cuadro, latencia por etapa, memoria y exportación de trazas"""
+
+    def __init__(self, view=None, parent=None):
+        super().__init__('Perfilado', parent)
+        self.setObjectName('profilerDock')
+        if view is not None:
+            self.frame_timer = FrameTimer(view.viewport())
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+
+        self.enable_check = QCheckBox('Activar instrumentación')
+        self.enable_check.setChecked(profiling.enabled)
+        self.enable_check.toggled.connect(self.set_enabled)
+        layout.addWidget(self.enable_check)
+
+        self.frame_label = QLabel()
+        self.memory_label = QLabel()
+        layout.addWidget(self.frame_label)
+        layout.addWidget(self.memory_label)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.itemSelectionChanged.connect(self.refresh_histogram)
+        layout.addWidget(self.table)
+
+        self.histogram = HistogramView()
+        layout.addWidget(self.histogram)
+
+        btn_layout = QHBoxLayout()
+        btn_reset = QPushButton('Reiniciar')
+        btn_reset.clicked.connect(self.reset)
+        btn_trace = QPushButton('Chrome trace')
+        btn_trace.clicked.connect(self.export_trace)
+        btn_json = QPushButton('JSON')
+        btn_json.clicked.connect(self.export_json)
+        btn_layout.addWidget(btn_reset)
+        btn_layout.addWidget(btn_trace)
+        btn_layout.addWidget(btn_json)
+        layout.addLayout(btn_layout)
+
+        self.setWidget(widget)
+
+        self.snapshot = {}
+        self.timer = QTimer(self)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+        self.refresh()
+
+    def set_enabled(self, flag):
+        profiling.enable(flag)
+        self.refresh()
+
+    def reset(self):
+        profiling.reset()
+        self.refresh()
+
+    def refresh(self):
+        # No gastar tiempo en actualizar un panel oculto
+        if not self.isVisible() and self.snapshot:
+            return
+        self.snapshot = profiling.snapshot()
+        stages = self.snapshot['stages']
+
+        frame = stages.get('frame')
+        if frame and frame['count']:
+            fps = 1000 / frame['mean_ms'] if frame['mean_ms'] else 0
+            self.frame_label.setText(
+                f'Cuadro: {frame["mean_ms"]:.2f} ms media, '
+                f'{frame["p95_ms"]:.2f} ms p95 (~{fps:.0f} cuadros/s posibles)')
+        else:
+            self.frame_label.setText('Cuadro: sin mediciones')
+
+        memory = self.snapshot['memory_bytes']
+        self.memory_label.setText(
+            f'Memoria: {memory / 2**20:.1f} MiB' if memory else 'Memoria: no disponible')
+
+        selected = self.selected_stage()
+        names = sorted(stages, key=lambda s: stages[s]['total_ms'], reverse=True)
+        self.table.setRowCount(len(names))
+        for row, name in enumerate(names):
+            stage = stages[name]
+            values = [name, str(stage['count']), f'{stage["mean_ms"]:.3f}',
+                      f'{stage["p50_ms"]:.3f}', f'{stage["p95_ms"]:.3f}',
+                      f'{stage["max_ms"]:.3f}']
+            for col, value in enumerate(values):
+                item = self.table.item(row, col)
+                if item is None:
+                    item = QTableWidgetItem()
+                    self.table.setItem(row, col, item)
+                item.setText(value)
+            if name == selected:
+                self.table.selectRow(row)
+        self.refresh_histogram()
+
+    def selected_stage(self):
+        items = self.table.selectedItems()
+        return self.table.item(items[0].row(), 0).text() if items else None
+
+    def refresh_histogram(self):
+        stage = self.snapshot.get('stages', {}).get(self.selected_stage())
+        self.histogram.set_histogram(stage['histogram_us_log2'] if stage else [])
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, 'Exportar traza', 'traza.json',
+                                              'Chrome trace (*.json)')
+        if path:
+            profiling.export_chrome_trace(path)
+
+    def export_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, 'Exportar mediciones',
+                                              'perfilado.json', 'JSON (*.json)')
+        if path:
+            profiling.export_json(path)
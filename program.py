@@ -0,0 +1,264 @@
+"""Compilación del diagrama a un programa NumPy plano (sin Qt)
+
+El diseño (bloques, subsistemas y si hay conexiones) se traduce una vez a
+una lista de instrucciones en orden topológico; la instrucción i escribe el
+registro i:
+
+    ops         código de operación de cada instrucción: el índice del tipo
+                de bloque en LEAF_TYPES o SERIES
+    operands    registros que combina cada SERIES (formato CSR: operand_ptr)
+    slots       columnas del vector de parámetros que lee cada hoja (CSR:
+                slot_ptr), en el orden de DEFAULTS de su tipo
+    outputs     registro de cada bloque de nivel superior
+
+Los parámetros quedan fuera del programa, en un vector (o una matriz con un
+vector por fila): evaluar otros valores, o miles a la vez, no recorre ningún
+dict ni objeto por bloque. Las hojas del mismo tipo se evalúan juntas con
+block_mtbf_array y las series del mismo nivel con un solo np.add.reduceat.
+
+Sólo un cambio de estructura (tipos de bloque, subsistemas usados, presencia
+de conexiones) obliga a recompilar; ProgramCache reconoce la estructura por
+structure_key() y, si ya la tiene, sólo vuelve a leer los parámetros.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+from reliability import (BLOCK_TYPES, DEFAULT_TIMES, DEFAULTS, block_mtbf_array,
+                         get_param, normalize_type)
+
+SUBSYSTEM_TYPE = 'Subsistema'
+LEAF_TYPES = tuple(dict.fromkeys(normalize_type(t) for t in BLOCK_TYPES))
+SERIES = len(LEAF_TYPES)
+CACHE_SIZE = 8
+
+
+def _leaf_type(block):
+    block_type = normalize_type(block['type'])
+    return block_type if block_type in LEAF_TYPES else None
+
+
+def _structure(blocks, definitions, seen):
+    # Tipo de cada bloque, o el subsistema al que remite
+    items = []
+    for block in blocks:
+        if block.get('type') == SUBSYSTEM_TYPE:
+            name = block['params']['subsystem']
+            items.append(['S', name])
+            if name not in seen:
+                seen[name] = None
+                definition = definitions.get(name, {})
+                seen[name] = _structure(definition.get('blocks', []), definitions, seen)
+        else:
+            items.append(normalize_type(block['type']))
+    return items
+
+
+def structure_key(design):
+    """Huella de todo lo que define el programa, sin los valores de parámetros"""
+    seen = {}
+    top = _structure(design.get('blocks', []), design.get('subsystems') or {}, seen)
+    text = json.dumps([top, bool(design.get('connections')), seen], sort_keys=True)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class Program:
+    """Programa compilado de un diseño y su vector de parámetros por defecto"""
+
+    def __init__(self, design):
+        self.definitions = design.get('subsystems') or {}
+        self.series = bool(design.get('connections'))
+        self.key = structure_key(design)
+        ops = []
+        operands, operand_ptr = [], [0]
+        slots, slot_ptr = [], [0]
+        self.slot_names = []     # (subsistema o '', índice del bloque, parámetro)
+        self._compiled = {}      # subsistema -> registro de su serie
+        self._sources = []       # (subsistema o '', índice, tipo) de cada hoja
+
+        def emit(op, children=(), block_slots=()):
+            ops.append(op)
+            operands.extend(children)
+            operand_ptr.append(len(operands))
+            slots.extend(block_slots)
+            slot_ptr.append(len(slots))
+            return len(ops) - 1
+
+        def compile_blocks(blocks, owner, stack):
+            registers = []
+            for index, block in enumerate(blocks):
+                if block.get('type') == SUBSYSTEM_TYPE:
+                    registers.append(compile_subsystem(block['params']['subsystem'], stack))
+                    continue
+                block_type = _leaf_type(block)
+                if block_type is None:
+                    raise ValueError(f'Tipo de bloque desconocido: {block["type"]}')
+                first = len(self.slot_names)
+                for key in DEFAULTS[block_type]:
+                    self.slot_names.append((owner, index, key))
+                self._sources.append((owner, index, block_type))
+                registers.append(emit(LEAF_TYPES.index(block_type),
+                                      block_slots=range(first, len(self.slot_names))))
+            return registers
+
+        def compile_subsystem(name, stack):
+            if name in stack:
+                raise ValueError(f'Subsistema recursivo: {name}')
+            if name not in self._compiled:
+                if name not in self.definitions:
+                    raise ValueError(f'Subsistema no definido: {name}')
+                inner = self.definitions[name].get('blocks', [])
+                children = compile_blocks(inner, name, stack + (name,))
+                self._compiled[name] = emit(SERIES, children)
+            return self._compiled[name]
+
+        self.outputs = np.array(compile_blocks(design.get('blocks', []), '', ()),
+                                dtype=np.int64)
+        self.ops = np.array(ops, dtype=np.int8)
+        self.operands = np.array(operands, dtype=np.int64)
+        self.operand_ptr = np.array(operand_ptr, dtype=np.int64)
+        self.slots = np.array(slots, dtype=np.int64)
+        self.slot_ptr = np.array(slot_ptr, dtype=np.int64)
+        self._slot_index = {name: i for i, name in enumerate(self.slot_names)}
+        self.values = self.load_params(design)
+        self._plan()
+
+    def _plan(self):
+        """Agrupa las instrucciones en pasos vectorizados
+
+        Las hojas se agrupan por tipo. Una serie queda en el nivel siguiente
+        al más alto de sus operandos; las de un mismo nivel van en un paso.
+        """
+        count = self.ops.size
+        level = np.zeros(count, dtype=np.int64)
+        for i in np.flatnonzero(self.ops == SERIES):  # orden topológico
+            children = self.operands[self.operand_ptr[i]:self.operand_ptr[i + 1]]
+            level[i] = 1 + (level[children].max() if children.size else 0)
+        self.steps = []
+        for op in range(len(LEAF_TYPES)):
+            registers = np.flatnonzero(self.ops == op)
+            if registers.size:
+                width = len(DEFAULTS[LEAF_TYPES[op]])
+                columns = self.slots[self.slot_ptr[registers][:, None] + np.arange(width)]
+                self.steps.append((op, registers, columns))
+        series = np.flatnonzero(self.ops == SERIES)
+        for depth in range(1, int(level.max(initial=0)) + 1):
+            registers = series[level[series] == depth]
+            sizes = self.operand_ptr[registers + 1] - self.operand_ptr[registers]
+            empty = registers[sizes == 0]  # subsistema vacío: MTBF 0
+            registers = registers[sizes > 0]
+            sizes = sizes[sizes > 0]
+            operands = np.concatenate(
+                [self.operands[self.operand_ptr[r]:self.operand_ptr[r + 1]] for r in registers]
+                or [np.zeros(0, dtype=np.int64)])
+            offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+            self.steps.append((SERIES, registers, (operands, offsets, empty)))
+
+    @property
+    def size(self):
+        return self.ops.size
+
+    def load_params(self, design):
+        """Vector de parámetros con los valores actuales del diseño"""
+        definitions = design.get('subsystems') or {}
+        values = np.empty(len(self.slot_names))
+        position = 0
+        for owner, index, block_type in self._sources:
+            blocks = (definitions[owner] if owner else design).get('blocks', [])
+            params = blocks[index].get('params', {})
+            for key in DEFAULTS[block_type]:
+                values[position] = get_param(block_type, params, key)
+                position += 1
+        return values
+
+    def slot(self, index, key, owner=''):
+        """Columna del parámetro `key` del bloque `index` (de un subsistema)"""
+        try:
+            return self._slot_index[(owner, index, key)]
+        except KeyError:
+            raise KeyError(f'El bloque {index} no tiene el parámetro {key}')
+
+    def run(self, values=None):
+        """Registros (instrucciones × vectores) para una matriz de parámetros"""
+        values = self.values if values is None else np.asarray(values, dtype=float)
+        values = np.atleast_2d(values)
+        batch = values.shape[0]
+        registers = np.zeros((self.size, batch))
+        for op, targets, data in self.steps:
+            if op == SERIES:
+                operands, offsets, empty = data
+                registers[empty] = 0.0
+                if not targets.size:
+                    continue
+                mtbfs = registers[operands]
+                with np.errstate(divide='ignore'):
+                    rates = np.where(mtbfs > 0, 1 / np.where(mtbfs > 0, mtbfs, 1), 0.0)
+                total = np.add.reduceat(rates, offsets, axis=0)
+                with np.errstate(divide='ignore'):
+                    registers[targets] = np.where(total > 0, 1 / np.where(total > 0, total, 1), 0.0)
+            else:
+                block_type = LEAF_TYPES[op]
+                # Columnas (hojas·vectores,) en el orden de DEFAULTS del tipo
+                columns = {key: values[:, data[:, j]].T.ravel()
+                           for j, key in enumerate(DEFAULTS[block_type])}
+                registers[targets] = block_mtbf_array(block_type, columns).reshape(-1, batch)
+        return registers
+
+    def evaluate(self, values=None, times=DEFAULT_TIMES):
+        """MTBF de los bloques y del sistema para uno o varios vectores
+
+        Devuelve arrays con una fila por vector: 'blocks' (vectores × bloques)
+        y, con conexiones, 'mtbf', 'lambda' y 'reliability' (vectores ×
+        tiempos) de la serie; sin conexiones, 'mean', 'min' y 'max'.
+        """
+        mtbfs = self.run(values)[self.outputs].T
+        result = {'blocks': mtbfs}
+        if self.series:
+            with np.errstate(divide='ignore'):
+                rates = np.where(mtbfs > 0, 1 / np.where(mtbfs > 0, mtbfs, 1), 0.0)
+                lam = rates.sum(axis=1)
+                result['lambda'] = lam
+                result['mtbf'] = np.where(lam > 0, 1 / np.where(lam > 0, lam, 1), 0.0)
+            times = np.asarray(times, dtype=float)
+            result['times'] = times
+            result['reliability'] = np.exp(-lam[:, None] * times[None, :])
+        elif mtbfs.shape[1]:
+            result['mean'] = mtbfs.mean(axis=1)
+            result['min'] = mtbfs.min(axis=1)
+            result['max'] = mtbfs.max(axis=1)
+        return result
+
+
+class ProgramCache:
+    """Programas compilados por estructura; los más usados se conservan"""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.programs = OrderedDict()
+        self.compilations = 0
+
+    def get(self, design):
+        """Programa del diseño con sus parámetros actuales cargados"""
+        key = structure_key(design)
+        program = self.programs.get(key)
+        if program is None:
+            program = Program(design)
+            self.compilations += 1
+            self.programs[key] = program
+            if len(self.programs) > self.size:
+                self.programs.popitem(last=False)
+        else:
+            self.programs.move_to_end(key)
+            program.values = program.load_params(design)
+        return program
+
+    def clear(self):
+        self.programs.clear()
+
+
+def compile_design(design):
+    """Atajo de Program(design)"""
+    return Program(design)
@@ -0,0 +1,478 @@
+"""Motor de cálculo de confiabilidad sin dependencias de Qt"""
+
+import math
+import numpy as np
+
+import profiling
+from standby import (chain_mtbf, chain_reliability, load_sharing_chain,
+                     standby_chain)
+
+# Tiempos usados en las tablas de R(t)
+DEFAULT_TIMES = (100, 500, 1000, 2000, 5000)
+
+# Alias de parámetros: main.py y mainpremi.py usan nombres distintos
+PARAM_ALIASES = {
+    'n': ('n_components', 'n_total', 'n'),
+    'k': ('k_required', 'k'),
+    'mtbf': ('mtbf_component', 'mtbf'),
+}
+
+# Valores por defecto de cada tipo de bloque
+DEFAULTS = {
+    'Componente Simple': {'lambda': 0.001},
+    'Serie': {'n': 2, 'mtbf': 1000},
+    'Paralelo': {'n': 2, 'mtbf': 1000},
+    'Redundancia k-de-n': {'n': 3, 'k': 2, 'mtbf': 1000},
+    'k-de-n': {'n': 3, 'k': 2, 'mtbf': 1000},
+    'Sistema con Mantenimiento': {'mtbf_base': 1000, 'maintenance_interval': 100},
+    # mtbf_standby = 0: reserva fría (las unidades en espera no fallan)
+    'Reserva en Espera': {'n': 2, 'mtbf': 1000, 'mtbf_standby': 0, 'switch_reliability': 1.0},
+    'Carga Compartida': {'n': 3, 'k': 2, 'mtbf': 1000, 'load_exponent': 1.0},
+}
+
+BLOCK_TYPES = tuple(DEFAULTS)
+CHAIN_TYPES = ('Reserva en Espera', 'Carga Compartida')
+
+
+def normalize_type(block_type):
+    """Unifica los nombres de tipo de ambas interfaces"""
+    if block_type == 'k-de-n':
+        return 'Redundancia k-de-n'
+    return block_type
+
+
+def get_param(block_type, params, key):
+    """Lee un parámetro aceptando los alias de ambas interfaces"""
+    for alias in PARAM_ALIASES.get(key, (key,)):
+        if alias in params:
+            return params[alias]
+    return DEFAULTS.get(block_type, {}).get(key, 0)
+
+
+def harmonic(n, k=1):
+    """Suma 1/k + 1/(k+1) + ... + 1/n"""
+    return sum(1/i for i in range(k, n+1))
+
+
+def block_mtbf(block_type, params):
+    """Calcula el MTBF de un bloque según su tipo y parámetros"""
+    block_type = normalize_type(block_type)
+
+    if block_type == 'Componente Simple':
+        # MTBF = 1/λ para tasa de fallo constante
+        lambda_val = get_param(block_type, params, 'lambda')
+        if lambda_val > 0:
+            return 1 / lambda_val
+        return float('inf')
+
+    elif block_type == 'Serie':
+        # Para sistema en serie: 1/MTBF_sys = Σ(1/MTBF_i)
+        n = get_param(block_type, params, 'n')
+        mtbf_comp = get_param(block_type, params, 'mtbf')
+        if mtbf_comp > 0:
+            return mtbf_comp / n
+        return 0
+
+    elif block_type == 'Paralelo':
+        # MTBF_sys ≈ MTBF_comp * (1 + 1/2 + 1/3 + ... + 1/n)
+        n = int(get_param(block_type, params, 'n'))
+        mtbf_comp = get_param(block_type, params, 'mtbf')
+        return mtbf_comp * harmonic(n)
+
+    elif block_type == 'Redundancia k-de-n':
+        # Sistema k-de-n: requiere al menos k de n componentes
+        n = int(get_param(block_type, params, 'n'))
+        k = int(get_param(block_type, params, 'k'))
+        mtbf_comp = get_param(block_type, params, 'mtbf')
+        if k <= n:
+            return mtbf_comp * harmonic(n, k)
+        return 0
+
+    elif block_type == 'Sistema con Mantenimiento':
+        # Con mantenimiento preventivo: MTBF_PM = ∫R(t)dt / (1-R(Y))
+        mtbf_base = get_param(block_type, params, 'mtbf_base')
+        interval = get_param(block_type, params, 'maintenance_interval')
+        lambda_val = 1 / mtbf_base if mtbf_base > 0 else 0.001
+        r_y = math.exp(-lambda_val * interval)
+        integral_r = mtbf_base * (1 - math.exp(-lambda_val * interval))
+        if r_y < 1:
+            return integral_r / (1 - r_y)
+        return mtbf_base
+
+    elif block_type == 'Reserva en Espera':
+        # Etapas con r unidades en espera: a = λ + r·λs; si falla la activa
+        # la conmutación funciona con probabilidad p (ver standby.py)
+        n = max(int(get_param(block_type, params, 'n')), 1)
+        mtbf_comp = get_param(block_type, params, 'mtbf')
+        standby = get_param(block_type, params, 'mtbf_standby')
+        p = min(max(get_param(block_type, params, 'switch_reliability'), 0.0), 1.0)
+        if mtbf_comp <= 0:
+            return 0
+        lam = 1 / mtbf_comp
+        lam_s = 1 / standby if standby > 0 else 0.0
+        total, reach = 0.0, 1.0
+        for spares in range(n - 1, -1, -1):
+            rate = lam + spares * lam_s
+            total += reach / rate
+            reach *= 1 - lam / rate * (1 - p)
+        return total
+
+    elif block_type == 'Carga Compartida':
+        # Con m unidades operando cada una falla con λ·(n/m)^γ
+        n = max(int(get_param(block_type, params, 'n')), 1)
+        k = max(int(get_param(block_type, params, 'k')), 1)
+        mtbf_comp = get_param(block_type, params, 'mtbf')
+        gamma = get_param(block_type, params, 'load_exponent')
+        if k > n or mtbf_comp <= 0:
+            return 0
+        return sum(mtbf_comp / (m * (n / m) ** gamma) for m in range(k, n + 1))
+
+    return 0
+
+
+def _chain(block_type, col):
+    """Cadena de etapas de los bloques de standby.py"""
+    if block_type == 'Reserva en Espera':
+        return standby_chain(col('n'), col('mtbf'), col('mtbf_standby'),
+                             col('switch_reliability'))
+    return load_sharing_chain(col('n'), col('k'), col('mtbf'), col('load_exponent'))
+
+
+def _harmonic_table(n_max):
+    """Tabla acumulada H[i] = 1 + 1/2 + ... + 1/i (H[0] = 0)"""
+    table = np.zeros(int(n_max) + 1)
+    if n_max > 0:
+        table[1:] = np.cumsum(1.0 / np.arange(1, int(n_max) + 1))
+    return table
+
+
+def params_columns(block_type, params_list, extra_keys=()):
+    """Convierte una lista de dicts de parámetros en columnas NumPy
+
+    Se incluyen los parámetros que usa el tipo de bloque más extra_keys; los
+    que faltan toman el valor por defecto (0 para los extra).
+    """
+    block_type = normalize_type(block_type)
+    keys = list(DEFAULTS.get(block_type, {})) + list(extra_keys)
+    return {
+        key: np.array([get_param(block_type, p, key) for p in params_list], dtype=float)
+        for key in keys
+    }
+
+
+def block_mtbf_array(block_type, columns):
+    """Versión vectorizada de block_mtbf
+
+    columns es un dict {parámetro: array}; todas las columnas deben tener
+    la misma longitud. Devuelve un array con el MTBF de cada fila.
+    """
+    block_type = normalize_type(block_type)
+    size = len(next(iter(columns.values()))) if columns else 0
+
+    def col(key):
+        for alias in PARAM_ALIASES.get(key, (key,)):
+            if alias in columns:
+                return np.asarray(columns[alias], dtype=float)
+        return np.full(size, float(DEFAULTS.get(block_type, {}).get(key, 0)))
+
+    if block_type == 'Componente Simple':
+        lam = col('lambda')
+        with np.errstate(divide='ignore'):
+            return np.where(lam > 0, 1 / np.where(lam > 0, lam, 1), np.inf)
+
+    elif block_type == 'Serie':
+        n = col('n')
+        mtbf_comp = col('mtbf')
+        return np.where(mtbf_comp > 0, mtbf_comp / n, 0.0)
+
+    elif block_type in ('Paralelo', 'Redundancia k-de-n'):
+        n = col('n').astype(int)
+        k = col('k').astype(int) if block_type == 'Redundancia k-de-n' else np.ones(size, dtype=int)
+        mtbf_comp = col('mtbf')
+        table = _harmonic_table(n.max() if size else 0)
+        valid = k <= n
+        # k > n se descarta con valid, pero el índice no debe salirse de la tabla
+        factor = table[n] - table[np.clip(k - 1, 0, n)]
+        return np.where(valid, mtbf_comp * factor, 0.0)
+
+    elif block_type == 'Sistema con Mantenimiento':
+        mtbf_base = col('mtbf_base')
+        interval = col('maintenance_interval')
+        lam = np.where(mtbf_base > 0, 1 / np.where(mtbf_base > 0, mtbf_base, 1), 0.001)
+        r_y = np.exp(-lam * interval)
+        integral_r = mtbf_base * (1 - r_y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(r_y < 1, integral_r / (1 - r_y), mtbf_base)
+
+    elif block_type in CHAIN_TYPES:
+        return chain_mtbf(*_chain(block_type, col))
+
+    return np.zeros(size)
+
+
+def block_reliability_array(block_type, columns, times):
+    """R(t) de cada fila de columns en los tiempos dados (filas × tiempos)
+
+    A diferencia de las tablas, que usan exp(-t/MTBF) para todos los
+    bloques, aquí cada tipo tiene su distribución: serie de n componentes
+    exponenciales, paralelo, k-de-n (binomial), mantenimiento preventivo
+    periódico (renovación cada intervalo) y las cadenas de standby.py.
+    """
+    block_type = normalize_type(block_type)
+    size = len(next(iter(columns.values()))) if columns else 0
+    t = np.asarray(times, dtype=float)[None, :]
+
+    def col(key):
+        for alias in PARAM_ALIASES.get(key, (key,)):
+            if alias in columns:
+                return np.asarray(columns[alias], dtype=float)[:, None]
+        return np.full((size, 1), float(DEFAULTS.get(block_type, {}).get(key, 0)))
+
+    def exposure(mtbf):
+        # t/MTBF; un MTBF no positivo es un bloque siempre fallado (también en t = 0)
+        return np.where(mtbf > 0, t / np.where(mtbf > 0, mtbf, 1), np.inf)
+
+    if block_type == 'Componente Simple':
+        return np.exp(-np.clip(col('lambda'), 0, None) * t)
+
+    elif block_type == 'Serie':
+        return np.exp(-col('n') * exposure(col('mtbf')))
+
+    elif block_type == 'Paralelo':
+        # 1 - (1 - p)^n escrito con expm1/log1p para no perder la cola
+        p = np.exp(-exposure(col('mtbf')))
+        with np.errstate(divide='ignore'):
+            return -np.expm1(col('n') * np.log1p(-p))
+
+    elif block_type == 'Redundancia k-de-n':
+        n = col('n').astype(int)
+        k = col('k').astype(int)
+        p = np.exp(-exposure(col('mtbf')))
+        q = -np.expm1(-exposure(col('mtbf')))
+        result = np.zeros((size, t.size))
+        for j in range(int(n.max()) + 1 if size else 0):
+            # Σ_{j=k}^{n} C(n, j) p^j q^(n-j)
+            coefficient = np.array([[math.comb(int(ni), j) for ni in n[:, 0]]]).T
+            term = coefficient * p ** j * q ** np.clip(n - j, 0, None)
+            result += np.where((j >= k) & (j <= n), term, 0.0)
+        return result
+
+    elif block_type == 'Sistema con Mantenimiento':
+        base = col('mtbf_base')
+        interval = col('maintenance_interval')
+        rate = np.where(base > 0, 1 / np.where(base > 0, base, 1), 0.001)
+        # R(t) = R(Y)^j · R(t - jY), con j intervalos completos
+        cycles = np.floor(t / np.where(interval > 0, interval, np.inf))
+        return np.exp(-rate * interval * cycles) * np.exp(-rate * (t - cycles * interval))
+
+    elif block_type in CHAIN_TYPES:
+        return chain_reliability(*_chain(block_type, lambda key: col(key)[:, 0]), t[0])
+
+    return np.zeros((size, t.size))
+
+
+def series_system(mtbfs, times=DEFAULT_TIMES):
+    """MTBF, λ y R(t) de un sistema en serie a partir de los MTBF de sus bloques"""
+    mtbfs = np.asarray(mtbfs, dtype=float)
+    positive = mtbfs > 0
+    lambda_system = float(np.sum(1 / mtbfs[positive])) if positive.any() else 0.0
+    mtbf_system = 1 / lambda_system if lambda_system > 0 else 0
+    times = np.asarray(times, dtype=float)
+    r_t = np.exp(-lambda_system * times)
+    return {
+        'mtbf': mtbf_system,
+        'lambda': lambda_system,
+        'times': times.tolist(),
+        'reliability': r_t.tolist(),
+    }
+
+
+def evaluate_system(design, times=DEFAULT_TIMES):
+    """Evalúa un diseño completo igual que el botón de cálculo de la interfaz
+
+    Con conexiones el sistema se considera en serie (simplificación de la
+    interfaz); sin conexiones sólo se reportan estadísticas de los bloques.
+    """
+    blocks = design.get('blocks', [])
+    with profiling.span('evaluacion.bloques'):
+        if design.get('subsystems'):
+            from hierarchy import Hierarchy
+            mtbfs = Hierarchy(design).block_mtbfs(blocks).tolist()
+        else:
+            mtbfs = [block_mtbf(b['type'], b.get('params', {})) for b in blocks]
+    profiling.count('bloques evaluados', len(blocks))
+
+    result = {
+        'blocks': [
+            {
+                'name': b.get('name', ''),
+                'type': b['type'],
+                'mtbf': mtbf,
+                'lambda': 1/mtbf if mtbf > 0 else 0,
+            }
+            for b, mtbf in zip(blocks, mtbfs)
+        ],
+    }
+
+    if design.get('connections'):
+        with profiling.span('evaluacion.sistema'):
+            result['system'] = series_system(mtbfs, times)
+    elif mtbfs:
+        result['statistics'] = {
+            'mean': sum(mtbfs) / len(mtbfs),
+            'min': min(mtbfs),
+            'max': max(mtbfs),
+        }
+    return result
+
+
+# A partir de este número de estados un generador disperso se resuelve de
+# forma iterativa en lugar de convertirlo a una matriz densa
+DENSE_SOLVE_LIMIT = 2000
+
+
+@profiling.timed('markov.resolver')
+def markov_steady_state(Q, atol=1e-5):
+    """Probabilidades estacionarias, disponibilidad y MTBF de un generador Q
+
+    Reproduce el cálculo de MarkovAnalysis: las filas deben sumar cero y el
+    último estado se considera de fallo. Q puede ser una matriz densa o un
+    markov_matrix.Generator disperso.
+    """
+    if hasattr(Q, 'to_coo'):
+        if not Q.is_valid():
+            raise ValueError('Las filas deben sumar cero')
+        if Q.n > DENSE_SOLVE_LIMIT:
+            pi = _sparse_steady_state(Q)
+            q00 = Q.get(0, 0)
+            mtbf = (1 - pi[-1]) / abs(q00) if q00 < 0 else 0
+            return {
+                'probabilities': pi.tolist(),
+                'availability': float(pi[0]),
+                'mtbf': float(mtbf),
+            }
+        Q = Q.to_dense()
+
+    Q = np.asarray(Q, dtype=float)
+    n = Q.shape[0]
+    if Q.ndim != 2 or Q.shape[1] != n:
+        raise ValueError('La matriz de transición debe ser cuadrada')
+
+    sums = Q.sum(axis=1)
+    if not np.allclose(sums, 0, atol=atol):
+        raise ValueError('Las filas deben sumar cero')
+
+    # Qᵀπ = 0 con la última ecuación reemplazada por Σπ = 1; si el sistema
+    # es singular (varias clases cerradas) se usa mínimos cuadrados
+    A = Q.T.copy()
+    A[-1, :] = 1
+    b = np.zeros(n)
+    b[-1] = 1
+    try:
+        pi = np.linalg.solve(A, b)
+    except np.linalg.LinAlgError:
+        A = np.vstack([Q.T, np.ones(n)])
+        pi = np.linalg.lstsq(A, np.append(np.zeros(n), 1.0), rcond=None)[0]
+
+    mtbf = (1 - pi[-1]) / abs(Q[0, 0]) if Q[0, 0] < 0 else 0
+    return {
+        'probabilities': pi.tolist(),
+        'availability': float(pi[0]),
+        'mtbf': float(mtbf),
+    }
+
+
+def _sparse_steady_state(gen, tol=1e-10, max_iter=5000):
+    """πQ = 0, Σπ = 1 con BiCGSTAB precondicionado por la diagonal
+
+    La última ecuación de Qᵀπ = 0 se reemplaza por la normalización. Si el
+    método no converge se recurre a la iteración de potencia sobre la cadena
+    uniformizada, que siempre converge aunque más lento.
+    """
+    n = gen.n
+    rows, cols, data = gen.to_coo()
+    diagonal = np.bincount(rows[rows == cols], weights=data[rows == cols], minlength=n)
+    d = np.where(diagonal != 0, diagonal, 1.0)
+    d[-1] = 1.0
+
+    def matvec(x):
+        y = np.bincount(cols, weights=data * x[rows], minlength=n)
+        y[-1] = x.sum()
+        return y
+
+    b = np.zeros(n)
+    b[-1] = 1.0
+    x = np.full(n, 1.0 / n)
+    r = b - matvec(x)
+    r_hat = r.copy()
+    rho = alpha = omega = 1.0
+    v = p = np.zeros(n)
+    converged = False
+    for _ in range(max_iter):
+        rho_new = r_hat @ r
+        if rho_new == 0 or omega == 0:
+            break
+        p = r + (rho_new / rho) * (alpha / omega) * (p - omega * v)
+        p_hat = p / d
+        v = matvec(p_hat)
+        alpha = rho_new / (r_hat @ v)
+        s = r - alpha * v
+        if np.linalg.norm(s) < tol:
+            x += alpha * p_hat
+            converged = True
+            break
+        s_hat = s / d
+        t = matvec(s_hat)
+        omega = (t @ s) / (t @ t) if t @ t else 0.0
+        x += alpha * p_hat + omega * s_hat
+        r = s - omega * t
+        rho = rho_new
+        if np.linalg.norm(r) < tol:
+            converged = True
+            break
+
+    if not converged or not np.all(np.isfinite(x)) or x.min() < -1e-8:
+        # Uniformización: π ← π + πQ/Λ
+        rate = np.abs(diagonal).max() * 1.01 or 1.0
+        x = np.full(n, 1.0 / n)
+        for _ in range(max_iter * 20):
+            step = np.bincount(cols, weights=data * x[rows], minlength=n) / rate
+            x += step
+            if np.abs(step).sum() < tol:
+                break
+
+    x = np.clip(x, 0.0, None)
+    return x / x.sum()
+
+
+@profiling.timed('montecarlo')
+def monte_carlo(design, samples=10000, times=DEFAULT_TIMES, seed=None):
+    """Estima por simulación el MTBF y R(t) del sistema en serie
+
+    Cada bloque falla con tiempo exponencial de media igual a su MTBF; el
+    sistema falla con el primer bloque. Devuelve media, intervalo de
+    confianza del 95 % y R(t) empírica.
+    """
+    blocks = design.get('blocks', [])
+    mtbfs = np.array([block_mtbf(b['type'], b.get('params', {})) for b in blocks], dtype=float)
+    mtbfs = mtbfs[(mtbfs > 0) & np.isfinite(mtbfs)]
+    if mtbfs.size == 0:
+        # Ningún bloque falla: R(t) = 1 y MTBF 0 como en series_system (λ = 0)
+        return {'mtbf': 0.0, 'ci95': [0.0, 0.0], 'samples': 0,
+                'times': list(times), 'reliability': [1.0] * len(times)}
+
+    rng = np.random.default_rng(seed)
+    ttf = (rng.standard_exponential((samples, mtbfs.size)) * mtbfs).min(axis=1)
+
+    mean = float(ttf.mean())
+    half = 1.96 * float(ttf.std(ddof=1)) / math.sqrt(samples) if samples > 1 else 0.0
+    times_arr = np.asarray(times, dtype=float)
+    ttf.sort()
+    survivors = samples - np.searchsorted(ttf, times_arr, side='right')
+    return {
+        'mtbf': mean,
+        'ci95': [mean - half, mean + half],
+        'samples': samples,
+        'times': times_arr.tolist(),
+        'reliability': (survivors / samples).tolist(),
+    }
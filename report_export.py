@@ -0,0 +1,342 @@
+"""Exportación de resultados a CSV, HTML y PDF en flujo
+
+Un informe es una lista de secciones (tablas). Cada sección entrega sus filas
+por bloques de columnas de NumPy, y los escritores las vuelcan al archivo a
+medida que llegan: nunca se arma el documento completo en memoria, de modo
+que un informe de cientos de miles de filas usa la misma memoria que uno
+pequeño. CSV y HTML no usan Qt; el PDF se dibuja con QPdfWriter, que puede
+usarse fuera del hilo de la interfaz.
+
+    export_report(design, 'informe.pdf', progress=print)
+"""
+
+import csv
+import html
+import os
+
+import numpy as np
+
+from availability import design_availability, series_availability
+from curves import SYSTEM_NAME, block_reliability
+from hierarchy import Hierarchy, flatten
+from reliability import DEFAULT_TIMES, markov_steady_state
+
+CHUNK_ROWS = 4096    # filas por bloque escrito
+CURVE_POINTS = 50    # puntos de cada curva R(t)
+FORMATS = ('.csv', '.html', '.pdf')
+
+
+class Cancelled(Exception):
+    """La exportación se canceló; el archivo parcial se elimina"""
+
+
+class Section:
+    """Tabla de un informe con sus filas generadas por bloques
+
+    chunks() devuelve un iterador de listas de columnas (arrays o listas de
+    igual longitud); rows es el total de filas, para informar el avance.
+    """
+
+    def __init__(self, title, headers, chunks, rows):
+        self.title = title
+        self.headers = headers
+        self.chunks = chunks
+        self.rows = rows
+
+    @classmethod
+    def from_columns(cls, title, headers, columns):
+        rows = len(columns[0]) if columns else 0
+
+        def chunks():
+            for start in range(0, rows, CHUNK_ROWS):
+                yield [column[start:start + CHUNK_ROWS] for column in columns]
+        return cls(title, headers, chunks, rows)
+
+
+def _rates(mtbfs):
+    # Igual que la tabla de la interfaz: λ = 1/MTBF, o 0 si el MTBF no es positivo
+    return np.where(mtbfs > 0, 1 / np.where(mtbfs > 0, mtbfs, 1), 0.0)
+
+
+def system_reliability(design, times):
+    """R(t) del sistema en serie: producto de las curvas de sus bloques"""
+    blocks = design.get('blocks', [])
+    result = np.ones(len(times))
+    for start in range(0, len(blocks), CHUNK_ROWS):
+        part = dict(design, blocks=blocks[start:start + CHUNK_ROWS], connections=[])
+        result *= np.prod(block_reliability(part, times), axis=0)
+    return result
+
+
+def curve_section(design, times, system=None):
+    """R(t) de cada bloque en formato largo (nombre, t, R), como en el gráfico
+
+    Las curvas salen de curves.block_reliability por bloques de filas; si se
+    indica la curva del sistema, va primero.
+    """
+    times = np.asarray(times, dtype=float)
+    blocks = design.get('blocks', [])
+    per_chunk = max(1, CHUNK_ROWS // max(times.size, 1))
+
+    def chunks():
+        if system is not None:
+            yield [[SYSTEM_NAME] * times.size, times, system]
+        for start in range(0, len(blocks), per_chunk):
+            part = blocks[start:start + per_chunk]
+            reliability = block_reliability(dict(design, blocks=part, connections=[]), times)
+            names = np.asarray([block.get('name', '') for block in part], dtype=object)
+            yield [np.repeat(names, times.size),
+                   np.tile(times, len(part)),
+                   reliability.ravel()]
+    curves = len(blocks) + (system is not None)
+    return Section('Curvas R(t)', ['Bloque', 't (h)', 'R(t)'], chunks, curves * times.size)
+
+
+def report_sections(design, times=DEFAULT_TIMES, markov=None, curve_points=CURVE_POINTS):
+    """Secciones del informe de un diseño (y de un generador de Markov, si hay)"""
+    blocks = design.get('blocks', [])
+    names = [block.get('name', '') for block in blocks]
+    mtbfs = Hierarchy(design).block_mtbfs(blocks)
+    rates = _rates(mtbfs)
+    sections = [Section.from_columns(
+        'Bloques', ['Nombre', 'Tipo', 'MTBF (h)', 'λ (fallos/h)'],
+        [names, [block['type'] for block in blocks], mtbfs, rates])]
+
+    flat = flatten(design)
+    data = design_availability(flat['blocks'], times)
+    repairable = data['repairable']
+    if repairable.any():
+        sections.append(Section.from_columns(
+            'Disponibilidad por bloque',
+            ['Nombre', 'Ai', 'Ao', 'Frecuencia (fallos/h)', 'Parada (h/año)'],
+            [[block.get('name', '') for block in flat['blocks']],
+             data['inherent'], data['operational'], data['frequency'], data['downtime']]))
+
+    # Sistema: en serie si hay conexiones, como en la interfaz
+    summary = []
+    in_series = bool(design.get('connections') and blocks)
+    if in_series:
+        lambda_system = float(rates.sum())
+        summary += [('MTBF del sistema (h)', 1 / lambda_system if lambda_system > 0 else 0.0),
+                    ('λ del sistema (fallos/h)', lambda_system)]
+        summary += [(f'R({t:g} h)', float(r))
+                    for t, r in zip(times, system_reliability(design, times))]
+        # Un bloque que nunca falla no necesita reparación
+        if (repairable | (data['inherent'] == 1.0)).all():
+            system = series_availability(data['inherent'], data['operational'],
+                                         data['frequency'], data['point'])
+            summary += [('Ai del sistema', system['inherent']),
+                        ('Ao del sistema', system['operational']),
+                        ('Parada esperada (h/año)', system['downtime'])]
+    elif blocks:
+        summary += [('MTBF promedio (h)', float(mtbfs.mean())),
+                    ('MTBF mínimo (h)', float(mtbfs.min())),
+                    ('MTBF máximo (h)', float(mtbfs.max()))]
+
+    if markov is None and design.get('markov'):
+        markov = design['markov'].get('matrix')
+        if markov is None:
+            from markov_import import load_generator
+            markov = load_generator(design['markov']['file'])
+    if markov is not None:
+        steady = markov_steady_state(markov)
+        summary += [('Markov: disponibilidad', steady['availability']),
+                    ('Markov: MTBF (h)', steady['mtbf'])]
+
+    if summary:
+        sections.append(Section.from_columns(
+            'Sistema', ['Magnitud', 'Valor'],
+            [[name for name, _ in summary], [value for _, value in summary]]))
+
+    if blocks:
+        grid = np.linspace(0, max(times), curve_points)
+        system = system_reliability(design, grid) if in_series else None
+        sections.append(curve_section(design, grid, system))
+
+    if markov is not None:
+        pi = np.asarray(steady['probabilities'])
+        labels = getattr(markov, 'labels', None) or [f'Estado {i}' for i in range(pi.size)]
+        sections.append(Section.from_columns(
+            'Markov: probabilidades de estado', ['Estado', 'Probabilidad'], [labels, pi]))
+    return sections
+
+
+# Escritores -----------------------------------------------------------------
+
+def _rows(chunk):
+    """Filas de un bloque de columnas, con tipos de Python"""
+    return zip(*[c.tolist() if isinstance(c, np.ndarray) else c for c in chunk])
+
+
+def _cell(value):
+    if isinstance(value, float):
+        return f'{value:.6g}'
+    return str(value)
+
+
+class _Progress:
+    """Avance por filas escritas y comprobación de cancelación"""
+
+    def __init__(self, sections, progress, cancelled):
+        self.total = max(1, sum(s.rows for s in sections))
+        self.done = 0
+        self.progress = progress
+        self.cancelled = cancelled
+
+    def advance(self, rows):
+        if self.cancelled is not None and self.cancelled.is_set():
+            raise Cancelled()
+        self.done += rows
+        if self.progress is not None:
+            self.progress(self.done / self.total)
+
+
+def write_csv(path, sections, progress=None, cancelled=None):
+    """Secciones separadas por una línea en blanco, cada una con su título"""
+    tracker = _Progress(sections, progress, cancelled)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for i, section in enumerate(sections):
+            if i:
+                writer.writerow([])
+            writer.writerow([section.title])
+            writer.writerow(section.headers)
+            for chunk in section.chunks():
+                rows = list(_rows(chunk))
+                writer.writerows(rows)
+                tracker.advance(len(rows))
+
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: 'Segoe UI', Arial, sans-serif; margin: 2em; color: #333; }}
+h1, h2 {{ color: #1976D2; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+th {{ background-color: #2196F3; color: white; }}
+th, td {{ border: 1px solid #ddd; padding: 4px 8px; text-align: right; }}
+td:first-child {{ text-align: left; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+"""
+
+
+def write_html(path, sections, progress=None, cancelled=None, title='Informe de Confiabilidad'):
+    """Página HTML independiente (estilos incluidos)"""
+    tracker = _Progress(sections, progress, cancelled)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(HTML_HEAD.format(title=html.escape(title)))
+        for section in sections:
+            f.write(f'<h2>{html.escape(section.title)}</h2>\n<table>\n<tr>')
+            f.write(''.join(f'<th>{html.escape(h)}</th>' for h in section.headers))
+            f.write('</tr>\n')
+            for chunk in section.chunks():
+                rows = list(_rows(chunk))
+                f.write(''.join(
+                    '<tr>' + ''.join(f'<td>{html.escape(_cell(v))}</td>' for v in row) + '</tr>\n'
+                    for row in rows))
+                tracker.advance(len(rows))
+            f.write('</table>\n')
+        f.write('</body>\n</html>\n')
+
+
+def write_pdf(path, sections, progress=None, cancelled=None, title='Informe de Confiabilidad'):
+    """PDF A4 dibujado fila a fila con QPdfWriter (no requiere pantalla)"""
+    from PyQt5.QtCore import QMarginsF, QRectF, Qt
+    from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPageLayout, QPageSize, QPainter, QPdfWriter
+
+    tracker = _Progress(sections, progress, cancelled)
+    writer = QPdfWriter(path)
+    writer.setPageLayout(QPageLayout(QPageSize(QPageSize.A4), QPageLayout.Portrait,
+                                     QMarginsF(15, 15, 15, 15), QPageLayout.Millimeter))
+    writer.setResolution(150)
+    writer.setTitle(title)
+    painter = QPainter(writer)
+    try:
+        page = writer.pageLayout().paintRectPixels(writer.resolution())
+        width, height = page.width(), page.height()
+        body = QFont('Arial', 8)
+        bold = QFont('Arial', 8, QFont.Bold)
+        heading = QFont('Arial', 12, QFont.Bold)
+        metrics = QFontMetrics(body, writer)
+        bold_metrics = QFontMetrics(bold, writer)
+        row_height = int(metrics.height() * 1.5)
+        y = 0
+        painter.setFont(body)
+
+        def new_page():
+            writer.newPage()
+            return 0
+
+        def draw_row(values, y, font, background=None):
+            if background is not None:
+                painter.setFont(font)
+                painter.fillRect(QRectF(0, y, width, row_height), background)
+            cell = width / len(values)
+            baseline = y + (row_height + metrics.ascent() - metrics.descent()) // 2
+            fm = metrics if background is None else bold_metrics  # encabezado en negrita
+            for i, value in enumerate(values):
+                # Texto simple en una posición: mucho más rápido que el diseño en un rectángulo
+                text = _cell(value)
+                advance = fm.horizontalAdvance(text)
+                if advance > cell - 8:
+                    text = fm.elidedText(text, Qt.ElideRight, int(cell - 8))
+                    advance = fm.horizontalAdvance(text)
+                x = i * cell + 4 if i == 0 else (i + 1) * cell - 4 - advance
+                painter.drawText(int(x), int(baseline), text)
+            if background is not None:
+                painter.setFont(body)
+            return y + row_height
+
+        painter.setFont(heading)
+        painter.drawText(QRectF(0, y, width, row_height * 2), Qt.AlignLeft | Qt.AlignVCenter, title)
+        y += row_height * 2
+        header_color = QColor('#BBDEFB')
+        for section in sections:
+            if y + row_height * 4 > height:
+                y = new_page()
+            painter.setFont(heading)
+            painter.drawText(QRectF(0, y, width, row_height * 2), Qt.AlignLeft | Qt.AlignVCenter,
+                             section.title)
+            painter.setFont(body)
+            y += row_height * 2
+            y = draw_row(section.headers, y, bold, header_color)
+            for chunk in section.chunks():
+                count = 0
+                for row in _rows(chunk):
+                    if y + row_height > height:
+                        # Página nueva, repitiendo el encabezado de la tabla
+                        y = new_page()
+                        y = draw_row(section.headers, y, bold, header_color)
+                    y = draw_row(row, y, body)
+                    count += 1
+                tracker.advance(count)
+            y += row_height
+    finally:
+        painter.end()
+
+
+WRITERS = {'.csv': write_csv, '.html': write_html, '.pdf': write_pdf}
+
+
+def export_report(design, path, times=DEFAULT_TIMES, markov=None, progress=None,
+                  cancelled=None):
+    """Calcula las secciones y las escribe según la extensión de path"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.htm':
+        ext = '.html'
+    if ext not in WRITERS:
+        raise ValueError(f'Formato no soportado: {ext}')
+    sections = report_sections(design, times, markov)
+    try:
+        WRITERS[ext](path, sections, progress=progress, cancelled=cancelled)
+    except Cancelled:
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    return path
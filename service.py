@@ -0,0 +1,484 @@
+"""Servicio local HTTP/JSON sobre el motor de confiabilidad (sin Qt)
+
+Rutas:
+    GET  /health        estado del servicio
+    GET  /stats         contadores de peticiones, lotes y caché
+    POST /mtbf          {"type": "Paralelo", "params": {...}, "times": [...]}
+    POST /system        diseño completo (ver design.py)
+    POST /markov        {"matrix": [[...], ...]}
+
+Las peticiones concurrentes se agrupan en lotes: /mtbf se evalúa vectorizado
+con NumPy por tipo de bloque, /system y /markov se envían en un solo mensaje a
+un grupo de procesos que se mantiene caliente; allí los modelos de Markov del
+mismo tamaño se resuelven juntos con np.linalg.solve por lotes. Las respuestas
+repetidas se sirven desde una caché LRU.
+
+Las respuestas son JSON estricto: los valores infinitos o indefinidos (por
+ejemplo el MTBF de un bloque que nunca falla) se envían como null.
+
+Ejemplo:
+    python service.py --port 8765 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from design import finite_json
+from markov_batch import steady_state_batch
+from reliability import (DEFAULT_TIMES, block_mtbf_array, evaluate_system,
+                         markov_steady_state, normalize_type, params_columns,
+                         BLOCK_TYPES)
+
+MAX_BODY = 16 * 1024 * 1024
+
+# Errores de los datos de una petición (parámetros con tipos o valores inválidos)
+INVALID_INPUT = (AttributeError, IndexError, KeyError, TypeError, ValueError)
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+
+class RequestError(Exception):
+    """Error atribuible a la petición del cliente"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def encode(value):
+    """Cuerpo JSON estricto de una respuesta"""
+    return json.dumps(finite_json(value), allow_nan=False).encode()
+
+
+def _block_mtbfs(block_type, params_list):
+    return block_mtbf_array(block_type, params_columns(block_type, params_list)).tolist()
+
+
+def evaluate_block_batch(payloads):
+    """Evalúa un lote de bloques agrupando por tipo en una sola pasada NumPy
+
+    Devuelve una lista alineada con payloads; los errores individuales se
+    devuelven como RequestError sin afectar al resto del lote.
+    """
+    results = [None] * len(payloads)
+    groups = {}
+    for i, payload in enumerate(payloads):
+        if not isinstance(payload.get('params', {}), dict):
+            results[i] = RequestError('"params" debe ser un objeto JSON')
+            continue
+        block_type = normalize_type(payload.get('type', ''))
+        if block_type not in BLOCK_TYPES:
+            results[i] = RequestError(f'Tipo de bloque desconocido: {payload.get("type")}')
+            continue
+        groups.setdefault(block_type, []).append(i)
+
+    for block_type, indices in groups.items():
+        try:
+            mtbfs = _block_mtbfs(block_type, [payloads[i].get('params', {}) for i in indices])
+        except INVALID_INPUT:
+            # Una fila inválida no debe arrastrar al resto: se evalúan una a una
+            mtbfs = []
+            for i in indices:
+                try:
+                    mtbfs.extend(_block_mtbfs(block_type, [payloads[i].get('params', {})]))
+                except INVALID_INPUT as e:
+                    mtbfs.append(RequestError(f'Parámetros inválidos: {e}'))
+
+        for i, mtbf in zip(indices, mtbfs):
+            if isinstance(mtbf, RequestError):
+                results[i] = mtbf
+                continue
+            lambda_val = 1/mtbf if mtbf > 0 else 0
+            result = {'type': block_type, 'mtbf': mtbf, 'lambda': lambda_val}
+            times = payloads[i].get('times')
+            if times is not None:
+                try:
+                    t = np.asarray(times, dtype=float)
+                except (TypeError, ValueError):
+                    results[i] = RequestError('"times" debe ser una lista de números')
+                    continue
+                result['times'] = t.tolist()
+                result['reliability'] = np.exp(-lambda_val * t).tolist()
+            results[i] = result
+    return results
+
+
+def _system_batch(designs):
+    """Evalúa varios diseños en un proceso del grupo"""
+    out = []
+    for design in designs:
+        try:
+            out.append(evaluate_system(design, design.get('times', DEFAULT_TIMES)))
+        except (KeyError, TypeError, ValueError) as e:
+            out.append({'__error__': f'{type(e).__name__}: {e}'})
+    return out
+
+
+def _markov_one(payload):
+    try:
+        return markov_steady_state(payload['matrix'])
+    except (KeyError, TypeError, ValueError, np.linalg.LinAlgError) as e:
+        return {'__error__': f'{type(e).__name__}: {e}'}
+
+
+def _markov_batch(payloads):
+    """Resuelve varios modelos de Markov en un proceso del grupo
+
+    Los modelos densos del mismo tamaño se apilan y se resuelven juntos con
+    steady_state_batch; si alguno del grupo es inválido, el grupo se resuelve
+    modelo a modelo para devolver el error de cada uno.
+    """
+    out = [None] * len(payloads)
+    groups = {}
+    for i, payload in enumerate(payloads):
+        try:
+            Q = np.asarray(payload['matrix'], dtype=float)
+        except (KeyError, TypeError, ValueError):
+            Q = None
+        if Q is not None and Q.ndim == 2 and Q.shape[0] == Q.shape[1] and Q.size:
+            groups.setdefault(Q.shape[0], []).append((i, Q))
+        else:
+            out[i] = _markov_one(payload)
+
+    for members in groups.values():
+        if len(members) == 1:
+            i, _ = members[0]
+            out[i] = _markov_one(payloads[i])
+            continue
+        try:
+            result = steady_state_batch(np.stack([Q for _, Q in members]))
+        except ValueError:
+            for i, _ in members:
+                out[i] = _markov_one(payloads[i])
+            continue
+        for row, (i, _) in enumerate(members):
+            out[i] = {
+                'probabilities': result['probabilities'][row].tolist(),
+                'availability': float(result['availability'][row]),
+                'mtbf': float(result['mtbf'][row]),
+            }
+    return out
+
+
+def _warm_up():
+    """Fuerza los imports en cada proceso del grupo antes de la primera petición"""
+    markov_steady_state([[-1.0, 1.0], [1.0, -1.0]])
+    return os.getpid()
+
+
+class LRUCache:
+    """Caché LRU acotada en número de entradas"""
+
+    def __init__(self, size=4096):
+        self.size = size
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self.data:
+            self.data.move_to_end(key)
+            self.hits += 1
+            return self.data[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        if self.size <= 0:
+            return
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.size:
+            self.data.popitem(last=False)
+
+
+class Batcher:
+    """Agrupa peticiones concurrentes y las despacha juntas
+
+    Un lote se envía al alcanzar max_batch elementos o cuando pasan max_delay
+    segundos desde la primera petición pendiente.
+    """
+
+    def __init__(self, handler, max_batch=256, max_delay=0.002):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.pending = []
+        self.timer = None
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, payload):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((payload, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.max_delay, self.flush)
+        return await future
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            self.batches += 1
+            self.items += len(batch)
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        try:
+            results = await self.handler([payload for payload, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            elif isinstance(result, dict) and '__error__' in result:
+                future.set_exception(RequestError(result['__error__']))
+            else:
+                future.set_result(result)
+
+
+class ReliabilityService:
+    """Servidor HTTP/1.1 mínimo con lotes, grupo de procesos y caché"""
+
+    def __init__(self, workers=None, max_batch=256, max_delay=0.002,
+                 cache_size=4096):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        self.cache = LRUCache(cache_size)
+        self.inflight = {}
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+
+        self.batchers = {
+            '/mtbf': Batcher(self._run_blocks, max_batch, max_delay),
+            '/system': Batcher(self._run_pool(_system_batch), max_batch, max_delay),
+            '/markov': Batcher(self._run_pool(_markov_batch), max_batch, max_delay),
+        }
+
+    async def _run_blocks(self, payloads):
+        # Las operaciones vectorizadas son cortas; se ejecutan en un hilo
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, evaluate_block_batch, payloads)
+
+    def _run_pool(self, function):
+        async def run(payloads):
+            loop = asyncio.get_running_loop()
+            # Repartir el lote entre los procesos del grupo
+            size = max(1, -(-len(payloads) // self.workers))
+            chunks = [payloads[i:i + size] for i in range(0, len(payloads), size)]
+            parts = await asyncio.gather(*[
+                loop.run_in_executor(self.pool, function, chunk) for chunk in chunks
+            ])
+            return [result for part in parts for result in part]
+        return run
+
+    async def start(self, host='127.0.0.1', port=8765):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self.pool, _warm_up) for _ in range(self.workers)
+        ])
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def evaluate(self, path, payload):
+        """Resuelve una petición usando caché, coalescencia y lotes"""
+        batcher = self.batchers.get(path)
+        if batcher is None:
+            raise RequestError(f'Ruta desconocida: {path}', 404)
+
+        key = path + json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Peticiones idénticas en curso comparten el mismo resultado
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(batcher, key, payload))
+            self.inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _compute(self, batcher, key, payload):
+        try:
+            body = encode(await batcher.submit(payload))
+        finally:
+            del self.inflight[key]
+        self.cache.put(key, body)
+        return body
+
+    def stats(self):
+        return {
+            'uptime_s': time.time() - self.started,
+            'requests': self.requests,
+            'errors': self.errors,
+            'workers': self.workers,
+            'cache': {
+                'entries': len(self.cache.data),
+                'hits': self.cache.hits,
+                'misses': self.cache.misses,
+            },
+            'batches': {
+                path: {
+                    'batches': b.batches,
+                    'items': b.items,
+                    'mean_size': b.items / b.batches if b.batches else 0,
+                }
+                for path, b in self.batchers.items()
+            },
+        }
+
+    async def route(self, method, path, body):
+        if method == 'GET':
+            if path == '/health':
+                return encode({'status': 'ok'})
+            if path == '/stats':
+                return encode(self.stats())
+            if path in self.batchers:
+                raise RequestError('Use POST', 405)
+            raise RequestError(f'Ruta desconocida: {path}', 404)
+
+        if method != 'POST':
+            raise RequestError('Método no soportado', 405)
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError as e:
+            raise RequestError(f'JSON inválido: {e}')
+        if not isinstance(payload, dict):
+            raise RequestError('El cuerpo debe ser un objeto JSON')
+        return await self.evaluate(path, payload)
+
+    async def handle_connection(self, reader, writer):
+        """Atiende una conexión con keep-alive de HTTP/1.1"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.respond(writer, 400, {'error': 'Petición mal formada'})
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self.respond(writer, 400, {'error': 'Content-Length inválido'})
+                    break
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {'error': 'Cuerpo demasiado grande'})
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+
+                self.requests += 1
+                path = target.split('?', 1)[0]
+                try:
+                    status, payload = 200, await self.route(method, path, body)
+                except RequestError as e:
+                    self.errors += 1
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    self.errors += 1
+                    status, payload = 500, {'error': f'{type(e).__name__}: {e}'}
+
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive=False):
+        body = payload if isinstance(payload, bytes) else encode(payload)
+        head = (f'HTTP/1.1 {status} {STATUS_TEXT.get(status, "")}\r\n'
+                'Content-Type: application/json; charset=utf-8\r\n'
+                f'Content-Length: {len(body)}\r\n'
+                f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(host, port, **options):
+    service = ReliabilityService(**options)
+    server = await service.start(host, port)
+    print(f'Servicio de confiabilidad en http://{host}:{port} '
+          f'({service.workers} procesos)')
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Servicio local de evaluación de confiabilidad')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='interfaz de escucha (por defecto sólo local)')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='procesos del grupo (por defecto: núcleos)')
+    parser.add_argument('--batch', type=int, default=256,
+                        help='tamaño máximo de lote')
+    parser.add_argument('--delay-ms', type=float, default=2.0,
+                        help='espera máxima para completar un lote')
+    parser.add_argument('--cache', type=int, default=4096,
+                        help='entradas de la caché de respuestas')
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers,
+                          max_batch=args.batch, max_delay=args.delay_ms / 1000,
+                          cache_size=args.cache))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Redundancia en espera y de carga compartida (sin Qt)
+
+Ambos bloques son una cadena de etapas exponenciales: en la etapa j el
+bloque falla con tasa a_j y, si sobrevive a la transición (probabilidad
+c_j), pasa a la etapa siguiente; de la última etapa sólo se sale por falla.
+
+    Reserva en Espera   n unidades, una activa (tasa λ = 1/MTBF) y n-1 en
+                        espera (λs = 1/MTBF en espera; 0 = reserva fría). En
+                        la etapa j quedan r unidades en espera: a_j = λ + r·λs.
+                        Si falla la activa, la conmutación funciona con
+                        probabilidad p: c_j = 1 - (λ/a_j)·(1 - p).
+    Carga Compartida    n unidades, se requieren k; con m unidades operando
+                        cada una lleva más carga y falla con λ·(n/m)^γ, así
+                        que a = m·λ·(n/m)^γ para m = n..k. Con γ = 0 es un
+                        k-de-n; con γ = 1 la tasa total no cambia (Erlang).
+
+El MTBF es una forma cerrada, Σ_j (Π_{i<j} c_i) / a_j. R(t) se obtiene por
+uniformización: con Λ = max a_j la cadena se recorre con pasos discretos y
+R(t) = Σ_k Poisson(k; Λt) · s_k, donde s_k es la probabilidad de seguir
+operando tras k pasos. Todos los términos son positivos, así que no hay la
+cancelación de la fórmula hipoexponencial con tasas cercanas; con tasas
+iguales (reserva fría, unidades idénticas) se reduce a la suma de Erlang
+exacta en n términos. Cada paso procesa todas las filas a la vez.
+
+Para las grillas uniformes de los gráficos se calcula una vez P = exp(QΔt)
+y se avanza por la grilla con potencias precalculadas, con costo lineal en
+el número de tiempos.
+"""
+
+import math
+
+import numpy as np
+
+SURVIVAL_TOL = 1e-16    # s_k por debajo de esto se considera cero
+MAX_STEPS = 100_000     # tope de pasos de uniformización
+MARCH_MIN = 64          # tiempos desde los que una grilla uniforme se recorre
+MARCH_BLOCK = 2**22     # elementos de las potencias de P precalculadas
+
+
+def _rate(mtbf):
+    mtbf = np.asarray(mtbf, dtype=float)
+    return np.where(mtbf > 0, 1 / np.where(mtbf > 0, mtbf, 1), np.inf)
+
+
+def _stages(count):
+    """Índice de etapa (1 × etapas) y máscara de etapas válidas por fila"""
+    count = np.asarray(count, dtype=int)
+    j = np.arange(max(int(count.max(initial=0)), 1))[None, :]
+    return j, j < count[:, None]
+
+
+def standby_chain(n, mtbf, mtbf_standby, switch):
+    """Tasas y probabilidades de continuar de bloques en espera (filas × etapas)"""
+    n = np.maximum(np.asarray(n, dtype=int), 1)
+    lam = _rate(mtbf)[:, None]
+    standby = np.asarray(mtbf_standby, dtype=float)
+    lam_s = np.where(standby > 0, 1 / np.where(standby > 0, standby, 1), 0.0)[:, None]
+    p = np.clip(np.asarray(switch, dtype=float), 0.0, 1.0)[:, None]
+    j, valid = _stages(n)
+    spares = np.clip(n[:, None] - 1 - j, 0, None)
+    rates = lam + spares * lam_s
+    # Fracción de la tasa que corresponde a la unidad activa
+    finite = np.isfinite(rates) & (rates > 0)
+    active = np.where(np.isinf(lam), 1.0, lam / np.where(finite, rates, 1))
+    cont = 1 - active * (1 - p)
+    cont = np.where(j + 1 < n[:, None], cont, 0.0)
+    return np.where(valid, rates, np.nan), np.where(valid, cont, 0.0)
+
+
+def load_sharing_chain(n, k, mtbf, exponent):
+    """Tasas y probabilidades de continuar de bloques de carga compartida
+
+    Un bloque con k > n no puede operar: queda con una sola etapa de tasa
+    infinita (MTBF 0), igual que el k-de-n.
+    """
+    n = np.maximum(np.asarray(n, dtype=int), 1)
+    k = np.clip(np.asarray(k, dtype=int), 1, None)
+    lam = _rate(mtbf)[:, None]
+    gamma = np.asarray(exponent, dtype=float)[:, None]
+    impossible = k > n
+    count = np.where(impossible, 1, n - k + 1)
+    j, valid = _stages(count)
+    working = np.clip(n[:, None] - j, 1, None)
+    rates = working * lam * (n[:, None] / working) ** gamma
+    rates = np.where(impossible[:, None], np.inf, rates)
+    cont = np.where(j + 1 < count[:, None], 1.0, 0.0)
+    return np.where(valid, rates, np.nan), np.where(valid, cont, 0.0)
+
+
+def chain_mtbf(rates, cont):
+    """MTBF de cada fila: Σ_j (Π_{i<j} c_i) / a_j"""
+    reach = np.cumprod(np.concatenate([np.ones((rates.shape[0], 1)), cont[:, :-1]], axis=1),
+                       axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(reach > 0, reach / rates, 0.0)
+    return np.nansum(terms, axis=1)
+
+
+def _uniformized(rates, cont):
+    """Matriz de un paso de la cadena uniformizada (filas × etapas × etapas)
+
+    Devuelve también Λ de cada fila y la máscara de filas con tasas finitas;
+    las demás filas (bloque siempre fallado) quedan con matriz nula.
+    """
+    rows, stages = rates.shape
+    valid = ~np.isnan(rates)
+    top = np.where(valid, rates, 0.0).max(axis=1, initial=0.0)
+    usable = np.isfinite(top)
+    big = np.where(usable & (top > 0), top, 1.0)
+    move = np.where(valid & usable[:, None], rates / big[:, None], 0.0)
+    step = np.zeros((rows, stages, stages))
+    diagonal = np.arange(stages)
+    step[:, diagonal, diagonal] = np.where(valid & usable[:, None], 1 - move, 0.0)
+    step[:, diagonal[:-1], diagonal[1:]] = (move * cont)[:, :-1]
+    return step, big, usable
+
+
+def _poisson_sum(step, big, start, times, vector=False):
+    """Σ_k Poisson(k; Λt) · start·M^k para cada tiempo
+
+    Devuelve la suma de las probabilidades (filas × tiempos) o, con vector,
+    la distribución completa (filas × tiempos × etapas). La serie se corta
+    cuando ya no queda probabilidad en la cadena o en la cola de Poisson.
+    """
+    x = big[:, None] * np.asarray(times, dtype=float)[None, :]
+    with np.errstate(divide='ignore'):
+        log_x = np.log(x)
+    log_weight = -x                      # ln Poisson(0; Λt), sin subdesbordar
+    x_max = float(x.max(initial=0.0))
+    last = min(MAX_STEPS, int(x_max + 12 * math.sqrt(x_max) + 40))
+    v = start.copy()
+    result = np.zeros(x.shape + ((v.shape[1],) if vector else ()))
+    for k in range(last):
+        survival = v.sum(axis=1)
+        if k and survival.max(initial=0.0) < SURVIVAL_TOL:
+            break
+        weight = np.exp(log_weight)
+        if vector:
+            result += weight[..., None] * v[:, None, :]
+        else:
+            result += weight * survival[:, None]
+        log_weight = log_weight + log_x - math.log(k + 1)
+        v = np.einsum('rs,rst->rt', v, step)
+    return result
+
+
+def _march(transition, start, count):
+    """Probabilidad de seguir operando tras i pasos P, i = 0..count-1
+
+    Las potencias P^0..P^(B-1) se arman por duplicación una vez y se aplican
+    por bloques de B pasos, así que el costo es lineal en count.
+    """
+    rows, stages = start.shape
+    block = int(min(count, max(16, MARCH_BLOCK // (rows * stages * stages))))
+    powers = np.empty((rows, block, stages, stages))
+    powers[:, 0] = np.eye(stages)
+    filled = 1
+    square = transition
+    while filled < block:
+        take = min(filled, block - filled)
+        powers[:, filled:filled + take] = powers[:, :take] @ square[:, None]
+        filled += take
+        square = square @ square
+    jump = powers[:, -1] @ transition  # P^B: de un bloque al siguiente
+    survival = powers.sum(axis=-1)     # filas × B × etapas
+    result = np.empty((rows, count))
+    v = start
+    for first in range(0, count, block):
+        take = min(block, count - first)
+        result[:, first:first + take] = np.einsum('rs,rbs->rb', v, survival[:, :take])
+        v = np.einsum('rs,rst->rt', v, jump)
+    return result
+
+
+def chain_reliability(rates, cont, times):
+    """R(t) de cada fila en los tiempos dados (filas × tiempos)
+
+    En una grilla uniforme larga desde 0 (la de los gráficos) se calcula una
+    sola vez P = exp(QΔt), también por uniformización, y se avanza por la
+    grilla; en otro caso se suma la serie de Poisson en cada tiempo.
+    """
+    step, big, usable = _uniformized(rates, cont)
+    rows, stages = rates.shape
+    t = np.asarray(times, dtype=float)
+    start = np.zeros((rows, stages))
+    start[:, 0] = usable
+    if t.size > MARCH_MIN and t[0] == 0 and np.allclose(np.diff(t), t[1], rtol=1e-9):
+        # Una fila por estado inicial: las filas de exp(QΔt)
+        identity = np.tile(np.eye(stages), (rows, 1))
+        transition = _poisson_sum(np.repeat(step, stages, axis=0), np.repeat(big, stages),
+                                  identity, t[1:2], vector=True)
+        result = _march(transition.reshape(rows, stages, stages), start, t.size)
+    else:
+        result = _poisson_sum(step, big, start, t)
+    return np.clip(result, 0.0, 1.0)
@@ -0,0 +1,501 @@
+"""Sistemas multiestado por función generadora universal (sin Qt)
+
+La función generadora universal (UGF) de un bloque es su distribución de
+capacidad, u(z) = Σ_k p_k · z^g_k, guardada como dos arrays (g, p) con g
+creciente. El diagrama es un sistema de transmisión de flujo:
+
+    serie       la capacidad es la del bloque más limitado: min(g_a, g_b)
+    paralelo    las ramas se suman: g_a + g_b
+
+Cada composición junta los términos de igual capacidad y descarta los de
+probabilidad menor que PRUNE_TOL (con MAX_TERMS como tope), de modo que el
+número de términos queda acotado. La probabilidad descartada pasa al nivel
+conservado inmediatamente inferior: el resultado nunca sobrestima la
+capacidad.
+
+Un bloque con el parámetro 'states' ([[capacidad, probabilidad], ...]) es
+multiestado; los demás son binarios: entregan 'capacity' (1 por defecto)
+con probabilidad R(t) al tiempo de misión y 0 en otro caso.
+
+La estructura sale de las conexiones: los bloques con los mismos
+predecesores y sucesores están en paralelo, las cadenas sin ramificar en
+serie, y la reducción se repite hasta agotar el diagrama (exacto en
+diagramas serie-paralelo). Lo que no se reduce (un puente, por ejemplo) se
+resuelve igual que en fault_tree.from_diagram,
+
+    G(v) = min(g_v, Σ G(w) para cada sucesor w),
+
+contando como independiente en cada rama un bloque compartido por varias.
+Las entradas de cada subdiagrama van en paralelo y los subdiagramas en serie.
+
+Las funciones se procesan por lotes: un lote es un conjunto de funciones
+concatenadas (dueño, g, p), y todas las composiciones de un mismo nivel del
+diagrama se hacen con unas pocas operaciones NumPy sobre el lote completo.
+"""
+
+import numpy as np
+
+from graph import (acyclic_successors, adjacency, predecessors, removed_edges,
+                   topological_order, weak_components)
+from hierarchy import flatten
+from reliability import block_reliability_array, normalize_type, params_columns
+
+PRUNE_TOL = 1e-12   # términos con menos probabilidad se descartan
+MAX_TERMS = 512     # tope de términos por función después de cada composición
+DECIMALS = 9        # las capacidades se redondean para juntar sumas iguales
+STATE_TOL = 1e-6    # tolerancia de la suma de probabilidades de 'states'
+
+SERIES = 'S'
+PARALLEL = 'P'
+
+
+def _starts(owner):
+    """Máscara del primer término de cada dueño en un lote ordenado"""
+    first = np.ones(owner.size, dtype=bool)
+    first[1:] = owner[1:] != owner[:-1]
+    return first
+
+
+def merge_batch(owner, values, probs, tol=PRUNE_TOL, max_terms=MAX_TERMS):
+    """Junta capacidades iguales y poda términos despreciables en todo un lote
+
+    Devuelve (dueño, g, p) ordenado por dueño y capacidad. El término de
+    menor capacidad de cada dueño siempre se conserva, así que toda la
+    probabilidad podada tiene a dónde ir.
+    """
+    values = np.round(values, DECIMALS)
+    order = np.lexsort((values, owner))
+    owner, values, probs = owner[order], values[order], probs[order]
+    new = _starts(owner)
+    new[1:] |= values[1:] != values[:-1]
+    starts = np.flatnonzero(new)
+    owner, values = owner[starts], values[starts]
+    probs = np.add.reduceat(probs, starts) if starts.size else probs[:0]
+
+    first = _starts(owner)
+    keep = probs >= tol
+    if np.bincount(owner[keep], minlength=1).max() > max_terms:
+        # Posición de cada término en su dueño por probabilidad decreciente
+        offset = np.maximum.accumulate(np.where(first, np.arange(owner.size), 0))
+        rank = np.empty(owner.size, dtype=np.int64)
+        rank[np.lexsort((-probs, owner))] = np.arange(owner.size) - offset
+        keep &= rank < max_terms
+    keep |= first
+    if not keep.all():
+        target = np.maximum.accumulate(np.where(keep, np.arange(owner.size), 0))
+        probs = np.bincount(target, weights=probs, minlength=owner.size)[keep]
+        owner, values = owner[keep], values[keep]
+    return owner, values, probs
+
+
+def _pack(ugfs):
+    sizes = np.array([g.size for g, _ in ugfs], dtype=np.int64)
+    owner = np.repeat(np.arange(len(ugfs)), sizes)
+    values = np.concatenate([g for g, _ in ugfs]) if ugfs else np.zeros(0)
+    probs = np.concatenate([p for _, p in ugfs]) if ugfs else np.zeros(0)
+    return owner, values, probs
+
+
+def _unpack(owner, values, probs):
+    bounds = np.append(np.flatnonzero(_starts(owner)), owner.size).tolist()
+    return [(values[a:b], probs[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def merge(values, probs, tol=PRUNE_TOL, max_terms=MAX_TERMS):
+    """merge_batch de una sola función; devuelve (g, p)"""
+    values = np.asarray(values, dtype=float)
+    _, values, probs = merge_batch(np.zeros(values.size, dtype=np.int64), values,
+                                   np.asarray(probs, dtype=float), tol, max_terms)
+    return values, probs
+
+
+def binary(capacity, reliability):
+    """UGF de un bloque binario: capacidad completa o nula"""
+    r = min(max(float(reliability), 0.0), 1.0)
+    return merge([0.0, max(float(capacity), 0.0)], [1 - r, r])
+
+
+def _states_array(states, name=''):
+    owner = f'de {name}' if name else 'del bloque'
+    data = np.asarray(states, dtype=float).reshape(-1, 2)
+    if not data.size or (data < 0).any():
+        raise ValueError(f'Estados inválidos {owner}')
+    total = data[:, 1].sum()
+    if abs(total - 1) > STATE_TOL:
+        raise ValueError(f'Las probabilidades de estado {owner} suman {total:g}, no 1')
+    return data[:, 0], data[:, 1] / total
+
+
+def from_states(states, name=''):
+    """UGF de una lista [[capacidad, probabilidad], ...]"""
+    return merge(*_states_array(states, name))
+
+
+def parse_states(text):
+    """Convierte '100:0.9, 50:0.08, 0:0.02' en [[100, 0.9], ...]; '' da None"""
+    text = text.strip()
+    if not text:
+        return None
+    states = []
+    for item in text.replace(';', ',').split(','):
+        capacity, _, probability = item.partition(':')
+        states.append([float(capacity), float(probability)])
+    _states_array(states)
+    return states
+
+
+def format_states(states):
+    """Texto editable de una lista de estados"""
+    return ', '.join(f'{c:g}:{p:g}' for c, p in states or [])
+
+
+def _parallel_pairs(left, right):
+    """Suma de capacidades de cada par (left[j], right[j]) como un lote"""
+    a_owner, a_values, a_probs = _pack(left)
+    b_owner, b_values, b_probs = _pack(right)
+    a = np.bincount(a_owner, minlength=len(left))
+    b = np.bincount(b_owner, minlength=len(right))
+    a_start = np.concatenate([[0], np.cumsum(a)[:-1]])
+    b_start = np.concatenate([[0], np.cumsum(b)[:-1]])
+    terms = a * b
+    owner = np.repeat(np.arange(len(left)), terms)
+    t = np.arange(owner.size) - np.concatenate([[0], np.cumsum(terms)[:-1]])[owner]
+    ia = a_start[owner] + t // b[owner]
+    ib = b_start[owner] + t % b[owner]
+    return _unpack(*merge_batch(owner, a_values[ia] + b_values[ib],
+                                a_probs[ia] * b_probs[ib]))
+
+
+def parallel_groups(groups):
+    """Paralelo de cada grupo de funciones
+
+    Los grupos se reducen por pares en un árbol balanceado; cada ronda
+    compone los pares de todos los grupos en un solo lote.
+    """
+    groups = [list(g) for g in groups]
+    while True:
+        left, right, where = [], [], []
+        for i, group in enumerate(groups):
+            for j in range(0, len(group) - 1, 2):
+                left.append(group[j])
+                right.append(group[j + 1])
+                where.append(i)
+        if not left:
+            return [group[0] for group in groups]
+        paired = iter(_parallel_pairs(left, right))
+        for i, group in enumerate(groups):
+            if len(group) > 1:
+                odd = [group[-1]] if len(group) % 2 else []
+                groups[i] = [next(paired) for _ in range(len(group) // 2)] + odd
+
+
+def series_groups(groups):
+    """Serie de cada grupo de funciones, todos los grupos en un solo paso
+
+    P(min ≥ v) = Π_i P(g_i ≥ v). Cada función aporta, en cada uno de sus
+    niveles, un salto δ = ln S(g_k) - ln S(g_{k+1}) de su log-supervivencia;
+    ordenando los niveles de todo el grupo, la log-supervivencia de la serie
+    es menos la suma acumulada de los saltos por debajo de v.
+    """
+    result = [group[0] if len(group) == 1 else None for group in groups]
+    pending = [i for i, group in enumerate(groups) if len(group) > 1]
+    if not pending:
+        return result
+    items = [u for i in pending for u in groups[i]]
+    item_group = np.repeat(np.arange(len(pending)), [len(groups[i]) for i in pending])
+    sizes = np.array([g.size for g, _ in items])
+    width = int(sizes.max())
+    mask = np.arange(width) < sizes[:, None]
+    values = np.zeros((len(items), width))
+    probs = np.zeros((len(items), width))
+    values[mask] = np.concatenate([g for g, _ in items])
+    probs[mask] = np.concatenate([p for _, p in items])
+
+    # Supervivencia en cada nivel y en el siguiente (0 después del último)
+    tail = np.cumsum(probs[:, ::-1], axis=1)[:, ::-1]
+    after = np.concatenate([tail[:, 1:], np.zeros((len(items), 1))], axis=1)
+    dead = after <= 0                     # más allá de este nivel S = 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        jump = np.where(dead, 0.0, np.log(tail) - np.log(np.where(dead, 1, after)))
+
+    group = np.broadcast_to(item_group[:, None], mask.shape)[mask]
+    points, jump, dead = values[mask], jump[mask], dead[mask]
+    order = np.lexsort((points, group))
+    group, points, jump, dead = group[order], points[order], jump[order], dead[order]
+    cum = np.concatenate([[0.0], np.cumsum(jump)])
+    cum_dead = np.concatenate([[0], np.cumsum(dead)])
+
+    # Niveles de cada grupo y los puntos que quedan por debajo de cada uno
+    level = _starts(group)
+    level[1:] |= points[1:] != points[:-1]
+    below = np.flatnonzero(level)
+    base = np.maximum.accumulate(np.where(_starts(group), np.arange(group.size), 0))[below]
+    owner = group[below]
+    zero = cum_dead[below] - cum_dead[base] > 0
+    survival = np.where(zero, 0.0, np.exp(-(cum[below] - cum[base])))
+    following = np.append(survival[1:], 0.0)
+    following[np.append(owner[1:] != owner[:-1], True)] = 0.0
+    merged = _unpack(*merge_batch(owner, points[below], survival - following))
+    for i, u in zip(pending, merged):
+        result[i] = u
+    return result
+
+
+def parallel_many(ugfs):
+    """Paralelo de varias funciones"""
+    return parallel_groups([list(ugfs)])[0]
+
+
+def series_many(ugfs):
+    """Serie de varias funciones"""
+    return series_groups([list(ugfs)])[0]
+
+
+def has_states(design):
+    """Indica si algún bloque del diseño (ya expandido) es multiestado"""
+    return any(b.get('params', {}).get('states') for b in design.get('blocks', []))
+
+
+def _block_ugfs(blocks, mission_time):
+    """UGF de cada bloque, construidas y depuradas en un solo lote
+
+    Los bloques binarios se evalúan agrupados por tipo.
+    """
+    owners, values, probs = [], [], []
+    state_owner, states = [], []
+    groups = {}
+    for i, block in enumerate(blocks):
+        params = block.get('params', {})
+        if params.get('states'):
+            state_owner += [i] * len(params['states'])
+            states += params['states']
+        else:
+            groups.setdefault(normalize_type(block['type']), []).append(i)
+    if states:
+        # Todos los estados se validan y normalizan juntos
+        owner = np.array(state_owner)
+        data = np.asarray(states, dtype=float).reshape(-1, 2)
+        total = np.bincount(owner, weights=data[:, 1], minlength=len(blocks))
+        bad = np.bincount(owner, weights=(data < 0).any(axis=1), minlength=len(blocks)) > 0
+        bad |= np.isin(np.arange(len(blocks)), owner) & (np.abs(total - 1) > STATE_TOL)
+        if bad.any():
+            i = int(np.argmax(bad))
+            _states_array(blocks[i]['params']['states'], blocks[i].get('name', ''))
+        owners.append(owner)
+        values.append(data[:, 0])
+        probs.append(data[:, 1] / total[owner])
+    for block_type, indices in groups.items():
+        params_list = [blocks[i].get('params', {}) for i in indices]
+        columns = params_columns(block_type, params_list)
+        r = np.clip(block_reliability_array(block_type, columns, [mission_time])[:, 0], 0, 1)
+        capacity = np.array([p.get('capacity', 1.0) for p in params_list], dtype=float)
+        owners.append(np.repeat(indices, 2))
+        values.append(np.column_stack([np.zeros(r.size), np.maximum(capacity, 0.0)]).ravel())
+        probs.append(np.column_stack([1 - r, r]).ravel())
+    return _unpack(*merge_batch(np.concatenate(owners), np.concatenate(values),
+                                np.concatenate(probs)))
+
+
+class _Expression:
+    """Expresión serie-paralelo sobre los bloques 0..n-1"""
+
+    def __init__(self, n):
+        self.n = n
+        self.kinds = [None] * n
+        self.children = [()] * n
+
+    def node(self, kind, kids, flat=False):
+        """Nuevo nodo; con flat, los hijos del mismo tipo se absorben"""
+        if flat:
+            kids = [c for k in kids
+                    for c in (self.children[k] if self.kinds[k] == kind else (k,))]
+        if len(kids) == 1:
+            return kids[0]
+        self.kinds.append(kind)
+        self.children.append(tuple(kids))
+        return len(self.kinds) - 1
+
+    def steps(self, top):
+        """Nodos alcanzables desde top agrupados por (altura, tipo)"""
+        height = {}
+        stack = [top]
+        while stack:
+            i = stack[-1]
+            if i < self.n or i in height:
+                stack.pop()
+                continue
+            missing = [c for c in self.children[i] if c >= self.n and c not in height]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            height[i] = 1 + max(height.get(c, 0) for c in self.children[i])
+        steps = {}
+        for i, h in height.items():
+            steps.setdefault((h, self.kinds[i]), []).append(i)
+        return [nodes for _, nodes in sorted(steps.items())]
+
+
+def _reduce(expression, succ, pred, component):
+    """Reducción serie-paralelo del grafo
+
+    Paralelo: bloques del mismo subdiagrama con los mismos predecesores y
+    sucesores. Serie: cadenas sin ramificar. Se repite hasta que nada cambia;
+    un diagrama serie-paralelo queda en un nodo por subdiagrama. Devuelve
+    los nodos que quedan y la expresión de cada uno.
+    """
+    succ = [set(s) for s in succ]
+    pred = [set(p) for p in pred]
+    expr = list(range(len(succ)))
+    alive = set(expr)
+
+    def remove(u):
+        for p in pred[u]:
+            succ[p].discard(u)
+        for w in succ[u]:
+            pred[w].discard(u)
+        alive.discard(u)
+
+    changed = True
+    while changed:
+        changed = False
+        groups = {}
+        for v in alive:
+            key = (component[v], frozenset(pred[v]), frozenset(succ[v]))
+            groups.setdefault(key, []).append(v)
+        for group in groups.values():
+            if len(group) > 1:
+                expr[group[0]] = expression.node(PARALLEL, [expr[u] for u in group], flat=True)
+                for u in group[1:]:
+                    remove(u)
+                changed = True
+
+        for v in sorted(alive):
+            if v not in alive or len(succ[v]) != 1:
+                continue
+            p = next(iter(pred[v])) if len(pred[v]) == 1 else None
+            if p is not None and len(succ[p]) == 1:
+                continue                  # no es el comienzo de la cadena
+            chain = [v]
+            w = next(iter(succ[v]))
+            while len(pred[w]) == 1 and w != v:
+                chain.append(w)
+                if len(succ[w]) != 1:
+                    break
+                w = next(iter(succ[w]))
+            if len(chain) == 1:
+                continue
+            last = chain[-1]
+            expr[v] = expression.node(SERIES, [expr[u] for u in chain], flat=True)
+            outgoing = set(succ[last])
+            for u in chain[1:]:
+                remove(u)
+            succ[v] = outgoing
+            for w in outgoing:
+                pred[w].add(v)
+            changed = True
+    return sorted(alive), expr, succ, pred
+
+
+def system_ugf(design, mission_time=1000.0):
+    """Distribución de capacidad del sistema como (g, p)
+
+    Primero se arma la expresión serie-paralelo del diagrama por reducción;
+    si queda algo sin reducir (puentes, reconvergencias cruzadas) se sigue
+    con G(v) = min(g_v, Σ G(w)). Luego se evalúa por alturas: todas las
+    series y todos los paralelos de una misma altura van en un lote.
+    """
+    flat = flatten(design)
+    blocks = flat.get('blocks', [])
+    n = len(blocks)
+    if not n:
+        return np.zeros(1), np.ones(1)
+    connections = flat.get('connections', [])
+    succ, _ = adjacency(n, connections)
+    succ = acyclic_successors(succ)
+    pred = predecessors(succ)
+    component = [0] * n
+    for c, members in enumerate(weak_components(n, connections)):
+        for v in members:
+            component[v] = c
+
+    expression = _Expression(n)
+    nodes, expr, succ, pred = _reduce(expression, succ, pred, component)
+
+    # Lo que queda, con índices compactos
+    index = {v: i for i, v in enumerate(nodes)}
+    rest_succ = [[index[w] for w in sorted(succ[v])] for v in nodes]
+    rest_pred = predecessors(rest_succ)
+    own = [expr[v] for v in nodes]
+    pending = [None] * len(nodes)      # nodos en serie aún sin agrupar
+    done = {}
+
+    def resolve(v):
+        if v not in done:
+            done[v] = expression.node(SERIES, pending[v])
+            pending[v] = None
+        return done[v]
+
+    for v in reversed(topological_order(rest_succ)):
+        if not rest_succ[v]:
+            pending[v] = [own[v]]
+        elif len(rest_succ[v]) == 1 and len(rest_pred[rest_succ[v][0]]) == 1:
+            items = pending[rest_succ[v][0]]
+            pending[rest_succ[v][0]] = None
+            items.append(own[v])
+            pending[v] = items
+        else:
+            pending[v] = [own[v], expression.node(PARALLEL, [resolve(w) for w in rest_succ[v]])]
+
+    parts = {}
+    for v in range(len(nodes)):
+        if not rest_pred[v]:
+            parts.setdefault(component[nodes[v]], []).append(resolve(v))
+    top = expression.node(SERIES, [expression.node(PARALLEL, sources)
+                                   for _, sources in sorted(parts.items())])
+
+    compose = {SERIES: series_groups, PARALLEL: parallel_groups}
+    ugfs = _block_ugfs(blocks, mission_time) + [None] * (len(expression.kinds) - n)
+    for step in expression.steps(top):
+        kind = expression.kinds[step[0]]
+        results = compose[kind]([[ugfs[c] for c in expression.children[i]] for i in step])
+        for i, u in zip(step, results):
+            ugfs[i] = u
+    return ugfs[top]
+
+
+def performance(values, probs, demand=None):
+    """Medidas de desempeño de una distribución de capacidad
+
+    Sin demanda, la disponibilidad es la probabilidad de entregar algo (g > 0).
+    """
+    values = np.asarray(values, dtype=float)
+    probs = np.asarray(probs, dtype=float)
+    result = {
+        'values': values.tolist(),
+        'probabilities': probs.tolist(),
+        'expected': float(values @ probs),
+        'terms': int(values.size),
+        'demand': demand,
+    }
+    if demand is None:
+        result['availability'] = float(probs[values > 0].sum())
+        result['deficiency'] = 0.0
+    else:
+        result['availability'] = float(probs[values >= demand].sum())
+        result['deficiency'] = float(np.maximum(demand - values, 0) @ probs)
+    return result
+
+
+def analyze(design, mission_time=1000.0, demand=None):
+    """Distribución de capacidad, capacidad esperada y disponibilidad ante la demanda"""
+    result = performance(*system_ugf(design, mission_time), demand)
+    result['mission_time'] = mission_time
+    # Conexiones que system_ugf descarta al romper ciclos
+    flat = flatten(design)
+    blocks = flat.get('blocks', [])
+    succ, _ = adjacency(len(blocks), flat.get('connections', []))
+    result['removed_edges'] = [(blocks[a].get('name') or f'Bloque {a + 1}',
+                                blocks[b].get('name') or f'Bloque {b + 1}')
+                               for a, b in removed_edges(succ, acyclic_successors(succ))]
+    return result
@@ -0,0 +1,204 @@
+"""Evaluación incremental para el panel de escenarios (sin Qt)
+
+WhatIf compila el diseño una vez (program.Program) y conserva los registros
+de una evaluación. Al mover un control sólo se vuelven a calcular el bloque
+tocado y las series de subsistema que lo contienen; el MTBF, R(t) y la
+importancia del sistema salen de operaciones vectoriales sobre las tasas de
+los bloques de nivel superior.
+
+Los controles se expresan siempre como:
+
+    lambda                  tasa de fallo por unidad; en los tipos que
+                            guardan un MTBF se escribe 1/λ
+    n, k                    unidades totales y requeridas
+    maintenance_interval    intervalo de mantenimiento preventivo
+
+La importancia es la de un sistema en serie con bloques exponenciales al
+tiempo de misión t: Birnbaum I_B = Π_{j≠i} R_j y criticidad
+I_C = I_B · (1 - R_i) / (1 - R_sis).
+"""
+
+import numpy as np
+
+from program import LEAF_TYPES, SERIES, Program
+from reliability import (DEFAULT_TIMES, DEFAULTS, PARAM_ALIASES, block_mtbf,
+                         normalize_type)
+
+# Control: (etiqueta, mínimo, máximo, escala logarítmica, entero)
+CONTROLS = {
+    'lambda': ('Tasa de fallo λ (1/h)', 1e-7, 1e-1, True, False),
+    'n': ('Unidades n', 1, 20, False, True),
+    'k': ('Requeridas k', 1, 20, False, True),
+    'maintenance_interval': ('Intervalo de mantenimiento (h)', 1, 1e5, True, False),
+}
+RATE_KEYS = ('lambda', 'mtbf', 'mtbf_base')   # parámetro que fija λ, por tipo
+TOP_IMPORTANCE = 10
+
+
+def _rates(mtbfs):
+    with np.errstate(divide='ignore'):
+        return np.where(mtbfs > 0, 1 / np.where(mtbfs > 0, mtbfs, 1), 0.0)
+
+
+def controls(block_type):
+    """Controles que aplican a un tipo de bloque, en el orden de CONTROLS"""
+    keys = DEFAULTS.get(normalize_type(block_type), {})
+    return [name for name in CONTROLS
+            if (name == 'lambda' and any(k in keys for k in RATE_KEYS)) or name in keys]
+
+
+def _slot_key(block_type, control):
+    """(parámetro, se guarda como 1/valor) de un control"""
+    if control != 'lambda':
+        return control, False
+    keys = DEFAULTS[normalize_type(block_type)]
+    key = next(k for k in RATE_KEYS if k in keys)
+    return key, key != 'lambda'
+
+
+class WhatIf:
+    """Registros de un diseño que se actualizan por bloque"""
+
+    def __init__(self, design, mission_time=1000.0, times=DEFAULT_TIMES):
+        self.design = design
+        self.mission_time = mission_time
+        self.times = np.asarray(times, dtype=float)
+        self.program = program = Program(design)
+        self.base = program.values.copy()
+        self.values = program.values.copy()
+        self.registers = program.run(self.values)[:, 0]
+
+        # Serie(s) que consumen cada registro y hoja que lee cada columna
+        self.parents = [[] for _ in range(program.size)]
+        for r in np.flatnonzero(program.ops == SERIES):
+            for c in program.operands[program.operand_ptr[r]:program.operand_ptr[r + 1]]:
+                self.parents[c].append(int(r))
+        leaves = np.repeat(np.arange(program.size), np.diff(program.slot_ptr))
+        self.slot_register = np.empty(program.slots.size, dtype=np.int64)
+        self.slot_register[program.slots] = leaves
+        self.dirty = set()
+        self.rates = _rates(self.registers[program.outputs])
+
+    def block_type(self, index, owner=''):
+        blocks = (self.program.definitions[owner] if owner else self.design)['blocks']
+        return blocks[index]['type']
+
+    def value(self, index, control, owner=''):
+        """Valor actual de un control"""
+        key, inverse = _slot_key(self.block_type(index, owner), control)
+        value = self.values[self.program.slot(index, key, owner)]
+        if inverse:
+            return 1 / value if value > 0 else 0.0
+        return value
+
+    def set(self, index, control, value, owner=''):
+        """Cambia un control; el cálculo se hace en update()
+
+        En los bloques con n y k, k se limita a n y n a k como mínimo.
+        """
+        block_type = self.block_type(index, owner)
+        if control in ('n', 'k') and {'n', 'k'} <= DEFAULTS[normalize_type(block_type)].keys():
+            if control == 'k':
+                value = min(value, self.value(index, 'n', owner))
+            else:
+                value = max(value, self.value(index, 'k', owner))
+        key, inverse = _slot_key(block_type, control)
+        slot = self.program.slot(index, key, owner)
+        if inverse:
+            value = 1 / value if value > 0 else 0.0
+        self.values[slot] = value
+        self.dirty.add(int(self.slot_register[slot]))
+
+    def reset(self):
+        self.values[:] = self.base
+        self.dirty.update(int(r) for r in self.slot_register)
+        self.update()
+
+    def update(self):
+        """Recalcula las hojas modificadas y las series que las contienen"""
+        if not self.dirty:
+            return
+        program = self.program
+        ancestors = set()
+        stack = list(self.dirty)
+        for r in self.dirty:
+            block_type = LEAF_TYPES[program.ops[r]]
+            slots = program.slots[program.slot_ptr[r]:program.slot_ptr[r + 1]]
+            params = dict(zip(DEFAULTS[block_type], self.values[slots].tolist()))
+            self.registers[r] = block_mtbf(block_type, params)
+        while stack:
+            for parent in self.parents[stack.pop()]:
+                if parent not in ancestors:
+                    ancestors.add(parent)
+                    stack.append(parent)
+        # Los operandos siempre tienen un índice menor que su serie
+        for r in sorted(ancestors):
+            operands = program.operands[program.operand_ptr[r]:program.operand_ptr[r + 1]]
+            total = _rates(self.registers[operands]).sum()
+            self.registers[r] = 1 / total if total > 0 else 0.0
+        self.dirty.clear()
+        self.rates = _rates(self.registers[program.outputs])
+
+    @property
+    def series(self):
+        return self.program.series
+
+    def summary(self, top=TOP_IMPORTANCE):
+        """MTBF, λ, R(t) e importancia del sistema con los valores actuales"""
+        mtbfs = self.registers[self.program.outputs]
+        result = {'blocks': mtbfs, 'series': self.series}
+        if not self.series:
+            return result
+        lam = float(self.rates.sum())
+        result['lambda'] = lam
+        result['mtbf'] = 1 / lam if lam > 0 else 0.0
+        result['reliability'] = np.exp(-lam * self.times)
+
+        # Importancia al tiempo de misión; la serie ordena por criticidad
+        t = self.mission_time
+        birnbaum = np.exp(-(lam - self.rates) * t)
+        unreliability = -np.expm1(-lam * t)
+        if unreliability > 0:
+            criticality = birnbaum * -np.expm1(-self.rates * t) / unreliability
+        else:
+            criticality = np.zeros_like(self.rates)
+        count = min(top, criticality.size)
+        best = np.argpartition(-criticality, count - 1)[:count] if count else []
+        best = sorted(best, key=lambda i: -criticality[i])
+        result['importance'] = [(int(i), float(birnbaum[i]), float(criticality[i]))
+                                for i in best]
+        return result
+
+    def curve(self, times):
+        """R(t) del sistema en serie con tasas constantes"""
+        return np.exp(-float(self.rates.sum()) * np.asarray(times, dtype=float))
+
+    def changes(self):
+        """Parámetros modificados: [(subsistema o '', índice, parámetro, valor)]
+
+        El parámetro usa el nombre que ya tiene el bloque (alias de cada
+        interfaz) o, si no lo tiene, el de DEFAULTS.
+        """
+        result = []
+        for slot in np.flatnonzero(self.values != self.base):
+            owner, index, key = self.program.slot_names[slot]
+            blocks = (self.program.definitions[owner] if owner else self.design)['blocks']
+            params = blocks[index].get('params', {})
+            alias = next((a for a in PARAM_ALIASES.get(key, (key,)) if a in params), key)
+            value = float(self.values[slot])
+            if key in ('n', 'k'):
+                value = int(round(value))
+            result.append((owner, index, alias, value))
+        return result
+
+
+def system_curve(design, times):
+    """R(t) del sistema en serie con la distribución de cada tipo de bloque
+
+    Es el cálculo exacto que el panel hace en segundo plano; sin conexiones
+    devuelve None.
+    """
+    if not design.get('connections'):
+        return None
+    from curves import block_reliability
+    return np.prod(block_reliability(design, np.asarray(times, dtype=float)), axis=0)
@@ -0,0 +1,313 @@
+"""Panel acoplable de escenarios: controles deslizantes con recálculo en vivo
+
+Cada movimiento de un control sólo se anota; un temporizador de un cuadro
+(FRAME_MS) junta todos los movimientos de ese intervalo y los aplica de una
+vez con whatif.WhatIf, que recalcula sólo los bloques tocados. La curva
+exacta con la distribución de cada tipo de bloque se calcula en un hilo;
+mientras tanto se muestra la de tasas constantes, y si llegan cambios con
+el hilo ocupado se calcula sólo el escenario más reciente.
+"""
+
+import numpy as np
+from PyQt5.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QHBoxLayout,
+                             QFormLayout, QPushButton, QLabel, QSlider,
+                             QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt5.QtCore import Qt, QTimer
+
+import profiling
+from chart_view import ChartView
+from curves import Plot
+from program import structure_key
+from whatif import CONTROLS, WhatIf, controls, system_curve
+
+FRAME_MS = 16          # los movimientos se aplican a lo sumo una vez por cuadro
+SLIDER_STEPS = 1000    # posiciones de los controles continuos
+CURVE_POINTS = 400
+SPAN_MTBF = 3.0
+
+
+def to_position(control, value):
+    _, low, high, log, integer = CONTROLS[control]
+    if integer:
+        return int(round(min(max(value, low), high)))
+    value = min(max(value, low), high)
+    if log:
+        return int(round(SLIDER_STEPS * np.log(value / low) / np.log(high / low)))
+    return int(round(SLIDER_STEPS * (value - low) / (high - low)))
+
+
+def from_position(control, position):
+    _, low, high, log, integer = CONTROLS[control]
+    if integer:
+        return position
+    if log:
+        return low * (high / low) ** (position / SLIDER_STEPS)
+    return low + (high - low) * position / SLIDER_STEPS
+
+
+class WhatIfDock(QDockWidget):
+    """Controles de λ, n, k e intervalo de mantenimiento del bloque seleccionado"""
+
+    def __init__(self, app, parent=None):
+        super().__init__('Escenarios', parent)
+        self.setObjectName('whatIfDock')
+        self.app = app
+        self.model = None
+        self.index = None
+        self.pending = {}          # (bloque, control) -> valor aún sin aplicar
+        self.exact = None
+        self.exact_task = None
+        self.exact_pending = False
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+
+        self.block_label = QLabel('Seleccione un bloque')
+        self.block_label.setStyleSheet('font-weight: bold;')
+        layout.addWidget(self.block_label)
+
+        form = QFormLayout()
+        self.sliders = {}
+        for control, (label, low, high, log, integer) in CONTROLS.items():
+            slider = QSlider(Qt.Horizontal)
+            if integer:
+                slider.setRange(int(low), int(high))
+            else:
+                slider.setRange(0, SLIDER_STEPS)
+            slider.valueChanged.connect(
+                lambda position, control=control: self.slider_moved(control, position))
+            value_label = QLabel()
+            value_label.setMinimumWidth(80)
+            row = QHBoxLayout()
+            row.addWidget(slider, 1)
+            row.addWidget(value_label)
+            form.addRow(label, row)
+            self.sliders[control] = (slider, value_label, form.labelForField(row))
+        layout.addLayout(form)
+
+        self.summary_label = QLabel()
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(['Bloque', 'Birnbaum', 'Criticidad'])
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.chart = ChartView()
+        layout.addWidget(self.chart, 1)
+
+        btn_layout = QHBoxLayout()
+        btn_reset = QPushButton('Restablecer')
+        btn_reset.clicked.connect(self.reset)
+        btn_apply = QPushButton('Aplicar al diseño')
+        btn_apply.clicked.connect(self.apply)
+        btn_layout.addWidget(btn_reset)
+        btn_layout.addWidget(btn_apply)
+        layout.addLayout(btn_layout)
+
+        self.setWidget(widget)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(FRAME_MS)
+        self.timer.timeout.connect(self.apply_pending)
+        app.scene.selectionChanged.connect(self.select_block)
+        self.visibilityChanged.connect(lambda visible: visible and self.select_block())
+
+    # Modelo ----------------------------------------------------------------
+
+    def rebuild(self, design=None):
+        """Compila el diseño actual; los cambios sin aplicar se descartan"""
+        design = design or self.app.to_design()
+        self.pending.clear()
+        self.model = WhatIf(design)
+        summary = self.model.summary()
+        mtbf = summary.get('mtbf') or 0.0
+        span = SPAN_MTBF * mtbf if 0 < mtbf < float('inf') else SPAN_MTBF * self.model.mission_time
+        self.grid = np.linspace(0.0, span, CURVE_POINTS)
+        self.baseline = self.model.curve(self.grid) if self.model.series else None
+        self.exact = None
+        self.refresh()
+
+    def stale(self, design):
+        """Indica si el diagrama cambió fuera del panel"""
+        return (self.model is None or structure_key(design) != self.model.program.key
+                or not np.array_equal(self.model.program.load_params(design), self.model.base))
+
+    def select_block(self):
+        if not self.isVisible():
+            return
+        design = self.app.to_design()
+        if self.stale(design):
+            self.rebuild(design)
+        selected = [i for i, block in enumerate(self.app.blocks) if block.isSelected()]
+        self.index = selected[0] if selected else None
+        self.sync_sliders()
+
+    def sync_sliders(self):
+        """Muestra los controles del bloque seleccionado con sus valores actuales"""
+        if self.index is None:
+            self.block_label.setText('Seleccione un bloque')
+            usable = []
+        else:
+            block = self.model.design['blocks'][self.index]
+            self.block_label.setText(f'{block["name"]} ({block["type"]})')
+            usable = controls(block['type']) if block['type'] != 'Subsistema' else []
+        for control, (slider, value_label, label) in self.sliders.items():
+            visible = control in usable
+            for widget in (slider, value_label, label):
+                widget.setVisible(visible)
+            if visible:
+                value = self.model.value(self.index, control)
+                slider.blockSignals(True)
+                slider.setValue(to_position(control, value))
+                slider.blockSignals(False)
+                value_label.setText(f'{value:.4g}')
+        self.limit_units(usable)
+
+    def limit_units(self, usable):
+        """Rangos de n y k que no permiten k > n"""
+        n_slider, k_slider = self.sliders['n'][0], self.sliders['k'][0]
+        _, n_low, n_high, _, _ = CONTROLS['n']
+        _, k_low, k_high, _, _ = CONTROLS['k']
+        if 'n' in usable and 'k' in usable:
+            n_low, k_high = k_slider.value(), n_slider.value()
+        for slider, low, high in ((n_slider, n_low, n_high), (k_slider, k_low, k_high)):
+            slider.blockSignals(True)
+            slider.setRange(int(low), int(high))
+            slider.blockSignals(False)
+
+    # Controles ---------------------------------------------------------------
+
+    def slider_moved(self, control, position):
+        if self.index is None:
+            return
+        value = from_position(control, position)
+        self.sliders[control][1].setText(f'{value:.4g}')
+        self.pending[(self.index, control)] = value
+        if control in ('n', 'k'):
+            self.limit_units([name for name in ('n', 'k') if not self.sliders[name][0].isHidden()])
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def apply_pending(self):
+        """Aplica los movimientos acumulados en el último cuadro"""
+        if not self.pending:
+            return
+        with profiling.span('escenario.cuadro'):
+            for (index, control), value in sorted(self.pending.items(), key=self.unit_order):
+                self.model.set(index, control, value)
+            self.pending.clear()
+            self.model.update()
+            self.refresh()
+        self.request_exact()
+
+    def reset(self):
+        if self.model is None:
+            return
+        self.pending.clear()
+        self.model.reset()
+        self.exact = None
+        self.sync_sliders()
+        self.refresh()
+
+    def apply(self):
+        """Escribe los valores del escenario en los bloques (se puede deshacer)"""
+        if self.model is None:
+            return
+        self.apply_pending()
+        history = {}
+        for owner, index, key, value in self.model.changes():
+            if not owner:
+                block = self.app.blocks[index]
+                old, new = history.setdefault(block.uid, ({}, {}))
+                old[key] = block.params.get(key)
+                new[key] = value
+        for uid, (old, new) in history.items():
+            self.app.set_fields(self.app.blocks_by_uid[uid], new)
+        # Un solo paso de deshacer para todo el escenario
+        self.app.history.push('params', history)
+        self.rebuild()
+        self.sync_sliders()
+
+    def unit_order(self, item):
+        # n sube antes que k y baja después: ninguno se recorta con el valor viejo del otro
+        (index, control), value = item
+        if control != 'n':
+            return 0
+        return -1 if value >= self.model.value(index, 'n') else 1
+
+    # Resultados ------------------------------------------------------------
+
+    def refresh(self):
+        summary = self.model.summary()
+        names = [block['name'] for block in self.model.design['blocks']]
+        if not summary['series']:
+            mtbfs = summary['blocks']
+            self.summary_label.setText(
+                'Sin conexiones: no hay sistema en serie.<br>'
+                + (f'MTBF medio de los bloques: {mtbfs.mean():.2f} h' if mtbfs.size else ''))
+            self.table.setRowCount(0)
+            self.chart.set_plot(None)
+            return
+
+        times = ', '.join(f'R({t:g}) = {r:.4f}'
+                          for t, r in zip(self.model.times, summary['reliability']))
+        self.summary_label.setText(
+            f'<b>MTBF del sistema: {summary["mtbf"]:.2f} h</b> · '
+            f'λ = {summary["lambda"]:.6g} fallos/h<br>{times}')
+
+        importance = summary['importance']
+        self.table.setRowCount(len(importance))
+        for row, (index, birnbaum, criticality) in enumerate(importance):
+            for col, text in enumerate((names[index], f'{birnbaum:.4g}', f'{criticality:.4f}')):
+                item = self.table.item(row, col)
+                if item is None:
+                    item = QTableWidgetItem()
+                    self.table.setItem(row, col, item)
+                item.setText(text)
+        self.show_curves()
+
+    def show_curves(self):
+        curves = [self.baseline, self.model.curve(self.grid)]
+        labels = ['Diseño', 'Escenario']
+        if self.exact is not None:
+            curves.append(self.exact)
+            labels.append('Escenario (exacto)')
+        self.chart.set_plot(Plot('R(t) del escenario', 'R(t)', self.grid, np.vstack(curves),
+                                 labels, y_range=(0.0, 1.0), emphasis=(1,)))
+
+    def request_exact(self):
+        """Curva exacta del escenario en un hilo; un cálculo a la vez"""
+        if not self.model.series:
+            return
+        if self.exact_task is not None:
+            self.exact_pending = True
+            return
+        from workers import Task
+        design = dict(self.model.design)
+        design['blocks'] = [dict(block, params=dict(block.get('params', {})))
+                            for block in design['blocks']]
+        for owner, index, key, value in self.model.changes():
+            if not owner:
+                design['blocks'][index]['params'][key] = value
+        self.exact_task = Task(system_curve, design, self.grid, parent=self)
+        self.exact_task.done.connect(self.exact_ready)
+        self.exact_task.finished.connect(self.exact_finished)
+        self.exact_task.start()
+
+    def exact_ready(self, curve):
+        # Un resultado que llega después de un cambio más nuevo igual se muestra:
+        # el cálculo pendiente lo reemplaza en cuanto termina
+        self.exact = curve
+        self.show_curves()
+
+    def exact_finished(self):
+        self.exact_task.deleteLater()
+        self.exact_task = None
+        if self.exact_pending:
+            self.exact_pending = False
+            self.request_exact()
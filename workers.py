@@ -0,0 +1,53 @@
+"""Tareas en segundo plano para las interfaces gráficas
+
+Task ejecuta una función de los módulos sin Qt en un QThread y entrega el
+resultado con señales, que Qt encola hacia el hilo de la interfaz:
+
+    task = Task(auto_layout, n, connections, parent=self)
+    task.done.connect(self.apply_layout)
+    task.start()
+
+Las operaciones de NumPy liberan el GIL, así que la interfaz sigue
+respondiendo mientras la tarea calcula.
+"""
+
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class Task(QThread):
+    """Ejecuta function(*args, **kwargs) fuera del hilo de la interfaz
+
+    Con progress=True la función recibe `progress`, que emite la señal del
+    mismo nombre, y con cancellable=True recibe `cancelled`, un
+    threading.Event que cancel() activa.
+    """
+
+    done = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(object)
+
+    def __init__(self, function, *args, progress=False, cancellable=False, parent=None,
+                 **kwargs):
+        super().__init__(parent)
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = threading.Event()
+        if progress:
+            self.kwargs['progress'] = self.progress.emit
+        if cancellable:
+            self.kwargs['cancelled'] = self.cancelled
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as e:  # noqa: BLE001 - se informa a la interfaz
+            self.failed.emit(f'{type(e).__name__}: {e}')
+            return
+        if not self.cancelled.is_set():
+            self.done.emit(result)